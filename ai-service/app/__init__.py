@@ -4,12 +4,14 @@ import os
 from flask import Flask
 from flask_jwt_extended import JWTManager
 
+from .json_provider import init_json
 from .models import db
 from .observability import register_observability
 
 
 def create_app():
     app = Flask(__name__)
+    init_json(app)
     register_observability(app, "ai-service")
 
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret")
@@ -1,16 +1,25 @@
 # api-gateway/app/__init__.py
-import os
-
-import requests
-from flask import Flask, current_app, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, get_jwt_identity, jwt_required
+from flask_jwt_extended import JWTManager, get_jwt, jwt_required
 
+from . import token_gate
+from .compression import compress_flask_response, get_compressor
 from .config import load_config
 from .identity import extract_tenant_context
+from .internal_identity import HEADER_NAME as IDENTITY_HEADER
+from .json_provider import init_json
 from .observability import register_observability
+from .overview import get_overview_aggregator
+from .revocation import get_revocation_replica
 from .routes_auth import bp as auth_bp
 from .routes_services import bp as services_bp
+from .static_cache import get_static_cache, init_static_cache
+from .theme import theme_response
+from .utils import get_current_identity
+
+# também aplicado pelo motor ASGI (app/asgi.py), que atende o proxy sem o Flask
+CORS_OPTIONS = {"supports_credentials": True, "expose_headers": ["X-Next-Cursor"]}
 
 
 def create_app():
@@ -18,6 +27,7 @@ def create_app():
     cfg = load_config()
 
     app = Flask(__name__)
+    init_json(app)
     register_observability(app, service_name)
 
     # JWT (deve usar o MESMO segredo dos outros serviços)
@@ -25,9 +35,26 @@ def create_app():
     app.config["ENV"] = cfg.app_env
 
     # CORS liberado pro frontend (ajusta depois se quiser fechar)
-    CORS(app, supports_credentials=True)
+    CORS(app, **CORS_OPTIONS)
+
+    # respostas bufferizadas (proxy, overview, tema) saem comprimidas quando
+    # o cliente aceita; o que o upstream já comprimiu passa intacto
+    compressor = get_compressor()
+
+    @app.after_request
+    def compress_response(response):
+        return compress_flask_response(
+            response, request.headers.get("Accept-Encoding"), compressor
+        )
+
+    jwt = JWTManager(app)
+    revocations = get_revocation_replica()
 
-    JWTManager(app)
+    # rotas atendidas pelo próprio gateway (tema, overview) também respeitam
+    # a revogação replicada do users-service
+    @jwt.token_in_blocklist_loader
+    def is_token_revoked(jwt_header, jwt_payload):  # type: ignore[unused-argument]
+        return token_gate.is_revoked(jwt_payload, revocations)
 
     # ------------------------------------------------------------
     # ROTAS DE API
@@ -59,104 +86,20 @@ def create_app():
 
     # ---------- Tema por tenant (BASIC / PRO / ENTERPRISE) ----------
 
-    BASE_THEMES = {
-        "BASIC": [
-            {
-                "id": "basic-blue",
-                "name": "Oficina Azul",
-                "primary": "#2563EB",
-                "secondary": "#0EA5E9",
-                "accent": "#F97316",
-                "background": "#020617",
-                "surface": "#0F172A",
-            },
-            {
-                "id": "basic-dark",
-                "name": "Garage Dark",
-                "primary": "#F97316",
-                "secondary": "#EAB308",
-                "accent": "#22C55E",
-                "background": "#020617",
-                "surface": "#111827",
-            },
-        ],
-        "PRO": [
-            {
-                "id": "pro-red",
-                "name": "Racing Red",
-                "primary": "#DC2626",
-                "secondary": "#F97316",
-                "accent": "#22C55E",
-                "background": "#0B1120",
-                "surface": "#111827",
-            },
-            {
-                "id": "pro-green",
-                "name": "Torque Green",
-                "primary": "#16A34A",
-                "secondary": "#22C55E",
-                "accent": "#FBBF24",
-                "background": "#022C22",
-                "surface": "#064E3B",
-            },
-        ],
-        "ENTERPRISE": [
-            {
-                "id": "enterprise-custom-base",
-                "name": "Enterprise Custom Base",
-                "primary": "#38BDF8",
-                "secondary": "#6366F1",
-                "accent": "#F97316",
-                "background": "#020617",
-                "surface": "#020617",
-            }
-        ],
-    }
-
-    def _tenant_theme_payload():
-        """
-        Retorna opções de paleta para o tenant atual, baseado no plano.
-        Espera que o JWT contenha algo como:
-        {
-          "tenant_id": 1,
-          "plan": "BASIC" | "PRO" | "ENTERPRISE",
-          "tenant_name": "Oficina X"
-        }
-        """
-        identity = extract_tenant_context(get_jwt_identity() or {})
-        plan = identity.get("plan", "BASIC")
-        tenant_name = identity.get("tenant_name")
-
-        available_plans = ["BASIC", "PRO", "ENTERPRISE"]
-        if plan not in available_plans:
-            plan = "BASIC"
-
-        themes_for_plan = BASE_THEMES.get(plan, BASE_THEMES["BASIC"])
-
-        # Placeholder pra futuro: buscar palette custom do tenant em algum serviço
-        custom_palette = None
-
-        return {
-            "tenant": {
-                "id": identity.get("tenant_id"),
-                "name": tenant_name,
-                "plan": plan,
-            },
-            "themes": themes_for_plan,
-            "custom_palette": custom_palette,
-            "custom_allowed": plan in ("PRO", "ENTERPRISE"),
-            "custom_only_enterprise": plan == "ENTERPRISE",
-        }
+    def _tenant_theme_response():
+        # plano/tenant vêm das claims (o sub do users-service é só o id)
+        identity = extract_tenant_context(get_current_identity())
+        return theme_response(identity, request.if_none_match)
 
     @app.route("/tenant/theme", methods=["GET"])
     @jwt_required()
     def tenant_theme():
-        return jsonify(_tenant_theme_payload())
+        return _tenant_theme_response()
 
     @app.route("/api/tenant/theme", methods=["GET"])
     @jwt_required()
     def api_tenant_theme():
-        return jsonify(_tenant_theme_payload())
+        return _tenant_theme_response()
 
     # ---------- Overview simples agregando serviços ----------
 
@@ -165,67 +108,12 @@ def create_app():
         headers = {}
         if auth_header:
             headers["Authorization"] = auth_header
+        identity_header = token_gate.identity_header(get_jwt(), cfg)
+        if identity_header:
+            headers[IDENTITY_HEADER] = identity_header
 
-        summary = {}
-
-        # OS (management-service)
-        try:
-            resp_os = requests.get(
-                cfg.management_service_url.rstrip("/") + "/os",
-                headers=headers,
-                timeout=5,
-            )
-            if resp_os.ok:
-                os_list = resp_os.json()
-                open_status = {"OPEN", "IN_PROGRESS", "WAITING_PARTS"}
-                summary["service_orders"] = {
-                    "total": len(os_list),
-                    "open": len([o for o in os_list if o.get("status") in open_status]),
-                    "completed": len(
-                        [o for o in os_list if o.get("status") == "COMPLETED"]
-                    ),
-                }
-            else:
-                summary["service_orders"] = {"error": resp_os.status_code}
-        except Exception:
-            summary["service_orders"] = {"error": "unavailable"}
-
-        # Recebíveis pendentes (financial-service)
-        try:
-            resp_rec = requests.get(
-                cfg.financial_service_url.rstrip("/") + "/receivables",
-                headers=headers,
-                params={"status": "PENDING"},
-                timeout=5,
-            )
-            if resp_rec.ok:
-                rec_list = resp_rec.json()
-                summary["receivables"] = {
-                    "pending_count": len(rec_list),
-                    "pending_total": sum(float(r.get("amount", 0)) for r in rec_list),
-                }
-            else:
-                summary["receivables"] = {"error": resp_rec.status_code}
-        except Exception:
-            summary["receivables"] = {"error": "unavailable"}
-
-        # Tarefas abertas (teamcrm-service)
-        try:
-            resp_tasks = requests.get(
-                cfg.teamcrm_service_url.rstrip("/") + "/tasks",
-                headers=headers,
-                params={"only_open": "1"},
-                timeout=5,
-            )
-            if resp_tasks.ok:
-                tasks = resp_tasks.json()
-                summary["tasks"] = {"open_count": len(tasks)}
-            else:
-                summary["tasks"] = {"error": resp_tasks.status_code}
-        except Exception:
-            summary["tasks"] = {"error": "unavailable"}
-
-        return summary
+        identity = extract_tenant_context(get_current_identity())
+        return get_overview_aggregator().build(identity.get("tenant_id"), headers)
 
     @app.route("/overview", methods=["GET"])
     @jwt_required()
@@ -240,12 +128,13 @@ def create_app():
     # ---------- Frontend estático (React/Vite) ----------
 
     app.config["FRONTEND_DIST_PATH"] = cfg.frontend_dist_path
+    init_static_cache(app, cfg.frontend_dist_path)
 
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
     def serve_frontend(path: str):
         """
-        Serve arquivos estáticos do frontend.
+        Serve arquivos estáticos do frontend (da memória, ver app/static_cache.py).
         Se o arquivo não existir, devolve index.html (SPA).
         Se nem index existir, responde erro de frontend não construído.
 
@@ -254,17 +143,15 @@ def create_app():
         if path.startswith("api/"):
             return jsonify({"error": "api_route_not_found"}), 404
 
-        dist_path = current_app.config["FRONTEND_DIST_PATH"]
-
-        if path:
-            file_path = os.path.join(dist_path, path)
-            if os.path.exists(file_path) and os.path.isfile(file_path):
-                return send_from_directory(dist_path, path)
-
-        index_path = os.path.join(dist_path, "index.html")
-        if os.path.exists(index_path):
-            return send_from_directory(dist_path, "index.html")
+        cache = get_static_cache()
+        asset = (cache.lookup(path) if path else None) or cache.lookup("index.html")
+        if asset is None:
+            return jsonify({"error": "frontend_not_built"}), 500
 
-        return jsonify({"error": "frontend_not_built"}), 500
+        return cache.respond(
+            asset,
+            request.headers.get("Accept-Encoding"),
+            request.headers.get("If-None-Match"),
+        )
 
     return app
@@ -0,0 +1,326 @@
+"""
+Asyncio (ASGI) runtime for the API Gateway.
+
+Rotas de proxy (tabela em ``routing.py``) são atendidas direto no event loop
+com um ``httpx.AsyncClient`` compartilhado, sem prender thread por requisição
+em voo. Todo o resto (overview, tema, health, frontend) cai no app Flask
+existente via ``a2wsgi``.
+
+Uso: ``uvicorn asgi:app --host 0.0.0.0 --port 5000``
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httpx
+from a2wsgi import WSGIMiddleware
+from flask import Flask
+from flask_cors.core import get_cors_headers, get_cors_options
+from werkzeug.datastructures import Headers
+
+from . import CORS_OPTIONS
+from .compression import add_vary, build_compressor
+from .config import BaseConfig, load_config
+from .internal_identity import HEADER_NAME as IDENTITY_HEADER
+from .observability import REQUEST_COUNT, REQUEST_LATENCY
+from .proxy import STRIPPED_REQUEST_HEADERS, forwarded_for
+from .revocation import RevocationReplica, get_revocation_replica
+from .routing import ProxyRoute, match_proxy_route
+from .token_gate import REVOKED_MESSAGE, inspect_authorization
+
+SERVICE_NAME = "api-gateway"
+
+# Cabeçalhos de resposta que não atravessam o proxy. O corpo é repassado cru
+# (``aiter_raw``), então content-encoding/content-length continuam válidos.
+EXCLUDED_RESPONSE_HEADERS = {"connection", "keep-alive", "transfer-encoding"}
+
+
+def _decode_headers(raw: List[Tuple[bytes, bytes]]) -> List[Tuple[str, str]]:
+    return [(k.decode("latin-1"), v.decode("latin-1")) for k, v in raw]
+
+
+class AsyncGateway:
+    def __init__(
+        self,
+        wsgi_app=None,
+        cfg: Optional[BaseConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        revocations: Optional[RevocationReplica] = None,
+    ) -> None:
+        if wsgi_app is None:
+            from . import create_app
+
+            wsgi_app = create_app()
+        self.cfg = cfg or load_config()
+        self.revocations = revocations if revocations is not None else get_revocation_replica()
+        self.fallback = WSGIMiddleware(wsgi_app)
+        # mesmas opções do flask-cors do app WSGI (inclusive CORS_* do config)
+        self.cors = get_cors_options(
+            wsgi_app if isinstance(wsgi_app, Flask) else None, CORS_OPTIONS
+        )
+        self.compressor = build_compressor(self.cfg)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    # ---------- cliente HTTP compartilhado ----------
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.cfg.async_max_connections,
+            max_keepalive_connections=self.cfg.upstream_pool_size,
+            keepalive_expiry=self.cfg.upstream_idle_timeout,
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(self.cfg.upstream_timeout),
+            transport=self._transport,
+            follow_redirects=False,
+            # cliente compartilhado entre usuários: Set-Cookie do upstream não é guardado
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- ASGI ----------
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        matched = match_proxy_route(scope["path"], scope["method"])
+        if matched is None or scope["method"] == "OPTIONS":
+            # preflight vai pro Flask, igual ao motor WSGI (flask-cors responde)
+            await self.fallback(scope, receive, send)
+            return
+
+        route, path = matched
+        await self._proxy(scope, receive, send, route, path)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._client = self._build_client()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _proxy(self, scope, receive, send, route: ProxyRoute, path: str) -> None:
+        started = time.perf_counter()
+        method = scope["method"]
+        route_label = f"/{route.prefix}/<path:path>"
+
+        url = route.base_url(self.cfg).rstrip("/")
+        subpath = route.subpath(path)
+        if subpath:
+            url += "/" + subpath.lstrip("/")
+        query = scope.get("query_string", b"").decode("latin-1")
+        if query:
+            url += "?" + query
+
+        headers = []
+        trace_id = None
+        authorization = None
+        accept_encoding = None
+        xff = None
+        has_length = False
+        chunked = False
+        for name, value in _decode_headers(scope.get("headers", [])):
+            lname = name.lower()
+            if lname == "x-trace-id":
+                trace_id = value
+            if lname == "authorization":
+                authorization = value
+            if lname == "accept-encoding":
+                accept_encoding = value
+            if lname == "x-forwarded-for":
+                xff = value
+                continue
+            if lname == "content-length":
+                has_length = True
+                headers.append((name, value))
+                continue
+            if lname == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+            if lname in STRIPPED_REQUEST_HEADERS:
+                continue
+            headers.append((name, value))
+        if trace_id is None:
+            trace_id = uuid.uuid4().hex
+            headers.append(("X-Trace-Id", trace_id))
+        if accept_encoding is None:
+            # sem isso o httpx pede gzip por conta própria
+            headers.append(("Accept-Encoding", "identity"))
+
+        client = scope.get("client")
+        xff = forwarded_for(xff, client[0] if client else None)
+        if xff:
+            headers.append(("X-Forwarded-For", xff))
+
+        cors_headers = self._cors_headers(scope, method)
+
+        decision = inspect_authorization(authorization, self.cfg, self.revocations)
+        if decision.identity_header:
+            headers.append((IDENTITY_HEADER, decision.identity_header))
+
+        async def body() -> AsyncIterator[bytes]:
+            more = True
+            while more:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                chunk = message.get("body", b"")
+                more = message.get("more_body", False)
+                if chunk:
+                    yield chunk
+
+        content = body() if (has_length or chunked) else None
+
+        status = 502
+        try:
+            if decision.revoked:
+                status = 401
+                await self._send_json(
+                    send, status, {"msg": REVOKED_MESSAGE}, trace_id, cors_headers
+                )
+                return
+            request = self.client.build_request(method, url, headers=headers, content=content)
+            resp = await self.client.send(request, stream=True)
+        except httpx.TimeoutException:
+            status = 504
+            await self._send_error(send, status, "upstream_timeout", trace_id, cors_headers)
+        except httpx.HTTPError:
+            await self._send_error(send, status, "upstream_unavailable", trace_id, cors_headers)
+        else:
+            status = resp.status_code
+            try:
+                response_headers = [
+                    (k.encode("latin-1"), v.encode("latin-1"))
+                    for k, v in resp.headers.multi_items()
+                    if k.lower() not in EXCLUDED_RESPONSE_HEADERS
+                    and k.lower() != "x-trace-id"
+                ]
+                response_headers.append((b"x-trace-id", trace_id.encode("latin-1")))
+                response_headers.extend(cors_headers)
+                encoding = self._negotiate_compression(resp, accept_encoding)
+                if encoding is not None:
+                    await self._send_compressed(send, resp, response_headers, encoding)
+                    return
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": status,
+                        "headers": response_headers,
+                    }
+                )
+                async for chunk in resp.aiter_raw():
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            finally:
+                await resp.aclose()
+        finally:
+            REQUEST_LATENCY.labels(
+                service=SERVICE_NAME, method=method, route=route_label
+            ).observe(time.perf_counter() - started)
+            REQUEST_COUNT.labels(
+                service=SERVICE_NAME, method=method, route=route_label, status=str(status)
+            ).inc()
+
+    def _negotiate_compression(self, resp: httpx.Response, accept_encoding) -> Optional[str]:
+        """
+        Só corpos não codificados com tamanho conhecido até o limite de
+        streaming; o resto (inclusive o que o upstream já comprimiu) passa cru.
+        """
+        if "content-encoding" in resp.headers or resp.status_code in (204, 206, 304):
+            return None
+        try:
+            length = int(resp.headers.get("content-length", ""))
+        except ValueError:
+            return None
+        if length > self.cfg.proxy_stream_threshold:
+            return None
+        return self.compressor.negotiate(
+            accept_encoding, resp.headers.get("content-type"), length
+        )
+
+    async def _send_compressed(self, send, resp, response_headers, encoding: str) -> None:
+        body = await resp.aread()
+        compressed = self.compressor.compress(body, encoding)
+        headers = [
+            (k, v) for k, v in response_headers if k.lower() not in (b"content-length", b"vary")
+        ]
+        vary = add_vary(resp.headers.get("vary"))
+        headers.append((b"vary", vary.encode("latin-1")))
+        if compressed is not None:
+            body = compressed
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            # outra representação do mesmo recurso: ETag forte vira fraco
+            headers = [
+                (k, b"W/" + v if k.lower() == b"etag" and not v.startswith(b"W/") else v)
+                for k, v in headers
+            ]
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": resp.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+    def _cors_headers(self, scope, method: str) -> List[Tuple[bytes, bytes]]:
+        """Cabeçalhos ``Access-Control-*`` que o flask-cors poria nessa resposta."""
+        request_headers = Headers(_decode_headers(scope.get("headers", [])))
+        return [
+            (name.encode("latin-1"), str(value).encode("latin-1"))
+            for name, value in get_cors_headers(self.cors, request_headers, method).items(
+                multi=True
+            )
+        ]
+
+    @classmethod
+    async def _send_error(
+        cls, send, status: int, error: str, trace_id: str, extra_headers=()
+    ) -> None:
+        await cls._send_json(send, status, {"error": error}, trace_id, extra_headers)
+
+    @staticmethod
+    async def _send_json(
+        send, status: int, payload: dict, trace_id: str, extra_headers=()
+    ) -> None:
+        body = json.dumps(payload).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-trace-id", trace_id.encode("latin-1")),
+                    *extra_headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+def create_asgi_app(
+    wsgi_app=None, cfg: Optional[BaseConfig] = None, transport=None, revocations=None
+):
+    return AsyncGateway(
+        wsgi_app=wsgi_app, cfg=cfg, transport=transport, revocations=revocations
+    )
@@ -0,0 +1,231 @@
+"""Response compression at the gateway: negotiation, size threshold, CPU budget."""
+
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import BaseConfig, load_config
+from .observability import GATEWAY_COMPRESSION
+
+try:  # brotli e zstd são opcionais: sem eles só gzip
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende do ambiente
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/problem+json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+    "application/wasm",
+)
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """``Accept-Encoding`` -> {codificação: q}."""
+    result: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        result[token] = q
+    return result
+
+
+def choose_encoding(header: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """Melhor codificação disponível aceita pelo cliente (ordem de ``available``)."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def _encoders(gzip_level: int, brotli_quality: int, zstd_level: int) -> Dict[str, Callable]:
+    # ordem = preferência quando o cliente aceita várias com o mesmo q
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        # ZstdCompressor não é thread-safe: um contexto por thread
+        local = threading.local()
+
+        def zstd_compress(data: bytes) -> bytes:
+            cctx = getattr(local, "cctx", None)
+            if cctx is None:
+                cctx = local.cctx = zstandard.ZstdCompressor(level=zstd_level)
+            return cctx.compress(data)
+
+        encoders["zstd"] = zstd_compress
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=brotli_quality)
+    encoders["gzip"] = lambda data: gzip.compress(data, gzip_level, mtime=0)
+    return encoders
+
+
+class CpuBudget:
+    """
+    Balde de CPU por processo: ``fraction`` segundos de CPU de compressão por
+    segundo de relógio, acumulando no máximo ``burst`` segundos. Sem saldo a
+    resposta sai sem compressão (nunca espera).
+    """
+
+    def __init__(self, fraction: float, burst: float = 1.0) -> None:
+        self.fraction = fraction
+        self.burst = burst
+        self._balance = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        if self.fraction <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._balance = min(
+                self.burst, self._balance + (now - self._updated) * self.fraction
+            )
+            self._updated = now
+            return self._balance > 0
+
+    def spend(self, seconds: float) -> None:
+        with self._lock:
+            self._balance -= seconds
+
+
+class Compressor:
+    """
+    Comprime respostas ainda não codificadas quando o cliente aceita
+    (zstd/br/gzip, o que estiver instalado), o corpo tem pelo menos
+    ``min_size`` bytes, o tipo é texto/JSON e ainda há orçamento de CPU.
+    Corpos que o upstream já mandou comprimidos não passam por aqui.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        cpu_budget: float = 0.25,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.min_size = min_size
+        self.budget = CpuBudget(cpu_budget)
+        self.encoders = _encoders(gzip_level, brotli_quality, zstd_level)
+
+    @property
+    def encodings(self) -> List[str]:
+        return list(self.encoders)
+
+    def negotiate(
+        self, accept_encoding: Optional[str], content_type: Optional[str], size: int
+    ) -> Optional[str]:
+        if size < self.min_size or not is_compressible(content_type):
+            return None
+        encoding = choose_encoding(accept_encoding, self.encoders)
+        if encoding is None:
+            return None
+        if not self.budget.available():
+            GATEWAY_COMPRESSION.labels(encoding=encoding, result="over_budget").inc()
+            return None
+        return encoding
+
+    def compress(self, body: bytes, encoding: str) -> Optional[bytes]:
+        """Corpo comprimido, ou None se não ficou menor."""
+        started = time.thread_time()
+        compressed = self.encoders[encoding](body)
+        self.budget.spend(time.thread_time() - started)
+        if len(compressed) >= len(body):
+            GATEWAY_COMPRESSION.labels(encoding=encoding, result="not_smaller").inc()
+            return None
+        GATEWAY_COMPRESSION.labels(encoding=encoding, result="compressed").inc()
+        return compressed
+
+    def maybe_compress(
+        self, body: bytes, content_type: Optional[str], accept_encoding: Optional[str]
+    ) -> Tuple[bytes, Optional[str]]:
+        encoding = self.negotiate(accept_encoding, content_type, len(body))
+        if encoding is None:
+            return body, None
+        compressed = self.compress(body, encoding)
+        if compressed is None:
+            return body, None
+        return compressed, encoding
+
+
+def add_vary(value: Optional[str], header: str = "Accept-Encoding") -> str:
+    if not value:
+        return header
+    if header.lower() in (part.strip().lower() for part in value.split(",")):
+        return value
+    return f"{value}, {header}"
+
+
+def compress_flask_response(response, accept_encoding: Optional[str], compressor: Compressor):
+    """``after_request``: comprime respostas Flask bufferizadas."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or "Content-Encoding" in response.headers
+        or "no-transform" in response.headers.get("Cache-Control", "")
+    ):
+        return response
+    if not is_compressible(response.mimetype):
+        return response
+    response.headers["Vary"] = add_vary(response.headers.get("Vary"))
+    body, encoding = compressor.maybe_compress(
+        response.get_data(), response.mimetype, accept_encoding
+    )
+    if encoding is None:
+        return response
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    # mesmo recurso, outra representação: o ETag vira fraco
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def build_compressor(cfg: BaseConfig) -> Compressor:
+    return Compressor(min_size=cfg.compress_min_size, cpu_budget=cfg.compress_cpu_budget)
+
+
+_compressor: Optional[Compressor] = None
+_compressor_lock = threading.Lock()
+
+
+def get_compressor() -> Compressor:
+    global _compressor
+    if _compressor is None:
+        with _compressor_lock:
+            if _compressor is None:
+                _compressor = build_compressor(load_config())
+    return _compressor
@@ -22,6 +22,33 @@ class BaseConfig:
     ai_service_url: str = os.getenv("AI_SERVICE_URL", "http://ai-service:5005")
     frontend_dist_path: str = os.getenv("FRONTEND_DIST_PATH", "/app/frontend/dist")
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    # Pool de conexões keep-alive por upstream (ver app/upstream.py)
+    upstream_pool_size: int = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+    upstream_pool_block: bool = os.getenv("UPSTREAM_POOL_BLOCK", "false").lower() == "true"
+    upstream_idle_timeout: float = float(os.getenv("UPSTREAM_IDLE_TIMEOUT", "60"))
+    upstream_timeout: float = float(os.getenv("UPSTREAM_TIMEOUT", "30"))
+    # Conexões simultâneas aos upstreams no motor ASGI (app/asgi.py)
+    async_max_connections: int = int(os.getenv("ASYNC_MAX_CONNECTIONS", "1000"))
+    # /overview: fan-out paralelo com prazo total e cache por tenant
+    overview_deadline: float = float(os.getenv("OVERVIEW_DEADLINE", "3"))
+    overview_section_timeout: float = float(os.getenv("OVERVIEW_SECTION_TIMEOUT", "5"))
+    overview_cache_ttl: float = float(os.getenv("OVERVIEW_CACHE_TTL", "15"))
+    overview_stale_ttl: float = float(os.getenv("OVERVIEW_STALE_TTL", "60"))
+    overview_cache_max_entries: int = int(os.getenv("OVERVIEW_CACHE_MAX_ENTRIES", "10000"))
+    # Corpos maiores que isso (bytes) passam pelo proxy em streaming
+    proxy_stream_threshold: int = int(os.getenv("PROXY_STREAM_THRESHOLD", str(1024 * 1024)))
+    proxy_stream_chunk_size: int = int(os.getenv("PROXY_STREAM_CHUNK_SIZE", str(64 * 1024)))
+    # Compressão de respostas (app/compression.py): tamanho mínimo em bytes e
+    # fração de um núcleo que cada processo pode gastar comprimindo
+    compress_min_size: int = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    compress_cpu_budget: float = float(os.getenv("COMPRESS_CPU_BUDGET", "0.25"))
+    # Revogação replicada do users-service via pub/sub (app/revocation.py)
+    redis_url: str = os.getenv("REDIS_URL", "")
+    redis_socket_timeout: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.2"))
+    # Cabeçalho de identidade assinado pros serviços internos (app/token_gate.py);
+    # vazio = chave derivada do JWT_SECRET_KEY
+    internal_identity_secret: str = os.getenv("INTERNAL_IDENTITY_SECRET", "")
+    internal_identity_ttl: float = float(os.getenv("INTERNAL_IDENTITY_TTL", "60"))
 
 
 @dataclass
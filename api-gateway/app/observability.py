@@ -9,7 +9,7 @@ from logging.config import dictConfig
 from typing import Optional
 
 from flask import Flask, g, has_request_context, request
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from prometheus_flask_exporter import PrometheusMetrics
 
 try:  # opentelemetry is optional at runtime
@@ -46,6 +46,44 @@ OS_CREATED_COUNTER = Counter(
     "os_created_total", "Service Orders created per tenant", ["tenant_id"]
 )
 
+# Gateway -> upstream connection pools (app/upstream.py)
+UPSTREAM_POOL_IN_USE = Gauge(
+    "gateway_upstream_pool_in_use",
+    "Requests currently borrowing an upstream pooled session",
+    ["upstream"],
+)
+UPSTREAM_POOL_SATURATED = Counter(
+    "gateway_upstream_pool_saturated_total",
+    "Requests that found the upstream pool already at its max size",
+    ["upstream"],
+)
+UPSTREAM_POOL_EVICTIONS = Counter(
+    "gateway_upstream_pool_evictions_total",
+    "Upstream sessions closed after exceeding the idle timeout",
+    ["upstream"],
+)
+
+# Verificação de JWT na borda (app/token_gate.py)
+GATEWAY_TOKEN_CHECKS = Counter(
+    "gateway_token_checks_total",
+    "Bearer tokens checked at the gateway by outcome",
+    ["result"],
+)
+
+# Frontend servido da memória (app/static_cache.py)
+GATEWAY_STATIC_RESPONSES = Counter(
+    "gateway_static_responses_total",
+    "Frontend files served by the gateway by status and content encoding",
+    ["status", "encoding"],
+)
+
+# Compressão negociada de respostas (app/compression.py)
+GATEWAY_COMPRESSION = Counter(
+    "gateway_compression_total",
+    "Response compression decisions by encoding and result",
+    ["encoding", "result"],
+)
+
 _APP_INFO_REGISTERED = False
 
 
@@ -0,0 +1,236 @@
+"""Concurrent, cached fan-out behind ``/overview`` (dashboard summary)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .config import BaseConfig, load_config
+from .upstream import get_upstream_pool
+
+# (status, payload): status é "ok" ou "error"
+SectionResult = Tuple[str, Dict[str, Any]]
+SectionFetcher = Callable[[BaseConfig, Dict[str, str]], SectionResult]
+
+# ---------- seções ----------
+
+
+def fetch_service_orders(cfg: BaseConfig, headers: Dict[str, str]) -> SectionResult:
+    resp = get_upstream_pool().get(
+        cfg.management_service_url.rstrip("/") + "/os/stats",
+        headers=headers,
+        timeout=cfg.overview_section_timeout,
+    )
+    if not resp.ok:
+        return "error", {"error": resp.status_code}
+    stats = resp.json()
+    return "ok", {
+        "total": stats.get("total", 0),
+        "open": stats.get("open", 0),
+        "completed": stats.get("completed", 0),
+    }
+
+
+def fetch_receivables(cfg: BaseConfig, headers: Dict[str, str]) -> SectionResult:
+    resp = get_upstream_pool().get(
+        cfg.financial_service_url.rstrip("/") + "/receivables/stats",
+        headers=headers,
+        timeout=cfg.overview_section_timeout,
+    )
+    if not resp.ok:
+        return "error", {"error": resp.status_code}
+    stats = resp.json()
+    return "ok", {
+        "pending_count": stats.get("pending_count", 0),
+        "pending_total": float(stats.get("pending_total", 0)),
+    }
+
+
+def fetch_tasks(cfg: BaseConfig, headers: Dict[str, str]) -> SectionResult:
+    resp = get_upstream_pool().get(
+        cfg.teamcrm_service_url.rstrip("/") + "/tasks/stats",
+        headers=headers,
+        timeout=cfg.overview_section_timeout,
+    )
+    if not resp.ok:
+        return "error", {"error": resp.status_code}
+    return "ok", {"open_count": resp.json().get("open_count", 0)}
+
+
+OVERVIEW_SECTIONS: Dict[str, SectionFetcher] = {
+    "service_orders": fetch_service_orders,
+    "receivables": fetch_receivables,
+    "tasks": fetch_tasks,
+}
+
+
+# ---------- cache por tenant ----------
+
+
+@dataclass
+class _Entry:
+    value: Dict[str, Any]
+    fetched_at: float
+
+
+class SectionCache:
+    """
+    Cache TTL com stale-while-revalidate.
+
+    - idade <= ``ttl``: "fresh", serve direto.
+    - idade <= ``ttl + stale_ttl``: "stale", serve e revalida em background.
+    - acima disso (ou ausente): "miss", e a entrada sai do cache.
+
+    No máximo ``max_entries`` entradas (LRU): acima disso a menos usada sai,
+    pra memória não crescer com o número de tenants.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Dict[str, Any]], str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss"
+            age = now - entry.fetched_at
+            if age > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                return None, "miss"
+            self._entries.move_to_end(key)
+        if age <= self.ttl:
+            return entry.value, "fresh"
+        return entry.value, "stale"
+
+    def store(self, key: Hashable, value: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = _Entry(value=value, fetched_at=now)
+            self._entries.move_to_end(key)
+            self._purge(now)
+
+    def _purge(self, now: float) -> None:
+        # varre as vencidas no máximo uma vez por ``ttl``; o teto vale sempre
+        if now >= self._next_sweep:
+            limit = self.ttl + self.stale_ttl
+            expired = [k for k, e in self._entries.items() if now - e.fetched_at > limit]
+            for key in expired:
+                del self._entries[key]
+            self._next_sweep = now + self.ttl
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ---------- agregador ----------
+
+
+class OverviewAggregator:
+    def __init__(
+        self,
+        cfg: BaseConfig,
+        sections: Optional[Dict[str, SectionFetcher]] = None,
+        max_workers: int = 16,
+    ) -> None:
+        self.cfg = cfg
+        self.sections = sections if sections is not None else OVERVIEW_SECTIONS
+        self.cache = SectionCache(
+            cfg.overview_cache_ttl, cfg.overview_stale_ttl, cfg.overview_cache_max_entries
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="overview"
+        )
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _run(self, name: str, headers: Dict[str, str]) -> SectionResult:
+        try:
+            return self.sections[name](self.cfg, headers)
+        except Exception:
+            return "error", {"error": "unavailable"}
+
+    def _submit(
+        self, key: Optional[Hashable], name: str, headers: Dict[str, str]
+    ) -> Future:
+        """Dispara a busca da seção, reaproveitando uma já em voo pro mesmo tenant."""
+        if key is None:
+            return self._executor.submit(self._run, name, headers)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._run, name, headers)
+            self._inflight[key] = future
+
+        def _done(fut: Future) -> None:
+            with self._lock:
+                self._inflight.pop(key, None)
+            status, payload = fut.result()
+            if status == "ok":
+                self.cache.store(key, payload)
+
+        future.add_done_callback(_done)
+        return future
+
+    def build(self, tenant_id: Any, headers: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Monta o resumo com as seções em paralelo, respeitando
+        ``OVERVIEW_DEADLINE``. Cada seção traz ``status``:
+        ok | stale | error | timeout.
+        """
+        summary: Dict[str, Any] = {}
+        pending: Dict[str, Future] = {}
+
+        for name in self.sections:
+            key = (tenant_id, name) if tenant_id is not None else None
+            value, state = self.cache.lookup(key) if key else (None, "miss")
+            if state == "fresh":
+                summary[name] = {**value, "status": "ok"}
+            elif state == "stale":
+                summary[name] = {**value, "status": "stale"}
+                self._submit(key, name, headers)
+            else:
+                pending[name] = self._submit(key, name, headers)
+
+        if pending:
+            done, _ = wait(pending.values(), timeout=self.cfg.overview_deadline)
+            for name, future in pending.items():
+                if future in done:
+                    status, payload = future.result()
+                    summary[name] = {**payload, "status": status}
+                else:
+                    # segue rodando em background e aquece o cache pro próximo load
+                    summary[name] = {"error": "timeout", "status": "timeout"}
+
+        return {name: summary[name] for name in self.sections}
+
+
+_aggregator: Optional[OverviewAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_overview_aggregator() -> OverviewAggregator:
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = OverviewAggregator(load_config())
+    return _aggregator
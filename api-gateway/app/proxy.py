@@ -1,8 +1,15 @@
 # api-gateway/app/proxy.py
-from typing import Dict
+from typing import Dict, Iterator, Optional
 
-import requests
-from flask import Response, request
+from flask import Response, jsonify, request
+
+from .config import load_config
+from .internal_identity import HEADER_NAME as IDENTITY_HEADER
+from .revocation import get_revocation_replica
+from .token_gate import REVOKED_MESSAGE, inspect_authorization
+from .upstream import get_upstream_pool
+
+cfg = load_config()
 
 # Cabeçalhos que NÃO devem ser repassados
 HOP_BY_HOP_HEADERS = {
@@ -18,22 +25,106 @@ HOP_BY_HOP_HEADERS = {
     "host",
 }
 
+# Nunca aceitos do cliente: o gateway gera o seu (ver token_gate.py)
+STRIPPED_REQUEST_HEADERS = HOP_BY_HOP_HEADERS | {IDENTITY_HEADER.lower()}
+
+
+def forwarded_for(existing: Optional[str], client_ip: Optional[str]) -> Optional[str]:
+    """X-Forwarded-For com o IP de quem falou com o gateway no fim da lista."""
+    if not client_ip:
+        return existing
+    return f"{existing}, {client_ip}" if existing else client_ip
+
 
 def _filter_request_headers() -> Dict[str, str]:
     headers: Dict[str, str] = {}
     for k, v in request.headers.items():
-        if k.lower() in HOP_BY_HOP_HEADERS:
+        if k.lower() in STRIPPED_REQUEST_HEADERS:
             continue
         headers[k] = v
     return headers
 
 
+class _StreamedBody:
+    """
+    Corpo da requisição lido em blocos direto do socket do cliente.
+
+    Expõe ``__len__`` quando o Content-Length é conhecido para que o
+    ``requests`` repasse o tamanho ao upstream em vez de usar chunked.
+    """
+
+    def __init__(self, stream, length: Optional[int], chunk_size: int) -> None:
+        self._stream = stream
+        self._length = length
+        self._chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self._length or 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._stream.read(self._chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _should_stream_request() -> bool:
+    length = request.content_length
+    if length is None:
+        # upload chunked (sem Content-Length)
+        return request.headers.get("Transfer-Encoding", "").lower() == "chunked"
+    return length > cfg.proxy_stream_threshold
+
+
+def _should_stream_response(resp) -> bool:
+    if resp.headers.get("Transfer-Encoding", "").lower() == "chunked":
+        return True
+    try:
+        length = int(resp.headers.get("Content-Length", ""))
+    except ValueError:
+        return False
+    return length > cfg.proxy_stream_threshold
+
+
+def _iter_upstream(resp) -> Iterator[bytes]:
+    try:
+        for chunk in resp.iter_content(chunk_size=cfg.proxy_stream_chunk_size):
+            if chunk:
+                yield chunk
+    finally:
+        resp.close()
+
+
+def _iter_upstream_raw(resp) -> Iterator[bytes]:
+    """Bytes como vieram do upstream (sem decodificar o content-encoding)."""
+    try:
+        for chunk in resp.raw.stream(cfg.proxy_stream_chunk_size, decode_content=False):
+            if chunk:
+                yield chunk
+    finally:
+        resp.close()
+
+
+def _read_raw(resp) -> bytes:
+    try:
+        return resp.raw.read(decode_content=False)
+    finally:
+        resp.close()
+
+
 def forward_request(base_url: str, subpath: str = "") -> Response:
     """
     Encaminha a requisição atual para o serviço de destino.
 
     base_url: ex: http://management-service:5002
     subpath:  ex: "customers/1"  -> vira http://management-service:5002/customers/1
+
+    Corpos acima de ``PROXY_STREAM_THRESHOLD`` bytes (ou chunked) são
+    repassados em streaming nos dois sentidos, sem bufferizar no gateway.
+
+    O JWT é verificado aqui uma vez: revogado -> 401; válido -> segue com
+    ``X-Internal-Identity`` assinado.
     """
     method = request.method
 
@@ -43,22 +134,89 @@ def forward_request(base_url: str, subpath: str = "") -> Response:
         url = base_url.rstrip("/")
 
     headers = _filter_request_headers()
+    if "Accept-Encoding" not in headers:
+        # sem isso o requests pede gzip por conta própria
+        headers["Accept-Encoding"] = "identity"
+    xff = forwarded_for(request.headers.get("X-Forwarded-For"), request.remote_addr)
+    if xff:
+        headers["X-Forwarded-For"] = xff
 
-    resp = requests.request(
+    decision = inspect_authorization(
+        request.headers.get("Authorization"), cfg, get_revocation_replica()
+    )
+    if decision.revoked:
+        return jsonify({"msg": REVOKED_MESSAGE}), 401
+    if decision.identity_header:
+        headers[IDENTITY_HEADER] = decision.identity_header
+
+    if _should_stream_request():
+        data = _StreamedBody(
+            request.stream, request.content_length, cfg.proxy_stream_chunk_size
+        )
+    else:
+        data = request.get_data()
+
+    resp = get_upstream_pool().request(
         method=method,
         url=url,
         headers=headers,
         params=request.args,
-        data=request.get_data(),
+        data=data,
         cookies=request.cookies,
-        timeout=30,
+        timeout=cfg.upstream_timeout,
+        stream=True,
     )
 
-    excluded = {"content-encoding", "transfer-encoding", "connection"}
+    excluded = {"transfer-encoding", "connection"}
+
+    if resp.headers.get("Content-Encoding"):
+        # upstream já comprimiu: repassa os bytes crus (sem decodificar e
+        # recomprimir); Content-Length e Content-Encoding continuam valendo
+        response_headers = [
+            (name, value)
+            for name, value in resp.headers.items()
+            if name.lower() not in excluded
+        ]
+        if _should_stream_response(resp):
+            response = Response(
+                _iter_upstream_raw(resp),
+                status=resp.status_code,
+                headers=response_headers,
+                direct_passthrough=True,
+            )
+            # cliente que desiste antes do primeiro bloco: o gerador nem começa
+            response.call_on_close(resp.close)
+            return response
+        return Response(_read_raw(resp), status=resp.status_code, headers=response_headers)
+
+    # sem content-encoding o Content-Length é o do corpo; o gateway pode
+    # comprimir depois (after_request em app/compression.py)
+    excluded = excluded | {"content-encoding"}
+
+    if _should_stream_response(resp):
+        excluded = excluded | {"content-length"}
+        response_headers = [
+            (name, value)
+            for name, value in resp.headers.items()
+            if name.lower() not in excluded
+        ]
+        response = Response(
+            _iter_upstream(resp),
+            status=resp.status_code,
+            headers=response_headers,
+            direct_passthrough=True,
+        )
+        response.call_on_close(resp.close)
+        return response
+
     response_headers = [
         (name, value)
         for name, value in resp.headers.items()
         if name.lower() not in excluded
     ]
 
-    return Response(resp.content, status=resp.status_code, headers=response_headers)
+    try:
+        body = resp.content
+    finally:
+        resp.close()
+    return Response(body, status=resp.status_code, headers=response_headers)
@@ -0,0 +1,183 @@
+"""Local replica of the users-service revocation set, fed by Redis pub/sub."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from .config import BaseConfig, load_config
+
+try:  # redis é opcional: sem REDIS_URL o gateway não consulta revogação
+    import redis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - depende do ambiente
+    redis = None
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+# mesmos nomes do users-service (users-service/app/revocation.py)
+KEY_PREFIX = "motogestor:revoked:"
+CHANNEL = "motogestor:revocations"
+
+
+def _epoch_ms(raw) -> int:
+    """Época do logout_all em ms; valores antigos (segundos) ficam abaixo de 10**11."""
+    epoch = int(raw or 0)
+    return epoch * 1000 if epoch < 10**11 else epoch
+
+
+class RevocationReplica:
+    """
+    Cópia em memória de ``<prefix><jti>`` (com TTL) e ``<prefix>user:<id>``
+    (época do logout_all, em ms) que o users-service grava no Redis.
+
+    Na (re)conexão assina o canal e só depois varre as chaves com SCAN, então
+    nada publicado no meio se perde. Consulta é só dicionário em memória.
+    Enquanto a primeira sincronização não termina ``ready`` fica False e
+    nenhum token é tratado como revogado aqui (o users-service continua
+    checando os dele).
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix: str = KEY_PREFIX,
+        channel: str = CHANNEL,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.redis = redis_client
+        self.prefix = prefix
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.ready = False
+        self._jtis: Dict[str, float] = {}
+        self._epochs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---------- consulta ----------
+
+    def is_revoked(
+        self, jti: Optional[str], user_id: Optional[int], issued_at_ms: Optional[int]
+    ) -> bool:
+        with self._lock:
+            if user_id is not None and issued_at_ms is not None:
+                if issued_at_ms <= self._epochs.get(user_id, 0):
+                    return True
+            expires = self._jtis.get(jti) if jti else None
+        return expires is not None and expires > time.time()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jtis) + len(self._epochs)
+
+    # ---------- atualização ----------
+
+    def apply(self, message: Dict) -> None:
+        """Aplica um evento publicado pelo users-service."""
+        with self._lock:
+            if message.get("jti"):
+                self._jtis[message["jti"]] = float(message.get("exp") or 0)
+            elif message.get("user_id") is not None:
+                user_id = int(message["user_id"])
+                epoch = _epoch_ms(message.get("epoch"))
+                self._epochs[user_id] = max(epoch, self._epochs.get(user_id, 0))
+
+    def prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, exp in self._jtis.items() if exp <= now]:
+                del self._jtis[jti]
+
+    def sync(self) -> None:
+        """Recarrega tudo a partir das chaves do Redis."""
+        jtis: Dict[str, float] = {}
+        epochs: Dict[int, int] = {}
+        user_prefix = f"{self.prefix}user:"
+        now = time.time()
+        for raw in self.redis.scan_iter(match=f"{self.prefix}*", count=1000):
+            key = raw.decode() if isinstance(raw, bytes) else raw
+            if key.startswith(user_prefix):
+                value = self.redis.get(key)
+                if value is not None:
+                    epochs[int(key[len(user_prefix):])] = _epoch_ms(value)
+            elif not key[len(self.prefix):].startswith("__"):
+                # __primed__, __warming__, __generation__ são controle do users-service
+                ttl = self.redis.ttl(key)
+                if ttl and ttl > 0:
+                    jtis[key[len(self.prefix):]] = now + ttl
+        with self._lock:
+            self._jtis = jtis
+            self._epochs = epochs
+        self.ready = True
+
+    # ---------- assinatura ----------
+
+    def _listen_once(self) -> None:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            self.sync()
+            last_prune = time.monotonic()
+            while not self._stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    try:
+                        self.apply(json.loads(message["data"]))
+                    except (ValueError, TypeError):
+                        logger.warning("revocation: mensagem inválida %r", message["data"])
+                if time.monotonic() - last_prune > 60:
+                    self.prune()
+                    last_prune = time.monotonic()
+        finally:
+            pubsub.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+            except RedisError:
+                logger.warning("revocation: conexão com Redis perdida, ressincronizando", exc_info=True)
+                self._stop.wait(self.reconnect_delay)
+
+    def start(self) -> None:
+        if self.redis is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="revocation-replica", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def build_redis_client(cfg: BaseConfig):
+    if not cfg.redis_url:
+        return None
+    if redis is None:
+        logger.warning("REDIS_URL definido mas o pacote redis não está instalado")
+        return None
+    # socket_timeout maior que o get_message(timeout=1.0) do listener
+    return redis.Redis.from_url(
+        cfg.redis_url, socket_timeout=5, socket_connect_timeout=cfg.redis_socket_timeout
+    )
+
+
+_replica: Optional[RevocationReplica] = None
+_replica_lock = threading.Lock()
+
+
+def get_revocation_replica() -> RevocationReplica:
+    global _replica
+    if _replica is None:
+        with _replica_lock:
+            if _replica is None:
+                _replica = RevocationReplica(build_redis_client(load_config()))
+                _replica.start()
+    return _replica
@@ -4,11 +4,10 @@ from flask import Blueprint
 from .config import load_config
 cfg = load_config()
 from .proxy import forward_request
+from .routing import ALL_METHODS, ROUTES
 
 bp = Blueprint("auth_proxy", __name__)
 
-ALL_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
-
 
 @bp.route("/auth", defaults={"path": ""}, methods=ALL_METHODS)
 @bp.route("/auth/<path:path>", methods=ALL_METHODS)
@@ -16,8 +15,8 @@ def auth_proxy(path: str):
     """
     Encaminha /auth/... para o users-service (/auth/...).
     """
-    subpath = f"auth/{path}" if path else "auth"
-    return forward_request(cfg.users_service_url, subpath)
+    route = ROUTES["auth"]
+    return forward_request(route.base_url(cfg), route.subpath(path))
 
 
 @bp.route("/me", methods=["GET"])
@@ -25,4 +24,5 @@ def me_proxy():
     """
     Encaminha /me para o users-service (/me).
     """
-    return forward_request(cfg.users_service_url, "me")
+    route = ROUTES["me"]
+    return forward_request(route.base_url(cfg), route.subpath())
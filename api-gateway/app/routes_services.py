@@ -3,12 +3,11 @@ from flask import Blueprint
 
 from .config import load_config
 from .proxy import forward_request
+from .routing import ALL_METHODS, ROUTES
 
 bp = Blueprint("services_proxy", __name__)
 cfg = load_config()
 
-ALL_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
-
 
 # MANAGEMENT: /management/... -> management-service
 @bp.route("/management", defaults={"path": ""}, methods=ALL_METHODS)
@@ -18,7 +17,8 @@ def management_proxy(path: str):
     /management/customers -> management-service /customers
     /management/os/123    -> management-service /os/123
     """
-    return forward_request(cfg.management_service_url, path)
+    route = ROUTES["management"]
+    return forward_request(route.base_url(cfg), route.subpath(path))
 
 
 # FINANCIAL: /financial/... -> financial-service
@@ -29,7 +29,8 @@ def financial_proxy(path: str):
     /financial/receivables -> financial-service /receivables
     /financial/payables    -> financial-service /payables
     """
-    return forward_request(cfg.financial_service_url, path)
+    route = ROUTES["financial"]
+    return forward_request(route.base_url(cfg), route.subpath(path))
 
 
 # TEAMCRM: /teamcrm/... -> teamcrm-service
@@ -40,7 +41,8 @@ def teamcrm_proxy(path: str):
     /teamcrm/staff -> teamcrm-service /staff
     /teamcrm/tasks -> teamcrm-service /tasks
     """
-    return forward_request(cfg.teamcrm_service_url, path)
+    route = ROUTES["teamcrm"]
+    return forward_request(route.base_url(cfg), route.subpath(path))
 
 
 # AI: /ai/... -> ai-service /ai/...
@@ -51,5 +53,5 @@ def ai_proxy(path: str):
     Externamente: /ai/whatsapp/generate-message
     Internamente: ai-service /ai/whatsapp/generate-message
     """
-    subpath = f"ai/{path}" if path else "ai"
-    return forward_request(cfg.ai_service_url, subpath)
+    route = ROUTES["ai"]
+    return forward_request(route.base_url(cfg), route.subpath(path))
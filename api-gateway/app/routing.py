@@ -0,0 +1,66 @@
+"""Proxy route table shared by the Flask blueprints and the ASGI engine."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .config import BaseConfig
+
+ALL_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+
+
+@dataclass(frozen=True)
+class ProxyRoute:
+    """
+    prefix:          primeiro segmento externo (``/management/...``)
+    upstream_attr:   atributo do config com a URL base do serviço
+    upstream_prefix: prefixo mantido no path interno (``/ai/...`` -> ``ai/...``)
+    """
+
+    prefix: str
+    upstream_attr: str
+    upstream_prefix: str = ""
+    methods: Tuple[str, ...] = tuple(ALL_METHODS)
+    allow_subpaths: bool = True
+
+    def base_url(self, cfg: BaseConfig) -> str:
+        return getattr(cfg, self.upstream_attr)
+
+    def subpath(self, path: str = "") -> str:
+        if not self.upstream_prefix:
+            return path
+        return f"{self.upstream_prefix}/{path}" if path else self.upstream_prefix
+
+
+PROXY_ROUTES: Tuple[ProxyRoute, ...] = (
+    ProxyRoute("auth", "users_service_url", "auth"),
+    ProxyRoute("me", "users_service_url", "me", methods=("GET",), allow_subpaths=False),
+    ProxyRoute("management", "management_service_url"),
+    ProxyRoute("financial", "financial_service_url"),
+    ProxyRoute("teamcrm", "teamcrm_service_url"),
+    ProxyRoute("ai", "ai_service_url", "ai"),
+)
+
+ROUTES: Dict[str, ProxyRoute] = {r.prefix: r for r in PROXY_ROUTES}
+
+
+def match_proxy_route(path: str, method: str) -> Optional[Tuple[ProxyRoute, str]]:
+    """
+    Resolve ``/api/management/os/1`` (ou sem ``/api``) para
+    ``(ROUTES["management"], "os/1")``. Retorna None se não for rota de proxy.
+    """
+    parts = path.lstrip("/").split("/", 1)
+    if parts[0] == "api":
+        if len(parts) == 1:
+            return None
+        parts = parts[1].split("/", 1)
+
+    route = ROUTES.get(parts[0])
+    if route is None or method.upper() not in route.methods:
+        return None
+
+    rest = parts[1] if len(parts) > 1 else ""
+    if rest and not route.allow_subpaths:
+        return None
+    return route, rest
@@ -0,0 +1,202 @@
+"""In-memory cache of the frontend dist: metadata, precompressed bodies, ETags."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, send_file
+
+from .compression import choose_encoding, is_compressible
+from .observability import GATEWAY_STATIC_RESPONSES
+
+try:  # brotli é opcional: sem ele só gzip
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "static_cache"
+
+# nomes que o Vite gera em assets/: ``index-3f9a1c2b.js``, ``logo-Bx7_aQ2d.svg``
+HASHED_ASSET = re.compile(r"(^|/)assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def _etag(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:20]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+class StaticAsset:
+    __slots__ = ("path", "file_path", "size", "mimetype", "etag", "immutable", "bodies")
+
+    def __init__(self, path: str, file_path: str, size: int, mimetype: str) -> None:
+        self.path = path
+        self.file_path = file_path
+        self.size = size
+        self.mimetype = mimetype
+        self.etag = ""
+        self.immutable = bool(HASHED_ASSET.search(path))
+        # codificação ("identity", "br", "gzip") -> corpo; vazio = grande demais
+        self.bodies: Dict[str, bytes] = {}
+
+    @property
+    def cache_control(self) -> str:
+        return IMMUTABLE if self.immutable else REVALIDATE
+
+
+class StaticCache:
+    """
+    Varre o ``dist`` do frontend uma vez (no start) e guarda metadados de
+    cada arquivo; arquivos até ``max_file_size`` ficam em memória já
+    comprimidos (br/gzip, ou os ``.br``/``.gz`` gerados no build).
+
+    Assets com hash no nome (``assets/*-<hash>.*``) saem com Cache-Control
+    imutável; o resto (``index.html``) com ``no-cache`` + ETag, então o
+    navegador revalida e recebe 304. Um build novo exige restart do gateway.
+    """
+
+    def __init__(
+        self,
+        dist_path: str,
+        min_compress_size: int = 1024,
+        max_file_size: int = 2 * 1024 * 1024,
+        gzip_level: int = 9,
+        brotli_quality: int = 11,
+    ) -> None:
+        self.dist_path = dist_path
+        self.min_compress_size = min_compress_size
+        self.max_file_size = max_file_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.assets: Dict[str, StaticAsset] = {}
+
+    # ---------- carga ----------
+
+    def load(self) -> int:
+        assets: Dict[str, StaticAsset] = {}
+        if os.path.isdir(self.dist_path):
+            for root, _, files in os.walk(self.dist_path):
+                names = set(files)
+                for name in files:
+                    if name.endswith((".gz", ".br")) and name[:-3] in names:
+                        continue  # pré-comprimido no build: servido junto do original
+                    file_path = os.path.join(root, name)
+                    path = os.path.relpath(file_path, self.dist_path).replace(os.sep, "/")
+                    try:
+                        assets[path] = self._load_asset(path, file_path)
+                    except OSError:
+                        logger.warning("static cache: não leu %s", file_path, exc_info=True)
+        self.assets = assets
+        logger.info("static cache: %d arquivos de %s", len(assets), self.dist_path)
+        return len(assets)
+
+    def _compressible(self, asset: StaticAsset) -> bool:
+        return asset.size >= self.min_compress_size and is_compressible(asset.mimetype)
+
+    def _load_asset(self, path: str, file_path: str) -> StaticAsset:
+        stat = os.stat(file_path)
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        asset = StaticAsset(path, file_path, stat.st_size, mimetype)
+        if stat.st_size > self.max_file_size:
+            asset.etag = f"{int(stat.st_mtime)}-{stat.st_size}"
+            return asset
+
+        with open(file_path, "rb") as fh:
+            data = fh.read()
+        asset.etag = _etag(data)
+        asset.bodies["identity"] = data
+        if not self._compressible(asset):
+            return asset
+
+        if brotli is not None or os.path.exists(file_path + ".br"):
+            asset.bodies["br"] = self._read_or(
+                file_path + ".br", lambda: brotli.compress(data, quality=self.brotli_quality)
+            )
+        asset.bodies["gzip"] = self._read_or(
+            file_path + ".gz", lambda: gzip.compress(data, self.gzip_level, mtime=0)
+        )
+        for encoding in ("br", "gzip"):
+            # comprimido que não ficou menor não vale o Content-Encoding
+            if len(asset.bodies.get(encoding, data)) >= len(data):
+                asset.bodies.pop(encoding, None)
+        return asset
+
+    @staticmethod
+    def _read_or(path: str, build) -> bytes:
+        if os.path.exists(path):
+            with open(path, "rb") as fh:
+                return fh.read()
+        return build()
+
+    # ---------- resposta ----------
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        return self.assets.get(path)
+
+    def respond(
+        self,
+        asset: StaticAsset,
+        accept_encoding: Optional[str],
+        if_none_match: Optional[str],
+    ) -> Response:
+        encodings: List[str] = [e for e in ("br", "gzip") if e in asset.bodies]
+        encoding = choose_encoding(accept_encoding, encodings)
+        etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+        headers: List[Tuple[str, str]] = [
+            ("Cache-Control", asset.cache_control),
+            ("ETag", f'"{etag}"'),
+        ]
+        if encodings:
+            headers.append(("Vary", "Accept-Encoding"))
+
+        if etag_matches(if_none_match, etag):
+            GATEWAY_STATIC_RESPONSES.labels(status="304", encoding=encoding or "identity").inc()
+            return Response(status=304, headers=headers)
+
+        if not asset.bodies:
+            # arquivo grande: direto do disco (suporta Range)
+            GATEWAY_STATIC_RESPONSES.labels(status="200", encoding="identity").inc()
+            response = send_file(
+                asset.file_path, mimetype=asset.mimetype, etag=etag, conditional=True
+            )
+            response.headers["Cache-Control"] = asset.cache_control
+            return response
+
+        body = asset.bodies[encoding or "identity"]
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
+        GATEWAY_STATIC_RESPONSES.labels(status="200", encoding=encoding or "identity").inc()
+        return Response(body, mimetype=asset.mimetype, headers=headers)
+
+
+def init_static_cache(app: Flask, dist_path: str) -> StaticCache:
+    cache = StaticCache(dist_path)
+    cache.load()
+    app.extensions[EXTENSION_KEY] = cache
+    return cache
+
+
+def get_static_cache() -> StaticCache:
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,131 @@
+"""Tenant theme options per plan, with precomputed ETags."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from flask import Response, jsonify
+
+PLANS = ("BASIC", "PRO", "ENTERPRISE")
+
+BASE_THEMES = {
+    "BASIC": [
+        {
+            "id": "basic-blue",
+            "name": "Oficina Azul",
+            "primary": "#2563EB",
+            "secondary": "#0EA5E9",
+            "accent": "#F97316",
+            "background": "#020617",
+            "surface": "#0F172A",
+        },
+        {
+            "id": "basic-dark",
+            "name": "Garage Dark",
+            "primary": "#F97316",
+            "secondary": "#EAB308",
+            "accent": "#22C55E",
+            "background": "#020617",
+            "surface": "#111827",
+        },
+    ],
+    "PRO": [
+        {
+            "id": "pro-red",
+            "name": "Racing Red",
+            "primary": "#DC2626",
+            "secondary": "#F97316",
+            "accent": "#22C55E",
+            "background": "#0B1120",
+            "surface": "#111827",
+        },
+        {
+            "id": "pro-green",
+            "name": "Torque Green",
+            "primary": "#16A34A",
+            "secondary": "#22C55E",
+            "accent": "#FBBF24",
+            "background": "#022C22",
+            "surface": "#064E3B",
+        },
+    ],
+    "ENTERPRISE": [
+        {
+            "id": "enterprise-custom-base",
+            "name": "Enterprise Custom Base",
+            "primary": "#38BDF8",
+            "secondary": "#6366F1",
+            "accent": "#F97316",
+            "background": "#020617",
+            "surface": "#020617",
+        }
+    ],
+}
+
+
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+# calculado uma vez: muda só com deploy (BASE_THEMES é estático)
+PLAN_ETAGS = {plan: f"{plan}-{_digest(BASE_THEMES[plan])}" for plan in PLANS}
+
+
+def normalize_plan(plan: Optional[str]) -> str:
+    return plan if plan in PLANS else "BASIC"
+
+
+def theme_etag(identity: Dict[str, Any]) -> str:
+    """
+    ETag do payload: parte fixa por plano + id/nome do tenant (que também
+    vão na resposta). Calculado sem montar o payload.
+    """
+    plan = normalize_plan(identity.get("plan", "BASIC"))
+    tenant = _digest([identity.get("tenant_id"), identity.get("tenant_name")])
+    return f"theme-{PLAN_ETAGS[plan]}-{tenant}"
+
+
+def theme_payload(identity: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retorna opções de paleta para o tenant atual, baseado no plano.
+    Espera que o JWT contenha algo como:
+    {
+      "tenant_id": 1,
+      "plan": "BASIC" | "PRO" | "ENTERPRISE",
+      "tenant_name": "Oficina X"
+    }
+    """
+    plan = normalize_plan(identity.get("plan", "BASIC"))
+
+    # Placeholder pra futuro: buscar palette custom do tenant em algum serviço
+    custom_palette = None
+
+    return {
+        "tenant": {
+            "id": identity.get("tenant_id"),
+            "name": identity.get("tenant_name"),
+            "plan": plan,
+        },
+        "themes": BASE_THEMES[plan],
+        "custom_palette": custom_palette,
+        "custom_allowed": plan in ("PRO", "ENTERPRISE"),
+        "custom_only_enterprise": plan == "ENTERPRISE",
+    }
+
+
+def theme_response(identity: Dict[str, Any], if_none_match) -> Response:
+    """200 com ETag, ou 304 se o cliente já tem essa versão."""
+    etag = theme_etag(identity)
+    # comparação fraca: a resposta pode ter saído comprimida (ETag W/)
+    if if_none_match is not None and if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(theme_payload(identity))
+    response.set_etag(etag)
+    # depende do token: só o navegador guarda, e sempre revalida
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Authorization"
+    return response
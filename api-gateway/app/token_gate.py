@@ -0,0 +1,106 @@
+"""Edge JWT check: verify once, consult the revocation replica, sign identity."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import jwt
+
+from .config import BaseConfig
+from .internal_identity import sign_identity, signing_key
+from .observability import GATEWAY_TOKEN_CHECKS
+from .revocation import RevocationReplica
+
+# mesmo corpo que o flask-jwt-extended devolve nos serviços
+REVOKED_MESSAGE = "Token has been revoked"
+
+
+@dataclass(frozen=True)
+class GateDecision:
+    revoked: bool = False
+    identity_header: Optional[str] = None
+
+
+@lru_cache(maxsize=4)
+def _key(secret: str, jwt_secret: str) -> bytes:
+    return signing_key(secret, jwt_secret)
+
+
+def _bearer(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def _user_id(claims: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(claims["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _issued_at_ms(claims: Dict[str, Any]) -> Optional[int]:
+    """``iat_ms`` do users-service; tokens antigos só têm ``iat`` (segundos)."""
+    if claims.get("iat_ms") is not None:
+        return int(claims["iat_ms"])
+    iat = claims.get("iat")
+    return int(iat) * 1000 if iat is not None else None
+
+
+def decode_token(token: str, cfg: BaseConfig) -> Optional[Dict[str, Any]]:
+    try:
+        return jwt.decode(token, cfg.jwt_secret_key, algorithms=["HS256"])
+    except jwt.PyJWTError:
+        return None
+
+
+def is_revoked(claims: Dict[str, Any], replica: Optional[RevocationReplica]) -> bool:
+    if replica is None:
+        return False
+    return replica.is_revoked(claims.get("jti"), _user_id(claims), _issued_at_ms(claims))
+
+
+def identity_header(claims: Dict[str, Any], cfg: BaseConfig) -> Optional[str]:
+    """Cabeçalho assinado pra um access token já verificado."""
+    if claims.get("type") != "access":
+        return None
+    expires_at = time.time() + cfg.internal_identity_ttl
+    if claims.get("exp"):
+        expires_at = min(expires_at, claims["exp"])
+    return sign_identity(
+        claims, _key(cfg.internal_identity_secret, cfg.jwt_secret_key), expires_at
+    )
+
+
+def inspect_authorization(
+    authorization: Optional[str],
+    cfg: BaseConfig,
+    replica: Optional[RevocationReplica] = None,
+) -> GateDecision:
+    """
+    Decide o que fazer com o ``Authorization`` de uma requisição de proxy.
+
+    - sem token / token inválido ou expirado: repassa sem identidade, o
+      serviço responde com o erro de JWT de sempre;
+    - revogado (réplica do users-service): o gateway já devolve 401;
+    - access token válido: repassa com ``X-Internal-Identity``.
+    """
+    token = _bearer(authorization)
+    if token is None:
+        GATEWAY_TOKEN_CHECKS.labels(result="absent").inc()
+        return GateDecision()
+    claims = decode_token(token, cfg)
+    if claims is None:
+        GATEWAY_TOKEN_CHECKS.labels(result="invalid").inc()
+        return GateDecision()
+    if is_revoked(claims, replica):
+        GATEWAY_TOKEN_CHECKS.labels(result="revoked").inc()
+        return GateDecision(revoked=True)
+    GATEWAY_TOKEN_CHECKS.labels(result="verified").inc()
+    return GateDecision(identity_header=identity_header(claims, cfg))
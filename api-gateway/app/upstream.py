@@ -0,0 +1,177 @@
+"""Pooled keep-alive HTTP sessions for gateway -> upstream service calls."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+from .config import load_config
+from .observability import (
+    UPSTREAM_POOL_EVICTIONS,
+    UPSTREAM_POOL_IN_USE,
+    UPSTREAM_POOL_SATURATED,
+)
+
+
+def upstream_key(url: str) -> str:
+    """Chave do pool: scheme://host:port do serviço de destino."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class _DiscardCookies(RequestsCookieJar):
+    """Jar que ignora ``Set-Cookie``: a sessão é a mesma pra todos os usuários."""
+
+    def extract_cookies(self, response, request) -> None:
+        return None
+
+
+@dataclass
+class _PoolEntry:
+    session: requests.Session
+    last_used: float = field(default_factory=time.monotonic)
+    in_flight: int = 0
+
+
+class UpstreamPool:
+    """
+    Mantém uma ``requests.Session`` por upstream (host), reaproveitando
+    conexões TCP/TLS entre requisições.
+
+    - ``pool_size``: conexões mantidas por upstream (``pool_maxsize`` do urllib3).
+    - ``pool_block``: se True, espera uma conexão livre em vez de abrir extras.
+    - ``idle_timeout``: sessões sem uso por mais que isso são fechadas.
+    """
+
+    def __init__(
+        self, pool_size: int = 10, pool_block: bool = False, idle_timeout: float = 60.0
+    ) -> None:
+        self.pool_size = max(1, int(pool_size))
+        self.pool_block = pool_block
+        self.idle_timeout = float(idle_timeout)
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        # cookie de um usuário não pode voltar na requisição de outro
+        session.cookies = _DiscardCookies()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            pool_block=self.pool_block,
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _evict_idle_locked(self, now: float) -> None:
+        if self.idle_timeout <= 0:
+            return
+        for key, entry in list(self._entries.items()):
+            if entry.in_flight == 0 and now - entry.last_used > self.idle_timeout:
+                entry.session.close()
+                del self._entries[key]
+                UPSTREAM_POOL_EVICTIONS.labels(upstream=key).inc()
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+
+    def _acquire(self, url: str):
+        key = upstream_key(url)
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle_locked(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry(session=self._new_session())
+                self._entries[key] = entry
+            if entry.in_flight >= self.pool_size:
+                UPSTREAM_POOL_SATURATED.labels(upstream=key).inc()
+            entry.in_flight += 1
+            entry.last_used = now
+            UPSTREAM_POOL_IN_USE.labels(upstream=key).set(entry.in_flight)
+        return key, entry
+
+    def _release(self, key: str, entry: _PoolEntry) -> None:
+        with self._lock:
+            entry.in_flight -= 1
+            entry.last_used = time.monotonic()
+            UPSTREAM_POOL_IN_USE.labels(upstream=key).set(entry.in_flight)
+
+    @contextmanager
+    def checkout(self, url: str) -> Iterator[requests.Session]:
+        """Empresta a sessão do upstream de ``url`` contabilizando uso/saturação."""
+        key, entry = self._acquire(url)
+        try:
+            yield entry.session
+        finally:
+            self._release(key, entry)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Com ``stream=True`` a sessão continua emprestada até ``resp.close()``:
+        o corpo ainda está sendo lido, e a sessão não pode ser despejada
+        nem sair da conta de uso/saturação antes disso.
+        """
+        key, entry = self._acquire(url)
+        try:
+            resp = entry.session.request(method=method, url=url, **kwargs)
+        except BaseException:
+            self._release(key, entry)
+            raise
+        if not kwargs.get("stream"):
+            self._release(key, entry)
+            return resp
+
+        close = resp.close
+        released = threading.Event()
+
+        def close_and_release() -> None:
+            try:
+                close()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    self._release(key, entry)
+
+        resp.close = close_and_release
+        return resp
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry.session.close()
+            self._entries.clear()
+
+
+_pool: Optional[UpstreamPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_upstream_pool() -> UpstreamPool:
+    """Pool compartilhado do processo (um por worker do gunicorn)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                cfg = load_config()
+                _pool = UpstreamPool(
+                    pool_size=cfg.upstream_pool_size,
+                    pool_block=cfg.upstream_pool_block,
+                    idle_timeout=cfg.upstream_idle_timeout,
+                )
+    return _pool
@@ -0,0 +1,291 @@
+"""
+Benchmark: gateway síncrono (gunicorn 2 workers x 4 threads) vs motor ASGI.
+
+Sobe um upstream falso com latência fixa, os dois gateways apontando para ele
+e dispara carga em ``/management/bench`` com 50/200/1000 clientes
+concorrentes, reportando req/s e latências P50/P99.
+
+Rodar de dentro de ``api-gateway/``:
+
+    python bench/gateway_bench.py compare --latency-ms 50 --concurrency 50,200,1000
+
+Subcomandos avulsos:
+
+    python bench/gateway_bench.py upstream --port 5999 --latency-ms 50
+    python bench/gateway_bench.py load --url http://localhost:5000/management/bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import httpx
+
+GATEWAY_DIR = Path(__file__).resolve().parents[1]
+
+
+# ---------- upstream falso ----------
+
+
+def make_upstream(latency_ms: float, size: int):
+    body = b'{"data": "' + b"x" * max(0, size - 12) + b'"}'
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        more = True
+        while more:
+            message = await receive()
+            more = message.get("more_body", False)
+        await asyncio.sleep(latency_ms / 1000)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def run_upstream(args) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        make_upstream(args.latency_ms, args.size),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning",
+        backlog=4096,
+    )
+
+
+# ---------- gerador de carga ----------
+
+
+async def _open(host: str, port: int):
+    return await asyncio.open_connection(host, port, limit=1 << 20)
+
+
+async def _get(reader, writer, request: bytes) -> int:
+    """GET HTTP/1.1 keep-alive mínimo; o cliente não pode ser o gargalo."""
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    status = int(lines[0].split()[1])
+    length = None
+    chunked = False
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value.strip())
+        elif name == b"transfer-encoding" and b"chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _load(url: str, concurrency: int, total: int, timeout: float) -> Dict:
+    parsed = urlsplit(url)
+    host, port = parsed.hostname, parsed.port or 80
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: */*\r\n\r\n".encode()
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        conn = None
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = await asyncio.wait_for(_open(host, port), timeout)
+                status = await asyncio.wait_for(_get(*conn, request), timeout)
+                ok = status == 200
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+                ok = False
+                if conn is not None:
+                    conn[1].close()
+                conn = None
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+        if conn is not None:
+            conn[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        if not latencies:
+            return float("nan")
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+    }
+
+
+def _print_rows(label: str, rows: List[Dict]) -> None:
+    print(f"\n{label}")
+    print(f"{'conc':>6} {'reqs':>7} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for r in rows:
+        print(
+            f"{r['concurrency']:>6} {r['requests']:>7} {r['errors']:>5} "
+            f"{r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+        )
+
+
+def _levels(args) -> List[int]:
+    return [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+
+def _total_for(args, concurrency: int) -> int:
+    return args.requests or max(1000, concurrency * 5)
+
+
+def run_load(args) -> List[Dict]:
+    rows = [
+        asyncio.run(_load(args.url, c, _total_for(args, c), args.timeout))
+        for c in _levels(args)
+    ]
+    _print_rows(args.url, rows)
+    return rows
+
+
+# ---------- comparação completa ----------
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} não subiu a tempo")
+
+
+def run_compare(args) -> None:
+    upstream_port, sync_port, async_port = args.port, args.port + 1, args.port + 2
+    env = os.environ.copy()
+    env.update(
+        {
+            "APP_ENV": "production",
+            "LOG_LEVEL": "WARNING",
+            "MANAGEMENT_SERVICE_URL": f"http://127.0.0.1:{upstream_port}",
+            "FRONTEND_DIST_PATH": "/nonexistent",
+        }
+    )
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "upstream", "--port", str(upstream_port),
+             "--latency-ms", str(args.latency_ms), "--size", str(args.size)],
+            cwd=GATEWAY_DIR, env=env,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "app:create_app()", "-b",
+             f"127.0.0.1:{sync_port}", "-w", "2", "--threads", "4",
+             "--timeout", "120", "--log-level", "warning", "--backlog", "4096"],
+            cwd=GATEWAY_DIR, env=env,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1",
+             "--port", str(async_port), "--log-level", "warning", "--backlog", "4096",
+             "--no-access-log"],
+            cwd=GATEWAY_DIR, env=env,
+        ),
+    ]
+    try:
+        for port in (upstream_port, sync_port, async_port):
+            _wait_ready(f"http://127.0.0.1:{port}/health")
+
+        for label, port in (("sync (gunicorn 2x4)", sync_port), ("asgi (uvicorn 1 proc)", async_port)):
+            url = f"http://127.0.0.1:{port}/management/bench"
+            rows = [
+                asyncio.run(_load(url, c, _total_for(args, c), args.timeout))
+                for c in _levels(args)
+            ]
+            _print_rows(f"{label} — upstream {args.latency_ms:.0f} ms", rows)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    def common(p):
+        p.add_argument("--latency-ms", type=float, default=50.0)
+        p.add_argument("--size", type=int, default=2048, help="bytes do corpo do upstream")
+        p.add_argument("--port", type=int, default=5999)
+
+    def load_opts(p):
+        p.add_argument("--concurrency", default="50,200,1000")
+        p.add_argument("--requests", type=int, default=0, help="0 = max(1000, 5x conc)")
+        p.add_argument("--timeout", type=float, default=60.0)
+
+    p_up = sub.add_parser("upstream")
+    common(p_up)
+    p_up.set_defaults(func=run_upstream)
+
+    p_load = sub.add_parser("load")
+    p_load.add_argument("--url", required=True)
+    load_opts(p_load)
+    p_load.set_defaults(func=run_load)
+
+    p_cmp = sub.add_parser("compare")
+    common(p_cmp)
+    load_opts(p_cmp)
+    p_cmp.set_defaults(func=run_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import asyncio
+
+import httpx
+from flask import Flask
+from flask_cors import CORS
+
+from app import CORS_OPTIONS
+from app.asgi import create_asgi_app
+from app.config import BaseConfig
+from app.routing import ROUTES, match_proxy_route
+
+
+def test_match_proxy_route_handles_api_prefix():
+    assert match_proxy_route("/api/management/os/1", "GET") == (ROUTES["management"], "os/1")
+    assert match_proxy_route("/ai/whatsapp", "POST") == (ROUTES["ai"], "whatsapp")
+    assert match_proxy_route("/me", "GET") == (ROUTES["me"], "")
+    assert match_proxy_route("/me", "POST") is None
+    assert match_proxy_route("/api/overview", "GET") is None
+    assert ROUTES["auth"].subpath("login") == "auth/login"
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def __aiter__(self):
+        yield self.data
+
+
+def _gateway(handler):
+    fallback = Flask("fallback")
+
+    @fallback.get("/health")
+    def health():
+        return {"status": "ok", "service": "api-gateway"}
+
+    cfg = BaseConfig()
+    cfg.management_service_url = "http://management:5002"
+    return create_asgi_app(
+        wsgi_app=fallback, cfg=cfg, transport=httpx.MockTransport(handler)
+    )
+
+
+def _run(gateway, method, path, **kwargs):
+    async def go():
+        transport = httpx.ASGITransport(app=gateway)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gw") as c:
+            resp = await c.request(method, path, **kwargs)
+        await gateway.aclose()
+        return resp
+
+    return asyncio.run(go())
+
+
+def test_asgi_proxies_routes_with_body_and_query():
+    seen = {}
+
+    def handler(request: httpx.Request):
+        seen["url"] = str(request.url)
+        seen["body"] = request.read()
+        seen["trace"] = request.headers.get("x-trace-id")
+        return httpx.Response(
+            201,
+            headers={"X-Up": "1", "Content-Type": "application/json"},
+            stream=_Body(b'{"ok": true}'),
+        )
+
+    resp = _run(
+        _gateway(handler),
+        "POST",
+        "/api/management/customers/?q=ana",
+        json={"name": "Ana"},
+        headers={"X-Trace-Id": "t-1"},
+    )
+
+    assert resp.status_code == 201
+    assert resp.json() == {"ok": True}
+    assert resp.headers["x-up"] == "1"
+    assert resp.headers["x-trace-id"] == "t-1"
+    assert seen["url"] == "http://management:5002/customers/?q=ana"
+    assert seen["body"] == b'{"name":"Ana"}'
+    assert seen["trace"] == "t-1"
+
+
+def test_asgi_upstream_cookies_are_not_shared_between_requests():
+    def handler(request: httpx.Request):
+        return httpx.Response(
+            200,
+            headers={"Set-Cookie": "session=user-a; Path=/"},
+            stream=_Body((request.headers.get("cookie") or "").encode()),
+        )
+
+    gateway = _gateway(handler)
+
+    async def go():
+        transport = httpx.ASGITransport(app=gateway)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gw") as c:
+            first = await c.get("/management/os")
+            c.cookies.clear()  # outro usuário, sem o cookie do primeiro
+            second = await c.get("/management/os")
+            third = await c.get("/management/os", headers={"Cookie": "theme=dark"})
+        await gateway.aclose()
+        return first, second, third
+
+    first, second, third = asyncio.run(go())
+    assert first.headers["set-cookie"].startswith("session=user-a")
+    # a próxima requisição (de outro usuário) não leva o cookie do upstream
+    assert second.content == b""
+    # cookies do próprio cliente continuam sendo repassados
+    assert third.content == b"theme=dark"
+
+
+def test_asgi_maps_upstream_failure_to_502():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    resp = _run(_gateway(handler), "GET", "/management/os")
+    assert resp.status_code == 502
+    assert resp.json() == {"error": "upstream_unavailable"}
+
+
+def test_asgi_falls_back_to_flask_routes():
+    def handler(request):  # pragma: no cover - não deve ser chamado
+        raise AssertionError("health não passa pelo proxy")
+
+    resp = _run(_gateway(handler), "GET", "/health")
+    assert resp.status_code == 200
+    assert resp.json()["service"] == "api-gateway"
+
+
+def test_asgi_applies_flask_cors_headers_and_sends_preflight_to_flask():
+    upstream_methods = []
+
+    def handler(request: httpx.Request):
+        upstream_methods.append(request.method)
+        return httpx.Response(200, headers={"X-Next-Cursor": "abc"}, stream=_Body(b"[]"))
+
+    fallback = Flask("fallback")
+    CORS(fallback, **CORS_OPTIONS)
+
+    @fallback.route("/api/management/<path:path>", methods=["OPTIONS"])
+    def preflight(path):
+        return "", 204
+
+    cfg = BaseConfig()
+    cfg.management_service_url = "http://management:5002"
+    gateway = create_asgi_app(wsgi_app=fallback, cfg=cfg, transport=httpx.MockTransport(handler))
+    origin = {"Origin": "https://painel.example.com"}
+
+    resp = _run(gateway, "GET", "/api/management/os", headers=origin)
+    assert resp.headers["access-control-allow-origin"] == "https://painel.example.com"
+    assert resp.headers["access-control-allow-credentials"] == "true"
+    assert resp.headers["access-control-expose-headers"] == "X-Next-Cursor"
+
+    resp = _run(
+        gateway,
+        "OPTIONS",
+        "/api/management/os",
+        headers={**origin, "Access-Control-Request-Method": "POST"},
+    )
+    assert resp.status_code == 204
+    assert resp.headers["access-control-allow-origin"] == "https://painel.example.com"
+    assert "POST" in resp.headers["access-control-allow-methods"]
+    assert upstream_methods == ["GET"]
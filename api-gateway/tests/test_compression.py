@@ -0,0 +1,185 @@
+import gzip
+import io
+import json
+import threading
+import types
+
+import httpx
+from flask import Flask
+
+from app.compression import Compressor, compress_flask_response
+from tests.test_asgi import _Body, _gateway, _run
+
+ROWS = json.dumps([{"id": i, "status": "ABERTA", "cliente": "Ana"} for i in range(200)]).encode()
+
+
+def test_negotiate_applies_threshold_type_and_budget():
+    compressor = Compressor(min_size=100)
+    assert compressor.negotiate("gzip", "application/json", 1000) == "gzip"
+    assert compressor.negotiate("gzip", "application/json", 50) is None
+    assert compressor.negotiate("gzip", "image/png", 1000) is None
+    assert compressor.negotiate("gzip;q=0", "application/json", 1000) is None
+
+    broke = Compressor(min_size=100, cpu_budget=0)
+    assert broke.negotiate("gzip", "application/json", 1000) is None
+
+
+def test_flask_response_is_compressed_and_etag_weakened():
+    app = Flask("test")
+    compressor = Compressor(min_size=100)
+    with app.test_request_context("/"):
+        resp = app.response_class(ROWS, mimetype="application/json")
+        resp.set_etag("abc")
+        out = compress_flask_response(resp, "br;q=0, gzip", compressor)
+
+    assert out.headers["Content-Encoding"] == "gzip"
+    assert out.headers["Vary"] == "Accept-Encoding"
+    assert out.headers["ETag"] == 'W/"abc"'
+    assert int(out.headers["Content-Length"]) == len(out.get_data())
+    assert gzip.decompress(out.get_data()) == ROWS
+
+
+class _Raw:
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def read(self, decode_content=True):
+        assert decode_content is False
+        return self._data.read()
+
+
+class _EncodedResp:
+    status_code = 200
+
+    def __init__(self, body):
+        self.headers = {
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+            "Content-Length": str(len(body)),
+        }
+        self.raw = _Raw(body)
+
+    @property
+    def content(self):
+        raise AssertionError("corpo comprimido não deve ser decodificado")
+
+    def close(self):
+        pass
+
+
+def test_zstd_context_is_per_thread(monkeypatch):
+    class FakeZstdCompressor:
+        instances = []
+
+        def __init__(self, level):
+            self.thread = threading.get_ident()
+            self.instances.append(self)
+
+        def compress(self, data):
+            # o zstandard real não aceita o mesmo contexto em duas threads
+            shared.append(threading.get_ident() != self.thread)
+            return gzip.compress(data)
+
+    monkeypatch.setattr(
+        "app.compression.zstandard", types.SimpleNamespace(ZstdCompressor=FakeZstdCompressor)
+    )
+    shared = []
+    compressor = Compressor(min_size=100)
+
+    def work():
+        for _ in range(5):
+            compressor.compress(ROWS, "zstd")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    work()
+    assert len(shared) == 25 and not any(shared)
+    assert len(FakeZstdCompressor.instances) == 5
+
+
+def test_proxy_passes_upstream_compression_through(monkeypatch):
+    from app import create_app
+
+    upstream_body = gzip.compress(ROWS)
+    seen = {}
+
+    class FakePool:
+        def request(self, **kwargs):
+            seen["accept"] = kwargs["headers"].get("Accept-Encoding")
+            return _EncodedResp(upstream_body)
+
+    monkeypatch.setattr("app.proxy.get_upstream_pool", lambda: FakePool())
+    client = create_app().test_client()
+
+    resp = client.get("/api/management/os", headers={"Accept-Encoding": "gzip"})
+    assert seen["accept"] == "gzip"
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.get_data() == upstream_body
+
+
+def test_proxy_compresses_plain_upstream_bodies(monkeypatch):
+    from app import create_app
+
+    seen = {}
+
+    class PlainResp:
+        status_code = 200
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(ROWS))}
+        content = ROWS
+
+        def close(self):
+            pass
+
+    class FakePool:
+        def request(self, **kwargs):
+            seen["accept"] = kwargs["headers"].get("Accept-Encoding")
+            return PlainResp()
+
+    monkeypatch.setattr("app.proxy.get_upstream_pool", lambda: FakePool())
+    client = create_app().test_client()
+
+    resp = client.get("/api/financial/receivables", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.get_data()) == ROWS
+
+    plain = client.get("/api/financial/receivables")
+    assert seen["accept"] == "identity"
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data() == ROWS
+
+
+def test_asgi_compresses_plain_and_passes_encoded_bodies():
+    upstream_gzip = gzip.compress(ROWS)
+
+    def handler(request: httpx.Request):
+        if request.url.path.endswith("/encoded"):
+            return httpx.Response(
+                200,
+                headers={
+                    "Content-Type": "application/json",
+                    "Content-Encoding": "gzip",
+                    "Content-Length": str(len(upstream_gzip)),
+                },
+                stream=_Body(upstream_gzip),
+            )
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "application/json", "Content-Length": str(len(ROWS))},
+            stream=_Body(ROWS),
+        )
+
+    plain = _run(
+        _gateway(handler), "GET", "/api/management/os", headers={"Accept-Encoding": "gzip"}
+    )
+    assert plain.headers["content-encoding"] == "gzip"
+    assert int(plain.headers["content-length"]) < len(ROWS)
+    assert plain.content == ROWS  # httpx decodifica
+
+    encoded = _run(
+        _gateway(handler), "GET", "/api/management/encoded", headers={"Accept-Encoding": "gzip"}
+    )
+    assert encoded.headers["content-length"] == str(len(upstream_gzip))
+    assert encoded.content == ROWS
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from app.config import BaseConfig
+from app.overview import OverviewAggregator, SectionCache
+
+
+def _cfg(**overrides):
+    cfg = BaseConfig()
+    cfg.overview_deadline = 1.0
+    cfg.overview_cache_ttl = 60
+    cfg.overview_stale_ttl = 60
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def _sleeper(seconds, payload, calls=None):
+    def fetch(cfg, headers):
+        if calls is not None:
+            calls.append(headers)
+        time.sleep(seconds)
+        return "ok", dict(payload)
+
+    return fetch
+
+
+def test_sections_run_concurrently():
+    agg = OverviewAggregator(
+        _cfg(),
+        sections={
+            "a": _sleeper(0.3, {"n": 1}),
+            "b": _sleeper(0.3, {"n": 2}),
+            "c": _sleeper(0.3, {"n": 3}),
+        },
+    )
+    started = time.perf_counter()
+    summary = agg.build(1, {})
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.8
+    assert summary == {
+        "a": {"n": 1, "status": "ok"},
+        "b": {"n": 2, "status": "ok"},
+        "c": {"n": 3, "status": "ok"},
+    }
+
+
+def test_deadline_returns_partial_result_and_warms_cache():
+    gate = threading.Event()
+
+    def slow(cfg, headers):
+        gate.wait(5)
+        return "ok", {"open_count": 4}
+
+    agg = OverviewAggregator(
+        _cfg(overview_deadline=0.1),
+        sections={"fast": _sleeper(0, {"total": 1}), "slow": slow},
+    )
+
+    summary = agg.build(7, {})
+    assert summary["fast"] == {"total": 1, "status": "ok"}
+    assert summary["slow"] == {"error": "timeout", "status": "timeout"}
+
+    gate.set()
+    time.sleep(0.1)
+    assert agg.build(7, {})["slow"] == {"open_count": 4, "status": "ok"}
+
+
+def test_cache_is_per_tenant_and_skips_errors():
+    calls = []
+
+    def flaky(cfg, headers):
+        calls.append(headers)
+        if len(calls) == 1:
+            return "error", {"error": 503}
+        return "ok", {"total": len(calls)}
+
+    agg = OverviewAggregator(_cfg(), sections={"os": flaky})
+
+    assert agg.build(1, {})["os"] == {"error": 503, "status": "error"}
+    assert agg.build(1, {})["os"] == {"total": 2, "status": "ok"}
+    assert agg.build(1, {})["os"] == {"total": 2, "status": "ok"}
+    assert agg.build(2, {})["os"] == {"total": 3, "status": "ok"}
+    assert len(calls) == 3
+
+
+def test_stale_entries_are_served_and_revalidated(monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr("app.overview.time.monotonic", lambda: clock["now"])
+    calls = []
+    agg = OverviewAggregator(
+        _cfg(overview_cache_ttl=10, overview_stale_ttl=30),
+        sections={"tasks": _sleeper(0, {"open_count": 1}, calls)},
+    )
+
+    agg.build(1, {})
+    clock["now"] += 15
+
+    assert agg.build(1, {})["tasks"] == {"open_count": 1, "status": "stale"}
+    time.sleep(0.05)
+    assert len(calls) == 2
+    assert agg.build(1, {})["tasks"]["status"] == "ok"
+
+
+def test_cache_is_bounded_and_drops_expired_entries(monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr("app.overview.time.monotonic", lambda: clock["now"])
+    cache = SectionCache(ttl=10, stale_ttl=30, max_entries=2)
+
+    cache.store((1, "os"), {"n": 1})
+    cache.store((2, "os"), {"n": 2})
+    assert cache.lookup((1, "os")) == ({"n": 1}, "fresh")
+    cache.store((3, "os"), {"n": 3})
+    # tenant 2 foi o menos usado
+    assert len(cache) == 2
+    assert cache.lookup((2, "os")) == (None, "miss")
+    assert cache.lookup((1, "os"))[1] == "fresh"
+
+    clock["now"] += 41
+    cache.store((4, "os"), {"n": 4})
+    assert len(cache) == 1
+    assert cache.lookup((1, "os")) == (None, "miss")
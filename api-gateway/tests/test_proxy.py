@@ -32,6 +32,10 @@ class DummyResp:
         self.status_code = status_code
         self.headers = headers or {"Content-Type": "application/json"}
         self.content = content
+        self.closed = False
+
+    def close(self):
+        self.closed = True
 
 
 def test_forward_request_makes_http_call(monkeypatch):
@@ -41,13 +45,17 @@ def test_forward_request_makes_http_call(monkeypatch):
     # Prepare a Flask app context with a fake request
     app = Flask("test")
 
-    def fake_request(method, url, headers, params, data, cookies, timeout):
+    def fake_request(method, url, headers, params, data, cookies, timeout, stream):
         # validate inputs
         assert method == "POST"
         assert url.endswith("/path/1")
         return DummyResp(status_code=201, headers={"X-Ok": "1"}, content=b"created")
 
-    monkeypatch.setattr("requests.request", fake_request)
+    class FakePool:
+        def request(self, **kwargs):
+            return fake_request(**kwargs)
+
+    monkeypatch.setattr("app.proxy.get_upstream_pool", lambda: FakePool())
 
     with app.test_request_context("/proxy", method="POST", data=json.dumps({"a": 1}), headers={"X-Trace": "1"}):
         resp = forward_request("http://upstream-service:5000", "path/1")
@@ -55,3 +63,102 @@ def test_forward_request_makes_http_call(monkeypatch):
     assert resp.status_code == 201
     assert resp.get_data() == b"created"
     assert resp.headers.get("X-Ok") == "1"
+
+
+class DummyStreamResp(DummyResp):
+    def __init__(self, chunks, headers):
+        super().__init__(status_code=200, headers=headers, content=None)
+        self.chunks = chunks
+        self.closed = False
+
+    @property
+    def content(self):
+        raise AssertionError("large bodies must not be buffered")
+
+    @content.setter
+    def content(self, value):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield from self.chunks
+
+    def close(self):
+        self.closed = True
+
+
+def test_forward_request_streams_large_responses(monkeypatch):
+    from app.proxy import forward_request
+
+    app = Flask("test")
+    monkeypatch.setattr("app.proxy.cfg.proxy_stream_threshold", 10)
+    upstream = DummyStreamResp(
+        [b"[1,", b"2,", b"3]"],
+        headers={"Content-Type": "application/json", "Content-Length": "64"},
+    )
+
+    class FakePool:
+        def request(self, **kwargs):
+            assert kwargs["stream"] is True
+            return upstream
+
+    monkeypatch.setattr("app.proxy.get_upstream_pool", lambda: FakePool())
+
+    with app.test_request_context("/management/os", method="GET"):
+        resp = forward_request("http://upstream-service:5000", "os")
+
+    assert resp.is_streamed
+    assert "Content-Length" not in resp.headers
+    assert b"".join(resp.response) == b"[1,2,3]"
+    assert upstream.closed
+
+
+def test_forward_request_streams_large_uploads(monkeypatch):
+    from app.proxy import _StreamedBody, forward_request
+
+    app = Flask("test")
+    monkeypatch.setattr("app.proxy.cfg.proxy_stream_threshold", 4)
+    received = {}
+
+    class FakePool:
+        def request(self, **kwargs):
+            body = kwargs["data"]
+            assert isinstance(body, _StreamedBody)
+            received["length"] = len(body)
+            received["body"] = b"".join(body)
+            return DummyResp(status_code=201, content=b"ok")
+
+    monkeypatch.setattr("app.proxy.get_upstream_pool", lambda: FakePool())
+
+    payload = b"x" * 100
+    with app.test_request_context("/ai/upload", method="POST", data=payload):
+        resp = forward_request("http://upstream-service:5000", "upload")
+
+    assert resp.status_code == 201
+    assert received == {"length": 100, "body": payload}
+
+
+def test_pagination_cursor_passes_through(monkeypatch):
+    from app import create_app
+
+    seen = {}
+
+    class FakePool:
+        def request(self, **kwargs):
+            seen["url"] = kwargs["url"]
+            seen["params"] = kwargs["params"]
+            return DummyResp(
+                headers={"Content-Type": "application/json", "X-Next-Cursor": "abc"},
+                content=b"[]",
+            )
+
+    monkeypatch.setattr("app.proxy.get_upstream_pool", lambda: FakePool())
+
+    client = create_app().test_client()
+    resp = client.get(
+        "/api/management/os?limit=20&cursor=xyz", headers={"Origin": "http://front"}
+    )
+
+    assert seen["url"].endswith("/os")
+    assert seen["params"].to_dict() == {"limit": "20", "cursor": "xyz"}
+    assert resp.headers["X-Next-Cursor"] == "abc"
+    assert "X-Next-Cursor" in resp.headers["Access-Control-Expose-Headers"]
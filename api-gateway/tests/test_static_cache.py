@@ -0,0 +1,107 @@
+import gzip
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.compression import choose_encoding
+from app.static_cache import IMMUTABLE, init_static_cache
+
+BUNDLE = b"export const answer = 42;\n" * 200
+
+
+@pytest.fixture()
+def dist(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>")
+    (tmp_path / "assets" / "index-3f9a1c2b.js").write_bytes(BUNDLE)
+    (tmp_path / "favicon.ico").write_bytes(b"\x00\x01" * 10)
+    return tmp_path
+
+
+@pytest.fixture()
+def app(dist):
+    application = create_app()
+    application.config["JWT_SECRET_KEY"] = "test-secret-with-at-least-32-bytes"
+    init_static_cache(application, str(dist))
+    return application
+
+
+def test_choose_encoding_respects_q_values():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0, gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+
+
+def test_hashed_asset_is_immutable_and_precompressed(app, dist):
+    client = app.test_client()
+    # servido da memória: apagar o arquivo não muda nada até o restart
+    (dist / "assets" / "index-3f9a1c2b.js").unlink()
+
+    resp = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == IMMUTABLE
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(resp.data) == BUNDLE
+
+    plain = client.get("/assets/index-3f9a1c2b.js")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data == BUNDLE
+    assert plain.headers["ETag"] != resp.headers["ETag"]
+
+
+def test_conditional_request_gets_304(app):
+    client = app.test_client()
+    first = client.get("/")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get("/", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_spa_fallback_and_small_files(app):
+    client = app.test_client()
+    route = client.get("/ordens/123", headers={"Accept-Encoding": "gzip"})
+    assert route.status_code == 200
+    assert b"id=root" in route.data
+
+    icon = client.get("/favicon.ico", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in icon.headers
+    assert client.get("/api/nada").status_code == 404
+
+
+def test_frontend_not_built(tmp_path):
+    application = create_app()
+    init_static_cache(application, str(tmp_path / "missing"))
+    resp = application.test_client().get("/")
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "frontend_not_built"}
+
+
+def test_theme_etag_is_keyed_by_plan(app):
+    client = app.test_client()
+    with app.app_context():
+        basic = create_access_token("1", additional_claims={"tenant_id": 1, "plan": "BASIC"})
+        pro = create_access_token("1", additional_claims={"tenant_id": 1, "plan": "PRO"})
+
+    first = client.get("/api/tenant/theme", headers={"Authorization": f"Bearer {basic}"})
+    assert first.status_code == 200
+    assert first.get_json()["tenant"]["plan"] == "BASIC"
+    etag = first.headers["ETag"]
+
+    cached = client.get(
+        "/api/tenant/theme",
+        headers={"Authorization": f"Bearer {basic}", "If-None-Match": etag},
+    )
+    assert cached.status_code == 304
+
+    upgraded = client.get(
+        "/api/tenant/theme",
+        headers={"Authorization": f"Bearer {pro}", "If-None-Match": etag},
+    )
+    assert upgraded.status_code == 200
+    assert upgraded.get_json()["custom_allowed"] is True
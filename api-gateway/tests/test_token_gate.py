@@ -0,0 +1,190 @@
+import asyncio
+import base64
+import json
+import time
+
+import fakeredis
+import httpx
+import jwt
+from flask import Flask
+
+from app.asgi import create_asgi_app
+from app.config import BaseConfig
+from app.internal_identity import HEADER_NAME, sign_identity, signing_key, verify_identity
+from app.revocation import CHANNEL, KEY_PREFIX, RevocationReplica
+from app.token_gate import inspect_authorization
+
+
+def _cfg():
+    cfg = BaseConfig()
+    cfg.jwt_secret_key = "test-secret-with-at-least-32-bytes"
+    cfg.internal_identity_secret = ""
+    cfg.management_service_url = "http://management:5002"
+    return cfg
+
+
+def _token(cfg, **overrides):
+    now = int(time.time())
+    claims = {
+        "sub": "7",
+        "jti": "jti-1",
+        "type": "access",
+        "iat": now,
+        "exp": now + 900,
+        "tenant_id": 3,
+        "plan": "PRO",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, cfg.jwt_secret_key, algorithm="HS256")
+
+
+def test_identity_header_roundtrip_and_tampering():
+    key = signing_key("", "test-secret-with-at-least-32-bytes")
+    value = sign_identity({"sub": "7", "tenant_id": 3, "role": None}, key, time.time() + 30)
+
+    assert verify_identity(value, key) == {"sub": "7", "tenant_id": 3, "exp": int(time.time() + 30)}
+    assert verify_identity(value, signing_key("", "other")) is None
+    assert verify_identity(value, key, now=time.time() + 60) is None
+
+    version, body, sig = value.split(".")
+    forged = json.dumps({"sub": "7", "tenant_id": 99, "exp": 2**40}).encode()
+    forged_body = base64.urlsafe_b64encode(forged).decode().rstrip("=")
+    assert verify_identity(f"{version}.{forged_body}.{sig}", key) is None
+
+
+def test_inspect_authorization_outcomes():
+    cfg = _cfg()
+    replica = RevocationReplica()
+
+    assert inspect_authorization(None, cfg, replica).identity_header is None
+    assert inspect_authorization("Bearer garbage", cfg, replica).identity_header is None
+
+    decision = inspect_authorization(f"Bearer {_token(cfg)}", cfg, replica)
+    claims = verify_identity(decision.identity_header, signing_key("", cfg.jwt_secret_key))
+    assert claims["tenant_id"] == 3 and claims["sub"] == "7" and claims["plan"] == "PRO"
+
+    refresh = inspect_authorization(f"Bearer {_token(cfg, type='refresh')}", cfg, replica)
+    assert not refresh.revoked and refresh.identity_header is None
+
+    replica.apply({"jti": "jti-1", "exp": time.time() + 60})
+    assert inspect_authorization(f"Bearer {_token(cfg)}", cfg, replica).revoked
+
+
+def test_logout_all_uses_millisecond_issue_time():
+    cfg = _cfg()
+    replica = RevocationReplica()
+    now = int(time.time())
+    replica.apply({"user_id": 7, "epoch": now * 1000 + 400})
+
+    # login no mesmo segundo, depois do logout_all
+    after = _token(cfg, jti="new", iat=now, iat_ms=now * 1000 + 401)
+    assert not inspect_authorization(f"Bearer {after}", cfg, replica).revoked
+    before = _token(cfg, jti="old", iat=now, iat_ms=now * 1000 + 399)
+    assert inspect_authorization(f"Bearer {before}", cfg, replica).revoked
+    # token sem iat_ms: o iat em segundos continua valendo
+    legacy = _token(cfg, jti="legacy", iat=now)
+    assert inspect_authorization(f"Bearer {legacy}", cfg, replica).revoked
+
+
+def test_replica_sync_reads_users_service_keys_and_applies_epochs():
+    redis = fakeredis.FakeRedis()
+    redis.set(f"{KEY_PREFIX}jti-1", 1, ex=60)
+    redis.set(f"{KEY_PREFIX}__primed__", 1)
+    redis.set(f"{KEY_PREFIX}user:7", 1_700_000_000_500)  # época em ms
+    redis.set(f"{KEY_PREFIX}user:8", 1_700_000_000)  # chave antiga, em segundos
+
+    replica = RevocationReplica(redis)
+    replica.sync()
+
+    assert replica.ready
+    assert replica.is_revoked("jti-1", None, None)
+    assert not replica.is_revoked("jti-2", None, None)
+    assert replica.is_revoked("jti-2", 7, 1_700_000_000_500)
+    assert not replica.is_revoked("jti-2", 7, 1_700_000_000_501)
+    assert replica.is_revoked("jti-2", 8, 1_700_000_000_000)
+    assert not replica.is_revoked("jti-2", 8, 1_700_000_000_001)
+
+    # evento publicado pelo users-service depois do sync
+    replica.apply({"user_id": 7, "epoch": 1_700_000_002_000})
+    assert replica.is_revoked("jti-2", 7, 1_700_000_000_501)
+
+    replica.apply({"jti": "old", "exp": time.time() - 1})
+    assert not replica.is_revoked("old", None, None)
+    replica.prune()
+    assert len(replica) == 3
+
+
+def test_replica_listener_picks_up_published_revocations():
+    redis = fakeredis.FakeRedis()
+    replica = RevocationReplica(redis)
+    replica.start()
+    try:
+        deadline = time.time() + 5
+        while not replica.ready and time.time() < deadline:
+            time.sleep(0.01)
+        redis.publish(CHANNEL, json.dumps({"jti": "late", "exp": time.time() + 60}))
+        while not replica.is_revoked("late", None, None) and time.time() < deadline:
+            time.sleep(0.01)
+        assert replica.is_revoked("late", None, None)
+    finally:
+        replica.stop()
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def __aiter__(self):
+        yield self.data
+
+
+def _run(gateway, method, path, **kwargs):
+    async def go():
+        transport = httpx.ASGITransport(app=gateway)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gw") as c:
+            resp = await c.request(method, path, **kwargs)
+        await gateway.aclose()
+        return resp
+
+    return asyncio.run(go())
+
+
+def test_asgi_forwards_signed_identity_and_blocks_revoked_tokens():
+    cfg = _cfg()
+    replica = RevocationReplica()
+    seen = {}
+
+    def handler(request: httpx.Request):
+        seen["identity"] = request.headers.get(HEADER_NAME)
+        seen["xff"] = request.headers.get("x-forwarded-for")
+        return httpx.Response(200, stream=_Body(b'{"ok": true}'))
+
+    gateway = create_asgi_app(
+        wsgi_app=Flask("fallback"),
+        cfg=cfg,
+        transport=httpx.MockTransport(handler),
+        revocations=replica,
+    )
+    headers = {
+        "Authorization": f"Bearer {_token(cfg)}",
+        HEADER_NAME: "v1.forged.sig",
+        "X-Forwarded-For": "203.0.113.9",
+    }
+
+    resp = _run(gateway, "GET", "/api/management/customers/", headers=headers)
+    assert resp.status_code == 200
+    assert seen["xff"] == "203.0.113.9, 127.0.0.1"
+    claims = verify_identity(seen["identity"], signing_key("", cfg.jwt_secret_key))
+    assert claims["tenant_id"] == 3
+
+    # sem token o cabeçalho forjado do cliente não passa
+    seen.clear()
+    _run(gateway, "GET", "/api/management/customers/", headers={HEADER_NAME: "v1.forged.sig"})
+    assert seen["identity"] is None
+
+    replica.apply({"user_id": 7, "epoch": int(time.time() * 1000)})
+    seen.clear()
+    resp = _run(gateway, "GET", "/api/management/customers/", headers=headers)
+    assert resp.status_code == 401
+    assert resp.json() == {"msg": "Token has been revoked"}
+    assert seen == {}
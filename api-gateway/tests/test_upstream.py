@@ -0,0 +1,120 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.upstream import UpstreamPool, upstream_key
+
+
+def _metric(name, upstream):
+    return REGISTRY.get_sample_value(name, {"upstream": upstream}) or 0
+
+
+def test_upstream_key_ignores_path():
+    assert upstream_key("http://management-service:5002/os/1?x=1") == (
+        "http://management-service:5002"
+    )
+
+
+def test_session_is_reused_per_upstream():
+    pool = UpstreamPool(pool_size=2)
+
+    with pool.checkout("http://svc-a:5000/customers") as first:
+        pass
+    with pool.checkout("http://svc-a:5000/os/1") as second:
+        pass
+    with pool.checkout("http://svc-b:5000/tasks") as other:
+        pass
+
+    assert first is second
+    assert other is not first
+    pool.close()
+
+
+def test_saturation_and_in_use_metrics():
+    pool = UpstreamPool(pool_size=1)
+    key = "http://svc-sat:5000"
+    before = _metric("gateway_upstream_pool_saturated_total", key)
+
+    with pool.checkout(key + "/a"):
+        assert _metric("gateway_upstream_pool_in_use", key) == 1
+        with pool.checkout(key + "/b"):
+            assert _metric("gateway_upstream_pool_in_use", key) == 2
+
+    assert _metric("gateway_upstream_pool_saturated_total", key) == before + 1
+    assert _metric("gateway_upstream_pool_in_use", key) == 0
+    pool.close()
+
+
+def test_idle_sessions_are_evicted(monkeypatch):
+    pool = UpstreamPool(pool_size=1, idle_timeout=10)
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("app.upstream.time.monotonic", lambda: clock["now"])
+
+    with pool.checkout("http://svc-idle:5000/x") as first:
+        pass
+
+    clock["now"] += 30
+    pool.evict_idle()
+
+    with pool.checkout("http://svc-idle:5000/x") as second:
+        pass
+
+    assert second is not first
+    assert _metric("gateway_upstream_pool_evictions_total", "http://svc-idle:5000") >= 1
+    pool.close()
+
+
+@pytest.fixture()
+def upstream_server():
+    """Upstream HTTP de verdade (thread local) que sempre manda ``Set-Cookie``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 - API do http.server
+            body = (self.headers.get("Cookie") or "").encode()
+            self.send_response(200)
+            self.send_header("Set-Cookie", "session=user-a; Path=/")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_streamed_response_keeps_checkout_until_closed(upstream_server):
+    pool = UpstreamPool(pool_size=2)
+
+    resp = pool.request("GET", upstream_server + "/x", stream=True)
+    assert _metric("gateway_upstream_pool_in_use", upstream_server) == 1
+    resp.content
+    resp.close()
+    resp.close()  # idempotente
+    assert _metric("gateway_upstream_pool_in_use", upstream_server) == 0
+
+    pool.request("GET", upstream_server + "/x")
+    assert _metric("gateway_upstream_pool_in_use", upstream_server) == 0
+    pool.close()
+
+
+def test_upstream_cookies_are_not_shared_between_requests(upstream_server):
+    pool = UpstreamPool(pool_size=2)
+
+    first = pool.request("GET", upstream_server + "/x")
+    assert first.cookies.get("session") == "user-a"
+
+    # a próxima requisição (de outro usuário) não leva o cookie do upstream
+    second = pool.request("GET", upstream_server + "/x")
+    assert second.content == b""
+    # cookies do próprio cliente continuam sendo repassados
+    third = pool.request("GET", upstream_server + "/x", cookies={"theme": "dark"})
+    assert third.content == b"theme=dark"
+    pool.close()
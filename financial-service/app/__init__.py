@@ -1,20 +1,36 @@
 # financial-service/app/__init__.py
 import os
+import tempfile
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 
+from .exports import init_exports
+from .json_provider import init_json
+from .ledger import register_cli
 from .models import db
 from .observability import register_observability
+from .pagination import PaginationError
 from .tenant_guard import inject_current_tenant_from_token
 
 
 def create_app():
     app = Flask(__name__)
+    init_json(app)
     register_observability(app, "financial-service")
 
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret")
+    # identidade assinada pelo api-gateway (vazio = derivada do JWT_SECRET_KEY)
+    app.config["INTERNAL_IDENTITY_SECRET"] = os.getenv("INTERNAL_IDENTITY_SECRET", "")
     app.config["ENV"] = os.getenv("APP_ENV", "development")
+    # exportações (app/exports.py): planilhas XLSX geradas em disco e apagadas depois do TTL
+    app.config["EXPORT_DIR"] = os.getenv(
+        "EXPORT_DIR", os.path.join(tempfile.gettempdir(), "motogestor-exports")
+    )
+    app.config["EXPORT_WORKERS"] = int(os.getenv("EXPORT_WORKERS", "1"))
+    app.config["EXPORT_TTL_SECONDS"] = int(os.getenv("EXPORT_TTL_SECONDS", str(24 * 3600)))
+    # job XLSX de processo morto (ou rodando sem heartbeat há mais que isso) vira failed
+    app.config["EXPORT_STALE_MINUTES"] = int(os.getenv("EXPORT_STALE_MINUTES", "30"))
 
     database_url = os.getenv(
         "DATABASE_URL",
@@ -25,18 +41,28 @@ def create_app():
 
     db.init_app(app)
     jwt = JWTManager(app)  # noqa: F841
+    init_exports(app)
 
     @app.before_request
     def inject_tenant():
         inject_current_tenant_from_token(optional=True)
 
+    @app.errorhandler(PaginationError)
+    def pagination_error(err):
+        return jsonify({"error": str(err)}), 400
+
     from .routes_cashflow import bp as cash_bp
+    from .routes_exports import bp as exports_bp
     from .routes_payables import bp as pay_bp
     from .routes_receivables import bp as rec_bp
+    from .routes_search import bp as search_bp
 
     app.register_blueprint(rec_bp, url_prefix="/receivables")
     app.register_blueprint(pay_bp, url_prefix="/payables")
     app.register_blueprint(cash_bp, url_prefix="/cashflow")
+    app.register_blueprint(search_bp, url_prefix="/search")
+    app.register_blueprint(exports_bp, url_prefix="/exports")
+    register_cli(app)
 
     @app.route("/health")
     def health():
@@ -0,0 +1,525 @@
+"""Streaming CSV/NDJSON exports and background XLSX export jobs."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Sequence, Tuple)
+from xml.sax.saxutils import escape
+
+from flask import Flask, Response, current_app, stream_with_context
+from sqlalchemy import text
+
+from .models import db
+from .observability import EXPORT_ROWS
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "export_runner"
+FORMATS = ("csv", "ndjson")
+CHUNK_SIZE = 64 * 1024
+YIELD_PER = 1000
+XLSX_MAX_ROWS = 1_048_575  # limite do Excel (1.048.576 linhas) menos o cabeçalho
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+ACTIVE_STATUSES = ("queued", "running")
+HEARTBEAT_SECONDS = 30
+
+# Exportação nunca monta a lista inteira: a query sai ordenada por id e é lida
+# com ``yield_per`` (cursor do lado do servidor no Postgres), e as linhas vão
+# pro cliente em blocos de ~64 KB. Retomar = pedir de novo com ``?after=<último
+# id recebido>``. O XLSX é gerado por um worker num arquivo temporário (a
+# planilha vai sendo escrita direto dentro do zip) e baixado com suporte a Range.
+
+
+class ExportError(ValueError):
+    pass
+
+
+class Column(NamedTuple):
+    name: str
+    expr: Any  # coluna/expressão SQL
+
+
+class Filter(NamedTuple):
+    column: Any  # comparada por igualdade
+    type: Callable[[str], Any] = str  # converte o valor da query string (ValueError = 400)
+
+
+class ExportSpec(NamedTuple):
+    model: Any
+    columns: Sequence[Column]
+    joins: Sequence[Tuple[Any, Any]]  # (tabela, ON) em LEFT JOIN
+    date_column: Any  # ?from= / ?to=
+    filters: Dict[str, Filter]  # parâmetro -> filtro
+
+
+def _parse_date(args, name: str) -> Optional[date]:
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise ExportError(f"{name} deve ser uma data (AAAA-MM-DD)") from exc
+
+
+def _coerce(name: str, spec_filter: Filter, value: str) -> Any:
+    # antes do streaming: valor errado é 400, não erro do banco no meio do download
+    try:
+        return spec_filter.type(value)
+    except ValueError:
+        if spec_filter.type is int:
+            raise ExportError(f"{name} deve ser um número inteiro") from None
+        raise ExportError(f"{name} inválido") from None
+
+
+def parse_filters(spec: ExportSpec, args) -> Dict[str, Any]:
+    """Filtros da query string validados (``after``, ``from``, ``to`` e os do tipo)."""
+    after = args.get("after") or "0"
+    if not after.isdigit():
+        raise ExportError("after deve ser um id")
+    filters = {
+        "after": int(after),
+        "from": _parse_date(args, "from"),
+        "to": _parse_date(args, "to"),
+    }
+    for name, spec_filter in spec.filters.items():
+        if args.get(name):
+            filters[name] = _coerce(name, spec_filter, args[name])
+    return filters
+
+
+def build_query(spec: ExportSpec, tenant_id: int, filters: Dict[str, Any]):
+    """
+    Só as colunas exportadas (tuplas, sem montar objetos do ORM), do tenant,
+    em ordem de id.
+    """
+    query = db.session.query(*[column.expr.label(column.name) for column in spec.columns])
+    query = query.select_from(spec.model).filter(spec.model.tenant_id == tenant_id)
+    for target, onclause in spec.joins:
+        query = query.outerjoin(target, onclause)
+    if filters.get("after"):
+        query = query.filter(spec.model.id > filters["after"])
+    if filters.get("from"):
+        query = query.filter(spec.date_column >= filters["from"])
+    if filters.get("to"):
+        # dia inteiro, vale pra coluna DATE e DATETIME
+        query = query.filter(spec.date_column < filters["to"] + timedelta(days=1))
+    for name, spec_filter in spec.filters.items():
+        if filters.get(name) is not None:
+            query = query.filter(spec_filter.column == filters[name])
+    return query.order_by(spec.model.id)
+
+
+def _counted(rows: Iterable, kind: str, file_format: str) -> Iterator:
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            yield row
+    finally:
+        EXPORT_ROWS.labels(kind=kind, format=file_format).inc(count)
+
+
+# ---------- CSV / NDJSON ----------
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_cell(value) -> str:
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        # texto livre (nome, descrição) não vira fórmula ao abrir no Excel
+        return "'" + value
+    return _text(value)
+
+
+def csv_chunks(
+    columns: Sequence[Column], rows: Iterable, header: bool = True
+) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow([column.name for column in columns])
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buf.tell() >= CHUNK_SIZE:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode()
+
+
+def ndjson_chunks(columns: Sequence[Column], rows: Iterable) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    dumps = current_app.json.dumps_bytes
+    buf = bytearray()
+    for row in rows:
+        buf += dumps(dict(zip(names, row)))
+        buf += b"\n"
+        if len(buf) >= CHUNK_SIZE:
+            yield bytes(buf)
+            buf.clear()
+    yield bytes(buf)
+
+
+def stream_export(
+    kind: str, spec: ExportSpec, tenant_id: int, file_format: str, filters: Dict[str, Any]
+) -> Response:
+    """Resposta em streaming; retomada (``after``) continua o arquivo sem cabeçalho."""
+    rows = _counted(build_query(spec, tenant_id, filters).yield_per(YIELD_PER), kind, file_format)
+    if file_format == "csv":
+        chunks = csv_chunks(spec.columns, rows, header=not filters.get("after"))
+        mimetype = "text/csv"
+    else:
+        chunks = ndjson_chunks(spec.columns, rows)
+        mimetype = "application/x-ndjson"
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{kind}.{file_format}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+# ---------- XLSX ----------
+
+# Escritor mínimo de XLSX (um zip de XMLs): a planilha é gravada linha a linha
+# direto na entrada comprimida do zip, com texto inline (sem sharedStrings, que
+# obrigaria a guardar todas as strings em memória até o fim).
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet"/>'
+    '<Relationship Id="rId2" Target="styles.xml" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/styles"/>'
+    "</Relationships>"
+)
+# estilos: 0 = padrão, 1 = data, 2 = data e hora
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, datetime):
+        serial = (value - _EXCEL_EPOCH) / timedelta(days=1)
+        return f'<c s="2"><v>{serial:.8f}</v></c>'
+    if isinstance(value, date):
+        serial = (value - _EXCEL_EPOCH.date()).days
+        return f'<c s="1"><v>{serial}</v></c>'
+    value = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def write_xlsx(path: str, columns: Sequence[Column], rows: Iterable, sheet_name: str) -> int:
+    """Grava ``rows`` numa planilha em ``path``; devolve o número de linhas."""
+    count = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            buf: List[str] = [_SHEET_HEAD, _xlsx_row(column.name for column in columns)]
+            size = 0
+            for row in rows:
+                count += 1
+                if count > XLSX_MAX_ROWS:
+                    raise ExportError("mais linhas do que cabem numa planilha: use CSV")
+                line = _xlsx_row(row)
+                buf.append(line)
+                size += len(line)
+                if size >= CHUNK_SIZE:
+                    sheet.write("".join(buf).encode())
+                    buf.clear()
+                    size = 0
+            buf.append(_SHEET_TAIL)
+            sheet.write("".join(buf).encode())
+    return count
+
+
+# ---------- jobs de XLSX ----------
+
+# O estado do job fica num JSON ao lado do arquivo (``EXPORT_DIR``), sem tabela:
+# os arquivos expiram em ``EXPORT_TTL_SECONDS`` e o id aleatório não é enumerável.
+# O JSON guarda o ``host:pid`` do worker e um heartbeat, para um job cujo
+# processo morreu não ficar "running" até o TTL (ver ``fail_stale_export``).
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _job_file(job_id: str, suffix: str) -> str:
+    return os.path.join(current_app.config["EXPORT_DIR"], f"export-{job_id}{suffix}")
+
+
+def export_path(job_id: str) -> str:
+    return _job_file(job_id, ".xlsx")
+
+
+def save_job(job: dict) -> None:
+    path = _job_file(job["id"], ".json")
+    with open(path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(job, fh, default=str)
+    os.replace(path + ".tmp", path)
+
+
+def load_job(job_id: str) -> Optional[dict]:
+    if not JOB_ID.match(job_id):
+        return None
+    try:
+        with open(_job_file(job_id, ".json"), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def purge_expired(max_age: int) -> int:
+    """Apaga arquivos de export mais velhos que ``max_age`` segundos."""
+    limit = time.time() - max_age
+    removed = 0
+    with os.scandir(current_app.config["EXPORT_DIR"]) as entries:
+        for entry in entries:
+            if not entry.name.startswith("export-"):
+                continue
+            try:
+                if entry.stat().st_mtime < limit:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def worker_id() -> str:
+    """``host:pid`` do processo que roda o job."""
+    return f"{socket.gethostname()}:{os.getpid()}"[:80]
+
+
+def _process_alive(worker: Optional[str]) -> bool:
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True  # outro host: daqui só dá pra julgar pelo heartbeat
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _scope_tenant(tenant_id: int) -> None:
+    # o worker não passa pelo before_request: RLS do Postgres precisa do tenant
+    if db.session.get_bind().dialect.name == "postgresql":
+        db.session.execute(
+            text("SELECT set_config('app.current_tenant', :tenant_id, true)"),
+            {"tenant_id": str(tenant_id)},
+        )
+
+
+def fail_stale_export(job: dict, max_age: timedelta, pending=frozenset()) -> dict:
+    """
+    Marca ``failed`` o job que ninguém vai terminar: de um processo que já
+    morreu ou rodando sem heartbeat há mais de ``max_age``. Na fila de um
+    processo vivo ele só está esperando; ``pending`` são os jobs deste processo.
+    """
+    if job["status"] not in ACTIVE_STATUSES or job["id"] in pending:
+        return job
+    last_seen = datetime.fromisoformat(job.get("heartbeat_at") or job["created_at"])
+    running_stale = job["status"] == "running" and datetime.utcnow() - last_seen > max_age
+    if running_stale or not _process_alive(job.get("worker")):
+        job.update(
+            status="failed",
+            message="exportação interrompida: o worker parou; peça de novo",
+            finished_at=_now(),
+        )
+        save_job(job)
+    return job
+
+
+def _heartbeat(job: dict, rows: Iterable) -> Iterator:
+    last = time.monotonic()
+    for row in rows:
+        yield row
+        if time.monotonic() - last >= HEARTBEAT_SECONDS:
+            job["heartbeat_at"] = _now()
+            save_job(job)
+            last = time.monotonic()
+
+
+def run_export(job: dict, spec: ExportSpec) -> dict:
+    job.update(status="running", started_at=_now(), heartbeat_at=_now())
+    save_job(job)
+
+    _scope_tenant(job["tenant_id"])
+    query = build_query(spec, job["tenant_id"], parse_filters(spec, job["filters"]))
+    partial = _job_file(job["id"], ".partial")
+    rows = _heartbeat(job, _counted(query.yield_per(YIELD_PER), job["kind"], "xlsx"))
+    count = write_xlsx(partial, spec.columns, rows, sheet_name=job["kind"])
+    os.replace(partial, export_path(job["id"]))
+
+    job.update(
+        status="done", rows=count, bytes=os.path.getsize(export_path(job["id"])), finished_at=_now()
+    )
+    save_job(job)
+    return job
+
+
+class ExportRunner:
+    """Pool de threads do processo que gera as planilhas XLSX."""
+
+    def __init__(self, app: Flask, workers: int, stale_after: timedelta) -> None:
+        self.app = app
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="export"
+        )
+        self._pending: set = set()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, spec: ExportSpec, tenant_id: int, filters: Dict[str, str]) -> dict:
+        purge_expired(current_app.config["EXPORT_TTL_SECONDS"])
+        job = {
+            "id": uuid.uuid4().hex,
+            "tenant_id": tenant_id,
+            "kind": kind,
+            "format": "xlsx",
+            "filters": filters,
+            "status": "queued",
+            "worker": worker_id(),
+            "rows": 0,
+            "bytes": 0,
+            "message": None,
+            "created_at": _now(),
+            "started_at": None,
+            "heartbeat_at": None,
+            "finished_at": None,
+        }
+        save_job(job)
+        with self._lock:
+            self._pending.add(job["id"])
+        self._executor.submit(self._run, dict(job), spec)
+        return job
+
+    def pending(self) -> frozenset:
+        """Jobs deste processo na fila ou rodando."""
+        with self._lock:
+            return frozenset(self._pending)
+
+    def fail_stale(self, job: dict) -> dict:
+        return fail_stale_export(job, self.stale_after, self.pending())
+
+    def _run(self, job: dict, spec: ExportSpec) -> None:
+        with self.app.app_context():
+            try:
+                run_export(job, spec)
+            except Exception as exc:  # noqa: BLE001 - o job precisa terminar como failed
+                logger.exception("export %s falhou", job["id"])
+                job.update(status="failed", message=str(exc)[:255], finished_at=_now())
+                save_job(job)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._pending.discard(job["id"])
+                try:
+                    os.remove(_job_file(job["id"], ".partial"))
+                except OSError:
+                    pass
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def init_exports(app: Flask) -> ExportRunner:
+    os.makedirs(app.config["EXPORT_DIR"], exist_ok=True)
+    runner = ExportRunner(
+        app,
+        app.config.get("EXPORT_WORKERS", 1),
+        timedelta(minutes=app.config.get("EXPORT_STALE_MINUTES", 30)),
+    )
+    app.extensions[EXTENSION_KEY] = runner
+    return runner
+
+
+def get_export_runner() -> ExportRunner:
+    return current_app.extensions[EXTENSION_KEY]
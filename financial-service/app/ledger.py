@@ -0,0 +1,171 @@
+"""Daily cashflow ledger: incremental bucket updates and full rebuild."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+import click
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from .models import AccountPayable, AccountReceivable, CashflowDaily, _to_decimal, db
+
+# payment_method nulo/vazio vira esse bucket (a coluna é NOT NULL pro UNIQUE funcionar)
+UNSPECIFIED_METHOD = "UNSPECIFIED"
+
+BucketKey = Tuple[int, date, str]
+
+
+def _method(payment_method: Optional[str]) -> str:
+    return (payment_method or "").strip().upper() or UNSPECIFIED_METHOD
+
+
+def _day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def record_cashflow(
+    tenant_id: int,
+    when,
+    payment_method: Optional[str],
+    amount_in=0,
+    amount_out=0,
+) -> None:
+    """
+    Soma um pagamento/recebimento no bucket do dia, na transação corrente
+    (commita junto com a baixa). UPDATE atômico ``total = total + x``; se o
+    bucket não existe, INSERT num savepoint e, se outra transação criou o
+    mesmo bucket no meio, cai de volta no UPDATE.
+    """
+    amount_in = _to_decimal(amount_in)
+    amount_out = _to_decimal(amount_out)
+    key = dict(tenant_id=tenant_id, day=_day(when), payment_method=_method(payment_method))
+
+    def _increment() -> int:
+        return (
+            CashflowDaily.query.filter_by(**key).update(
+                {
+                    CashflowDaily.total_in: CashflowDaily.total_in + amount_in,
+                    CashflowDaily.total_out: CashflowDaily.total_out + amount_out,
+                },
+                synchronize_session=False,
+            )
+        )
+
+    if _increment():
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(CashflowDaily(**key, total_in=amount_in, total_out=amount_out))
+    except IntegrityError:
+        _increment()
+
+
+def _sum_buckets(tenant_id: int, start: date, end: date, *group_by):
+    return (
+        db.session.query(
+            *group_by,
+            func.coalesce(func.sum(CashflowDaily.total_in), 0),
+            func.coalesce(func.sum(CashflowDaily.total_out), 0),
+        )
+        .filter(
+            CashflowDaily.tenant_id == tenant_id,
+            CashflowDaily.day >= start,
+            CashflowDaily.day <= end,
+        )
+        .group_by(*group_by)
+        .order_by(*group_by)
+    )
+
+
+def summarize(tenant_id: int, start: date, end: date, daily: bool = False) -> Dict:
+    """Soma os buckets de ``start`` a ``end`` (inclusive) no banco."""
+    total_in, total_out = _sum_buckets(tenant_id, start, end).one()
+    result = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        **_totals(total_in, total_out),
+        "by_method": {
+            method: _totals(t_in, t_out)
+            for method, t_in, t_out in _sum_buckets(
+                tenant_id, start, end, CashflowDaily.payment_method
+            )
+        },
+    }
+    if daily:
+        result["days"] = [
+            {"day": day.isoformat(), **_totals(t_in, t_out)}
+            for day, t_in, t_out in _sum_buckets(tenant_id, start, end, CashflowDaily.day)
+        ]
+    return result
+
+
+def _totals(total_in, total_out) -> Dict[str, float]:
+    total_in, total_out = _to_decimal(total_in), _to_decimal(total_out)
+    return {
+        "total_in": float(total_in),
+        "total_out": float(total_out),
+        "net": float(total_in - total_out),
+    }
+
+
+def _aggregate(model, when_col, amount_col, tenant_id: Optional[int]) -> Iterable:
+    query = db.session.query(
+        model.tenant_id,
+        func.date(when_col),
+        model.payment_method,
+        func.sum(amount_col),
+    ).filter(when_col.isnot(None))
+    if tenant_id is not None:
+        query = query.filter(model.tenant_id == tenant_id)
+    return query.group_by(model.tenant_id, func.date(when_col), model.payment_method)
+
+
+def rebuild_ledger(tenant_id: Optional[int] = None) -> int:
+    """
+    Recalcula os buckets a partir de recebíveis/pagáveis (um tenant ou todos).
+
+    Sem histórico de baixas, o valor acumulado de cada conta cai no dia da
+    última baixa (``received_at``/``paid_at``) — mesmo critério do resumo
+    antigo. Baixas feitas depois do ledger já entram no dia em que ocorreram.
+    """
+    buckets: Dict[BucketKey, list] = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+    sources = (
+        (AccountReceivable, AccountReceivable.received_at, AccountReceivable.received_amount, 0),
+        (AccountPayable, AccountPayable.paid_at, AccountPayable.paid_amount, 1),
+    )
+    for model, when_col, amount_col, slot in sources:
+        for t_id, day, method, total in _aggregate(model, when_col, amount_col, tenant_id):
+            if isinstance(day, str):  # SQLite devolve date() como texto
+                day = date.fromisoformat(day)
+            buckets[(t_id, day, _method(method))][slot] += _to_decimal(total)
+
+    delete = CashflowDaily.query
+    if tenant_id is not None:
+        delete = delete.filter_by(tenant_id=tenant_id)
+    delete.delete(synchronize_session=False)
+
+    db.session.add_all(
+        CashflowDaily(
+            tenant_id=t_id,
+            day=day,
+            payment_method=method,
+            total_in=total_in,
+            total_out=total_out,
+        )
+        for (t_id, day, method), (total_in, total_out) in buckets.items()
+    )
+    db.session.commit()
+    return len(buckets)
+
+
+def register_cli(app) -> None:
+    @app.cli.command("rebuild-cashflow")
+    @click.option("--tenant-id", type=int, default=None, help="só esse tenant")
+    def rebuild_cashflow_command(tenant_id):
+        """Reconstrói a tabela cashflow_daily a partir das contas."""
+        count = rebuild_ledger(tenant_id)
+        click.echo(f"cashflow_daily: {count} buckets reconstruídos")
@@ -67,9 +67,28 @@ class AccountPayable(db.Model):
     )
 
 
+class CashflowDaily(db.Model):
+    """Caixa pré-agregado por tenant/dia/forma de pagamento (ver ``ledger.py``)."""
+
+    __tablename__ = "cashflow_daily"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "tenant_id", "day", "payment_method", name="uq_cashflow_daily_bucket"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    payment_method = db.Column(db.String(50), nullable=False)
+    total_in = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    total_out = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+
 def _to_decimal(value) -> Decimal:
     if value is None:
         return Decimal("0.00")
     if isinstance(value, Decimal):
         return value
     return Decimal(str(value))
+
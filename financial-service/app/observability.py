@@ -46,6 +46,13 @@ OS_CREATED_COUNTER = Counter(
     "os_created_total", "Service Orders created per tenant", ["tenant_id"]
 )
 
+# app/exports.py: linhas exportadas por tipo e formato (csv | ndjson | xlsx)
+EXPORT_ROWS = Counter(
+    "financial_export_rows_total",
+    "Rows written by streaming and XLSX exports",
+    ["kind", "format"],
+)
+
 _APP_INFO_REGISTERED = False
 
 
@@ -2,20 +2,23 @@
 from datetime import date, datetime
 
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
 
+from .ledger import record_cashflow
 from .models import AccountPayable, _to_decimal, db
+from .pagination import page_response, paginate
+from .search import normalize_query, text_match
 from .utils import get_current_tenant_id, is_manager_or_owner
+from .tenant_guard import identity_required
 
 bp = Blueprint("payables", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_payables():
     tenant_id = get_current_tenant_id()
     status = request.args.get("status")
-    supplier = request.args.get("supplier")
+    supplier = normalize_query(request.args.get("supplier"))
     category = request.args.get("category")
     from_due = request.args.get("from_due")
     to_due = request.args.get("to_due")
@@ -25,8 +28,7 @@ def list_payables():
     if status:
         query = query.filter_by(status=status)
     if supplier:
-        like = f"%{supplier}%"
-        query = query.filter(AccountPayable.supplier_name.ilike(like))
+        query = query.filter(text_match(supplier, AccountPayable.supplier_name))
     if category:
         query = query.filter_by(category=category)
     if from_due:
@@ -34,9 +36,9 @@ def list_payables():
     if to_due:
         query = query.filter(AccountPayable.due_date <= date.fromisoformat(to_due))
 
-    pays = query.order_by(AccountPayable.due_date.asc()).all()
+    page = paginate(query, AccountPayable, AccountPayable.due_date)
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": p.id,
@@ -51,13 +53,14 @@ def list_payables():
                 "paid_at": p.paid_at.isoformat() if p.paid_at else None,
                 "payment_method": p.payment_method,
             }
-            for p in pays
-        ]
+            for p in page.items
+        ],
+        page,
     )
 
 
 @bp.get("/<int:pay_id>")
-@jwt_required()
+@identity_required()
 def get_payable(pay_id):
     tenant_id = get_current_tenant_id()
     p = db.session.get(AccountPayable, pay_id)
@@ -83,7 +86,7 @@ def get_payable(pay_id):
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_payable():
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -122,7 +125,7 @@ def create_payable():
 
 
 @bp.patch("/<int:pay_id>")
-@jwt_required()
+@identity_required()
 def update_payable(pay_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -161,7 +164,7 @@ def update_payable(pay_id):
 
 
 @bp.patch("/<int:pay_id>/pay")
-@jwt_required()
+@identity_required()
 def pay_payable(pay_id):
     """
     Pagar total ou parcial.
@@ -199,6 +202,7 @@ def pay_payable(pay_id):
     elif new_paid > 0:
         pay.status = "PARTIAL"
 
+    record_cashflow(tenant_id, pay.paid_at, pay.payment_method, amount_out=pay_amount)
     db.session.commit()
 
     return jsonify(
@@ -211,7 +215,7 @@ def pay_payable(pay_id):
 
 
 @bp.delete("/<int:pay_id>")
-@jwt_required()
+@identity_required()
 def cancel_payable(pay_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -2,20 +2,24 @@
 from datetime import date, datetime
 
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 
+from .ledger import record_cashflow
 from .models import AccountReceivable, _to_decimal, db
+from .pagination import page_response, paginate
+from .search import normalize_query, text_match
 from .utils import get_current_tenant_id, is_manager_or_owner
+from .tenant_guard import identity_required
 
 bp = Blueprint("receivables", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_receivables():
     tenant_id = get_current_tenant_id()
     status = request.args.get("status")
-    customer = request.args.get("customer")
+    customer = normalize_query(request.args.get("customer"))
     source_type = request.args.get("source_type")
     from_due = request.args.get("from_due")
     to_due = request.args.get("to_due")
@@ -25,8 +29,7 @@ def list_receivables():
     if status:
         query = query.filter_by(status=status)
     if customer:
-        like = f"%{customer}%"
-        query = query.filter(AccountReceivable.customer_name.ilike(like))
+        query = query.filter(text_match(customer, AccountReceivable.customer_name))
     if source_type:
         query = query.filter_by(source_type=source_type)
     if from_due:
@@ -34,9 +37,10 @@ def list_receivables():
     if to_due:
         query = query.filter(AccountReceivable.due_date <= date.fromisoformat(to_due))
 
-    recs = query.order_by(AccountReceivable.due_date.asc()).all()
+    page = paginate(query, AccountReceivable, AccountReceivable.due_date)
 
-    return jsonify(
+    # Decimal/datas vão direto: o JSON provider (app/json_provider.py) converte
+    return page_response(
         [
             {
                 "id": r.id,
@@ -44,21 +48,53 @@ def list_receivables():
                 "source_id": r.source_id,
                 "customer_name": r.customer_name,
                 "description": r.description,
-                "issue_date": r.issue_date.isoformat() if r.issue_date else None,
-                "due_date": r.due_date.isoformat() if r.due_date else None,
-                "amount": float(r.amount),
+                "issue_date": r.issue_date,
+                "due_date": r.due_date,
+                "amount": r.amount,
                 "status": r.status,
-                "received_amount": float(r.received_amount or 0),
-                "received_at": r.received_at.isoformat() if r.received_at else None,
+                "received_amount": r.received_amount or 0,
+                "received_at": r.received_at,
                 "payment_method": r.payment_method,
             }
-            for r in recs
-        ]
+            for r in page.items
+        ],
+        page,
+    )
+
+
+@bp.get("/stats")
+@identity_required()
+def receivables_stats():
+    """Quantidade e soma de recebíveis por status, agregadas no banco."""
+    tenant_id = get_current_tenant_id()
+
+    rows = (
+        db.session.query(
+            AccountReceivable.status,
+            func.count(AccountReceivable.id),
+            func.coalesce(func.sum(AccountReceivable.amount), 0),
+        )
+        .filter(AccountReceivable.tenant_id == tenant_id)
+        .group_by(AccountReceivable.status)
+        .all()
+    )
+    by_status = {
+        status: {"count": count, "total": float(_to_decimal(total))}
+        for status, count, total in rows
+    }
+    pending = by_status.get("PENDING", {"count": 0, "total": 0.0})
+
+    return jsonify(
+        {
+            "pending_count": pending["count"],
+            "pending_total": pending["total"],
+            "by_status": by_status,
+        }
     )
 
 
 @bp.get("/<int:rec_id>")
-@jwt_required()
+@identity_required()
 def get_receivable(rec_id):
     tenant_id = get_current_tenant_id()
     r = db.session.get(AccountReceivable, rec_id)
@@ -85,7 +121,7 @@ def get_receivable(rec_id):
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_receivable():
     """Cria conta a receber manual (não necessariamente ligada a OS)."""
     if not is_manager_or_owner():
@@ -126,7 +162,7 @@ def create_receivable():
 
 
 @bp.post("/from-os")
-@jwt_required()
+@identity_required()
 def create_from_os():
     """
     Cria conta a receber vinculada a uma OS.
@@ -177,7 +213,7 @@ def create_from_os():
 
 
 @bp.patch("/<int:rec_id>")
-@jwt_required()
+@identity_required()
 def update_receivable(rec_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -214,7 +250,7 @@ def update_receivable(rec_id):
 
 
 @bp.patch("/<int:rec_id>/pay")
-@jwt_required()
+@identity_required()
 def pay_receivable(rec_id):
     """
     Dar baixa total ou parcial.
@@ -252,6 +288,9 @@ def pay_receivable(rec_id):
     elif new_received > 0:
         rec.status = "PARTIAL"
 
+    record_cashflow(
+        tenant_id, rec.received_at, rec.payment_method, amount_in=pay_amount
+    )
     db.session.commit()
 
     return jsonify(
@@ -264,7 +303,7 @@ def pay_receivable(rec_id):
 
 
 @bp.delete("/<int:rec_id>")
-@jwt_required()
+@identity_required()
 def cancel_receivable(rec_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
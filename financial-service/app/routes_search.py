@@ -0,0 +1,55 @@
+# financial-service/app/routes_search.py
+from flask import Blueprint, jsonify
+from sqlalchemy import func
+
+from .models import AccountPayable, AccountReceivable, db
+from .search import MIN_QUERY_LENGTH, rank_order, search_args, text_match
+from .utils import get_current_tenant_id
+from .tenant_guard import identity_required
+
+bp = Blueprint("search", __name__)
+
+
+def _counterparties(column, tenant_column, tenant_id, term, limit):
+    rows = (
+        db.session.query(column, func.count())
+        .filter(tenant_column == tenant_id, text_match(term, column, fuzzy=True))
+        .group_by(column)
+        .order_by(*rank_order(term, column))
+        .limit(limit)
+        .all()
+    )
+    return [{"name": name, "count": count} for name, count in rows]
+
+
+@bp.get("/")
+@identity_required()
+def search_counterparties():
+    """
+    Typeahead de clientes (recebíveis) e fornecedores (pagáveis) já usados.
+
+    Query: ``?q=auto pecas&limit=8``
+    """
+    tenant_id = get_current_tenant_id()
+    term, limit = search_args()
+    if len(term) < MIN_QUERY_LENGTH:
+        return jsonify({"customers": [], "suppliers": []})
+
+    return jsonify(
+        {
+            "customers": _counterparties(
+                AccountReceivable.customer_name,
+                AccountReceivable.tenant_id,
+                tenant_id,
+                term,
+                limit,
+            ),
+            "suppliers": _counterparties(
+                AccountPayable.supplier_name,
+                AccountPayable.tenant_id,
+                tenant_id,
+                term,
+                limit,
+            ),
+        }
+    )
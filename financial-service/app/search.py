@@ -0,0 +1,93 @@
+"""Text search helpers: pg_trgm-backed on Postgres, plain LIKE fallback elsewhere."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from flask import request
+from sqlalchemy import case, func, literal, or_, text
+
+from .models import db
+
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 25
+
+# engine url -> pg_trgm instalado?
+_trigram_cache: Dict[str, bool] = {}
+
+
+def trigram_enabled() -> bool:
+    """True se o banco é Postgres com a extensão pg_trgm (ver migração *_trigram_search)."""
+    engine = db.engine
+    if engine.dialect.name != "postgresql":
+        return False
+    key = str(engine.url)
+    if key not in _trigram_cache:
+        found = db.session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first()
+        _trigram_cache[key] = found is not None
+    return _trigram_cache[key]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def normalize_query(raw: Optional[str]) -> str:
+    return " ".join((raw or "").split())
+
+
+def parse_limit(raw: Optional[str]) -> int:
+    try:
+        limit = int(raw) if raw else DEFAULT_LIMIT
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def text_match(term: str, *columns, fuzzy: bool = False):
+    """
+    Filtro "contém ``term``" (case-insensitive) em qualquer das colunas.
+
+    No Postgres o ``ILIKE '%term%'`` usa o índice GIN de trigramas; com
+    ``fuzzy=True`` também aceita erros de digitação (``term <% coluna``,
+    word similarity do pg_trgm). No SQLite fica só o LIKE.
+    """
+    like = f"%{_escape_like(term)}%"
+    clauses = [col.ilike(like, escape="\\") for col in columns]
+    if fuzzy and trigram_enabled():
+        clauses += [literal(term).op("<%")(col) for col in columns]
+    return or_(*clauses)
+
+
+def rank_order(term: str, *columns) -> List:
+    """
+    ORDER BY de relevância: começa com ``term`` > contém > parecido
+    (similaridade do pg_trgm), desempatando pelo texto mais curto.
+    """
+    prefix = f"{_escape_like(term)}%"
+    starts = or_(*(col.ilike(prefix, escape="\\") for col in columns))
+    order = [case((starts, 0), else_=1)]
+    if trigram_enabled():
+        similarity = [func.word_similarity(term, func.coalesce(col, "")) for col in columns]
+        best = similarity[0] if len(similarity) == 1 else func.greatest(*similarity)
+        order.append(best.desc())
+    order.append(func.length(columns[0]))
+    return order
+
+
+def ranked(query, term: str, *columns, limit: int):
+    """Aplica filtro fuzzy + ranking e devolve no máximo ``limit`` linhas."""
+    return (
+        query.filter(text_match(term, *columns, fuzzy=True))
+        .order_by(*rank_order(term, *columns))
+        .limit(limit)
+        .all()
+    )
+
+
+def search_args():
+    """(termo normalizado, limite) da query string ``?q=&limit=``."""
+    return normalize_query(request.args.get("q")), parse_limit(request.args.get("limit"))
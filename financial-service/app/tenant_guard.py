@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from functools import wraps
-from typing import Iterable, Optional
+from functools import lru_cache, wraps
+from typing import Any, Dict, Iterable, Optional
 
-from flask import g, jsonify, request
-from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt, jwt_required, verify_jwt_in_request
 
+from .internal_identity import HEADER_NAME, signing_key, verify_identity
 from .models import db
 
 TENANT_CLAIM = "tenant_id"
@@ -38,12 +39,55 @@ def _set_pg_tenant_scope(tenant_id: int) -> None:
     db.session.execute("SET LOCAL app.current_tenant = :tenant_id", {"tenant_id": tenant_id})
 
 
+@lru_cache(maxsize=4)
+def _identity_key(secret: Optional[str], jwt_secret: Optional[str]) -> bytes:
+    return signing_key(secret, jwt_secret)
+
+
+def load_internal_identity() -> Optional[Dict[str, Any]]:
+    """Claims do ``X-Internal-Identity`` assinado pelo gateway (None se ausente/inválido)."""
+    if "internal_identity" not in g:
+        key = _identity_key(
+            current_app.config.get("INTERNAL_IDENTITY_SECRET"),
+            current_app.config.get("JWT_SECRET_KEY"),
+        )
+        g.internal_identity = verify_identity(request.headers.get(HEADER_NAME), key)
+    return g.internal_identity
+
+
+def _request_claims(optional: bool = False) -> Dict[str, Any]:
+    claims = load_internal_identity()
+    if claims is not None:
+        return claims
+    verify_jwt_in_request(optional=optional, verify_type=not optional)
+    return get_jwt() or {}
+
+
+def identity_required():
+    """
+    ``jwt_required()`` com atalho: se o gateway já verificou o token e mandou
+    a identidade assinada, não decodifica o JWT de novo.
+    """
+
+    def decorator(fn):
+        protected = jwt_required()(fn)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if load_internal_identity() is not None:
+                return fn(*args, **kwargs)
+            return protected(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 def tenant_guard(path_key: str = "tenant_id", body_keys: Iterable[str] = ("tenant_id",)):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt() or {}
+            claims = _request_claims()
             token_tenant = claims.get(TENANT_CLAIM)
             if token_tenant is None:
                 return jsonify({"error": "token sem tenant"}), 403
@@ -65,8 +109,7 @@ def tenant_guard(path_key: str = "tenant_id", body_keys: Iterable[str] = ("tenan
 
 
 def inject_current_tenant_from_token(optional: bool = True) -> None:
-    verify_jwt_in_request(optional=optional, verify_type=False)
-    claims = get_jwt() or {}
+    claims = _request_claims(optional=optional)
     tenant_id = claims.get(TENANT_CLAIM)
     if tenant_id is not None:
         g.current_tenant_id = int(tenant_id)
@@ -0,0 +1,86 @@
+"""Composite/partial indexes for tenant-scoped list queries (financial).
+
+Revision ID: 20241010120002
+Revises: 20240909130002
+Create Date: 2024-10-10 12:00:02
+
+Cada índice casa com um filtro + ORDER BY das rotas de listagem (keyset em
+``app/pagination.py``: ``ORDER BY chave NULLS LAST, id``). Conferir com
+``scripts/explain_list_routes.py`` (ver ``docs/indexes-and-explain.md``).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20241010120002"
+down_revision: Union[str, None] = "20240909130002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas, WHERE do índice parcial)
+INDEXES = [
+    # GET /receivables  (+ ?status=) e GET /receivables/stats
+    (
+        "ix_accounts_receivable_tenant_due",
+        "accounts_receivable",
+        ["tenant_id", "due_date", "id"],
+        None,
+    ),
+    (
+        "ix_accounts_receivable_tenant_status_due",
+        "accounts_receivable",
+        ["tenant_id", "status", "due_date", "id"],
+        None,
+    ),
+    # em aberto (PENDING/PARTIAL): o que o painel e a cobrança consultam
+    (
+        "ix_accounts_receivable_open",
+        "accounts_receivable",
+        ["tenant_id", "due_date", "id"],
+        "status IN ('PENDING', 'PARTIAL')",
+    ),
+    # GET /cashflow/summary: entradas por período de recebimento
+    (
+        "ix_accounts_receivable_tenant_received",
+        "accounts_receivable",
+        ["tenant_id", "received_at"],
+        "received_at IS NOT NULL",
+    ),
+    # GET /payables  (+ ?status=)
+    (
+        "ix_accounts_payable_tenant_due",
+        "accounts_payable",
+        ["tenant_id", "due_date", "id"],
+        None,
+    ),
+    (
+        "ix_accounts_payable_tenant_status_due",
+        "accounts_payable",
+        ["tenant_id", "status", "due_date", "id"],
+        None,
+    ),
+    # GET /cashflow/summary: saídas por período de pagamento
+    (
+        "ix_accounts_payable_tenant_paid",
+        "accounts_payable",
+        ["tenant_id", "paid_at"],
+        "paid_at IS NOT NULL",
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            [sa.text(c) for c in columns],
+            unique=False,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns, _where in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,55 @@
+"""Daily per-tenant cashflow ledger (cashflow_daily).
+
+Revision ID: 20241012120002
+Revises: 20241011120002
+Create Date: 2024-10-12 12:00:02
+
+Depois do upgrade, popular com ``flask --app wsgi rebuild-cashflow``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20241012120002"
+down_revision: Union[str, None] = "20241011120002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PG_ROLE = "motogestor_app"
+TENANT_EXPR = "COALESCE(current_setting('app.current_tenant', true), '-1')::int"
+TABLE = "cashflow_daily"
+
+
+def upgrade() -> None:
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("payment_method", sa.String(length=50), nullable=False),
+        sa.Column("total_in", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("total_out", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+        # também serve de índice para o SUM por período: (tenant_id, day, ...)
+        sa.UniqueConstraint(
+            "tenant_id", "day", "payment_method", name="uq_cashflow_daily_bucket"
+        ),
+    )
+
+    op.execute(f"ALTER TABLE {TABLE} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"ALTER TABLE {TABLE} FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY {TABLE}_tenant_isolation ON {TABLE}
+        USING (tenant_id = {TENANT_EXPR})
+        WITH CHECK (tenant_id = {TENANT_EXPR});
+        """
+    )
+    op.execute(f"GRANT SELECT, INSERT, UPDATE, DELETE ON {TABLE} TO {PG_ROLE}")
+    op.execute(f"GRANT USAGE, SELECT ON SEQUENCE {TABLE}_id_seq TO {PG_ROLE}")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP POLICY IF EXISTS {TABLE}_tenant_isolation ON {TABLE}")
+    op.drop_table(TABLE)
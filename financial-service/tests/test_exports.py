@@ -0,0 +1,153 @@
+import csv
+import io
+import json
+import socket
+import subprocess
+import sys
+import time
+import zipfile
+from datetime import datetime
+from xml.etree import ElementTree
+
+import pytest
+
+from flask_jwt_extended import create_access_token
+
+SHEET_NS = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_ENV", "test")
+    # o XLSX é gerado numa thread do pool: banco em arquivo, não :memory:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'exports.db'}")
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path / "exports"))
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, identity: dict):
+    with app.app_context():
+        token = create_access_token(identity=str(identity.get('sub', '1')), additional_claims={'tenant_id': identity.get('tenant_id'), 'role': identity.get('role')})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create_receivables(client, headers, due_dates):
+    ids = []
+    for i, due_date in enumerate(due_dates):
+        payload = {"customer_name": f"Cliente {i}", "amount": 100.5 + i, "due_date": due_date}
+        ids.append(client.post("/receivables/", json=payload, headers=headers).get_json()["id"])
+    return ids
+
+
+def test_receivables_csv_export_filters_by_due_date_and_resumes(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    ids = _create_receivables(
+        client, headers, ["2030-01-05", "2030-01-31", "2030-02-01", "2030-01-10"]
+    )
+    other = auth_headers(client.application, {"tenant_id": 2, "role": "owner"})
+    _create_receivables(client, other, ["2030-01-15"])
+
+    resp = client.get("/exports/receivables?from=2030-01-01&to=2030-01-31", headers=headers)
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert [int(r["id"]) for r in rows] == [ids[0], ids[1], ids[3]]
+    assert (rows[0]["customer_name"], rows[0]["amount"], rows[0]["due_date"]) == (
+        "Cliente 0",
+        "100.50",
+        "2030-01-05",
+    )
+
+    resumed = client.get(
+        f"/exports/receivables?from=2030-01-01&to=2030-01-31&after={ids[1]}", headers=headers
+    )
+    assert [int(line.split(",")[0]) for line in resumed.get_data(as_text=True).splitlines()] == [
+        ids[3]
+    ]
+
+    mechanic = auth_headers(client.application, {"tenant_id": 1, "role": "mechanic"})
+    assert client.get("/exports/receivables", headers=mechanic).status_code == 403
+    assert client.get("/exports/receivables?after=x", headers=headers).status_code == 400
+
+
+def test_payables_ndjson_export(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    for supplier, category in (("Distribuidora", "PARTS"), ("Imobiliária", "RENT")):
+        client.post(
+            "/payables/",
+            json={
+                "supplier_name": supplier,
+                "amount": 250,
+                "due_date": "2030-03-10",
+                "category": category,
+            },
+            headers=headers,
+        )
+
+    resp = client.get("/exports/payables?format=ndjson&category=RENT", headers=headers)
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [(r["supplier_name"], r["amount"], r["status"]) for r in rows] == [
+        ("Imobiliária", 250, "PENDING")
+    ]
+
+
+def test_payables_xlsx_job(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    client.post(
+        "/payables/",
+        json={"supplier_name": "Distribuidora", "amount": 99.9, "due_date": "2030-03-10"},
+        headers=headers,
+    )
+
+    resp = client.post("/exports/payables/xlsx", headers=headers)
+    assert resp.status_code == 202
+    job_id = resp.get_json()["id"]
+
+    deadline = time.monotonic() + 10
+    job = resp.get_json()
+    while job["status"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/exports/jobs/{job_id}", headers=headers).get_json()
+    assert (job["status"], job["rows"]) == ("done", 1)
+
+    download = client.get(f"/exports/jobs/{job_id}/download", headers=headers)
+    assert download.headers["Content-Disposition"].startswith("attachment")
+    with zipfile.ZipFile(io.BytesIO(download.get_data())) as archive:
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    cells = sheet.findall("s:sheetData/s:row", SHEET_NS)[1]
+    assert cells[1].findtext("s:is/s:t", namespaces=SHEET_NS) == "Distribuidora"
+    assert cells[6].findtext("s:v", namespaces=SHEET_NS) == "99.90"
+
+
+def test_xlsx_job_of_a_dead_worker_is_marked_failed(client):
+    from app.exports import save_job
+
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    finished = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+    )
+    job_id = "d" * 32
+    with client.application.app_context():
+        save_job(
+            {
+                "id": job_id,
+                "tenant_id": 1,
+                "kind": "payables",
+                "status": "running",
+                "worker": f"{socket.gethostname()}:{int(finished.stdout)}",
+                "created_at": datetime.utcnow().isoformat(),
+                "heartbeat_at": datetime.utcnow().isoformat(),
+            }
+        )
+
+    job = client.get(f"/exports/jobs/{job_id}", headers=headers).get_json()
+    assert job["status"] == "failed"
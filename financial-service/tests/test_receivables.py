@@ -40,3 +40,79 @@ def test_create_receivable(client):
     assert resp.status_code == 201
     data = resp.get_json()
     assert isinstance(data.get("id"), int)
+
+
+def test_receivables_stats_sums_by_status(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    other = auth_headers(client.application, {"tenant_id": 2, "role": "owner"})
+
+    for amount in (100.5, 49.5):
+        client.post("/receivables/", json={"customer_name": "A", "amount": amount, "due_date": "2030-01-01"}, headers=headers)
+    paid = client.post("/receivables/", json={"customer_name": "B", "amount": 80, "due_date": "2030-01-01"}, headers=headers).get_json()["id"]
+    client.patch(f"/receivables/{paid}/pay", json={"amount": 80}, headers=headers)
+    client.post("/receivables/", json={"customer_name": "C", "amount": 999, "due_date": "2030-01-01"}, headers=other)
+
+    resp = client.get("/receivables/stats", headers=headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["pending_count"] == 2
+    assert data["pending_total"] == 150.0
+    assert data["by_status"]["PAID"] == {"count": 1, "total": 80.0}
+
+
+def test_search_counterparties(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    for name in ("Auto Peças Silva", "Silva Motos", "Silva Motos", "Outro"):
+        client.post("/receivables/", json={"customer_name": name, "amount": 10, "due_date": "2030-01-01"}, headers=headers)
+    client.post("/payables/", json={"supplier_name": "Distribuidora Silva", "amount": 5, "due_date": "2030-01-01"}, headers=headers)
+
+    data = client.get("/search/?q=silva", headers=headers).get_json()
+    assert data["customers"] == [
+        {"name": "Silva Motos", "count": 2},
+        {"name": "Auto Peças Silva", "count": 1},
+    ]
+    assert data["suppliers"] == [{"name": "Distribuidora Silva", "count": 1}]
+
+
+def test_cashflow_summary_sums_daily_buckets(client):
+    from datetime import date
+
+    from app.ledger import rebuild_ledger
+    from app.models import CashflowDaily
+
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    other = auth_headers(client.application, {"tenant_id": 2, "role": "owner"})
+
+    rec = client.post("/receivables/", json={"customer_name": "A", "amount": 300, "due_date": "2030-01-01"}, headers=headers).get_json()["id"]
+    client.patch(f"/receivables/{rec}/pay", json={"amount": 100, "payment_method": "PIX"}, headers=headers)
+    client.patch(f"/receivables/{rec}/pay", json={"amount": 50, "payment_method": "pix"}, headers=headers)
+    pay = client.post("/payables/", json={"supplier_name": "F", "amount": 40, "due_date": "2030-01-01"}, headers=headers).get_json()["id"]
+    client.patch(f"/payables/{pay}/pay", json={"amount": 40}, headers=headers)
+    foreign = client.post("/receivables/", json={"customer_name": "X", "amount": 999, "due_date": "2030-01-01"}, headers=other).get_json()["id"]
+    client.patch(f"/receivables/{foreign}/pay", json={"amount": 999}, headers=other)
+
+    today = date.today().isoformat()
+    resp = client.get(f"/cashflow/summary?start={today}&end={today}&daily=1", headers=headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert (data["total_in"], data["total_out"], data["net"]) == (150.0, 40.0, 110.0)
+    assert data["by_method"] == {
+        "PIX": {"total_in": 150.0, "total_out": 0.0, "net": 150.0},
+        "UNSPECIFIED": {"total_in": 0.0, "total_out": 40.0, "net": -40.0},
+    }
+    assert data["days"] == [{"day": today, "total_in": 150.0, "total_out": 40.0, "net": 110.0}]
+
+    empty = client.get("/cashflow/summary?start=2000-01-01&end=2000-12-31", headers=headers).get_json()
+    assert (empty["total_in"], empty["total_out"], empty["by_method"]) == (0.0, 0.0, {})
+
+    with client.application.app_context():
+        incremental = {
+            (b.tenant_id, b.day, b.payment_method): (b.total_in, b.total_out)
+            for b in CashflowDaily.query.all()
+        }
+        assert rebuild_ledger() == 3
+        rebuilt = {
+            (b.tenant_id, b.day, b.payment_method): (b.total_in, b.total_out)
+            for b in CashflowDaily.query.all()
+        }
+    assert rebuilt == incremental
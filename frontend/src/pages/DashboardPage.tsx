@@ -5,21 +5,26 @@ import StateBlock from "../components/ui/StateBlock";
 import { useAuth } from "../contexts/AuthContext";
 import { apiRequest, ApiError } from "../lib/api";
 
+type SectionStatus = "ok" | "stale" | "error" | "timeout";
+
 type Overview = {
   service_orders?: {
     total?: number;
     open?: number;
     completed?: number;
     error?: unknown;
+    status?: SectionStatus;
   };
   receivables?: {
     pending_count?: number;
     pending_total?: number;
     error?: unknown;
+    status?: SectionStatus;
   };
   tasks?: {
     open_count?: number;
     error?: unknown;
+    status?: SectionStatus;
   };
 };
 
@@ -1,20 +1,48 @@
 # management-service/app/__init__.py
 import os
+import tempfile
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 
+from .exports import init_exports
+from .imports import init_imports
+from .json_provider import init_json
 from .models import db
 from .observability import register_observability
+from .order_totals import register_cli
+from .pagination import PaginationError
 from .tenant_guard import inject_current_tenant_from_token
 
 
 def create_app():
     app = Flask(__name__)
+    init_json(app)
     register_observability(app, "management-service")
 
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret")
+    # identidade assinada pelo api-gateway (vazio = derivada do JWT_SECRET_KEY)
+    app.config["INTERNAL_IDENTITY_SECRET"] = os.getenv("INTERNAL_IDENTITY_SECRET", "")
     app.config["ENV"] = os.getenv("APP_ENV", "development")
+    # espera máxima pelo lock da linha da peça numa baixa de estoque (Postgres)
+    app.config["STOCK_LOCK_TIMEOUT_MS"] = int(os.getenv("STOCK_LOCK_TIMEOUT_MS", "2000"))
+    # importações em lote (app/imports.py): uploads vão pro disco, não pra memória
+    app.config["IMPORT_DIR"] = os.getenv(
+        "IMPORT_DIR", os.path.join(tempfile.gettempdir(), "motogestor-imports")
+    )
+    app.config["IMPORT_MAX_BYTES"] = int(os.getenv("IMPORT_MAX_BYTES", str(512 * 1024 * 1024)))
+    app.config["IMPORT_WORKERS"] = int(os.getenv("IMPORT_WORKERS", "1"))
+    app.config["IMPORT_BATCH_SIZE"] = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    # job queued/running sem heartbeat há mais que isso (ou de processo morto) vira failed
+    app.config["IMPORT_STALE_MINUTES"] = int(os.getenv("IMPORT_STALE_MINUTES", "30"))
+    # exportações (app/exports.py): planilhas XLSX geradas em disco e apagadas depois do TTL
+    app.config["EXPORT_DIR"] = os.getenv(
+        "EXPORT_DIR", os.path.join(tempfile.gettempdir(), "motogestor-exports")
+    )
+    app.config["EXPORT_WORKERS"] = int(os.getenv("EXPORT_WORKERS", "1"))
+    app.config["EXPORT_TTL_SECONDS"] = int(os.getenv("EXPORT_TTL_SECONDS", str(24 * 3600)))
+    # job XLSX de processo morto (ou rodando sem heartbeat há mais que isso) vira failed
+    app.config["EXPORT_STALE_MINUTES"] = int(os.getenv("EXPORT_STALE_MINUTES", "30"))
 
     database_url = os.getenv(
         "DATABASE_URL",
@@ -25,20 +53,33 @@ def create_app():
 
     db.init_app(app)
     jwt = JWTManager(app)  # noqa: F841
+    init_imports(app)
+    init_exports(app)
 
     @app.before_request
     def inject_tenant():
         inject_current_tenant_from_token(optional=True)
 
+    @app.errorhandler(PaginationError)
+    def pagination_error(err):
+        return jsonify({"error": str(err)}), 400
+
     from .routes_customers import bp as customers_bp
+    from .routes_exports import bp as exports_bp
+    from .routes_imports import bp as imports_bp
     from .routes_motos import bp as motos_bp
     from .routes_os import bp as os_bp
     from .routes_parts import bp as parts_bp
+    from .routes_search import bp as search_bp
 
     app.register_blueprint(customers_bp, url_prefix="/customers")
     app.register_blueprint(motos_bp, url_prefix="/motos")
     app.register_blueprint(parts_bp, url_prefix="/parts")
     app.register_blueprint(os_bp, url_prefix="/os")
+    app.register_blueprint(search_bp, url_prefix="/search")
+    app.register_blueprint(imports_bp, url_prefix="/imports")
+    app.register_blueprint(exports_bp, url_prefix="/exports")
+    register_cli(app)
 
     @app.route("/health")
     def health():
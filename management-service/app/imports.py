@@ -0,0 +1,517 @@
+"""Streaming CSV/NDJSON imports (customers, motorcycles, parts) as background jobs."""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import bindparam, insert, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .models import Customer, ImportJob, Motorcycle, Part, db
+from .observability import IMPORT_ROWS
+from .tenant_guard import scope_session_tenant
+from .utils import normalize_plate
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "import_runner"
+KINDS = ("customers", "motorcycles", "parts")
+FORMATS = ("csv", "ndjson")
+ACTIVE_STATUSES = ("queued", "running")
+MAX_ERRORS = 500  # erros detalhados guardados no job (o total vai em error_count)
+CHUNK_SIZE = 64 * 1024
+
+# O upload vai pro disco em blocos (nunca inteiro em memória) e um worker do
+# próprio processo lê o arquivo linha a linha. Cada lote de ``batch_size``
+# linhas válidas grava peças e motos com ``INSERT ... ON CONFLICT (tenant_id,
+# sku|plate) WHERE is_active DO UPDATE`` (índice único parcial: vale mesmo com
+# cadastro pela API ao mesmo tempo) e clientes com SELECT ... IN do documento +
+# INSERT/UPDATE em lote, e commita junto com o progresso do job. Lotes já
+# gravados ficam gravados se um lote posterior falhar; linhas inválidas só
+# entram na lista de erros.
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportTooLarge(Exception):
+    pass
+
+
+# ---------- leitura incremental ----------
+
+
+def _csv_dialect(first_line: str) -> str:
+    # planilha brasileira costuma exportar com ";"
+    return ";" if first_line.count(";") > first_line.count(",") else ","
+
+
+def iter_records(fh: IO[bytes], file_format: str) -> Iterator[Tuple[int, object]]:
+    """(número da linha, dict) por registro; registro ilegível vem como ``RowError``."""
+    text_fh = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    try:
+        yield from _records(text_fh, file_format)
+    finally:
+        text_fh.detach()  # quem abriu ``fh`` é quem fecha
+
+
+def _records(text_fh: io.TextIOWrapper, file_format: str) -> Iterator[Tuple[int, object]]:
+    if file_format == "ndjson":
+        for number, line in enumerate(text_fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield number, RowError("JSON inválido")
+                continue
+            if not isinstance(record, dict):
+                yield number, RowError("cada linha deve ser um objeto JSON")
+                continue
+            yield number, record
+        return
+
+    first = text_fh.readline()
+    if not first:
+        return
+    reader = csv.reader(itertools.chain([first], text_fh), delimiter=_csv_dialect(first))
+    header = [name.strip().lower() for name in next(reader)]
+    for number, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        if len(values) > len(header):
+            yield number, RowError("mais colunas que o cabeçalho")
+            continue
+        yield number, dict(zip(header, values))
+
+
+# ---------- validação por tipo ----------
+
+
+def _text(record: dict, field: str, max_length: int) -> Optional[str]:
+    value = record.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if len(value) > max_length:
+        raise RowError(f"{field} passa de {max_length} caracteres")
+    return value or None
+
+
+def _required(record: dict, field: str, max_length: int) -> str:
+    value = _text(record, field, max_length)
+    if not value:
+        raise RowError(f"{field} é obrigatório")
+    return value
+
+
+def _decimal(record: dict, field: str) -> Optional[Decimal]:
+    value = record.get(field)
+    if value in (None, ""):
+        return None
+    raw = str(value).strip()
+    if "," in raw:  # 1.234,56 -> 1234.56
+        raw = raw.replace(".", "").replace(",", ".")
+    try:
+        number = Decimal(raw)
+    except InvalidOperation:
+        raise RowError(f"{field} deve ser numérico") from None
+    if number < 0 or not number.is_finite():
+        raise RowError(f"{field} inválido")
+    return number
+
+
+def _int(record: dict, field: str) -> Optional[int]:
+    number = _decimal(record, field)
+    if number is None:
+        return None
+    if number != number.to_integral_value():
+        raise RowError(f"{field} deve ser inteiro")
+    return int(number)
+
+
+def clean_part(record: dict) -> dict:
+    return {
+        "sku": _required(record, "sku", 50),
+        "name": _required(record, "name", 120),
+        "unit_price": _decimal(record, "unit_price"),
+        "quantity_in_stock": _int(record, "quantity_in_stock"),
+        "min_stock": _int(record, "min_stock"),
+    }
+
+
+def clean_customer(record: dict) -> dict:
+    return {
+        "name": _required(record, "name", 120),
+        "phone": _text(record, "phone", 20),
+        "email": _text(record, "email", 120),
+        "document": _text(record, "document", 30),
+        "notes": _text(record, "notes", 10_000),
+    }
+
+
+def clean_motorcycle(record: dict) -> dict:
+    customer_id = _int(record, "customer_id")
+    customer_document = _text(record, "customer_document", 30)
+    if customer_id is None and not customer_document:
+        raise RowError("customer_id ou customer_document é obrigatório")
+    return {
+        "plate": normalize_plate(_required(record, "plate", 10)),
+        "brand": _text(record, "brand", 80),
+        "model": _text(record, "model", 80),
+        "year": _text(record, "year", 4),
+        "vin": _text(record, "vin", 20),
+        "km_current": _int(record, "km_current"),
+        "customer_id": customer_id,
+        "customer_document": customer_document,
+    }
+
+
+# tipo -> (modelo, coluna da chave de dedup, validação)
+SPECS = {
+    "parts": (Part, "sku", clean_part),
+    "customers": (Customer, "document", clean_customer),
+    "motorcycles": (Motorcycle, "plate", clean_motorcycle),
+}
+
+# estoque inicial só na criação: em peça existente o saldo muda por movimentação
+INSERT_ONLY = {"quantity_in_stock"}
+
+# chave com índice único parcial (tenant_id, chave) WHERE is_active: upsert no banco
+UPSERT_KINDS = {"parts", "motorcycles"}
+
+
+# ---------- gravação em lote ----------
+
+
+def _resolve_customers(tenant_id: int, rows: List[Tuple[int, dict]], errors: list):
+    """Troca ``customer_document``/``customer_id`` por um id válido do tenant."""
+    documents = {r["customer_document"] for _, r in rows if r["customer_id"] is None}
+    ids = {r["customer_id"] for _, r in rows if r["customer_id"] is not None}
+    by_document: Dict[str, int] = {}
+    if documents:
+        by_document = dict(
+            db.session.query(Customer.document, Customer.id).filter(
+                Customer.tenant_id == tenant_id,
+                Customer.is_active.is_(True),
+                Customer.document.in_(documents),
+            )
+        )
+    valid_ids = set()
+    if ids:
+        valid_ids = {
+            cid
+            for (cid,) in db.session.query(Customer.id).filter(
+                Customer.tenant_id == tenant_id,
+                Customer.is_active.is_(True),
+                Customer.id.in_(ids),
+            )
+        }
+
+    resolved = []
+    for number, row in rows:
+        customer_id = row.pop("customer_id")
+        document = row.pop("customer_document")
+        if customer_id is None:
+            customer_id = by_document.get(document)
+        elif customer_id not in valid_ids:
+            customer_id = None
+        if customer_id is None:
+            errors.append((number, "cliente não encontrado"))
+            continue
+        row["customer_id"] = customer_id
+        resolved.append((number, row))
+    return resolved
+
+
+def upsert_batch(
+    tenant_id: int, kind: str, rows: List[Tuple[int, dict]]
+) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """Grava um lote já validado; devolve (inseridos, atualizados, erros)."""
+    model, key, _ = SPECS[kind]
+    errors: List[Tuple[int, str]] = []
+    if kind == "motorcycles":
+        rows = _resolve_customers(tenant_id, rows, errors)
+
+    # mesma chave repetida no lote: vale a última linha
+    keyed: Dict[str, dict] = {}
+    unkeyed: List[dict] = []
+    for _, row in rows:
+        if row.get(key):
+            keyed[row[key]] = row
+        else:
+            unkeyed.append(row)
+
+    column = getattr(model, key)
+    existing: Dict[str, int] = {}
+    if keyed:
+        existing = dict(
+            db.session.query(column, model.id).filter(
+                model.tenant_id == tenant_id,
+                model.is_active.is_(True),
+                column.in_(list(keyed)),
+            )
+        )
+
+    table = model.__table__
+    connection = db.session.connection()
+    if kind in UPSERT_KINDS:
+        # o SELECT acima só conta novos x existentes; quem decide é o ON CONFLICT
+        rows_to_write = [
+            {f: v for f, v in dict(row, tenant_id=tenant_id).items() if v is not None}
+            for row in keyed.values()
+        ]
+        for columns, group in _group_by_columns(rows_to_write):
+            connection.execute(_upsert_statement(connection, table, key, columns), group)
+        inserted = sum(1 for k in keyed if k not in existing)
+        return inserted, len(keyed) - inserted, errors
+
+    new_rows = unkeyed + [row for k, row in keyed.items() if k not in existing]
+    inserts = [
+        {f: v for f, v in dict(row, tenant_id=tenant_id).items() if v is not None}
+        for row in new_rows
+    ]
+    updates = [
+        dict(
+            {f: v for f, v in row.items() if v is not None and f not in INSERT_ONLY},
+            _id=existing[k],
+        )
+        for k, row in keyed.items()
+        if k in existing
+    ]
+
+    # Core executemany (statement compilado uma vez, em cache); o psycopg2
+    # junta as linhas em INSERTs multi-linha (insertmanyvalues). Linhas com
+    # colunas diferentes (campos vazios) vão em grupos separados.
+    for columns, group in _group_by_columns(inserts):
+        connection.execute(insert(table), group)
+    for columns, group in _group_by_columns(updates):
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({c: bindparam(c) for c in columns if c != "_id"})
+        )
+        connection.execute(stmt, group)
+    return len(inserts), len(updates), errors
+
+
+def _upsert_statement(connection, table, key: str, columns):
+    """INSERT ... ON CONFLICT DO UPDATE só das colunas preenchidas (vazio não apaga)."""
+    dialect_insert = sqlite_insert if connection.dialect.name == "sqlite" else pg_insert
+    stmt = dialect_insert(table)
+    values = {
+        c: stmt.excluded[c] for c in columns if c not in ("tenant_id", key, *INSERT_ONLY)
+    }
+    if "updated_at" in table.c:  # onupdate do ORM não roda no DO UPDATE
+        values["updated_at"] = datetime.utcnow()
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.tenant_id, table.c[key]],
+        index_where=text("is_active"),
+        set_=values,
+    )
+
+
+def _group_by_columns(rows: List[dict]):
+    groups: Dict[tuple, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups.items()
+
+
+# ---------- job ----------
+
+
+def job_path(job_id: int) -> str:
+    return os.path.join(current_app.config["IMPORT_DIR"], f"import-{job_id}.upload")
+
+
+def spool_upload(stream, path: str, max_bytes: int) -> int:
+    """Copia o corpo da requisição pro disco em blocos; devolve o tamanho."""
+    written = 0
+    with open(path, "wb") as fh:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise ImportTooLarge()
+            fh.write(chunk)
+    return written
+
+
+def worker_id() -> str:
+    """``host:pid`` do processo que recebeu o upload (e tem o arquivo no disco)."""
+    return f"{socket.gethostname()}:{os.getpid()}"[:80]
+
+
+def _process_alive(worker: Optional[str]) -> bool:
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True  # outro host: daqui só dá pra julgar pelo heartbeat
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fail_stale_imports(tenant_id: int, max_age: timedelta, pending=frozenset()) -> int:
+    """
+    Marca ``failed`` os jobs do tenant que ninguém vai terminar: sem heartbeat
+    há mais de ``max_age`` ou de um processo que já morreu. ``pending`` são os
+    jobs na fila deste processo (esses não estão parados).
+    """
+    now = datetime.utcnow()
+    stale = 0
+    for job in ImportJob.query.filter(
+        ImportJob.tenant_id == tenant_id, ImportJob.status.in_(ACTIVE_STATUSES)
+    ):
+        if job.id in pending:
+            continue
+        last_seen = job.heartbeat_at or job.created_at or now
+        if now - last_seen > max_age or not _process_alive(job.worker):
+            job.status = "failed"
+            job.message = "importação interrompida: o worker parou; envie o arquivo de novo"
+            job.finished_at = now
+            stale += 1
+    if stale:
+        db.session.commit()
+    return stale
+
+
+def run_import(job_id: int, tenant_id: int, batch_size: int) -> ImportJob:
+    # antes de qualquer leitura: com FORCE RLS o job só aparece dentro do tenant
+    scope_session_tenant(tenant_id)
+    job = db.session.get(ImportJob, job_id)
+    job.status = "running"
+    job.started_at = job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    _, _, clean = SPECS[job.kind]
+    errors: list = []
+    batch: List[Tuple[int, dict]] = []
+
+    def flush(fh) -> None:
+        inserted, updated, batch_errors = upsert_batch(tenant_id, job.kind, batch)
+        for number, message in batch_errors:
+            record_error(number, message)
+        job.rows_inserted += inserted
+        job.rows_updated += updated
+        job.bytes_read = fh.tell()
+        job.errors = list(errors)
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()  # lote + progresso na mesma transação
+        IMPORT_ROWS.labels(kind=job.kind, result="inserted").inc(inserted)
+        IMPORT_ROWS.labels(kind=job.kind, result="updated").inc(updated)
+        batch.clear()
+
+    def record_error(number: int, message: str) -> None:
+        job.error_count += 1
+        IMPORT_ROWS.labels(kind=job.kind, result="error").inc()
+        if len(errors) < MAX_ERRORS:
+            errors.append({"row": number, "error": message})
+
+    with open(job_path(job.id), "rb") as fh:
+        for number, record in iter_records(fh, job.file_format):
+            job.rows_processed += 1
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                batch.append((number, clean(record)))
+            except RowError as err:
+                record_error(number, str(err))
+            if len(batch) >= batch_size:
+                flush(fh)
+        flush(fh)
+
+    job.status = "done"
+    job.bytes_read = job.bytes_total
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+class ImportRunner:
+    """Pool de threads do processo que executa os jobs de importação."""
+
+    def __init__(
+        self, app: Flask, workers: int, batch_size: int, stale_after: timedelta
+    ) -> None:
+        self.app = app
+        self.batch_size = batch_size
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="import")
+        self._pending: set = set()
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: int, tenant_id: int):
+        with self._lock:
+            self._pending.add(job_id)
+        return self._executor.submit(self._run, job_id, tenant_id)
+
+    def pending(self) -> frozenset:
+        """Jobs deste processo na fila ou rodando."""
+        with self._lock:
+            return frozenset(self._pending)
+
+    def fail_stale(self, tenant_id: int) -> int:
+        return fail_stale_imports(tenant_id, self.stale_after, self.pending())
+
+    def _run(self, job_id: int, tenant_id: int) -> None:
+        with self.app.app_context():
+            try:
+                run_import(job_id, tenant_id, self.batch_size)
+            except Exception as exc:  # noqa: BLE001 - o job precisa terminar como failed
+                logger.exception("import %s falhou", job_id)
+                db.session.rollback()
+                # a sessão continua presa ao tenant: a transação nova também enxerga o job
+                job = db.session.get(ImportJob, job_id)
+                if job is not None:
+                    job.status = "failed"
+                    job.message = str(exc)[:255]
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._pending.discard(job_id)
+                try:
+                    os.remove(job_path(job_id))
+                except OSError:
+                    pass
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def init_imports(app: Flask) -> ImportRunner:
+    os.makedirs(app.config["IMPORT_DIR"], exist_ok=True)
+    runner = ImportRunner(
+        app,
+        app.config.get("IMPORT_WORKERS", 1),
+        app.config.get("IMPORT_BATCH_SIZE", 1000),
+        timedelta(minutes=app.config.get("IMPORT_STALE_MINUTES", 30)),
+    )
+    app.extensions[EXTENSION_KEY] = runner
+    return runner
+
+
+def get_import_runner() -> ImportRunner:
+    return current_app.extensions[EXTENSION_KEY]
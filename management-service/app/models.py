@@ -1,6 +1,5 @@
 # management-service/app/models.py
 from datetime import datetime
-from decimal import Decimal
 
 from flask_sqlalchemy import SQLAlchemy
 
@@ -26,6 +25,17 @@ class Customer(db.Model):
 
 class Motorcycle(db.Model):
     __tablename__ = "motorcycles"
+    # placa ativa única por tenant: a importação faz upsert (ON CONFLICT) nessa chave
+    __table_args__ = (
+        db.Index(
+            "ix_motorcycles_tenant_plate_active",
+            "tenant_id",
+            "plate",
+            unique=True,
+            postgresql_where=db.text("is_active"),
+            sqlite_where=db.text("is_active"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tenant_id = db.Column(db.Integer, nullable=False, index=True)
@@ -43,6 +53,17 @@ class Motorcycle(db.Model):
 
 class Part(db.Model):
     __tablename__ = "parts"
+    # SKU ativo único por tenant: a importação faz upsert (ON CONFLICT) nessa chave
+    __table_args__ = (
+        db.Index(
+            "ix_parts_tenant_sku_active",
+            "tenant_id",
+            "sku",
+            unique=True,
+            postgresql_where=db.text("is_active"),
+            sqlite_where=db.text("is_active"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tenant_id = db.Column(db.Integer, nullable=False, index=True)
@@ -118,16 +139,62 @@ class StockMovement(db.Model):
     part = db.relationship("Part", backref="movements")
 
 
-def recalc_order_totals(order: ServiceOrder):
-    """Recalculate numeric totals for a ServiceOrder from its items."""
-    tp = Decimal("0")
-    tl = Decimal("0")
-    for i in getattr(order, "items", []):
-        val = i.total or Decimal("0")
-        if getattr(i, "item_type", "") == "part":
-            tp += val
-        else:
-            tl += val
-    order.total_parts = tp
-    order.total_labor = tl
-    order.total_amount = tp + tl
+class StockReservation(db.Model):
+    """
+    Estoque segurado por um item de peça enquanto a OS está aberta.
+
+    ``held``: já saiu de ``quantity_in_stock``; ``consumed``: OS concluída;
+    ``released``: devolvido ao estoque (OS cancelada ou item removido).
+    """
+
+    __tablename__ = "stock_reservations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False, index=True)
+    part_id = db.Column(db.Integer, db.ForeignKey("parts.id"), nullable=False)
+    service_order_id = db.Column(
+        db.Integer, db.ForeignKey("service_orders.id"), nullable=False, index=True
+    )
+    service_item_id = db.Column(db.Integer, db.ForeignKey("service_items.id"))
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default="held")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    closed_at = db.Column(db.DateTime)
+
+
+
+class ImportJob(db.Model):
+    """Importação em lote (CSV/NDJSON) rodando em segundo plano; ver ``app/imports.py``."""
+
+    __tablename__ = "import_jobs"
+    # um job em andamento por tenant (o segundo POST concorrente bate aqui)
+    __table_args__ = (
+        db.Index(
+            "ix_import_jobs_tenant_active",
+            "tenant_id",
+            unique=True,
+            postgresql_where=db.text("status IN ('queued', 'running')"),
+            sqlite_where=db.text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # customers | motorcycles | parts
+    file_format = db.Column(db.String(10), nullable=False)  # csv | ndjson
+    status = db.Column(
+        db.String(10), nullable=False, default="queued"
+    )  # queued, running, done, failed
+    bytes_total = db.Column(db.BigInteger, default=0)
+    bytes_read = db.Column(db.BigInteger, default=0)
+    rows_processed = db.Column(db.Integer, default=0)
+    rows_inserted = db.Column(db.Integer, default=0)
+    rows_updated = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    errors = db.Column(db.JSON)  # [{"row": n, "error": "..."}], no máximo as primeiras N
+    message = db.Column(db.String(255))
+    worker = db.Column(db.String(80))  # host:pid do processo com o upload
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # a cada lote gravado
+    finished_at = db.Column(db.DateTime)
@@ -46,6 +46,27 @@ OS_CREATED_COUNTER = Counter(
     "os_created_total", "Service Orders created per tenant", ["tenant_id"]
 )
 
+# app/stock.py: baixas recusadas (sem saldo / lock do Postgres estourou)
+STOCK_REJECTIONS = Counter(
+    "management_stock_rejections_total",
+    "Stock takes rejected by the atomic stock engine",
+    ["reason"],
+)
+
+# app/imports.py: linhas por resultado (inserted | updated | error)
+IMPORT_ROWS = Counter(
+    "management_import_rows_total",
+    "Rows processed by background catalog imports",
+    ["kind", "result"],
+)
+
+# app/exports.py: linhas exportadas por tipo e formato (csv | ndjson | xlsx)
+EXPORT_ROWS = Counter(
+    "management_export_rows_total",
+    "Rows written by streaming and XLSX exports",
+    ["kind", "format"],
+)
+
 _APP_INFO_REGISTERED = False
 
 
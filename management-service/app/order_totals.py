@@ -0,0 +1,190 @@
+"""Service-order totals: per-item deltas, SQL recompute and bulk verify/repair."""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional
+
+import click
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import ServiceItem, ServiceOrder, db
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
+
+# Os totais da OS não relêem ``order.items``: cada inclusão/edição/remoção
+# soma só a diferença do item num ``UPDATE ... SET total_x = total_x + :d``
+# (atômico, vale com dois mecânicos editando a mesma OS). ``verify-order-totals``
+# confere tudo contra ``SUM(...) GROUP BY``; o reparo trava as OS divergentes e
+# recalcula no próprio UPDATE, sem gravar valores lidos antes.
+
+
+def money(value) -> Decimal:
+    """Valor como a coluna ``Numeric(10, 2)`` grava (centavos, meio pra cima)."""
+    if value is None:
+        return ZERO
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def apply_item_delta(order: ServiceOrder, item_type: str, delta) -> None:
+    """Soma ``delta`` em ``total_parts``/``total_labor`` e ``total_amount``."""
+    if item_type == "part":
+        apply_totals_delta(order, parts=delta)
+    else:
+        apply_totals_delta(order, labor=delta)
+
+
+def apply_totals_delta(order: ServiceOrder, parts=ZERO, labor=ZERO) -> None:
+    """Um UPDATE com as diferenças de peças e mão de obra (ex.: um lote de itens)."""
+    parts, labor = money(parts), money(labor)
+    if not parts and not labor:
+        return
+    stmt = (
+        update(ServiceOrder)
+        .where(ServiceOrder.id == order.id)
+        .values(
+            total_parts=func.coalesce(ServiceOrder.total_parts, 0) + parts,
+            total_labor=func.coalesce(ServiceOrder.total_labor, 0) + labor,
+            total_amount=func.coalesce(ServiceOrder.total_amount, 0) + parts + labor,
+        )
+        .returning(
+            ServiceOrder.total_parts, ServiceOrder.total_labor, ServiceOrder.total_amount
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = db.session.execute(stmt).one()
+    set_committed_value(order, "total_parts", row[0])
+    set_committed_value(order, "total_labor", row[1])
+    set_committed_value(order, "total_amount", row[2])
+
+
+def _sums_query(tenant_id: Optional[int] = None):
+    """OS com os totais gravados e os somados dos itens (um GROUP BY)."""
+    part_sum = func.coalesce(
+        func.sum(case((ServiceItem.item_type == "part", ServiceItem.total), else_=0)), 0
+    )
+    labor_sum = func.coalesce(
+        func.sum(case((ServiceItem.item_type == "part", 0), else_=ServiceItem.total)), 0
+    )
+    query = (
+        db.session.query(
+            ServiceOrder.id,
+            ServiceOrder.total_parts,
+            ServiceOrder.total_labor,
+            ServiceOrder.total_amount,
+            part_sum.label("parts"),
+            labor_sum.label("labor"),
+        )
+        .outerjoin(ServiceItem, ServiceItem.service_order_id == ServiceOrder.id)
+        .group_by(ServiceOrder.id)
+    )
+    if tenant_id is not None:
+        query = query.filter(ServiceOrder.tenant_id == tenant_id)
+    return query
+
+
+def recalc_order_totals(order: ServiceOrder) -> None:
+    """Recalcula os totais de uma OS direto no banco (sem carregar os itens)."""
+    db.session.flush()
+    _, _, _, _, parts, labor = _sums_query().filter(ServiceOrder.id == order.id).one()
+    order.total_parts = money(parts)
+    order.total_labor = money(labor)
+    order.total_amount = order.total_parts + order.total_labor
+
+
+def verify_order_totals(
+    tenant_id: Optional[int] = None, repair: bool = False, batch_size: int = 1000
+) -> List[Dict]:
+    """
+    Confere os totais gravados de todas as OS (ou de um tenant) contra a soma
+    dos itens; devolve as divergências e, com ``repair``, as OS corrigidas.
+    """
+    mismatches: List[Dict] = []
+    for order_id, stored_parts, stored_labor, stored_amount, parts, labor in (
+        _sums_query(tenant_id).order_by(ServiceOrder.id).yield_per(batch_size)
+    ):
+        parts, labor = money(parts), money(labor)
+        if (money(stored_parts), money(stored_labor), money(stored_amount)) != (
+            parts,
+            labor,
+            parts + labor,
+        ):
+            mismatches.append(
+                {
+                    "id": order_id,
+                    "total_parts": parts,
+                    "total_labor": labor,
+                    "total_amount": parts + labor,
+                }
+            )
+
+    if not repair or not mismatches:
+        return mismatches
+    repaired: List[Dict] = []
+    ids = [row["id"] for row in mismatches]
+    for start in range(0, len(ids), batch_size):
+        repaired.extend(_repair_totals(ids[start : start + batch_size]))
+        db.session.commit()
+    return sorted(repaired, key=lambda row: row["id"])
+
+
+def _repair_totals(order_ids: List[int]) -> List[Dict]:
+    """
+    Grava a soma dos itens nas OS dadas, num ``UPDATE ... FROM (SELECT ...
+    GROUP BY)``. As OS ficam travadas (``FOR UPDATE``) antes da soma: um delta
+    concorrente ou já commitou (e entra na soma) ou espera o reparo e soma
+    por cima. Só muda o que ainda diverge.
+    """
+    db.session.execute(
+        select(ServiceOrder.id)
+        .where(ServiceOrder.id.in_(order_ids))
+        .order_by(ServiceOrder.id)
+        .with_for_update()
+    ).all()
+    sums = _sums_query().filter(ServiceOrder.id.in_(order_ids)).subquery()
+    parts = func.round(sums.c.parts, 2)
+    labor = func.round(sums.c.labor, 2)
+    stmt = (
+        update(ServiceOrder)
+        .where(ServiceOrder.id == sums.c.id)
+        .where(
+            ServiceOrder.total_parts.is_distinct_from(parts)
+            | ServiceOrder.total_labor.is_distinct_from(labor)
+            | ServiceOrder.total_amount.is_distinct_from(parts + labor)
+        )
+        .values(total_parts=parts, total_labor=labor, total_amount=parts + labor)
+        .returning(
+            ServiceOrder.id,
+            ServiceOrder.total_parts,
+            ServiceOrder.total_labor,
+            ServiceOrder.total_amount,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return [
+        {
+            "id": order_id,
+            "total_parts": money(total_parts),
+            "total_labor": money(total_labor),
+            "total_amount": money(total_amount),
+        }
+        for order_id, total_parts, total_labor, total_amount in db.session.execute(stmt)
+    ]
+
+
+def register_cli(app) -> None:
+    @app.cli.command("verify-order-totals")
+    @click.option("--tenant-id", type=int, default=None, help="só esse tenant")
+    @click.option("--repair", is_flag=True, help="grava os totais recalculados")
+    def verify_order_totals_command(tenant_id, repair):
+        """Confere (e opcionalmente corrige) os totais das OS contra os itens."""
+        mismatches = verify_order_totals(tenant_id, repair=repair)
+        for row in mismatches[:20]:
+            click.echo(
+                f"OS #{row['id']}: peças {row['total_parts']}, "
+                f"mão de obra {row['total_labor']}, total {row['total_amount']}"
+            )
+        action = "corrigidas" if repair else "divergentes"
+        click.echo(f"service_orders: {len(mismatches)} {action}")
@@ -0,0 +1,30 @@
+"""Read-side query builders for service orders (relationships loaded up front)."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from .models import Customer, Motorcycle, ServiceOrder, db
+
+
+def service_order_list_query(tenant_id):
+    """
+    Listagem de OS: cliente e moto vêm no mesmo SELECT (JOIN), só com as
+    colunas usadas na serialização. Sem isso cada linha dispara 2 SELECTs.
+    """
+    return ServiceOrder.query.filter_by(tenant_id=tenant_id).options(
+        joinedload(ServiceOrder.customer).options(load_only(Customer.name)),
+        joinedload(ServiceOrder.motorcycle).options(load_only(Motorcycle.plate)),
+    )
+
+
+def get_service_order_with_items(order_id: int, tenant_id) -> Optional[ServiceOrder]:
+    """OS + itens em 2 queries fixas (itens via selectin), ou None se não for do tenant."""
+    order = db.session.get(
+        ServiceOrder, order_id, options=[selectinload(ServiceOrder.items)]
+    )
+    if not order or order.tenant_id != tenant_id:
+        return None
+    return order
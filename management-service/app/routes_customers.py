@@ -1,27 +1,28 @@
 # management-service/app/routes_customers.py
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
 
 from .models import Customer, db
+from .pagination import page_response, paginate
+from .search import normalize_query, text_match
 from .utils import get_current_tenant_id, is_manager_or_owner
+from .tenant_guard import identity_required
 
 bp = Blueprint("customers", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_customers():
     tenant_id = get_current_tenant_id()
-    q = request.args.get("q")
+    q = normalize_query(request.args.get("q"))
 
     query = Customer.query.filter_by(tenant_id=tenant_id, is_active=True)
     if q:
-        like = f"%{q}%"
-        query = query.filter(Customer.name.ilike(like))
+        query = query.filter(text_match(q, Customer.name))
 
-    customers = query.order_by(Customer.created_at.desc()).all()
+    page = paginate(query, Customer, Customer.created_at, descending=True)
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": c.id,
@@ -31,13 +32,14 @@ def list_customers():
                 "document": c.document,
                 "notes": c.notes,
             }
-            for c in customers
-        ]
+            for c in page.items
+        ],
+        page,
     )
 
 
 @bp.get("/<int:customer_id>")
-@jwt_required()
+@identity_required()
 def get_customer(customer_id):
     tenant_id = get_current_tenant_id()
     customer = db.session.get(Customer, customer_id)
@@ -57,7 +59,7 @@ def get_customer(customer_id):
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_customer():
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
@@ -81,7 +83,7 @@ def create_customer():
 
 
 @bp.patch("/<int:customer_id>")
-@jwt_required()
+@identity_required()
 def update_customer(customer_id):
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
@@ -102,7 +104,7 @@ def update_customer(customer_id):
 
 
 @bp.delete("/<int:customer_id>")
-@jwt_required()
+@identity_required()
 def delete_customer(customer_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
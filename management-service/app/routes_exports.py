@@ -0,0 +1,153 @@
+# management-service/app/routes_exports.py
+from flask import Blueprint, abort, jsonify, request, send_file, url_for
+
+from .exports import (FORMATS, XLSX_MIMETYPE, Column, ExportError, ExportSpec, Filter,
+                      export_path, get_export_runner, load_job, parse_filters, stream_export)
+from .models import Customer, Motorcycle, Part, ServiceOrder, StockMovement
+from .tenant_guard import identity_required
+from .utils import get_current_tenant_id, is_manager_or_owner
+
+bp = Blueprint("exports", __name__)
+
+
+def _columns(model, *names):
+    return [Column(name, getattr(model, name)) for name in names]
+
+
+# mesmas colunas das listagens (GET /os/, GET /parts/<id>/movements)
+EXPORTS = {
+    "os": ExportSpec(
+        model=ServiceOrder,
+        columns=[
+            *_columns(ServiceOrder, "id", "status"),
+            Column("customer", Customer.name),
+            *_columns(ServiceOrder, "customer_id", "motorcycle_id"),
+            Column("motorcycle_plate", Motorcycle.plate),
+            *_columns(
+                ServiceOrder,
+                "description",
+                "total_parts",
+                "total_labor",
+                "total_amount",
+                "created_at",
+                "scheduled_date",
+                "closed_at",
+            ),
+        ],
+        joins=[
+            (Customer, Customer.id == ServiceOrder.customer_id),
+            (Motorcycle, Motorcycle.id == ServiceOrder.motorcycle_id),
+        ],
+        date_column=ServiceOrder.created_at,
+        filters={
+            "status": Filter(ServiceOrder.status),
+            "customer_id": Filter(ServiceOrder.customer_id, int),
+        },
+    ),
+    "movements": ExportSpec(
+        model=StockMovement,
+        columns=[
+            *_columns(StockMovement, "id", "part_id"),
+            Column("sku", Part.sku),
+            Column("part_name", Part.name),
+            *_columns(
+                StockMovement,
+                "movement_type",
+                "quantity",
+                "reason",
+                "related_order_id",
+                "created_at",
+            ),
+        ],
+        joins=[(Part, Part.id == StockMovement.part_id)],
+        date_column=StockMovement.created_at,
+        filters={
+            "movement_type": Filter(StockMovement.movement_type),
+            "part_id": Filter(StockMovement.part_id, int),
+        },
+    ),
+}
+
+
+def _serialize_job(job: dict) -> dict:
+    return {key: value for key, value in job.items() if key != "tenant_id"}
+
+
+def _spec(kind: str) -> ExportSpec:
+    spec = EXPORTS.get(kind)
+    if spec is None:
+        abort(404)
+    return spec
+
+
+@bp.get("/<kind>")
+@identity_required()
+def stream(kind):
+    """
+    Exporta tudo do tenant em streaming (``?format=csv|ndjson``), em ordem
+    de id. Se a conexão cair, ``?after=<último id recebido>`` continua dali.
+    """
+    if not is_manager_or_owner():
+        return jsonify({"error": "permissão negada"}), 403
+    spec = _spec(kind)
+
+    file_format = request.args.get("format", "csv")
+    if file_format not in FORMATS:
+        return jsonify({"error": "format deve ser 'csv' ou 'ndjson'"}), 400
+    try:
+        filters = parse_filters(spec, request.args)
+    except ExportError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return stream_export(kind, spec, get_current_tenant_id(), file_format, filters)
+
+
+@bp.post("/<kind>/xlsx")
+@identity_required()
+def create_xlsx(kind):
+    """Gera a planilha em background (mesmos filtros do streaming); 202 com o job."""
+    if not is_manager_or_owner():
+        return jsonify({"error": "permissão negada"}), 403
+    spec = _spec(kind)
+    try:
+        parse_filters(spec, request.args)
+    except ExportError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    names = ("after", "from", "to", *spec.filters)
+    filters = {name: request.args[name] for name in names if request.args.get(name)}
+    job = get_export_runner().submit(kind, spec, get_current_tenant_id(), filters)
+
+    response = jsonify(_serialize_job(job))
+    response.status_code = 202
+    response.headers["Location"] = url_for("exports.get_export_job", job_id=job["id"])
+    return response
+
+
+def _tenant_job(job_id: str) -> dict:
+    job = load_job(job_id)
+    if job is None or job["tenant_id"] != get_current_tenant_id():
+        abort(404)
+    return get_export_runner().fail_stale(job)
+
+
+@bp.get("/jobs/<job_id>")
+@identity_required()
+def get_export_job(job_id):
+    return jsonify(_serialize_job(_tenant_job(job_id)))
+
+
+@bp.get("/jobs/<job_id>/download")
+@identity_required()
+def download_export(job_id):
+    """Arquivo pronto, com ETag e Range (download retomável)."""
+    job = _tenant_job(job_id)
+    if job["status"] != "done":
+        return jsonify({"error": "exportação ainda não terminou", "status": job["status"]}), 409
+    return send_file(
+        export_path(job_id),
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=f"{job['kind']}.xlsx",
+        conditional=True,
+        max_age=0,
+    )
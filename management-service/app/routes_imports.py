@@ -0,0 +1,139 @@
+# management-service/app/routes_imports.py
+import os
+
+from flask import Blueprint, abort, current_app, jsonify, request, url_for
+from sqlalchemy.exc import IntegrityError
+
+from .imports import (ACTIVE_STATUSES, FORMATS, KINDS, ImportTooLarge, get_import_runner,
+                      job_path, spool_upload, worker_id)
+from .models import ImportJob, db
+from .pagination import page_response, paginate
+from .tenant_guard import identity_required
+from .utils import get_current_tenant_id, is_manager_or_owner
+
+bp = Blueprint("imports", __name__)
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _serialize_job(job: ImportJob) -> dict:
+    progress = 1.0 if job.status == "done" else 0.0
+    if job.status != "done" and job.bytes_total:
+        progress = round(min(job.bytes_read or 0, job.bytes_total) / job.bytes_total, 4)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "format": job.file_format,
+        "status": job.status,
+        "progress": progress,
+        "rows_processed": job.rows_processed or 0,
+        "rows_inserted": job.rows_inserted or 0,
+        "rows_updated": job.rows_updated or 0,
+        "error_count": job.error_count or 0,
+        "errors": job.errors or [],
+        "message": job.message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _active_job(tenant_id: int):
+    return ImportJob.query.filter(
+        ImportJob.tenant_id == tenant_id, ImportJob.status.in_(ACTIVE_STATUSES)
+    ).first()
+
+
+@bp.post("/<kind>")
+@identity_required()
+def create_import(kind):
+    """
+    Corpo = o arquivo (CSV com cabeçalho ou NDJSON), sem multipart: o
+    serviço grava em disco em blocos e responde 202 com o job pra consultar.
+    """
+    if not is_manager_or_owner():
+        return jsonify({"error": "permissão negada"}), 403
+    if kind not in KINDS:
+        abort(404)
+
+    tenant_id = get_current_tenant_id()
+    file_format = request.args.get("format") or CONTENT_TYPES.get(request.mimetype)
+    if file_format not in FORMATS:
+        return jsonify({"error": "format deve ser 'csv' ou 'ndjson'"}), 400
+
+    # um import por tenant de cada vez (índice único ix_import_jobs_tenant_active
+    # segura dois POSTs simultâneos); job de worker que caiu não segura o tenant
+    runner = get_import_runner()
+    runner.fail_stale(tenant_id)
+    busy = _active_job(tenant_id)
+    if busy:
+        return jsonify({"error": "já existe uma importação em andamento", "id": busy.id}), 409
+
+    job = ImportJob(
+        tenant_id=tenant_id,
+        kind=kind,
+        file_format=file_format,
+        status="queued",
+        worker=worker_id(),
+    )
+    db.session.add(job)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        busy = _active_job(tenant_id)
+        return (
+            jsonify(
+                {"error": "já existe uma importação em andamento", "id": busy and busy.id}
+            ),
+            409,
+        )
+
+    path = job_path(job.id)
+    try:
+        job.bytes_total = spool_upload(
+            request.stream, path, current_app.config["IMPORT_MAX_BYTES"]
+        )
+    except ImportTooLarge:
+        db.session.rollback()
+        os.remove(path)
+        return jsonify({"error": "arquivo grande demais"}), 413
+    db.session.commit()
+
+    runner.submit(job.id, tenant_id)
+
+    response = jsonify(_serialize_job(job))
+    response.status_code = 202
+    response.headers["Location"] = url_for("imports.get_import", job_id=job.id)
+    return response
+
+
+@bp.get("/")
+@identity_required()
+def list_imports():
+    tenant_id = get_current_tenant_id()
+    page = paginate(
+        ImportJob.query.filter_by(tenant_id=tenant_id),
+        ImportJob,
+        ImportJob.created_at,
+        descending=True,
+    )
+    return page_response([_serialize_job(j) for j in page.items], page)
+
+
+@bp.get("/<int:job_id>")
+@identity_required()
+def get_import(job_id):
+    tenant_id = get_current_tenant_id()
+    job = db.session.get(ImportJob, job_id)
+    if not job or job.tenant_id != tenant_id:
+        abort(404)
+    if job.status in ACTIVE_STATUSES:
+        get_import_runner().fail_stale(tenant_id)
+    return jsonify(_serialize_job(job))
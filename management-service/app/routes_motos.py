@@ -1,30 +1,33 @@
 # management-service/app/routes_motos.py
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 
 from .models import Customer, Motorcycle, db
-from .utils import get_current_tenant_id
+from .pagination import page_response, paginate
+from .search import normalize_query, text_match
+from .utils import get_current_tenant_id, normalize_plate
+from .tenant_guard import identity_required
 
 bp = Blueprint("motos", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_motos():
     tenant_id = get_current_tenant_id()
     customer_id = request.args.get("customer_id")
-    plate = request.args.get("plate")
+    plate = normalize_plate(normalize_query(request.args.get("plate")))
 
     query = Motorcycle.query.filter_by(tenant_id=tenant_id, is_active=True)
 
     if customer_id:
         query = query.filter_by(customer_id=customer_id)
     if plate:
-        query = query.filter(Motorcycle.plate.ilike(f"%{plate}%"))
+        query = query.filter(text_match(plate, Motorcycle.plate))
 
-    motos = query.all()
+    page = paginate(query, Motorcycle)
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": m.id,
@@ -35,13 +38,14 @@ def list_motos():
                 "year": m.year,
                 "km_current": m.km_current,
             }
-            for m in motos
-        ]
+            for m in page.items
+        ],
+        page,
     )
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_moto():
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
@@ -61,18 +65,22 @@ def create_moto():
         customer_id=customer_id,
         brand=data.get("brand"),
         model=data.get("model"),
-        plate=data.get("plate"),
+        plate=normalize_plate(data.get("plate")),
         year=data.get("year"),
         km_current=data.get("km_current") or 0,
     )
     db.session.add(moto)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:  # ix_motorcycles_tenant_plate_active
+        db.session.rollback()
+        return jsonify({"error": "já existe uma moto ativa com essa placa"}), 409
 
     return jsonify({"id": moto.id, "plate": moto.plate}), 201
 
 
 @bp.patch("/<int:moto_id>")
-@jwt_required()
+@identity_required()
 def update_moto(moto_id):
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
@@ -83,18 +91,24 @@ def update_moto(moto_id):
 
     moto.brand = data.get("brand", moto.brand)
     moto.model = data.get("model", moto.model)
-    moto.plate = data.get("plate", moto.plate)
+    if "plate" in data:
+        # mesma forma da importação: a dedup por placa compara igualdade
+        moto.plate = normalize_plate(data["plate"])
     moto.year = data.get("year", moto.year)
     if "km_current" in data:
         moto.km_current = data["km_current"]
 
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:  # ix_motorcycles_tenant_plate_active
+        db.session.rollback()
+        return jsonify({"error": "já existe uma moto ativa com essa placa"}), 409
 
     return jsonify({"message": "moto atualizada"})
 
 
 @bp.delete("/<int:moto_id>")
-@jwt_required()
+@identity_required()
 def delete_moto(moto_id):
     tenant_id = get_current_tenant_id()
 
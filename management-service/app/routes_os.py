@@ -1,35 +1,44 @@
 # management-service/app/routes_os.py
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from typing import Optional
 
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 
-from .models import (Customer, Motorcycle, Part, ServiceItem, ServiceOrder,
-                     StockMovement, db, recalc_order_totals)
+from . import stock
+from .models import Customer, Motorcycle, Part, ServiceItem, ServiceOrder, db
 from .observability import OS_CREATED_COUNTER
+from .order_totals import apply_item_delta, apply_totals_delta, money
+from .pagination import page_response, paginate
+from .queries import get_service_order_with_items, service_order_list_query
 from .utils import get_current_tenant_id, is_manager_or_owner
-from .tenant_guard import tenant_guard
+from .tenant_guard import identity_required, tenant_guard
 
 bp = Blueprint("os", __name__)
 
+OPEN_STATUSES = ("OPEN", "IN_PROGRESS", "WAITING_PARTS")
+# limite de linhas por POST /os/<id>/items:batch
+MAX_BATCH_ITEMS = 200
+
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_os():
     tenant_id = get_current_tenant_id()
     status = request.args.get("status")
     customer_id = request.args.get("customer_id")
 
-    query = ServiceOrder.query.filter_by(tenant_id=tenant_id)
+    query = service_order_list_query(tenant_id)
 
     if status:
         query = query.filter_by(status=status)
     if customer_id:
         query = query.filter_by(customer_id=customer_id)
 
-    orders = query.order_by(ServiceOrder.created_at.desc()).all()
+    page = paginate(query, ServiceOrder, ServiceOrder.created_at, descending=True)
 
+    # Decimal/datas vão direto: o JSON provider (app/json_provider.py) converte
     def _serialize_order(o: ServiceOrder):
         return {
             "id": o.id,
@@ -39,25 +48,47 @@ def list_os():
             "motorcycle_id": o.motorcycle_id,
             "motorcycle_plate": o.motorcycle.plate if o.motorcycle else None,
             "description": o.description,
-            "total_parts": float(o.total_parts or 0),
-            "total_labor": float(o.total_labor or 0),
-            "total_amount": float(o.total_amount or 0),
-            "created_at": o.created_at.isoformat(),
-            "scheduled_date": (
-                o.scheduled_date.isoformat() if o.scheduled_date else None
-            ),
-            "closed_at": o.closed_at.isoformat() if o.closed_at else None,
+            "total_parts": o.total_parts or 0,
+            "total_labor": o.total_labor or 0,
+            "total_amount": o.total_amount or 0,
+            "created_at": o.created_at,
+            "scheduled_date": o.scheduled_date,
+            "closed_at": o.closed_at,
         }
 
-    return jsonify([_serialize_order(o) for o in orders])
+    return page_response([_serialize_order(o) for o in page.items], page)
+
+
+@bp.get("/stats")
+@identity_required()
+def os_stats():
+    """Contagem de OS por status, agregada no banco (sem baixar a lista)."""
+    tenant_id = get_current_tenant_id()
+
+    rows = (
+        db.session.query(ServiceOrder.status, func.count(ServiceOrder.id))
+        .filter(ServiceOrder.tenant_id == tenant_id)
+        .group_by(ServiceOrder.status)
+        .all()
+    )
+    by_status = {status: count for status, count in rows}
+
+    return jsonify(
+        {
+            "total": sum(by_status.values()),
+            "open": sum(by_status.get(s, 0) for s in OPEN_STATUSES),
+            "completed": by_status.get("COMPLETED", 0),
+            "by_status": by_status,
+        }
+    )
 
 
 @bp.get("/<int:order_id>")
-@jwt_required()
+@identity_required()
 def get_os(order_id):
     tenant_id = get_current_tenant_id()
-    order = db.session.get(ServiceOrder, order_id)
-    if not order or order.tenant_id != tenant_id:
+    order = get_service_order_with_items(order_id, tenant_id)
+    if not order:
         abort(404)
 
     items = [
@@ -89,7 +120,7 @@ def get_os(order_id):
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 @tenant_guard(body_keys=("tenant_id",))
 def create_os():
     tenant_id = get_current_tenant_id()
@@ -132,7 +163,7 @@ def create_os():
 
 
 @bp.patch("/<int:order_id>")
-@jwt_required()
+@identity_required()
 @tenant_guard(path_key="tenant_id", body_keys=("tenant_id",))
 def update_os(order_id):
     tenant_id = get_current_tenant_id()
@@ -154,7 +185,7 @@ def update_os(order_id):
 
 
 @bp.patch("/<int:order_id>/status")
-@jwt_required()
+@identity_required()
 @tenant_guard(path_key="tenant_id", body_keys=("tenant_id",))
 def update_os_status(order_id):
     if not is_manager_or_owner():
@@ -177,6 +208,13 @@ def update_os_status(order_id):
     if not order or order.tenant_id != tenant_id:
         abort(404)
 
+    # cancelar devolve as peças reservadas; concluir dá baixa definitiva
+    try:
+        stock.apply_status(order, order.status, new_status)
+    except stock.StockError as err:
+        db.session.rollback()
+        return jsonify({"error": str(err)}), err.status_code
+
     order.status = new_status
     if new_status == "COMPLETED":
         order.closed_at = datetime.utcnow()
@@ -186,93 +224,218 @@ def update_os_status(order_id):
     return jsonify({"message": "status atualizado"})
 
 
+class ItemError(ValueError):
+    pass
+
+
+def _decimal(value, field: str) -> Decimal:
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ItemError(f"{field} deve ser numérico") from None
+    if not number.is_finite():
+        raise ItemError(f"{field} deve ser numérico")
+    return number
+
+
+def _parse_quantity(value, item_type: str) -> Decimal:
+    """Quantidade positiva; peça sai do estoque em unidades inteiras."""
+    quantity = _decimal(value, "quantity")
+    if quantity <= 0:
+        raise ItemError("quantity deve ser maior que zero")
+    if item_type == "part" and quantity != quantity.to_integral_value():
+        raise ItemError("quantity de peça deve ser inteira")
+    return quantity
+
+
+def _parse_part_id(value) -> int:
+    """Id positivo; aceita ``"12"`` (formulário), recusa lista/objeto/float."""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ItemError("part_id deve ser um id de peça")
+    return value
+
+
+def _parse_item(data: dict) -> dict:
+    """Valida uma linha de item (sem tocar no banco)."""
+    item_type = data.get("item_type")  # part | labor
+    if item_type not in ("part", "labor"):
+        raise ItemError("item_type deve ser 'part' ou 'labor'")
+    quantity = _parse_quantity(data.get("quantity", 1), item_type)
+    unit_price = _decimal(data.get("unit_price", 0), "unit_price")
+    part_id = None
+    if item_type == "part":
+        if data.get("part_id") in (None, ""):
+            raise ItemError("part_id é obrigatório para itens de peça")
+        part_id = _parse_part_id(data["part_id"])
+    return {
+        "item_type": item_type,
+        "description": data.get("description", ""),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "part_id": part_id,
+    }
+
+
+def _build_item(order: ServiceOrder, line: dict, part: Optional[Part]) -> ServiceItem:
+    return ServiceItem(
+        tenant_id=order.tenant_id,
+        service_order_id=order.id,
+        item_type=line["item_type"],
+        part_id=part.id if part else None,
+        description=line["description"] or (part.name if part else ""),
+        quantity=line["quantity"],
+        unit_price=line["unit_price"],
+        total=line["quantity"] * line["unit_price"],
+    )
+
+
+def _serialize_item(item: ServiceItem) -> dict:
+    return {
+        "id": item.id,
+        "item_type": item.item_type,
+        "part_id": item.part_id,
+        "description": item.description,
+        "quantity": float(item.quantity or 0),
+        "unit_price": float(item.unit_price or 0),
+        "total": float(item.total or 0),
+    }
+
+
+def _order_totals(order: ServiceOrder) -> dict:
+    return {
+        "total_parts": float(order.total_parts or 0),
+        "total_labor": float(order.total_labor or 0),
+        "total_amount": float(order.total_amount or 0),
+    }
+
+
 @bp.post("/<int:order_id>/items")
-@jwt_required()
+@identity_required()
 @tenant_guard(path_key="tenant_id", body_keys=("tenant_id",))
 def add_os_item(order_id):
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
 
-    item_type = data.get("item_type")  # part | labor
-    description = data.get("description", "")
-    quantity = Decimal(str(data.get("quantity", 1)))
-    unit_price = Decimal(str(data.get("unit_price", 0)))
-    part_id = data.get("part_id")
-
-    if item_type not in ("part", "labor"):
-        return jsonify({"error": "item_type deve ser 'part' ou 'labor'"}), 400
+    try:
+        line = _parse_item(data)
+    except ItemError as err:
+        return jsonify({"error": str(err)}), 400
 
     order = db.session.get(ServiceOrder, order_id)
     if not order or order.tenant_id != tenant_id:
         abort(404)
 
     part = None
-    if item_type == "part":
-        if not part_id:
-            return jsonify({"error": "part_id é obrigatório para itens de peça"}), 400
+    if line["item_type"] == "part":
         part = Part.query.filter_by(
-            id=part_id, tenant_id=tenant_id, is_active=True
+            id=line["part_id"], tenant_id=tenant_id, is_active=True
         ).first()
         if not part:
             return jsonify({"error": "peça inválida"}), 400
+        if order.status == "CANCELLED":
+            return jsonify({"error": "OS cancelada"}), 400
 
-        qty_int = int(quantity)
-        if part.quantity_in_stock < qty_int:
-            return jsonify({"error": "estoque insuficiente"}), 400
-
-        # baixa estoque
-        part.quantity_in_stock -= qty_int
-        movement = StockMovement(
-            tenant_id=tenant_id,
-            part_id=part.id,
-            movement_type="out",
-            quantity=qty_int,
-            reason=f"Uso na OS #{order.id}",
-            related_order_id=order.id,
-        )
-        db.session.add(movement)
-
-    total = quantity * unit_price
-
-    item = ServiceItem(
-        tenant_id=tenant_id,
-        service_order_id=order.id,
-        item_type=item_type,
-        part_id=part.id if part else None,
-        description=description or (part.name if part else ""),
-        quantity=quantity,
-        unit_price=unit_price,
-        total=total,
-    )
+    item = _build_item(order, line, part)
     db.session.add(item)
 
-    # recalcula totais
-    recalc_order_totals(order)
+    if part:
+        # reserva a peça pra OS: baixa atômica, devolvida se a OS for cancelada
+        db.session.flush()
+        try:
+            stock.reserve(order, item, int(item.quantity))
+        except stock.StockError as err:
+            db.session.rollback()
+            return jsonify({"error": str(err)}), err.status_code
+
+    # totais da OS: soma só o item novo
+    apply_item_delta(order, item.item_type, item.total)
 
     db.session.commit()
 
-    return (
-        jsonify(
-            {
-                "id": item.id,
-                "item_type": item.item_type,
-                "description": item.description,
-                "quantity": float(item.quantity or 0),
-                "unit_price": float(item.unit_price or 0),
-                "total": float(item.total or 0),
-                "order_totals": {
-                    "total_parts": float(order.total_parts or 0),
-                    "total_labor": float(order.total_labor or 0),
-                    "total_amount": float(order.total_amount or 0),
-                },
-            }
-        ),
-        201,
+    body = _serialize_item(item)
+    body["order_totals"] = _order_totals(order)
+    return jsonify(body), 201
+
+
+@bp.post("/<int:order_id>/items:batch")
+@identity_required()
+@tenant_guard(path_key="tenant_id", body_keys=("tenant_id",))
+def add_os_items_batch(order_id):
+    """
+    Várias linhas num request e numa transação (orçamento/revisão): tudo ou
+    nada. Peças validadas num único ``IN``, itens/movimentações/reservas
+    inseridos em lote, uma baixa por peça e um UPDATE de totais.
+    """
+    tenant_id = get_current_tenant_id()
+    data = request.get_json() or {}
+    raw_items = data.get("items")
+
+    if not isinstance(raw_items, list) or not raw_items:
+        return jsonify({"error": "items deve ser uma lista não vazia"}), 400
+    if len(raw_items) > MAX_BATCH_ITEMS:
+        return jsonify({"error": f"no máximo {MAX_BATCH_ITEMS} itens por lote"}), 400
+
+    lines = []
+    for index, raw in enumerate(raw_items):
+        try:
+            lines.append(_parse_item(raw if isinstance(raw, dict) else {}))
+        except ItemError as err:
+            return jsonify({"error": str(err), "index": index}), 400
+
+    order = db.session.get(ServiceOrder, order_id)
+    if not order or order.tenant_id != tenant_id:
+        abort(404)
+
+    part_ids = {line["part_id"] for line in lines if line["part_id"]}
+    parts = {}
+    if part_ids:
+        if order.status == "CANCELLED":
+            return jsonify({"error": "OS cancelada"}), 400
+        parts = {
+            p.id: p
+            for p in Part.query.filter(
+                Part.id.in_(part_ids), Part.tenant_id == tenant_id, Part.is_active.is_(True)
+            )
+        }
+    for index, line in enumerate(lines):
+        if line["part_id"] and line["part_id"] not in parts:
+            return jsonify({"error": "peça inválida", "index": index}), 400
+
+    items = [_build_item(order, line, parts.get(line["part_id"])) for line in lines]
+    db.session.add_all(items)
+    # um INSERT em lote (com RETURNING dos ids pras reservas)
+    db.session.flush()
+
+    part_lines = [(item, int(item.quantity)) for item in items if item.item_type == "part"]
+    if part_lines:
+        try:
+            stock.reserve_items(order, part_lines)
+        except stock.StockError as err:
+            db.session.rollback()
+            body = {"error": str(err)}
+            if getattr(err, "part_id", None) is not None:
+                body["part_id"] = err.part_id
+            return jsonify(body), err.status_code
+
+    apply_totals_delta(
+        order,
+        parts=sum(money(i.total) for i in items if i.item_type == "part"),
+        labor=sum(money(i.total) for i in items if i.item_type != "part"),
     )
+    # serializa antes do commit: depois dele cada item seria relido do banco
+    body = {
+        "items": [_serialize_item(item) for item in items],
+        "order_totals": _order_totals(order),
+    }
+    db.session.commit()
+
+    return jsonify(body), 201
 
 
 @bp.patch("/<int:order_id>/items/<int:item_id>")
-@jwt_required()
+@identity_required()
 def update_os_item(order_id, item_id):
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
@@ -284,26 +447,38 @@ def update_os_item(order_id, item_id):
     if not item or item.tenant_id != tenant_id or item.service_order_id != order.id:
         abort(404)
 
-    # não vamos tentar reverter estoque automaticamente pra não virar caos,
-    # ajustes de quantidade de peça grandes o dono faz via tela de estoque
+    # mesma validação do POST, antes de mexer no item ou na reserva
+    try:
+        quantity = _parse_quantity(data["quantity"], item.item_type) if "quantity" in data else None
+        unit_price = _decimal(data["unit_price"], "unit_price") if "unit_price" in data else None
+    except ItemError as err:
+        return jsonify({"error": str(err)}), 400
 
+    old_total = item.total
     if "description" in data:
         item.description = data["description"]
-    if "quantity" in data:
-        item.quantity = Decimal(str(data["quantity"]))
-    if "unit_price" in data:
-        item.unit_price = Decimal(str(data["unit_price"]))
+    if quantity is not None:
+        item.quantity = quantity
+        if item.item_type == "part":
+            # a reserva acompanha a quantidade (itens sem reserva: ajuste manual)
+            try:
+                stock.resize_item(order, item, int(item.quantity))
+            except stock.StockError as err:
+                db.session.rollback()
+                return jsonify({"error": str(err)}), err.status_code
+    if unit_price is not None:
+        item.unit_price = unit_price
 
     item.total = (item.quantity or 0) * (item.unit_price or 0)
 
-    recalc_order_totals(order)
+    apply_item_delta(order, item.item_type, money(item.total) - money(old_total))
     db.session.commit()
 
     return jsonify({"message": "item atualizado"})
 
 
 @bp.delete("/<int:order_id>/items/<int:item_id>")
-@jwt_required()
+@identity_required()
 def delete_os_item(order_id, item_id):
     tenant_id = get_current_tenant_id()
 
@@ -314,9 +489,14 @@ def delete_os_item(order_id, item_id):
     if not item or item.tenant_id != tenant_id or item.service_order_id != order.id:
         abort(404)
 
-    # opcional: não devolver estoque automático pra não confundir controle
+    # devolve a reserva do item (itens sem reserva: ajuste manual)
+    try:
+        stock.release_item(order, item)
+    except stock.StockError as err:
+        db.session.rollback()
+        return jsonify({"error": str(err)}), err.status_code
+    apply_item_delta(order, item.item_type, -money(item.total))
     db.session.delete(item)
-    recalc_order_totals(order)
     db.session.commit()
 
     return jsonify({"message": "item removido"})
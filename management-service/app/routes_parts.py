@@ -1,30 +1,33 @@
 # management-service/app/routes_parts.py
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 
+from . import stock
 from .models import Part, StockMovement, db
+from .pagination import page_response, paginate
+from .search import normalize_query, text_match
 from .utils import get_current_tenant_id, is_manager_or_owner
+from .tenant_guard import identity_required
 
 bp = Blueprint("parts", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_parts():
     tenant_id = get_current_tenant_id()
-    q = request.args.get("q")
+    q = normalize_query(request.args.get("q"))
     only_low = request.args.get("low_stock") == "1"
 
     query = Part.query.filter_by(tenant_id=tenant_id, is_active=True)
     if q:
-        like = f"%{q}%"
-        query = query.filter((Part.name.ilike(like)) | (Part.sku.ilike(like)))
+        query = query.filter(text_match(q, Part.name, Part.sku))
     if only_low:
         query = query.filter(Part.quantity_in_stock <= Part.min_stock)
 
-    parts = query.order_by(Part.name.asc()).all()
+    page = paginate(query, Part, Part.name)
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": p.id,
@@ -34,13 +37,14 @@ def list_parts():
                 "quantity_in_stock": p.quantity_in_stock,
                 "min_stock": p.min_stock,
             }
-            for p in parts
-        ]
+            for p in page.items
+        ],
+        page,
     )
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_part():
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -62,13 +66,17 @@ def create_part():
         min_stock=data.get("min_stock") or 0,
     )
     db.session.add(part)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:  # ix_parts_tenant_sku_active
+        db.session.rollback()
+        return jsonify({"error": "já existe uma peça ativa com esse sku"}), 409
 
     return jsonify({"id": part.id, "name": part.name}), 201
 
 
 @bp.patch("/<int:part_id>")
-@jwt_required()
+@identity_required()
 def update_part(part_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -87,13 +95,17 @@ def update_part(part_id):
     if "min_stock" in data:
         part.min_stock = data["min_stock"]
 
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:  # ix_parts_tenant_sku_active
+        db.session.rollback()
+        return jsonify({"error": "já existe uma peça ativa com esse sku"}), 409
 
     return jsonify({"message": "peça atualizada"})
 
 
 @bp.post("/<int:part_id>/stock-movement")
-@jwt_required()
+@identity_required()
 def stock_movement(part_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -108,23 +120,33 @@ def stock_movement(part_id):
 
     if movement_type not in ("in", "out", "adjust"):
         return jsonify({"error": "movement_type inválido"}), 400
-    if not quantity:
+    if quantity is None or quantity == "":
         return jsonify({"error": "quantity é obrigatório"}), 400
+    # inteiro (ou "12" de formulário); sinal e zero quem valida é o stock.py
+    qty = quantity
+    if isinstance(qty, str):
+        try:
+            qty = int(qty)
+        except ValueError:
+            pass
+    if isinstance(qty, bool) or not isinstance(qty, int):
+        return jsonify({"error": "quantity deve ser um número inteiro"}), 400
 
     part = db.session.get(Part, part_id)
     if not part or part.tenant_id != tenant_id or not part.is_active:
         abort(404)
 
-    qty = int(quantity)
-
-    if movement_type == "in":
-        part.quantity_in_stock += qty
-    elif movement_type == "out":
-        if part.quantity_in_stock < qty:
-            return jsonify({"error": "estoque insuficiente"}), 400
-        part.quantity_in_stock -= qty
-    else:  # adjust
-        part.quantity_in_stock = qty
+    # UPDATE condicional no banco: sem ler-comparar-gravar em Python
+    try:
+        if movement_type == "in":
+            balance = stock.put_stock(tenant_id, part.id, qty)
+        elif movement_type == "out":
+            balance = stock.take_stock(tenant_id, part.id, qty)
+        else:  # adjust
+            balance = stock.set_stock(tenant_id, part.id, qty)
+    except stock.StockError as err:
+        db.session.rollback()
+        return jsonify({"error": str(err)}), err.status_code
 
     movement = StockMovement(
         tenant_id=tenant_id,
@@ -139,12 +161,12 @@ def stock_movement(part_id):
     db.session.commit()
 
     return jsonify(
-        {"message": "movimentação registrada", "stock": part.quantity_in_stock}
+        {"message": "movimentação registrada", "stock": balance}
     )
 
 
 @bp.get("/<int:part_id>/movements")
-@jwt_required()
+@identity_required()
 def list_movements(part_id):
     tenant_id = get_current_tenant_id()
 
@@ -152,13 +174,14 @@ def list_movements(part_id):
     if not part or part.tenant_id != tenant_id or not part.is_active:
         abort(404)
 
-    moves = (
-        StockMovement.query.filter_by(tenant_id=tenant_id, part_id=part.id)
-        .order_by(StockMovement.created_at.desc())
-        .all()
+    page = paginate(
+        StockMovement.query.filter_by(tenant_id=tenant_id, part_id=part.id),
+        StockMovement,
+        StockMovement.created_at,
+        descending=True,
     )
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": m.id,
@@ -168,6 +191,7 @@ def list_movements(part_id):
                 "related_order_id": m.related_order_id,
                 "created_at": m.created_at.isoformat(),
             }
-            for m in moves
-        ]
+            for m in page.items
+        ],
+        page,
     )
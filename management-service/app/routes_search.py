@@ -0,0 +1,79 @@
+# management-service/app/routes_search.py
+from flask import Blueprint, jsonify, request
+
+from .models import Customer, Motorcycle, Part
+from .search import MIN_QUERY_LENGTH, ranked, search_args
+from .utils import get_current_tenant_id
+from .tenant_guard import identity_required
+
+bp = Blueprint("search", __name__)
+
+SEARCH_TYPES = ("customers", "parts", "motos")
+
+
+@bp.get("/")
+@identity_required()
+def search():
+    """
+    Typeahead do balcão: clientes, peças e motos num request só.
+
+    Query: ``?q=joao&types=customers,motos&limit=8``
+    """
+    tenant_id = get_current_tenant_id()
+    term, limit = search_args()
+    requested = request.args.get("types") or ",".join(SEARCH_TYPES)
+    types = [t for t in requested.split(",") if t in SEARCH_TYPES]
+
+    result = {t: [] for t in types}
+    if len(term) < MIN_QUERY_LENGTH:
+        return jsonify(result)
+
+    if "customers" in result:
+        customers = ranked(
+            Customer.query.filter_by(tenant_id=tenant_id, is_active=True),
+            term,
+            Customer.name,
+            limit=limit,
+        )
+        result["customers"] = [
+            {"id": c.id, "name": c.name, "phone": c.phone} for c in customers
+        ]
+
+    if "parts" in result:
+        parts = ranked(
+            Part.query.filter_by(tenant_id=tenant_id, is_active=True),
+            term,
+            Part.name,
+            Part.sku,
+            limit=limit,
+        )
+        result["parts"] = [
+            {
+                "id": p.id,
+                "sku": p.sku,
+                "name": p.name,
+                "unit_price": float(p.unit_price or 0),
+                "quantity_in_stock": p.quantity_in_stock,
+            }
+            for p in parts
+        ]
+
+    if "motos" in result:
+        motos = ranked(
+            Motorcycle.query.filter_by(tenant_id=tenant_id, is_active=True),
+            term,
+            Motorcycle.plate,
+            limit=limit,
+        )
+        result["motos"] = [
+            {
+                "id": m.id,
+                "customer_id": m.customer_id,
+                "plate": m.plate,
+                "brand": m.brand,
+                "model": m.model,
+            }
+            for m in motos
+        ]
+
+    return jsonify(result)
@@ -0,0 +1,252 @@
+"""Atomic stock changes and per-order stock reservations."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import Part, ServiceItem, ServiceOrder, StockMovement, StockReservation, db
+from .observability import STOCK_REJECTIONS
+
+# Nada aqui lê o saldo, compara em Python e grava: toda baixa é um único
+# ``UPDATE ... WHERE quantity_in_stock >= :q RETURNING``, então duas OS
+# disputando a última unidade nunca deixam o estoque negativo. No Postgres a
+# espera pelo lock da linha é limitada (``STOCK_LOCK_TIMEOUT_MS``); estourou,
+# a requisição devolve 409 em vez de segurar o worker.
+#
+# As funções só mexem na sessão; quem chama faz o commit (ou rollback ao
+# receber ``StockError``).
+
+DEFAULT_LOCK_TIMEOUT_MS = 2000
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class StockError(Exception):
+    status_code = 400
+
+
+class InsufficientStock(StockError):
+    part_id: Optional[int] = None
+
+    def __init__(self, message: str = "estoque insuficiente") -> None:
+        super().__init__(message)
+
+
+class StockBusy(StockError):
+    status_code = 409
+
+    def __init__(self, message: str = "estoque ocupado, tente novamente") -> None:
+        super().__init__(message)
+
+
+def _bound_lock_wait() -> None:
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    timeout = int(current_app.config.get("STOCK_LOCK_TIMEOUT_MS", DEFAULT_LOCK_TIMEOUT_MS))
+    # SET não aceita parâmetro; o valor vem da config e já é int
+    db.session.execute(text(f"SET LOCAL lock_timeout = {timeout}"))
+
+
+def _apply(tenant_id: int, part_id: int, new_value, *conditions) -> Optional[int]:
+    _bound_lock_wait()
+    stmt = (
+        update(Part)
+        .where(Part.id == part_id, Part.tenant_id == tenant_id, Part.is_active.is_(True))
+        .where(*conditions)
+        .values(quantity_in_stock=new_value)
+        .returning(Part.quantity_in_stock)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        stock = db.session.execute(stmt).scalar_one_or_none()
+    except OperationalError as exc:
+        if getattr(exc.orig, "pgcode", None) == LOCK_NOT_AVAILABLE:
+            STOCK_REJECTIONS.labels(reason="busy").inc()
+            raise StockBusy() from exc
+        raise
+    if stock is not None:
+        # a Part já carregada na sessão enxerga o saldo novo sem outro SELECT
+        part = db.session.identity_map.get(db.session.identity_key(Part, part_id))
+        if part is not None:
+            set_committed_value(part, "quantity_in_stock", stock)
+    return stock
+
+
+def _positive(quantity: int) -> None:
+    # baixa negativa passaria no ``>= :q`` e viraria entrada
+    if quantity <= 0:
+        raise StockError("quantity deve ser maior que zero")
+
+
+def take_stock(tenant_id: int, part_id: int, quantity: int) -> int:
+    """Baixa ``quantity`` se houver saldo; devolve o saldo restante."""
+    _positive(quantity)
+    stock = _apply(
+        tenant_id,
+        part_id,
+        Part.quantity_in_stock - quantity,
+        Part.quantity_in_stock >= quantity,
+    )
+    if stock is None:
+        STOCK_REJECTIONS.labels(reason="insufficient").inc()
+        raise InsufficientStock()
+    return stock
+
+
+def put_stock(tenant_id: int, part_id: int, quantity: int) -> int:
+    """Devolve ``quantity`` ao estoque; devolve o saldo novo."""
+    _positive(quantity)
+    stock = _apply(tenant_id, part_id, Part.quantity_in_stock + quantity)
+    if stock is None:
+        raise StockError("peça inválida")
+    return stock
+
+
+def set_stock(tenant_id: int, part_id: int, quantity: int) -> int:
+    """Ajuste de inventário: grava o saldo contado."""
+    if quantity < 0:
+        raise StockError("quantity não pode ser negativa")
+    stock = _apply(tenant_id, part_id, quantity)
+    if stock is None:
+        raise StockError("peça inválida")
+    return stock
+
+
+def _movement(order: ServiceOrder, part_id: int, movement_type: str, quantity: int, reason: str):
+    db.session.add(
+        StockMovement(
+            tenant_id=order.tenant_id,
+            part_id=part_id,
+            movement_type=movement_type,
+            quantity=quantity,
+            reason=f"{reason} #{order.id}",
+            related_order_id=order.id,
+        )
+    )
+
+
+def _reservations(order: ServiceOrder, status: str, item: Optional[ServiceItem] = None):
+    query = StockReservation.query.filter_by(
+        tenant_id=order.tenant_id, service_order_id=order.id, status=status
+    )
+    if item is not None:
+        query = query.filter_by(service_item_id=item.id)
+    return query.all()
+
+
+# ---------- reservas por OS ----------
+
+
+def reserve(order: ServiceOrder, item: ServiceItem, quantity: int) -> StockReservation:
+    """Segura estoque para um item de peça (o item precisa ter ``id``)."""
+    return reserve_items(order, [(item, quantity)])[0]
+
+
+def reserve_items(order: ServiceOrder, lines) -> list:
+    """
+    Reserva vários itens de peça de uma vez: uma baixa atômica por peça
+    (somando as linhas da mesma peça) e movimentações/reservas inseridas em
+    lote. ``lines`` = [(item com ``id``, quantidade)]; qualquer peça sem
+    saldo levanta ``InsufficientStock`` (quem chama faz rollback de tudo).
+    """
+    per_part: dict = {}
+    for item, quantity in lines:
+        per_part[item.part_id] = per_part.get(item.part_id, 0) + quantity
+    # ordem fixa de peças: dois lotes concorrentes travam as linhas na mesma
+    # sequência e não entram em deadlock
+    for part_id in sorted(per_part):
+        try:
+            take_stock(order.tenant_id, part_id, per_part[part_id])
+        except InsufficientStock as exc:
+            exc.part_id = part_id
+            raise
+
+    status = "consumed" if order.status == "COMPLETED" else "held"
+    reservations = [
+        StockReservation(
+            tenant_id=order.tenant_id,
+            part_id=item.part_id,
+            service_order_id=order.id,
+            service_item_id=item.id,
+            quantity=quantity,
+            status=status,
+        )
+        for item, quantity in lines
+    ]
+    for item, quantity in lines:
+        _movement(order, item.part_id, "out", quantity, "Reserva na OS")
+    db.session.add_all(reservations)
+    return reservations
+
+
+def resize_item(order: ServiceOrder, item: ServiceItem, quantity: int) -> None:
+    """Acompanha a quantidade nova de um item com reserva ativa."""
+    reservation = StockReservation.query.filter_by(service_item_id=item.id).first()
+    if reservation is None:
+        return  # item anterior às reservas: estoque segue manual
+    delta = quantity - reservation.quantity
+    if reservation.status == "released":
+        delta = 0  # OS cancelada: só vale na reabertura
+    if delta > 0:
+        take_stock(order.tenant_id, item.part_id, delta)
+        _movement(order, item.part_id, "out", delta, "Reserva na OS")
+    elif delta < 0:
+        put_stock(order.tenant_id, item.part_id, -delta)
+        _movement(order, item.part_id, "in", -delta, "Devolução da OS")
+    reservation.quantity = quantity
+
+
+def release_item(order: ServiceOrder, item: ServiceItem) -> None:
+    """Item removido: devolve o que estava segurado e solta o vínculo."""
+    for reservation in _reservations(order, "held", item) + _reservations(
+        order, "consumed", item
+    ):
+        _release(order, reservation)
+    for reservation in StockReservation.query.filter_by(service_item_id=item.id):
+        reservation.service_item_id = None
+
+
+def _release(order: ServiceOrder, reservation: StockReservation) -> None:
+    put_stock(order.tenant_id, reservation.part_id, reservation.quantity)
+    _movement(order, reservation.part_id, "in", reservation.quantity, "Devolução da OS")
+    reservation.status = "released"
+    reservation.closed_at = datetime.utcnow()
+
+
+def apply_status(order: ServiceOrder, old_status: str, new_status: str) -> None:
+    """
+    Reflete a troca de status nas reservas: cancelar devolve o estoque,
+    concluir consome; reabrir uma OS cancelada reserva tudo de novo (e falha
+    com ``InsufficientStock`` se o estoque já foi usado em outra OS).
+    """
+    if old_status == new_status:
+        return
+    now = datetime.utcnow()
+
+    if new_status == "CANCELLED":
+        for reservation in _reservations(order, "held") + _reservations(order, "consumed"):
+            _release(order, reservation)
+        return
+
+    if old_status == "CANCELLED":
+        for reservation in _reservations(order, "released"):
+            if reservation.service_item_id is None:
+                continue  # item removido antes do cancelamento
+            take_stock(order.tenant_id, reservation.part_id, reservation.quantity)
+            _movement(order, reservation.part_id, "out", reservation.quantity, "Reserva na OS")
+            reservation.status = "held"
+            reservation.closed_at = None
+
+    if new_status == "COMPLETED":
+        for reservation in _reservations(order, "held"):
+            reservation.status = "consumed"
+            reservation.closed_at = now
+    elif old_status == "COMPLETED":
+        for reservation in _reservations(order, "consumed"):
+            reservation.status = "held"
+            reservation.closed_at = None
@@ -1,8 +1,15 @@
 # management-service/app/utils.py
+import re
+
+from flask import g
 from flask_jwt_extended import get_jwt_identity, get_jwt
 
 
 def get_current_identity():
+    # identidade assinada pelo gateway (ver tenant_guard.load_internal_identity)
+    internal = g.get("internal_identity")
+    if internal is not None:
+        return internal
     identity = get_jwt_identity()
     # prefer identity if it's a mapping
     if isinstance(identity, dict):
@@ -20,3 +27,10 @@ def get_current_tenant_id():
 def is_manager_or_owner():
     identity = get_current_identity()
     return identity.get("role") in ("owner", "manager")
+
+
+def normalize_plate(plate):
+    """Placa como é gravada: maiúscula, sem espaço nem hífen (``abc-1d23`` -> ``ABC1D23``)."""
+    if plate is None:
+        return None
+    return re.sub(r"[\s-]", "", str(plate)).upper() or None
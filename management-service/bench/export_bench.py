@@ -0,0 +1,118 @@
+"""
+Benchmark: exportação de movimentações de estoque (``app/exports.py``).
+
+Grava ``--rows`` movimentações direto no banco, baixa ``/exports/movements``
+em CSV e NDJSON pelo cliente de teste do Flask, consumindo o stream bloco a
+bloco como um cliente HTTP faria, e depois gera o XLSX com o worker (sem
+HTTP). Mede o tempo e o pico de RSS do processo (``ru_maxrss``) em cada
+etapa. Usa SQLite em arquivo temporário por padrão; ``--database-url``
+aponta pra um Postgres.
+
+Rodar de dentro de ``management-service/``:
+
+    python bench/export_bench.py --rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB no Linux
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--tenant-id", type=int, default=9001)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="export-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["EXPORT_DIR"] = workdir
+    os.environ.setdefault("APP_ENV", "test")
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import insert
+
+    from app import create_app
+    from app.exports import run_export
+    from app.models import Part, StockMovement, db
+    from app.routes_exports import EXPORTS
+
+    app = create_app()
+    try:
+        with app.app_context():
+            StockMovement.query.filter_by(tenant_id=args.tenant_id).delete()
+            Part.query.filter_by(tenant_id=args.tenant_id).delete()
+            part = Part(tenant_id=args.tenant_id, sku="BENCH-1", name="Peça do benchmark")
+            db.session.add(part)
+            db.session.flush()
+            for start in range(0, args.rows, 1000):
+                db.session.execute(
+                    insert(StockMovement),
+                    [
+                        {
+                            "tenant_id": args.tenant_id,
+                            "part_id": part.id,
+                            "movement_type": "in" if i % 3 else "out",
+                            "quantity": 1 + i % 20,
+                            "reason": f"Movimentação de teste {i}",
+                        }
+                        for i in range(start, min(start + 1000, args.rows))
+                    ],
+                )
+            db.session.commit()
+            token = create_access_token(
+                identity="1", additional_claims={"tenant_id": args.tenant_id, "role": "owner"}
+            )
+        print(f"{args.rows} movimentações gravadas, RSS máx {peak_mb():.0f} MB")
+
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {token}"}
+        for file_format in ("csv", "ndjson"):
+            started = time.perf_counter()
+            resp = client.get(
+                f"/exports/movements?format={file_format}", headers=headers, buffered=False
+            )
+            size = chunks = 0
+            for chunk in resp.response:
+                size += len(chunk)
+                chunks += 1
+            resp.close()
+            elapsed = time.perf_counter() - started
+            print(
+                f"{file_format:>7}: {elapsed:6.2f}s  {args.rows / elapsed:9.0f} linhas/s  "
+                f"{size / 1024 / 1024:6.1f} MB em {chunks} blocos  RSS máx {peak_mb():5.0f} MB"
+            )
+
+        with app.app_context():
+            job = {"id": "0" * 32, "tenant_id": args.tenant_id, "kind": "movements", "filters": {}}
+            started = time.perf_counter()
+            job = run_export(job, EXPORTS["movements"])
+            elapsed = time.perf_counter() - started
+            print(
+                f"{'xlsx':>7}: {elapsed:6.2f}s  {args.rows / elapsed:9.0f} linhas/s  "
+                f"{job['bytes'] / 1024 / 1024:6.1f} MB em disco       RSS máx {peak_mb():5.0f} MB"
+            )
+
+            StockMovement.query.filter_by(tenant_id=args.tenant_id).delete()
+            Part.query.filter_by(tenant_id=args.tenant_id).delete()
+            db.session.commit()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
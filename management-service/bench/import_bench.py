@@ -0,0 +1,88 @@
+"""
+Benchmark: importação de um catálogo de peças (``app/imports.py``).
+
+Gera um CSV com ``--rows`` peças, roda o job de importação direto (sem
+HTTP, no mesmo processo) e mede o tempo total e o pico de RSS do processo
+(``ru_maxrss``; tracemalloc deixaria o job várias vezes mais lento). Depois
+repete o mesmo arquivo, o que vira só atualizações. Usa SQLite em arquivo
+temporário por padrão; ``--database-url`` aponta pra um Postgres.
+
+Rodar de dentro de ``management-service/``:
+
+    python bench/import_bench.py --rows 50000 --batch-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def write_catalog(path: str, rows: int) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("sku;name;unit_price;quantity_in_stock;min_stock\n")
+        for i in range(rows):
+            fh.write(f"SKU-{i:06d};Peça de teste {i};{10 + i % 900},90;{i % 50};5\n")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--tenant-id", type=int, default=9001)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="import-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["IMPORT_DIR"] = workdir
+    os.environ.setdefault("APP_ENV", "test")
+
+    from app import create_app
+    from app.imports import job_path, run_import
+    from app.models import ImportJob, Part, db
+
+    app = create_app()
+    source = os.path.join(workdir, "catalog.csv")
+    write_catalog(source, args.rows)
+    size = os.path.getsize(source)
+    print(f"{args.rows} linhas, {size / 1024 / 1024:.1f} MB, lotes de {args.batch_size}")
+
+    try:
+        with app.app_context():
+            Part.query.filter_by(tenant_id=args.tenant_id).delete()
+            db.session.commit()
+            for label in ("inserção", "reimportação (updates)"):
+                job = ImportJob(
+                    tenant_id=args.tenant_id, kind="parts", file_format="csv", bytes_total=size
+                )
+                db.session.add(job)
+                db.session.commit()
+                shutil.copyfile(source, job_path(job.id))
+
+                started = time.perf_counter()
+                job = run_import(job.id, args.tenant_id, args.batch_size)
+                elapsed = time.perf_counter() - started
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB no Linux
+                print(
+                    f"{label:>24}: {elapsed:6.2f}s  {args.rows / elapsed:9.0f} linhas/s  "
+                    f"RSS máx {peak / 1024:5.0f} MB  "
+                    f"(+{job.rows_inserted} ~{job.rows_updated} erros {job.error_count})"
+                )
+            Part.query.filter_by(tenant_id=args.tenant_id).delete()
+            ImportJob.query.filter_by(tenant_id=args.tenant_id).delete()
+            db.session.commit()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: serialização de uma listagem de 10k OS (formato de ``list_os``).
+
+Compara o caminho antigo (``float(...)``/``.isoformat()`` por linha +
+provider padrão do Flask, stdlib ``json``) com o ``FastJSONProvider``
+(``app/json_provider.py``) recebendo Decimal/datetime direto, com orjson e
+no fallback stdlib. Reporta tempo (mediana de ``--repeat`` execuções) e
+memória alocada no pico (tracemalloc) montando o corpo do ``jsonify``.
+
+Rodar de dentro de ``management-service/``:
+
+    python bench/json_bench.py --rows 10000 --repeat 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import statistics
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, List
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import json_provider  # noqa: E402
+from app.json_provider import FastJSONProvider  # noqa: E402
+
+
+def make_orders(count: int) -> List[SimpleNamespace]:
+    base = dt.datetime(2024, 10, 1, 8, 0, 0)
+    customer = SimpleNamespace(name="Cliente Bench")
+    moto = SimpleNamespace(plate="ABC1D23")
+    return [
+        SimpleNamespace(
+            id=i,
+            status=("OPEN", "IN_PROGRESS", "COMPLETED")[i % 3],
+            customer=customer,
+            customer_id=i % 500,
+            motorcycle=moto,
+            motorcycle_id=i,
+            description=f"Revisão {i} - troca de óleo e filtro",
+            total_parts=Decimal("120.50") + i,
+            total_labor=Decimal("80.00"),
+            total_amount=Decimal("200.50") + i,
+            created_at=base + dt.timedelta(minutes=i),
+            scheduled_date=(base + dt.timedelta(days=i % 30)).date(),
+            closed_at=None if i % 3 else base + dt.timedelta(hours=i),
+        )
+        for i in range(count)
+    ]
+
+
+def serialize_before(o) -> dict:
+    return {
+        "id": o.id,
+        "status": o.status,
+        "customer": o.customer.name if o.customer else None,
+        "customer_id": o.customer_id,
+        "motorcycle_id": o.motorcycle_id,
+        "motorcycle_plate": o.motorcycle.plate if o.motorcycle else None,
+        "description": o.description,
+        "total_parts": float(o.total_parts or 0),
+        "total_labor": float(o.total_labor or 0),
+        "total_amount": float(o.total_amount or 0),
+        "created_at": o.created_at.isoformat(),
+        "scheduled_date": o.scheduled_date.isoformat() if o.scheduled_date else None,
+        "closed_at": o.closed_at.isoformat() if o.closed_at else None,
+    }
+
+
+def serialize_after(o) -> dict:
+    return {
+        "id": o.id,
+        "status": o.status,
+        "customer": o.customer.name if o.customer else None,
+        "customer_id": o.customer_id,
+        "motorcycle_id": o.motorcycle_id,
+        "motorcycle_plate": o.motorcycle.plate if o.motorcycle else None,
+        "description": o.description,
+        "total_parts": o.total_parts or 0,
+        "total_labor": o.total_labor or 0,
+        "total_amount": o.total_amount or 0,
+        "created_at": o.created_at,
+        "scheduled_date": o.scheduled_date,
+        "closed_at": o.closed_at,
+    }
+
+
+def make_app(provider_class) -> Flask:
+    app = Flask("bench")
+    app.json = provider_class(app)
+    return app
+
+
+def measure(app: Flask, orders, serialize: Callable, repeat: int):
+    def run() -> int:
+        with app.app_context():
+            return len(jsonify([serialize(o) for o in orders]).get_data())
+
+    size = run()  # aquece
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, size
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    orders = make_orders(args.rows)
+    print(f"{args.rows} linhas, mediana de {args.repeat} execuções")
+    print(f"{'caso':<40} {'ms':>8} {'pico MB':>9} {'corpo KB':>9}")
+
+    def report(label: str, provider_class, serialize: Callable) -> None:
+        ms, peak, size = measure(make_app(provider_class), orders, serialize, args.repeat)
+        print(f"{label:<40} {ms:>8.1f} {peak / 1e6:>9.1f} {size / 1024:>9.0f}")
+
+    report("antes: float/isoformat + json (Flask)", DefaultJSONProvider, serialize_before)
+    orjson_module = json_provider.orjson
+    if orjson_module is not None:
+        report("depois: FastJSONProvider (orjson)", FastJSONProvider, serialize_after)
+    json_provider.orjson = None
+    try:
+        report("depois: FastJSONProvider (stdlib)", FastJSONProvider, serialize_after)
+    finally:
+        json_provider.orjson = orjson_module
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: custo de editar um item numa OS com muitas linhas.
+
+Compara o recálculo antigo (carrega ``order.items`` e soma em Python) com o
+delta do item (``app/order_totals.apply_item_delta``, um UPDATE) e com o
+recálculo em SQL (``recalc_order_totals``, um SUM ... GROUP BY), para OS com
+``--items`` linhas. Cada rodada edita um item e commita, numa sessão nova
+(como uma requisição). Usa SQLite em memória por padrão; ``--database-url``
+aponta pra um Postgres.
+
+Rodar de dentro de ``management-service/``:
+
+    python bench/order_totals_bench.py --items 10 100 500 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def rescan_totals(order) -> None:
+    """Recálculo antigo: percorre todos os itens da OS."""
+    tp = Decimal("0")
+    tl = Decimal("0")
+    for i in order.items:
+        val = i.total or Decimal("0")
+        if i.item_type == "part":
+            tp += val
+        else:
+            tl += val
+    order.total_parts = tp
+    order.total_labor = tl
+    order.total_amount = tp + tl
+
+
+def make_order(db, models, items: int) -> int:
+    customer = models.Customer(tenant_id=1, name="Frota Bench")
+    db.session.add(customer)
+    db.session.flush()
+    moto = models.Motorcycle(tenant_id=1, customer_id=customer.id, plate="BEN0001")
+    db.session.add(moto)
+    db.session.flush()
+    order = models.ServiceOrder(tenant_id=1, customer_id=customer.id, motorcycle_id=moto.id)
+    db.session.add(order)
+    db.session.flush()
+    db.session.add_all(
+        models.ServiceItem(
+            tenant_id=1,
+            service_order_id=order.id,
+            item_type="labor" if i % 2 else "part",
+            description=f"linha {i}",
+            quantity=1,
+            unit_price=Decimal("10.00"),
+            total=Decimal("10.00"),
+        )
+        for i in range(items)
+    )
+    db.session.commit()
+    return order.id
+
+
+def run(edit: Callable, repeat: int) -> float:
+    timings: List[float] = []
+    for n in range(repeat):
+        started = time.perf_counter()
+        edit(n)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database-url", default="sqlite:///:memory:")
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("APP_ENV", "test")
+
+    from app import create_app, models
+    from app.models import ServiceItem, ServiceOrder, db
+    from app.order_totals import apply_item_delta, money, recalc_order_totals
+
+    app = create_app()
+    print(f"{'itens':>6} {'rescan (ms)':>12} {'delta (ms)':>11} {'SQL SUM (ms)':>13}")
+    with app.app_context():
+        for items in args.items:
+            order_id = make_order(db, models, items)
+            item_id = ServiceItem.query.filter_by(service_order_id=order_id).first().id
+
+            def edit(n, strategy):
+                db.session.remove()
+                order = db.session.get(ServiceOrder, order_id)
+                item = db.session.get(ServiceItem, item_id)
+                old_total = item.total
+                item.unit_price = item.total = Decimal("10.00") + n % 7
+                strategy(order, item, old_total)
+                db.session.commit()
+
+            rescan = run(lambda n: edit(n, lambda o, i, old: rescan_totals(o)), args.repeat)
+            delta = run(
+                lambda n: edit(
+                    n,
+                    lambda o, i, old: apply_item_delta(
+                        o, i.item_type, money(i.total) - money(old)
+                    ),
+                ),
+                args.repeat,
+            )
+            summed = run(lambda n: edit(n, lambda o, i, old: recalc_order_totals(o)), args.repeat)
+            print(f"{items:>6} {rescan:>12.2f} {delta:>11.2f} {summed:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Composite/partial indexes for tenant-scoped list queries (management).
+
+Revision ID: 20241010120001
+Revises: 20240909130001
+Create Date: 2024-10-10 12:00:01
+
+Cada índice casa com um filtro + ORDER BY das rotas de listagem (keyset em
+``app/pagination.py``: ``ORDER BY chave NULLS LAST, id``). Conferir com
+``scripts/explain_list_routes.py`` (ver ``docs/indexes-and-explain.md``).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20241010120001"
+down_revision: Union[str, None] = "20240909130001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas, WHERE do índice parcial)
+INDEXES = [
+    # GET /os  (+ ?status=) e GET /os/stats
+    (
+        "ix_service_orders_tenant_created",
+        "service_orders",
+        ["tenant_id", "created_at DESC NULLS LAST", "id DESC"],
+        None,
+    ),
+    (
+        "ix_service_orders_tenant_status_created",
+        "service_orders",
+        ["tenant_id", "status", "created_at DESC NULLS LAST", "id DESC"],
+        None,
+    ),
+    # OS abertas (painel/overview): parcial, fica pequeno com o histórico crescendo
+    (
+        "ix_service_orders_open",
+        "service_orders",
+        ["tenant_id", "created_at DESC NULLS LAST", "id DESC"],
+        "status IN ('OPEN', 'IN_PROGRESS', 'WAITING_PARTS')",
+    ),
+    # GET /os/<id> carrega itens por OS
+    ("ix_service_items_order", "service_items", ["service_order_id"], None),
+    # listagens só mostram registros ativos
+    (
+        "ix_customers_tenant_created_active",
+        "customers",
+        ["tenant_id", "created_at DESC NULLS LAST", "id DESC"],
+        "is_active",
+    ),
+    ("ix_parts_tenant_name_active", "parts", ["tenant_id", "name", "id"], "is_active"),
+    ("ix_motorcycles_tenant_active", "motorcycles", ["tenant_id", "id"], "is_active"),
+    # GET /parts/<id>/movements
+    (
+        "ix_stock_movements_tenant_part_created",
+        "stock_movements",
+        ["tenant_id", "part_id", "created_at DESC NULLS LAST", "id DESC"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            [sa.text(c) for c in columns],
+            unique=False,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns, _where in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
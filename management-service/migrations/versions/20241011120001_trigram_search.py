@@ -0,0 +1,44 @@
+"""pg_trgm GIN indexes for typeahead/ILIKE search (management).
+
+Revision ID: 20241011120001
+Revises: 20241010120001
+Create Date: 2024-10-11 12:00:01
+
+Atende ``ILIKE '%termo%'`` das listagens e o ``/search`` (``app/search.py``).
+Sem a extensão o app cai no LIKE simples (sem busca fuzzy).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "20241011120001"
+down_revision: Union[str, None] = "20241010120001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, coluna)
+INDEXES = [
+    ("ix_customers_name_trgm", "customers", "name"),
+    ("ix_parts_name_trgm", "parts", "name"),
+    ("ix_parts_sku_trgm", "parts", "sku"),
+    ("ix_motorcycles_plate_trgm", "motorcycles", "plate"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for name, table, _column in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    # a extensão fica: pode estar em uso por outros schemas
@@ -0,0 +1,75 @@
+"""Stock reservations held by open service orders.
+
+Revision ID: 20241015120000
+Revises: 20241011120001
+Create Date: 2024-10-15 12:00:00
+
+Cada item de peça de uma OS segura o estoque numa linha ``held``
+(``app/stock.py``); cancelar a OS ou remover o item devolve, concluir marca
+``consumed``. Itens de peça já existentes ficam sem reserva (histórico).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20241015120000"
+down_revision: Union[str, None] = "20241011120001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PG_ROLE = "motogestor_app"
+TENANT_EXPR = "COALESCE(current_setting('app.current_tenant', true), '-1')::int"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("part_id", sa.Integer(), sa.ForeignKey("parts.id"), nullable=False),
+        sa.Column(
+            "service_order_id",
+            sa.Integer(),
+            sa.ForeignKey("service_orders.id"),
+            nullable=False,
+        ),
+        sa.Column("service_item_id", sa.Integer(), sa.ForeignKey("service_items.id")),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=10), nullable=False, server_default="held"),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("closed_at", sa.DateTime()),
+        sa.CheckConstraint("quantity > 0", name="ck_stock_reservations_quantity"),
+    )
+    op.create_index("ix_stock_reservations_tenant_id", "stock_reservations", ["tenant_id"])
+    op.create_index(
+        "ix_stock_reservations_service_order_id", "stock_reservations", ["service_order_id"]
+    )
+    # reservas em aberto por peça (quanto do estoque está segurado em OS)
+    op.create_index(
+        "ix_stock_reservations_part_held",
+        "stock_reservations",
+        ["tenant_id", "part_id"],
+        postgresql_where=sa.text("status = 'held'"),
+    )
+
+    op.execute("ALTER TABLE stock_reservations ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE stock_reservations FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY stock_reservations_tenant_isolation ON stock_reservations
+        USING (tenant_id = {TENANT_EXPR})
+        WITH CHECK (tenant_id = {TENANT_EXPR});
+        """
+    )
+    op.execute(f"GRANT SELECT, INSERT, UPDATE, DELETE ON stock_reservations TO {PG_ROLE}")
+    op.execute(f"GRANT USAGE, SELECT ON SEQUENCE stock_reservations_id_seq TO {PG_ROLE}")
+
+
+def downgrade() -> None:
+    op.execute(f"REVOKE ALL PRIVILEGES ON stock_reservations FROM {PG_ROLE}")
+    op.execute("DROP POLICY IF EXISTS stock_reservations_tenant_isolation ON stock_reservations")
+    op.drop_index("ix_stock_reservations_part_held", table_name="stock_reservations")
+    op.drop_index("ix_stock_reservations_service_order_id", table_name="stock_reservations")
+    op.drop_index("ix_stock_reservations_tenant_id", table_name="stock_reservations")
+    op.drop_table("stock_reservations")
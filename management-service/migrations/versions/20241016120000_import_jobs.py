@@ -0,0 +1,133 @@
+"""Background import jobs (CSV/NDJSON catalogs).
+
+Revision ID: 20241016120000
+Revises: 20241015120000
+Create Date: 2024-10-16 12:00:00
+
+Uma linha por upload em ``POST /imports/<kind>`` (``app/imports.py``): o
+worker grava o progresso aqui e o cliente consulta em ``GET /imports/<id>``.
+Os índices em ``parts``/``motorcycles``/``customers`` atendem a busca das
+chaves de dedup de cada lote (``sku``, ``plate``, ``document`` por tenant).
+As placas já gravadas passam pra forma normalizada da API e da importação
+(maiúscula, sem espaço/hífen), senão a dedup por igualdade não as encontra.
+
+SKU e placa ativos passam a ser únicos por tenant (a importação faz
+``ON CONFLICT`` nessas chaves). Repetidos que já existem ficam só no de menor
+id: os outros são desativados (``is_active = false``, como o DELETE da API),
+sem apagar nada que OS e movimentações referenciam.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20241016120000"
+down_revision: Union[str, None] = "20241015120000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PG_ROLE = "motogestor_app"
+TENANT_EXPR = "COALESCE(current_setting('app.current_tenant', true), '-1')::int"
+# mesma regra de ``app.utils.normalize_plate``
+PLATE_EXPR = r"upper(regexp_replace(plate, '[\s-]', '', 'g'))"
+
+# (nome, tabela, colunas, WHERE do índice parcial, único)
+INDEXES = [
+    ("ix_parts_tenant_sku_active", "parts", ["tenant_id", "sku"], "is_active", True),
+    (
+        "ix_motorcycles_tenant_plate_active",
+        "motorcycles",
+        ["tenant_id", "plate"],
+        "is_active",
+        True,
+    ),
+    (
+        "ix_customers_tenant_document_active",
+        "customers",
+        ["tenant_id", "document"],
+        "is_active AND document IS NOT NULL",
+        False,
+    ),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("file_format", sa.String(length=10), nullable=False),
+        sa.Column("status", sa.String(length=10), nullable=False, server_default="queued"),
+        sa.Column("bytes_total", sa.BigInteger(), server_default="0"),
+        sa.Column("bytes_read", sa.BigInteger(), server_default="0"),
+        sa.Column("rows_processed", sa.Integer(), server_default="0"),
+        sa.Column("rows_inserted", sa.Integer(), server_default="0"),
+        sa.Column("rows_updated", sa.Integer(), server_default="0"),
+        sa.Column("error_count", sa.Integer(), server_default="0"),
+        sa.Column("errors", sa.JSON()),
+        sa.Column("message", sa.String(length=255)),
+        sa.Column("worker", sa.String(length=80)),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("heartbeat_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_import_jobs_tenant_id", "import_jobs", ["tenant_id"])
+    # um job em andamento por tenant
+    op.create_index(
+        "ix_import_jobs_tenant_active",
+        "import_jobs",
+        ["tenant_id"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+    op.execute("ALTER TABLE import_jobs ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE import_jobs FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"""
+        CREATE POLICY import_jobs_tenant_isolation ON import_jobs
+        USING (tenant_id = {TENANT_EXPR})
+        WITH CHECK (tenant_id = {TENANT_EXPR});
+        """
+    )
+    op.execute(f"GRANT SELECT, INSERT, UPDATE, DELETE ON import_jobs TO {PG_ROLE}")
+    op.execute(f"GRANT USAGE, SELECT ON SEQUENCE import_jobs_id_seq TO {PG_ROLE}")
+
+    # dono da tabela também passa pelo RLS (FORCE): libera só durante o backfill
+    for table in ("parts", "motorcycles"):
+        op.execute(f"ALTER TABLE {table} NO FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"UPDATE motorcycles SET plate = NULLIF({PLATE_EXPR}, '') "
+        f"WHERE plate IS DISTINCT FROM NULLIF({PLATE_EXPR}, '')"
+    )
+    for table, key in (("parts", "sku"), ("motorcycles", "plate")):
+        op.execute(
+            f"""
+            UPDATE {table} SET is_active = false
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY tenant_id, {key} ORDER BY id) AS n
+                FROM {table}
+                WHERE is_active AND {key} IS NOT NULL
+            ) AS ranked
+            WHERE {table}.id = ranked.id AND ranked.n > 1
+            """
+        )
+    for table in ("parts", "motorcycles"):
+        op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+
+    for name, table, columns, where, unique in INDEXES:
+        op.create_index(
+            name, table, columns, unique=unique, postgresql_where=sa.text(where)
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns, _where, _unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.execute(f"REVOKE ALL PRIVILEGES ON import_jobs FROM {PG_ROLE}")
+    op.execute("DROP POLICY IF EXISTS import_jobs_tenant_isolation ON import_jobs")
+    op.drop_index("ix_import_jobs_tenant_active", table_name="import_jobs")
+    op.drop_index("ix_import_jobs_tenant_id", table_name="import_jobs")
+    op.drop_table("import_jobs")
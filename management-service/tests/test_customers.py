@@ -53,3 +53,50 @@ def test_create_and_get_customer(client):
     assert get_resp.status_code == 200
     get_data = get_resp.get_json()
     assert get_data["name"] == "Cliente Teste"
+
+
+def test_list_customers_keyset_pagination(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    for i in range(5):
+        client.post("/customers/", json={"name": f"Cliente {i}"}, headers=headers)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        url = "/customers/?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        resp = client.get(url, headers=headers)
+        assert resp.status_code == 200
+        seen.extend(c["name"] for c in resp.get_json())
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == [f"Cliente {i}" for i in range(5)]
+    assert len(set(seen)) == 5
+
+
+def test_list_customers_rejects_bad_cursor(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    assert client.get("/customers/?cursor=lixo", headers=headers).status_code == 400
+    assert client.get("/customers/?limit=0", headers=headers).status_code == 400
+
+
+def test_list_customers_without_limit_returns_everything(client, monkeypatch):
+    monkeypatch.setattr("app.pagination.DEFAULT_LIMIT", 2)
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    for i in range(5):
+        client.post("/customers/", json={"name": f"Cliente {i}"}, headers=headers)
+
+    # cliente antigo: sem limit nem cursor, lista inteira e sem cursor
+    resp = client.get("/customers/", headers=headers)
+    assert len(resp.get_json()) == 5
+    assert "X-Next-Cursor" not in resp.headers
+
+    # seguindo um cursor sem limit, vale o DEFAULT_LIMIT
+    first = client.get("/customers/?limit=1", headers=headers)
+    second = client.get(f"/customers/?cursor={first.headers['X-Next-Cursor']}", headers=headers)
+    assert len(second.get_json()) == 2
+    assert "X-Next-Cursor" in second.headers
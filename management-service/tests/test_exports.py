@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+import socket
+import subprocess
+import sys
+import time
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+
+import pytest
+
+from flask_jwt_extended import create_access_token
+
+SHEET_NS = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_ENV", "test")
+    # o XLSX é gerado numa thread do pool: banco em arquivo, não :memory:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'exports.db'}")
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path / "exports"))
+
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, tenant_id=1, role="owner"):
+    with app.app_context():
+        token = create_access_token(
+            identity="1", additional_claims={"tenant_id": tenant_id, "role": role}
+        )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create_orders(client, headers, count, tenant_id=1, name="Cliente"):
+    customer = client.post("/customers/", json={"name": name}, headers=headers).get_json()
+    moto = client.post(
+        "/motos/", json={"customer_id": customer["id"], "plate": "ABC1D23"}, headers=headers
+    ).get_json()
+    ids = []
+    for i in range(count):
+        resp = client.post(
+            "/os/",
+            json={
+                "tenant_id": tenant_id,
+                "customer_id": customer["id"],
+                "motorcycle_id": moto["id"],
+                "description": f"Revisão {i}",
+            },
+            headers=headers,
+        )
+        ids.append(resp.get_json()["id"])
+    return ids
+
+
+def test_os_csv_export_streams_and_resumes_after_last_id(client):
+    headers = auth_headers(client.application)
+    ids = _create_orders(client, headers, 5, name="=Cliente, Ltda")
+    _create_orders(client, auth_headers(client.application, tenant_id=2), 2, tenant_id=2)
+
+    resp = client.get("/exports/os?format=csv", headers=headers)
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+    assert resp.headers["Content-Disposition"] == 'attachment; filename="os.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert [int(r["id"]) for r in rows] == ids  # só o tenant, em ordem de id
+    assert rows[0]["customer"] == "'=Cliente, Ltda"
+    assert rows[0]["motorcycle_plate"] == "ABC1D23"
+    assert rows[0]["description"] == "Revisão 0"
+    assert rows[0]["status"] == "OPEN"
+
+    # retomada: sem cabeçalho, continua depois do último id recebido
+    resumed = client.get(f"/exports/os?format=csv&after={ids[2]}", headers=headers)
+    lines = resumed.get_data(as_text=True).splitlines()
+    assert [int(line.split(",")[0]) for line in lines] == ids[3:]
+
+
+def test_movements_ndjson_export_with_filters(client):
+    headers = auth_headers(client.application)
+    part = client.post(
+        "/parts/", json={"sku": "P-1", "name": "Pastilha", "quantity_in_stock": 0}, headers=headers
+    ).get_json()
+    for movement_type, quantity in (("in", 10), ("out", 3), ("in", 5)):
+        client.post(
+            f"/parts/{part['id']}/stock-movement",
+            json={"movement_type": movement_type, "quantity": quantity},
+            headers=headers,
+        )
+
+    resp = client.get("/exports/movements?format=ndjson&movement_type=in", headers=headers)
+    assert resp.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [(r["sku"], r["movement_type"], r["quantity"]) for r in rows] == [
+        ("P-1", "in", 10),
+        ("P-1", "in", 5),
+    ]
+
+    resp = client.get(f"/exports/movements?format=ndjson&part_id={part['id']}", headers=headers)
+    assert len(resp.get_data(as_text=True).splitlines()) == 3
+    resp = client.get(f"/exports/movements?part_id={part['id'] + 1}", headers=headers)
+    assert resp.get_data(as_text=True).splitlines() == [
+        "id,part_id,sku,part_name,movement_type,quantity,reason,related_order_id,created_at"
+    ]
+    for url in ("/exports/movements?part_id=abc", "/exports/os?customer_id=1%20OR%201=1"):
+        resp = client.get(url, headers=headers)
+        assert resp.status_code == 400
+        assert "deve ser um número inteiro" in resp.get_json()["error"]
+    assert client.post("/exports/os/xlsx?customer_id=x", headers=headers).status_code == 400
+    assert client.get("/exports/movements?from=ontem", headers=headers).status_code == 400
+    assert client.get("/exports/movements?format=xml", headers=headers).status_code == 400
+    assert client.get("/exports/parts", headers=headers).status_code == 404
+    mechanic = auth_headers(client.application, role="mechanic")
+    assert client.get("/exports/movements", headers=mechanic).status_code == 403
+
+
+def _wait(client, headers, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/exports/jobs/{job_id}", headers=headers).get_json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"export {job_id} não terminou: {job}")
+
+
+def test_os_xlsx_job_writes_sheet_and_supports_range_download(client):
+    headers = auth_headers(client.application)
+    ids = _create_orders(client, headers, 3)
+
+    resp = client.post("/exports/os/xlsx", headers=headers)
+    assert resp.status_code == 202
+    job_id = resp.get_json()["id"]
+    assert resp.headers["Location"].endswith(f"/exports/jobs/{job_id}")
+
+    job = _wait(client, headers, job_id)
+    assert (job["status"], job["rows"]) == ("done", 3)
+
+    download = client.get(f"/exports/jobs/{job_id}/download", headers=headers)
+    assert download.status_code == 200
+    body = download.get_data()
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = sheet.findall("s:sheetData/s:row", SHEET_NS)
+    assert len(rows) == 4
+    assert rows[0][0].findtext("s:is/s:t", namespaces=SHEET_NS) == "id"
+    assert [int(r[0].findtext("s:v", namespaces=SHEET_NS)) for r in rows[1:]] == ids
+
+    # download retomável: Range devolve só o pedaço pedido
+    partial = client.get(
+        f"/exports/jobs/{job_id}/download", headers={**headers, "Range": "bytes=100-"}
+    )
+    assert partial.status_code == 206
+    assert partial.get_data() == body[100:]
+
+    # job de outro tenant não aparece
+    other = auth_headers(client.application, tenant_id=2)
+    assert client.get(f"/exports/jobs/{job_id}", headers=other).status_code == 404
+    assert client.get(f"/exports/jobs/{job_id}/download", headers=other).status_code == 404
+
+
+def test_xlsx_job_of_a_dead_worker_is_marked_failed(client):
+    from app.exports import save_job
+
+    headers = auth_headers(client.application)
+    finished = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+    )
+    dead_pid = int(finished.stdout)
+    old = (datetime.utcnow() - timedelta(hours=2)).isoformat()
+    jobs = {
+        # processo deste host que já morreu (job recente)
+        "a" * 32: ("running", f"{socket.gethostname()}:{dead_pid}", datetime.utcnow().isoformat()),
+        # outro host rodando sem heartbeat há 2 h
+        "b" * 32: ("running", "outro-host:1", old),
+        # outro host, na fila: só está esperando o pool de lá
+        "c" * 32: ("queued", "outro-host:1", None),
+    }
+    with client.application.app_context():
+        for job_id, (status, worker, heartbeat_at) in jobs.items():
+            save_job(
+                {
+                    "id": job_id,
+                    "tenant_id": 1,
+                    "kind": "os",
+                    "status": status,
+                    "worker": worker,
+                    "created_at": old,
+                    "heartbeat_at": heartbeat_at,
+                }
+            )
+
+    statuses = {
+        job_id: client.get(f"/exports/jobs/{job_id}", headers=headers).get_json()["status"]
+        for job_id in jobs
+    }
+    assert statuses == {"a" * 32: "failed", "b" * 32: "failed", "c" * 32: "queued"}
+    download = client.get(f"/exports/jobs/{'a' * 32}/download", headers=headers)
+    assert download.status_code == 409
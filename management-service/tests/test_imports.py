@@ -0,0 +1,261 @@
+import json
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_ENV", "test")
+    # o job roda numa thread do pool: banco em arquivo, não :memory:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'imports.db'}")
+    monkeypatch.setenv("IMPORT_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setenv("IMPORT_BATCH_SIZE", "3")
+
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, tenant_id=1, role="owner"):
+    with app.app_context():
+        token = create_access_token(
+            identity="1", additional_claims={"tenant_id": tenant_id, "role": role}
+        )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _import(client, headers, kind, body, content_type):
+    resp = client.post(
+        f"/imports/{kind}", data=body, headers={**headers, "Content-Type": content_type}
+    )
+    assert resp.status_code == 202, resp.get_json()
+    assert resp.headers["Location"].endswith(f"/imports/{resp.get_json()['id']}")
+    return _wait(client, headers, resp.get_json()["id"])
+
+
+def _wait(client, headers, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/imports/{job_id}", headers=headers).get_json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"import {job_id} não terminou: {job}")
+
+
+def test_parts_csv_import_upserts_by_sku_and_reports_row_errors(client):
+    headers = auth_headers(client.application)
+    client.post(
+        "/parts/",
+        json={"sku": "P-1", "name": "Antigo", "unit_price": 5, "quantity_in_stock": 7},
+        headers=headers,
+    )
+
+    csv_body = (
+        "sku;name;unit_price;quantity_in_stock\n"
+        "P-1;Pastilha dianteira;49,90;100\n"
+        "P-2;Filtro de óleo;25.5;10\n"
+        ";Sem sku;1;1\n"
+        "P-3;Vela;abc;1\n"
+        "P-4;Corrente;120;3\n"
+        "P-2;Filtro de óleo (novo);26;10\n"
+        "P-5;Relação;300;\n"
+    ).encode()
+    job = _import(client, headers, "parts", csv_body, "text/csv")
+
+    assert job["status"] == "done"
+    assert job["progress"] == 1.0
+    assert (job["rows_processed"], job["rows_inserted"], job["rows_updated"]) == (7, 3, 2)
+    assert job["error_count"] == 2
+    assert job["errors"] == [
+        {"row": 4, "error": "sku é obrigatório"},
+        {"row": 5, "error": "unit_price deve ser numérico"},
+    ]
+
+    parts = {p["sku"]: p for p in client.get("/parts/", headers=headers).get_json()}
+    assert sorted(parts) == ["P-1", "P-2", "P-4", "P-5"]
+    # existente: preço/nome atualizados, saldo só muda por movimentação
+    assert parts["P-1"]["name"] == "Pastilha dianteira"
+    assert parts["P-1"]["unit_price"] == 49.9
+    assert parts["P-1"]["quantity_in_stock"] == 7
+    # lotes de 3: P-2 repetido em outro lote vira atualização
+    assert parts["P-2"]["name"] == "Filtro de óleo (novo)"
+    assert parts["P-5"]["quantity_in_stock"] == 0
+
+
+def test_customers_then_motorcycles_ndjson_import(client):
+    headers = auth_headers(client.application)
+    customers = "\n".join(
+        json.dumps(row)
+        for row in [
+            {"name": "Ana", "document": "111"},
+            {"name": "Bruno", "document": "222"},
+            {"name": "Sem documento"},
+        ]
+    )
+    job = _import(client, headers, "customers", customers.encode(), "application/x-ndjson")
+    assert (job["rows_inserted"], job["error_count"]) == (3, 0)
+
+    motos = "\n".join(
+        [
+            json.dumps({"plate": "abc-1d23", "brand": "Honda", "customer_document": "111"}),
+            json.dumps({"plate": "XYZ9K88", "customer_document": "999"}),
+            "não é json",
+            json.dumps({"plate": "ABC1D23", "model": "CG 160", "customer_document": "222"}),
+        ]
+    )
+    job = _import(client, headers, "motorcycles", motos.encode(), "application/x-ndjson")
+
+    assert job["status"] == "done"
+    assert job["rows_inserted"] == 1
+    assert sorted(job["errors"], key=lambda e: e["row"]) == [
+        {"row": 2, "error": "cliente não encontrado"},
+        {"row": 3, "error": "JSON inválido"},
+    ]
+    motos = client.get("/motos/", headers=headers).get_json()
+    assert len(motos) == 1
+    assert motos[0]["plate"] == "ABC1D23"
+    assert motos[0]["model"] == "CG 160"
+
+
+def test_motorcycle_import_matches_plates_typed_in_the_api(client):
+    headers = auth_headers(client.application)
+    customer = client.post(
+        "/customers/", json={"name": "Ana", "document": "111"}, headers=headers
+    ).get_json()
+    created = client.post(
+        "/motos/", json={"customer_id": customer["id"], "plate": "abc-1234"}, headers=headers
+    ).get_json()
+    assert created["plate"] == "ABC1234"
+    other = client.post(
+        "/motos/", json={"customer_id": customer["id"], "plate": "XYZ0000"}, headers=headers
+    ).get_json()
+    client.patch(f"/motos/{other['id']}", json={"plate": "xyz 9k88"}, headers=headers)
+
+    body = "plate,model,customer_document\nABC-1234,CG 160,111\nXYZ-9K88,Biz,111\n"
+    job = _import(client, headers, "motorcycles", body.encode(), "text/csv")
+
+    assert (job["rows_inserted"], job["rows_updated"]) == (0, 2)
+    motos = client.get("/motos/?plate=abc-12", headers=headers).get_json()
+    assert [(m["plate"], m["model"]) for m in motos] == [("ABC1234", "CG 160")]
+
+
+def test_active_sku_and_plate_are_unique_per_tenant(client, app, monkeypatch):
+    headers = auth_headers(app)
+    part = {"sku": "P-1", "name": "Pastilha"}
+    assert client.post("/parts/", json=part, headers=headers).status_code == 201
+    assert client.post("/parts/", json=part, headers=headers).status_code == 409
+    other = client.post("/parts/", json={"sku": "P-2", "name": "Vela"}, headers=headers)
+    resp = client.patch(f"/parts/{other.get_json()['id']}", json={"sku": "P-1"}, headers=headers)
+    assert resp.status_code == 409
+    other_tenant = auth_headers(app, tenant_id=2)
+    assert client.post("/parts/", json=part, headers=other_tenant).status_code == 201
+
+    customer = client.post("/customers/", json={"name": "Ana"}, headers=headers).get_json()
+    moto = {"customer_id": customer["id"], "plate": "ABC1D23"}
+    assert client.post("/motos/", json=moto, headers=headers).status_code == 201
+    moto["plate"] = "abc-1d23"
+    assert client.post("/motos/", json=moto, headers=headers).status_code == 409
+
+    # dois POST /imports ao mesmo tempo: o segundo passa pela checagem e bate no índice
+    from app import routes_imports
+    from app.models import ImportJob, db
+
+    with app.app_context():
+        db.session.add(ImportJob(tenant_id=1, kind="parts", file_format="csv", status="running"))
+        db.session.commit()
+    monkeypatch.setattr(routes_imports, "_active_job", lambda tenant_id: None)
+    resp = client.post("/imports/parts?format=csv", data=b"sku,name\n", headers=headers)
+    assert resp.status_code == 409
+
+
+def test_import_requires_manager_and_known_format(client):
+    headers = auth_headers(client.application)
+
+    resp = client.post("/imports/parts", data=b"sku,name\n", headers=headers)
+    assert resp.status_code == 400
+
+    mechanic = auth_headers(client.application, role="mechanic")
+    resp = client.post("/imports/parts?format=csv", data=b"sku,name\n", headers=mechanic)
+    assert resp.status_code == 403
+
+    assert client.post("/imports/orders?format=csv", data=b"", headers=headers).status_code == 404
+
+
+def test_import_rejects_oversized_upload(client, app):
+    headers = auth_headers(app)
+    app.config["IMPORT_MAX_BYTES"] = 10
+
+    resp = client.post(
+        "/imports/parts?format=csv", data=b"sku,name\nP-1,Pastilha\n", headers=headers
+    )
+    assert resp.status_code == 413
+    assert client.get("/imports/", headers=headers).get_json() == []
+
+
+def test_stale_jobs_fail_instead_of_blocking_the_tenant(client, app):
+    from app.models import ImportJob, db
+
+    headers = auth_headers(app)
+    finished = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True
+    )
+    dead_pid = int(finished.stdout)
+    with app.app_context():
+        db.session.add_all(
+            [
+                # worker de outro host sem heartbeat há 2 h
+                ImportJob(
+                    tenant_id=1,
+                    kind="parts",
+                    file_format="csv",
+                    status="running",
+                    worker="outro-host:1",
+                    heartbeat_at=datetime.utcnow() - timedelta(hours=2),
+                ),
+                # processo deste host que já morreu (job recente)
+                ImportJob(
+                    tenant_id=2,
+                    kind="parts",
+                    file_format="csv",
+                    status="queued",
+                    worker=f"{socket.gethostname()}:{dead_pid}",
+                ),
+                # outro host, heartbeat recente: continua valendo
+                ImportJob(
+                    tenant_id=3,
+                    kind="parts",
+                    file_format="csv",
+                    status="running",
+                    worker="outro-host:1",
+                    heartbeat_at=datetime.utcnow(),
+                ),
+            ]
+        )
+        db.session.commit()
+
+    job = _import(client, headers, "parts", b"sku,name\nP-1,Pastilha\n", "text/csv")
+    assert job["status"] == "done"
+    stale = client.get("/imports/1", headers=headers).get_json()
+    assert stale["status"] == "failed"
+    assert "interrompida" in stale["message"]
+
+    other = auth_headers(app, tenant_id=2)
+    assert client.get("/imports/2", headers=other).get_json()["status"] == "failed"
+
+    busy = auth_headers(app, tenant_id=3)
+    assert client.get("/imports/3", headers=busy).get_json()["status"] == "running"
+    resp = client.post("/imports/parts?format=csv", data=b"sku,name\n", headers=busy)
+    assert (resp.status_code, resp.get_json()["id"]) == (409, 3)
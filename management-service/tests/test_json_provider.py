@@ -0,0 +1,78 @@
+import datetime as dt
+import json
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify, request
+
+from app.json_provider import FastJSONProvider
+
+ROW = {
+    "id": 1,
+    "total_amount": Decimal("150.75"),
+    "created_at": dt.datetime(2024, 10, 1, 14, 30, 5, 120000),
+    "scheduled_date": dt.date(2024, 10, 3),
+    "closed_at": None,
+    7: "chave numérica",
+}
+
+EXPECTED = {
+    "id": 1,
+    "total_amount": 150.75,
+    "created_at": "2024-10-01T14:30:05.120000",
+    "scheduled_date": "2024-10-03",
+    "closed_at": None,
+    "7": "chave numérica",
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def app(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr("app.json_provider.orjson", None)
+    application = Flask("test")
+    application.json = FastJSONProvider(application)
+    return application
+
+
+def test_jsonify_handles_decimal_and_dates_like_the_old_routes(app):
+    with app.app_context():
+        resp = jsonify([ROW])
+    assert resp.mimetype == "application/json"
+    assert json.loads(resp.get_data()) == [EXPECTED]
+    # mesmo formato que o antigo float(...) / .isoformat()
+    assert json.loads(resp.get_data())[0]["created_at"] == ROW["created_at"].isoformat()
+
+
+def test_request_json_roundtrip(app):
+    @app.post("/echo")
+    def echo():
+        return jsonify(request.get_json())
+
+    resp = app.test_client().post(
+        "/echo", data=json.dumps({"a": [1, 2.5, "ç"]}), content_type="application/json"
+    )
+    assert resp.get_json() == {"a": [1, 2.5, "ç"]}
+
+
+def test_huge_ints_fall_back_to_stdlib():
+    application = Flask("test")
+    application.json = FastJSONProvider(application)
+    with application.app_context():
+        resp = jsonify({"big": 2**70})
+    assert json.loads(resp.get_data()) == {"big": 2**70}
+
+
+def test_list_os_serializes_model_values(monkeypatch):
+    monkeypatch.setenv("APP_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    from app import create_app
+    from tests.test_os import _create_order, auth_headers
+
+    client = create_app().test_client()
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    _create_order(client, headers)
+
+    order = client.get("/os/", headers=headers).get_json()[0]
+    assert order["total_amount"] == 0
+    dt.datetime.fromisoformat(order["created_at"])
@@ -0,0 +1,331 @@
+import itertools
+from contextlib import contextmanager
+
+import pytest
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    monkeypatch.setenv("APP_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+
+    from app import create_app
+
+    application = create_app()
+    return application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, identity: dict):
+    with app.app_context():
+        token = create_access_token(identity=str(identity.get('sub', '1')), additional_claims={'tenant_id': identity.get('tenant_id'), 'role': identity.get('role')})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_queries(app):
+    from app.models import db
+
+    statements = []
+
+    def _before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+_PLATES = itertools.count(1)
+
+
+def _create_order(client, headers, tenant_id=1):
+    customer = client.post("/customers/", json={"name": "Cliente OS"}, headers=headers).get_json()
+    # placa ativa é única por tenant
+    plate = f"ABC{next(_PLATES):04d}"
+    moto = client.post(
+        "/motos/", json={"customer_id": customer["id"], "plate": plate}, headers=headers
+    ).get_json()
+    resp = client.post(
+        "/os/",
+        json={"tenant_id": tenant_id, "customer_id": customer["id"], "motorcycle_id": moto["id"]},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def test_os_stats_counts_by_status(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    other = auth_headers(client.application, {"tenant_id": 2, "role": "owner"})
+
+    first = _create_order(client, headers)
+    _create_order(client, headers)
+    done = _create_order(client, headers)
+    _create_order(client, other, tenant_id=2)
+
+    client.patch(f"/os/{first}/status", json={"tenant_id": 1, "status": "IN_PROGRESS"}, headers=headers)
+    client.patch(f"/os/{done}/status", json={"tenant_id": 1, "status": "COMPLETED"}, headers=headers)
+
+    resp = client.get("/os/stats", headers=headers)
+    assert resp.status_code == 200
+    assert resp.get_json() == {
+        "total": 3,
+        "open": 2,
+        "completed": 1,
+        "by_status": {"OPEN": 1, "IN_PROGRESS": 1, "COMPLETED": 1},
+    }
+
+
+def test_list_os_query_count_is_constant(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+
+    _create_order(client, headers)
+    with count_queries(client.application) as few:
+        assert len(client.get("/os/", headers=headers).get_json()) == 1
+
+    for _ in range(9):
+        _create_order(client, headers)
+    with count_queries(client.application) as many:
+        orders = client.get("/os/", headers=headers).get_json()
+
+    assert len(orders) == 10
+    assert all(
+        o["customer"] == "Cliente OS" and o["motorcycle_plate"].startswith("ABC") for o in orders
+    )
+    assert len(many) == len(few)
+
+
+def test_get_os_query_count_is_constant(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+
+    def _add_labor():
+        client.post(
+            f"/os/{order_id}/items",
+            json={"tenant_id": 1, "item_type": "labor", "description": "Mão de obra", "unit_price": 50},
+            headers=headers,
+        )
+
+    _add_labor()
+    with count_queries(client.application) as few:
+        client.get(f"/os/{order_id}", headers=headers)
+
+    for _ in range(5):
+        _add_labor()
+    with count_queries(client.application) as many:
+        body = client.get(f"/os/{order_id}", headers=headers).get_json()
+
+    assert len(body["items"]) == 6
+    assert len(many) == len(few)
+
+
+def _add_item(client, headers, order_id, item_type="labor", unit_price=50, quantity=1):
+    return client.post(
+        f"/os/{order_id}/items",
+        json={
+            "tenant_id": 1,
+            "item_type": item_type,
+            "description": "Mão de obra",
+            "quantity": quantity,
+            "unit_price": unit_price,
+        },
+        headers=headers,
+    ).get_json()
+
+
+def test_item_edits_apply_deltas_to_order_totals(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+
+    first = _add_item(client, headers, order_id, unit_price="10.005")
+    second = _add_item(client, headers, order_id, unit_price=40, quantity=2)
+    assert second["order_totals"]["total_labor"] == 90.01
+
+    client.patch(
+        f"/os/{order_id}/items/{first['id']}", json={"unit_price": 15}, headers=headers
+    )
+    client.delete(f"/os/{order_id}/items/{second['id']}", headers=headers)
+
+    body = client.get(f"/os/{order_id}", headers=headers).get_json()
+    assert body["total_labor"] == 15.0
+    assert body["total_amount"] == 15.0
+
+
+def test_item_update_does_not_reload_order_items(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+    item_id = _add_item(client, headers, order_id)["id"]
+
+    with count_queries(client.application) as few:
+        client.patch(f"/os/{order_id}/items/{item_id}", json={"unit_price": 60}, headers=headers)
+
+    for _ in range(20):
+        _add_item(client, headers, order_id)
+    with count_queries(client.application) as many:
+        client.patch(f"/os/{order_id}/items/{item_id}", json={"unit_price": 70}, headers=headers)
+
+    assert len(many) == len(few)
+
+
+def test_verify_order_totals_repairs_drift(client):
+    from app.models import ServiceOrder, db
+
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    good = _create_order(client, headers)
+    drifted = _create_order(client, headers)
+    _add_item(client, headers, good, unit_price=30)
+    _add_item(client, headers, drifted, unit_price=20)
+
+    with client.application.app_context():
+        db.session.get(ServiceOrder, drifted).total_labor = 999
+        db.session.commit()
+
+    runner = client.application.test_cli_runner()
+    result = runner.invoke(args=["verify-order-totals"])
+    assert "service_orders: 1 divergentes" in result.output
+
+    result = runner.invoke(args=["verify-order-totals", "--repair"])
+    assert f"OS #{drifted}" in result.output
+
+    body = client.get(f"/os/{drifted}", headers=headers).get_json()
+    assert (body["total_labor"], body["total_amount"]) == (20.0, 20.0)
+    result = runner.invoke(args=["verify-order-totals"])
+    assert "service_orders: 0 divergentes" in result.output
+
+
+def test_repair_recomputes_totals_under_lock_instead_of_stale_values(client):
+    from app.models import ServiceOrder, db
+    from app.order_totals import _repair_totals, verify_order_totals
+
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+    _add_item(client, headers, order_id, unit_price=20)
+
+    with client.application.app_context():
+        db.session.get(ServiceOrder, order_id).total_labor = 999
+        db.session.commit()
+        assert [row["id"] for row in verify_order_totals()] == [order_id]
+
+    # item incluído entre a conferência e o reparo: entra na soma gravada
+    _add_item(client, headers, order_id, unit_price=5)
+    with client.application.app_context():
+        repaired = _repair_totals([order_id])
+        db.session.commit()
+        assert _repair_totals([order_id]) == []
+
+    assert [(row["total_labor"], row["total_amount"]) for row in repaired] == [(25, 25)]
+    body = client.get(f"/os/{order_id}", headers=headers).get_json()
+    assert (body["total_labor"], body["total_amount"]) == (25.0, 25.0)
+
+
+def _create_part(client, headers, sku, quantity):
+    return client.post(
+        "/parts/",
+        json={"sku": sku, "name": f"Peça {sku}", "quantity_in_stock": quantity},
+        headers=headers,
+    ).get_json()["id"]
+
+
+def _part_stock(client, headers):
+    return {p["id"]: p["quantity_in_stock"] for p in client.get("/parts/", headers=headers).get_json()}
+
+
+def test_items_batch_inserts_all_lines_in_one_transaction(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+    oil = _create_part(client, headers, "OLEO", 10)
+    filt = _create_part(client, headers, "FILTRO", 5)
+
+    resp = client.post(
+        f"/os/{order_id}/items:batch",
+        json={
+            "tenant_id": 1,
+            "items": [
+                {"item_type": "part", "part_id": oil, "quantity": 2, "unit_price": 30},
+                {"item_type": "part", "part_id": filt, "quantity": 1, "unit_price": 25},
+                {"item_type": "part", "part_id": oil, "quantity": 1, "unit_price": 30},
+                {"item_type": "labor", "description": "Revisão", "unit_price": 120},
+            ],
+        },
+        headers=headers,
+    )
+
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert [i["description"] for i in body["items"]] == [
+        "Peça OLEO",
+        "Peça FILTRO",
+        "Peça OLEO",
+        "Revisão",
+    ]
+    assert body["order_totals"] == {"total_parts": 115.0, "total_labor": 120.0, "total_amount": 235.0}
+    assert _part_stock(client, headers) == {oil: 7, filt: 4}
+    assert len(client.get(f"/os/{order_id}", headers=headers).get_json()["items"]) == 4
+
+
+def test_items_batch_is_all_or_nothing(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+    oil = _create_part(client, headers, "OLEO", 10)
+    filt = _create_part(client, headers, "FILTRO", 1)
+
+    resp = client.post(
+        f"/os/{order_id}/items:batch",
+        json={
+            "tenant_id": 1,
+            "items": [
+                {"item_type": "labor", "description": "Revisão", "unit_price": 120},
+                {"item_type": "part", "part_id": oil, "quantity": 2, "unit_price": 30},
+                {"item_type": "part", "part_id": filt, "quantity": 2, "unit_price": 25},
+            ],
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "estoque insuficiente", "part_id": filt}
+
+    resp = client.post(
+        f"/os/{order_id}/items:batch",
+        json={"tenant_id": 1, "items": [{"item_type": "labor"}, {"item_type": "part", "part_id": 999}]},
+        headers=headers,
+    )
+    assert resp.get_json() == {"error": "peça inválida", "index": 1}
+
+    body = client.get(f"/os/{order_id}", headers=headers).get_json()
+    assert body["items"] == []
+    assert body["total_amount"] == 0
+    assert _part_stock(client, headers) == {oil: 10, filt: 1}
+
+
+def test_items_batch_query_count_does_not_grow_with_lines(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    order_id = _create_order(client, headers)
+    oil = _create_part(client, headers, "OLEO", 1000)
+
+    def _batch(size):
+        lines = [{"item_type": "part", "part_id": oil, "unit_price": 30}] * size
+        lines += [{"item_type": "labor", "unit_price": 50}] * size
+        with count_queries(client.application) as statements:
+            resp = client.post(
+                f"/os/{order_id}/items:batch", json={"tenant_id": 1, "items": lines}, headers=headers
+            )
+        assert resp.status_code == 201
+        return statements
+
+    # os INSERTs viram um só no Postgres (insertmanyvalues); o SQLite do teste
+    # ainda manda um por linha, então conta só o resto
+    few = [s for s in _batch(2) if not s.startswith("INSERT")]
+    many = [s for s in _batch(20) if not s.startswith("INSERT")]
+    assert len(many) == len(few)
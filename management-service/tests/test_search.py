@@ -0,0 +1,60 @@
+import pytest
+
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    monkeypatch.setenv("APP_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+
+    from app import create_app
+
+    application = create_app()
+    return application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, identity: dict):
+    with app.app_context():
+        token = create_access_token(identity=str(identity.get('sub', '1')), additional_claims={'tenant_id': identity.get('tenant_id'), 'role': identity.get('role')})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_search_ranks_prefix_matches_first(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    other = auth_headers(client.application, {"tenant_id": 2, "role": "owner"})
+    for name in ("Maria Joana", "Joana Silva", "Jo", "Joana"):
+        client.post("/customers/", json={"name": name}, headers=headers)
+    client.post("/customers/", json={"name": "Joana Outro Tenant"}, headers=other)
+    client.post("/parts/", json={"sku": "JOA-1", "name": "Pastilha"}, headers=headers)
+
+    resp = client.get("/search/?q=joana", headers=headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert [c["name"] for c in data["customers"]] == ["Joana", "Joana Silva", "Maria Joana"]
+    assert data["parts"] == []
+    assert data["motos"] == []
+
+    limited = client.get("/search/?q=jo&types=customers,parts&limit=2", headers=headers).get_json()
+    assert set(limited) == {"customers", "parts"}
+    assert [c["name"] for c in limited["customers"]] == ["Jo", "Joana"]
+    assert [p["sku"] for p in limited["parts"]] == ["JOA-1"]
+
+
+def test_search_ignores_short_terms_and_escapes_wildcards(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    client.post("/customers/", json={"name": "Oficina 100%"}, headers=headers)
+    client.post("/customers/", json={"name": "Oficina 1000"}, headers=headers)
+
+    assert client.get("/search/?q=o", headers=headers).get_json()["customers"] == []
+
+    names = [c["name"] for c in client.get("/search/?q=100%25", headers=headers).get_json()["customers"]]
+    assert names == ["Oficina 100%"]
+
+    listed = client.get("/customers/?q=100%25", headers=headers).get_json()
+    assert [c["name"] for c in listed] == ["Oficina 100%"]
@@ -0,0 +1,299 @@
+import os
+import threading
+
+import pytest
+
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("APP_ENV", "test")
+    # arquivo (não :memory:) pra cada thread ter a própria conexão no mesmo banco;
+    # STOCK_TEST_DATABASE_URL aponta o teste pra um Postgres de verdade
+    monkeypatch.setenv(
+        "DATABASE_URL",
+        os.getenv("STOCK_TEST_DATABASE_URL", f"sqlite:///{tmp_path / 'stock.db'}"),
+    )
+
+    from app import create_app
+    from app.models import db
+
+    application = create_app()
+    yield application
+    with application.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, tenant_id=1, role="owner"):
+    with app.app_context():
+        token = create_access_token(
+            identity="1", additional_claims={"tenant_id": tenant_id, "role": role}
+        )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create_part(client, headers, quantity):
+    resp = client.post(
+        "/parts/",
+        json={"sku": "SKU-1", "name": "Pastilha", "quantity_in_stock": quantity},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def _create_order(client, headers):
+    customer = client.post("/customers/", json={"name": "Cliente"}, headers=headers).get_json()
+    moto = client.post(
+        "/motos/", json={"customer_id": customer["id"], "plate": "ABC1D23"}, headers=headers
+    ).get_json()
+    resp = client.post(
+        "/os/",
+        json={"tenant_id": 1, "customer_id": customer["id"], "motorcycle_id": moto["id"]},
+        headers=headers,
+    )
+    return resp.get_json()["id"]
+
+
+def _stock(client, headers, part_id):
+    parts = client.get("/parts/", headers=headers).get_json()
+    return next(p["quantity_in_stock"] for p in parts if p["id"] == part_id)
+
+
+def _add_part(client, headers, order_id, part_id, quantity):
+    return client.post(
+        f"/os/{order_id}/items",
+        json={
+            "tenant_id": 1,
+            "item_type": "part",
+            "part_id": part_id,
+            "quantity": quantity,
+            "unit_price": 10,
+        },
+        headers=headers,
+    )
+
+
+def _set_status(client, headers, order_id, status):
+    return client.patch(
+        f"/os/{order_id}/status", json={"tenant_id": 1, "status": status}, headers=headers
+    )
+
+
+def test_concurrent_takes_never_oversell(app):
+    headers = auth_headers(app)
+    part_id = _create_part(app.test_client(), headers, quantity=25)
+
+    results = []
+    lock = threading.Lock()
+    start = threading.Barrier(8)
+
+    def hammer():
+        client = app.test_client()
+        start.wait()
+        for _ in range(10):
+            resp = client.post(
+                f"/parts/{part_id}/stock-movement",
+                json={"movement_type": "out", "quantity": 1},
+                headers=headers,
+            )
+            with lock:
+                results.append((resp.status_code, resp.get_json()))
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ok = [body["stock"] for status, body in results if status == 200]
+    assert len(results) == 80
+    assert len(ok) == 25
+    # cada baixa aceita viu um saldo diferente: nenhuma leitura "perdida"
+    assert sorted(ok) == list(range(25))
+    assert {status for status, _ in results} <= {200, 400, 409}
+
+    client = app.test_client()
+    assert _stock(client, headers, part_id) == 0
+    movements = client.get(f"/parts/{part_id}/movements?limit=100", headers=headers)
+    assert len(movements.get_json()) == 25
+
+
+def test_out_movement_rejects_insufficient_stock(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=2)
+
+    resp = client.post(
+        f"/parts/{part_id}/stock-movement",
+        json={"movement_type": "out", "quantity": 3},
+        headers=headers,
+    )
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "estoque insuficiente"}
+    assert _stock(client, headers, part_id) == 2
+
+
+def test_stock_movement_rejects_non_positive_and_non_integer_quantities(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=2)
+    url = f"/parts/{part_id}/stock-movement"
+
+    for movement_type, quantity in (
+        ("out", -5),
+        ("in", -5),
+        ("out", 0),
+        ("in", "0"),
+        ("adjust", -1),
+        ("out", "abc"),
+        ("in", 1.5),
+        ("in", [1]),
+        ("in", True),
+    ):
+        resp = client.post(
+            url, json={"movement_type": movement_type, "quantity": quantity}, headers=headers
+        )
+        assert resp.status_code == 400, (movement_type, quantity)
+    assert _stock(client, headers, part_id) == 2
+
+    # string numérica de formulário vale; inventário pode zerar
+    resp = client.post(url, json={"movement_type": "in", "quantity": "3"}, headers=headers)
+    assert resp.get_json()["stock"] == 5
+    resp = client.post(url, json={"movement_type": "adjust", "quantity": 0}, headers=headers)
+    assert resp.get_json()["stock"] == 0
+
+
+def test_reservation_released_on_cancel_and_taken_on_reopen(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=5)
+    order_id = _create_order(client, headers)
+
+    assert _add_part(client, headers, order_id, part_id, 3).status_code == 201
+    assert _stock(client, headers, part_id) == 2
+    assert _add_part(client, headers, order_id, part_id, 3).status_code == 400
+
+    resp = _set_status(client, headers, order_id, "CANCELLED")
+    assert resp.status_code == 200
+    assert _stock(client, headers, part_id) == 5
+
+    resp = _set_status(client, headers, order_id, "OPEN")
+    assert resp.status_code == 200
+    assert _stock(client, headers, part_id) == 2
+
+
+def test_completed_order_keeps_stock_consumed(client):
+    from app.models import StockReservation
+
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=5)
+    order_id = _create_order(client, headers)
+    _add_part(client, headers, order_id, part_id, 2)
+
+    _set_status(client, headers, order_id, "COMPLETED")
+
+    assert _stock(client, headers, part_id) == 3
+    with client.application.app_context():
+        assert [r.status for r in StockReservation.query.all()] == ["consumed"]
+
+
+def test_item_quantity_and_delete_follow_reservation(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=5)
+    order_id = _create_order(client, headers)
+    item_id = _add_part(client, headers, order_id, part_id, 2).get_json()["id"]
+
+    item_url = f"/os/{order_id}/items/{item_id}"
+    resp = client.patch(item_url, json={"quantity": 4}, headers=headers)
+    assert resp.status_code == 200
+    assert _stock(client, headers, part_id) == 1
+
+    resp = client.patch(item_url, json={"quantity": 9}, headers=headers)
+    assert resp.status_code == 400
+    assert _stock(client, headers, part_id) == 1
+
+    assert client.delete(item_url, headers=headers).status_code == 200
+    assert _stock(client, headers, part_id) == 5
+
+
+def test_item_quantity_must_be_positive_and_whole_for_parts(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=5)
+    order_id = _create_order(client, headers)
+
+    for quantity in (-3, 0, 1.5, "NaN", "x"):
+        assert _add_part(client, headers, order_id, part_id, quantity).status_code == 400
+    resp = client.post(
+        f"/os/{order_id}/items:batch",
+        json={
+            "tenant_id": 1,
+            "items": [{"item_type": "part", "part_id": part_id, "quantity": -1}],
+        },
+        headers=headers,
+    )
+    assert (resp.status_code, resp.get_json()["index"]) == (400, 0)
+    assert _stock(client, headers, part_id) == 5
+
+    # mão de obra aceita fração (ex.: 1,5 h)
+    labor = client.post(
+        f"/os/{order_id}/items",
+        json={"tenant_id": 1, "item_type": "labor", "quantity": 1.5, "unit_price": 100},
+        headers=headers,
+    )
+    assert labor.status_code == 201
+    assert labor.get_json()["total"] == 150
+
+
+def test_item_update_validates_like_create(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=5)
+    order_id = _create_order(client, headers)
+    item_id = _add_part(client, headers, order_id, part_id, 2).get_json()["id"]
+    item_url = f"/os/{order_id}/items/{item_id}"
+
+    for payload in (
+        {"quantity": "x"},
+        {"quantity": -2},
+        {"quantity": 0},
+        {"quantity": 2.5},
+        {"unit_price": "abc"},
+        {"unit_price": "Infinity"},
+        {"quantity": 3, "unit_price": "abc"},
+    ):
+        assert client.patch(item_url, json=payload, headers=headers).status_code == 400
+    assert _stock(client, headers, part_id) == 3
+    order = client.get(f"/os/{order_id}", headers=headers).get_json()
+    assert [item["quantity"] for item in order["items"]] == [2]
+
+
+def test_item_part_id_is_coerced_to_an_id(client):
+    headers = auth_headers(client.application)
+    part_id = _create_part(client, headers, quantity=5)
+    order_id = _create_order(client, headers)
+
+    assert _add_part(client, headers, order_id, str(part_id), 1).status_code == 201
+    resp = client.post(
+        f"/os/{order_id}/items:batch",
+        json={
+            "tenant_id": 1,
+            "items": [{"item_type": "part", "part_id": str(part_id), "quantity": 1}],
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    assert _stock(client, headers, part_id) == 3
+
+    for bad in ([part_id], {"id": part_id}, 1.5, -1, True, "abc"):
+        assert _add_part(client, headers, order_id, bad, 1).status_code == 400
+        resp = client.post(
+            f"/os/{order_id}/items:batch",
+            json={"tenant_id": 1, "items": [{"item_type": "part", "part_id": bad}]},
+            headers=headers,
+        )
+        assert (resp.status_code, resp.get_json()["index"]) == (400, 0)
+    assert _stock(client, headers, part_id) == 3
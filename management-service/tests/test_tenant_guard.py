@@ -1,8 +1,12 @@
+import time
+
 from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager, create_access_token
 
-from app.tenant_guard import tenant_guard
+from app.internal_identity import HEADER_NAME, sign_identity, signing_key
+from app.tenant_guard import identity_required, inject_current_tenant_from_token, tenant_guard
 from app.models import db
+from app.utils import get_current_tenant_id
 
 
 def _app():
@@ -52,3 +56,50 @@ def test_tenant_guard_passes_on_match():
         "/t/7", json={"tenant_id": 7}, headers={"Authorization": f"Bearer {token}"}
     )
     assert resp.status_code == 200
+
+
+def _identity_app():
+    app = _app()
+
+    @app.before_request
+    def inject():
+        inject_current_tenant_from_token(optional=True)
+
+    @app.get("/me")
+    @identity_required()
+    def me():  # pragma: no cover
+        return jsonify({"tenant_id": get_current_tenant_id()})
+
+    return app
+
+
+def test_internal_identity_header_skips_jwt(monkeypatch):
+    app = _identity_app()
+    client = app.test_client()
+    header = sign_identity({"sub": "1", "tenant_id": 5}, signing_key("", "test"), time.time() + 30)
+
+    def no_decode(*args, **kwargs):  # pragma: no cover
+        raise AssertionError("JWT não deveria ser decodificado")
+
+    monkeypatch.setattr("app.tenant_guard.verify_jwt_in_request", no_decode)
+    resp = client.get("/me", headers={HEADER_NAME: header})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"tenant_id": 5}
+
+    # tenant_guard também usa a identidade do gateway
+    assert client.post("/t/5", headers={HEADER_NAME: header}).status_code == 200
+
+
+def test_forged_internal_identity_falls_back_to_jwt():
+    app = _identity_app()
+    client = app.test_client()
+    forged = sign_identity({"sub": "1", "tenant_id": 5}, signing_key("", "other"), time.time() + 30)
+
+    assert client.get("/me", headers={HEADER_NAME: forged}).status_code == 401
+
+    with app.app_context():
+        token = create_access_token(identity="1", additional_claims={"tenant_id": 8})
+    resp = client.get(
+        "/me", headers={HEADER_NAME: forged, "Authorization": f"Bearer {token}"}
+    )
+    assert resp.get_json() == {"tenant_id": 8}
@@ -0,0 +1,190 @@
+"""
+EXPLAIN check: cada rota de listagem precisa usar índice e não ordenar em memória.
+
+Roda ``EXPLAIN (FORMAT JSON)`` nas queries equivalentes às rotas (filtro por
+tenant + keyset ``ORDER BY chave NULLS LAST, id LIMIT n+1``) e falha se o
+plano tiver ``Seq Scan`` na tabela ou um nó ``Sort`` (índice não cobre a
+ordenação).
+
+    DATABASE_URL=postgresql://... python scripts/explain_list_routes.py management
+    python scripts/explain_list_routes.py financial --database-url postgresql://...
+
+Por padrão desliga ``enable_seqscan`` e ``enable_sort`` na sessão: com poucas
+linhas por tenant o planner prefere seq scan / bitmap + sort mesmo com o
+índice certo, e o que interessa aqui é se existe índice que *entrega* as
+linhas filtradas já na ordem do keyset. Se não existir, o Sort aparece mesmo
+desligado e o check falha. Em cópia de produção use ``--real-costs`` para ver
+o plano que o planner escolheria de verdade.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, text
+
+LIMIT = 51  # DEFAULT_LIMIT + 1 (app/pagination.py)
+
+# serviço -> [(rota, tabela, sql)]
+CHECKS: Dict[str, List[Tuple[str, str, str]]] = {
+    "management": [
+        (
+            "GET /os",
+            "service_orders",
+            "SELECT * FROM service_orders WHERE tenant_id = :t "
+            "ORDER BY created_at DESC NULLS LAST, id DESC LIMIT :n",
+        ),
+        (
+            "GET /os?status=OPEN",
+            "service_orders",
+            "SELECT * FROM service_orders WHERE tenant_id = :t AND status = 'OPEN' "
+            "ORDER BY created_at DESC NULLS LAST, id DESC LIMIT :n",
+        ),
+        (
+            "GET /customers",
+            "customers",
+            "SELECT * FROM customers WHERE tenant_id = :t AND is_active "
+            "ORDER BY created_at DESC NULLS LAST, id DESC LIMIT :n",
+        ),
+        (
+            "GET /parts",
+            "parts",
+            "SELECT * FROM parts WHERE tenant_id = :t AND is_active "
+            "ORDER BY name ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /motos",
+            "motorcycles",
+            "SELECT * FROM motorcycles WHERE tenant_id = :t AND is_active "
+            "ORDER BY id ASC LIMIT :n",
+        ),
+        (
+            "GET /parts/<id>/movements",
+            "stock_movements",
+            "SELECT * FROM stock_movements WHERE tenant_id = :t AND part_id = 1 "
+            "ORDER BY created_at DESC NULLS LAST, id DESC LIMIT :n",
+        ),
+    ],
+    "financial": [
+        (
+            "GET /receivables",
+            "accounts_receivable",
+            "SELECT * FROM accounts_receivable WHERE tenant_id = :t "
+            "ORDER BY due_date ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /receivables?status=PENDING",
+            "accounts_receivable",
+            "SELECT * FROM accounts_receivable WHERE tenant_id = :t AND status = 'PENDING' "
+            "ORDER BY due_date ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /payables",
+            "accounts_payable",
+            "SELECT * FROM accounts_payable WHERE tenant_id = :t "
+            "ORDER BY due_date ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /payables?status=PENDING",
+            "accounts_payable",
+            "SELECT * FROM accounts_payable WHERE tenant_id = :t AND status = 'PENDING' "
+            "ORDER BY due_date ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+    ],
+    "teamcrm": [
+        (
+            "GET /tasks",
+            "tasks",
+            "SELECT * FROM tasks WHERE tenant_id = :t "
+            "ORDER BY due_date ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /tasks?only_open=1",
+            "tasks",
+            "SELECT * FROM tasks WHERE tenant_id = :t "
+            "AND status IN ('OPEN', 'IN_PROGRESS', 'WAITING') "
+            "ORDER BY due_date ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /staff",
+            "staff",
+            "SELECT * FROM staff WHERE tenant_id = :t "
+            "ORDER BY name ASC NULLS LAST, id ASC LIMIT :n",
+        ),
+        (
+            "GET /interactions",
+            "interactions",
+            "SELECT * FROM interactions WHERE tenant_id = :t "
+            "ORDER BY occurred_at DESC LIMIT :n",
+        ),
+    ],
+    "users": [
+        (
+            "GET /users",
+            "users",
+            "SELECT * FROM users WHERE tenant_id = :t ORDER BY id ASC LIMIT :n",
+        ),
+    ],
+}
+
+
+def _walk(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def check_plan(table: str, plan: dict) -> List[str]:
+    """Problemas encontrados no plano (lista vazia = ok)."""
+    problems = []
+    for node in _walk(plan):
+        kind = node.get("Node Type", "")
+        if kind == "Seq Scan" and node.get("Relation Name") == table:
+            problems.append(f"Seq Scan em {table}")
+        if kind in ("Sort", "Incremental Sort"):
+            problems.append(f"{kind} ({', '.join(node.get('Sort Key', []))})")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("service", choices=sorted(CHECKS))
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--tenant-id", type=int, default=1)
+    parser.add_argument(
+        "--real-costs",
+        action="store_true",
+        help="não mexe no planner (usar em cópia de produção)",
+    )
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("informe --database-url ou DATABASE_URL")
+
+    engine = create_engine(args.database_url)
+    failures = 0
+    with engine.connect() as conn:
+        if not args.real_costs:
+            conn.execute(text("SET enable_seqscan = off"))
+            conn.execute(text("SET enable_sort = off"))
+        for route, table, sql in CHECKS[args.service]:
+            raw = conn.execute(
+                text("EXPLAIN (FORMAT JSON) " + sql), {"t": args.tenant_id, "n": LIMIT}
+            ).scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            problems = check_plan(table, plan)
+            indexes = sorted(
+                {n["Index Name"] for n in _walk(plan) if "Index Name" in n}
+            )
+            status = "FAIL" if problems else "ok"
+            detail = "; ".join(problems) if problems else ", ".join(indexes)
+            print(f"[{status:>4}] {route:<34} {detail}")
+            failures += bool(problems)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,24 @@
 # teamcrm-service/app/__init__.py
 import os
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 
+from .json_provider import init_json
 from .models import db
 from .observability import register_observability
+from .pagination import PaginationError
 from .tenant_guard import inject_current_tenant_from_token
 
 
 def create_app():
     app = Flask(__name__)
+    init_json(app)
     register_observability(app, "teamcrm-service")
 
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "dev-secret")
+    # identidade assinada pelo api-gateway (vazio = derivada do JWT_SECRET_KEY)
+    app.config["INTERNAL_IDENTITY_SECRET"] = os.getenv("INTERNAL_IDENTITY_SECRET", "")
     app.config["ENV"] = os.getenv("APP_ENV", "development")
 
     database_url = os.getenv(
@@ -30,6 +35,10 @@ def create_app():
     def inject_tenant():
         inject_current_tenant_from_token(optional=True)
 
+    @app.errorhandler(PaginationError)
+    def pagination_error(err):
+        return jsonify({"error": str(err)}), 400
+
     from .routes_dashboard import bp as dash_bp
     from .routes_interactions import bp as inter_bp
     from .routes_staff import bp as staff_bp
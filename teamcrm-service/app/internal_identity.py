@@ -0,0 +1,71 @@
+"""Signed internal identity header: gateway -> downstream services."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional
+
+# O gateway valida o JWT uma vez e repassa só isso pros serviços internos.
+# Clientes externos nunca conseguem injetar: o gateway descarta o cabeçalho
+# recebido e a assinatura exige o segredo compartilhado.
+HEADER_NAME = "X-Internal-Identity"
+VERSION = "v1"
+
+# claims do JWT que atravessam o gateway (mesmos nomes, pro get_current_identity)
+IDENTITY_CLAIMS = ("sub", "tenant_id", "role", "plan", "tenant_name")
+
+
+def signing_key(secret: Optional[str], jwt_secret: Optional[str]) -> bytes:
+    """
+    ``INTERNAL_IDENTITY_SECRET`` se definido; senão deriva do JWT_SECRET_KEY
+    (nunca a mesma chave: uma assinatura não serve como a outra).
+    """
+    if secret:
+        return secret.encode()
+    return hmac.new(
+        (jwt_secret or "").encode(), b"motogestor-internal-identity", hashlib.sha256
+    ).digest()
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _signature(key: bytes, body: str) -> str:
+    return _b64(hmac.new(key, f"{VERSION}.{body}".encode(), hashlib.sha256).digest())
+
+
+def sign_identity(claims: Dict[str, Any], key: bytes, expires_at: float) -> str:
+    payload = {name: claims[name] for name in IDENTITY_CLAIMS if claims.get(name) is not None}
+    payload["exp"] = int(expires_at)
+    body = _b64(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{VERSION}.{body}.{_signature(key, body)}"
+
+
+def verify_identity(
+    value: Optional[str], key: bytes, now: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """Claims do cabeçalho, ou None se ausente/adulterado/expirado."""
+    if not value:
+        return None
+    try:
+        version, body, signature = value.split(".")
+    except ValueError:
+        return None
+    if version != VERSION or not hmac.compare_digest(signature, _signature(key, body)):
+        return None
+    try:
+        claims = json.loads(_unb64(body))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < (now or time.time()):
+        return None
+    return claims
@@ -0,0 +1,90 @@
+"""Flask JSON provider: orjson when installed, stdlib json otherwise."""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import decimal
+import json
+import uuid
+from typing import Any
+
+from flask.json.provider import JSONProvider
+
+try:  # orjson é opcional: sem ele fica o json da stdlib
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+# Decimal sai como número (igual ao antigo ``float(...)`` das rotas) e datas
+# em ISO 8601 (igual ao ``.isoformat()``); as rotas podem devolver os valores
+# do banco direto.
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Mesmo contrato do provider padrão do Flask, sem ordenar chaves. Com
+    orjson o ``jsonify`` monta os bytes direto (sem passar por ``str``); tipos
+    que o orjson recusa (ex.: inteiros > 64 bits) caem no json da stdlib.
+    """
+
+    sort_keys = False
+    mimetype = "application/json"
+
+    def _orjson_options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self._app.debug:
+            options |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=_default, option=self._orjson_options())
+            except TypeError:
+                pass
+        return self.dumps(obj).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(
+                    obj, default=_default, option=self._orjson_options()
+                ).decode()
+            except TypeError:
+                pass
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        if not self._app.debug:
+            kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app) -> None:
+    app.json = FastJSONProvider(app)
@@ -2,16 +2,16 @@
 from datetime import date, datetime, timedelta
 
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required
 
 from .models import Interaction, Task
 from .utils import get_current_tenant_id
+from .tenant_guard import identity_required
 
 bp = Blueprint("dashboard", __name__)
 
 
 @bp.get("/summary")
-@jwt_required()
+@identity_required()
 def summary():
     """
     Resumo simples de produtividade da equipe.
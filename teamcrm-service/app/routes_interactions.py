@@ -2,16 +2,16 @@
 from datetime import datetime
 
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required
 
 from .models import Interaction, Staff, db
 from .utils import get_current_tenant_id
+from .tenant_guard import identity_required
 
 bp = Blueprint("interactions", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_interactions():
     tenant_id = get_current_tenant_id()
 
@@ -54,7 +54,7 @@ def list_interactions():
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_interaction():
     """
     Cria uma interação genérica (pode ser usada pelo frontend ou n8n).
@@ -1,15 +1,16 @@
 # teamcrm-service/app/routes_staff.py
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
 
 from .models import Staff, db
+from .pagination import page_response, paginate
 from .utils import get_current_tenant_id, is_manager_or_owner
+from .tenant_guard import identity_required
 
 bp = Blueprint("staff", __name__)
 
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_staff():
     tenant_id = get_current_tenant_id()
     active = request.args.get("active")
@@ -20,9 +21,9 @@ def list_staff():
     elif active == "0":
         query = query.filter_by(is_active=False)
 
-    staff_list = query.order_by(Staff.name.asc()).all()
+    page = paginate(query, Staff, Staff.name)
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": s.id,
@@ -32,13 +33,14 @@ def list_staff():
                 "email": s.email,
                 "is_active": s.is_active,
             }
-            for s in staff_list
-        ]
+            for s in page.items
+        ],
+        page,
     )
 
 
 @bp.get("/<int:staff_id>")
-@jwt_required()
+@identity_required()
 def get_staff(staff_id):
     tenant_id = get_current_tenant_id()
     s = db.session.get(Staff, staff_id)
@@ -58,7 +60,7 @@ def get_staff(staff_id):
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_staff():
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -84,7 +86,7 @@ def create_staff():
 
 
 @bp.patch("/<int:staff_id>")
-@jwt_required()
+@identity_required()
 def update_staff(staff_id):
     if not is_manager_or_owner():
         return jsonify({"error": "permissão negada"}), 403
@@ -2,16 +2,20 @@
 from datetime import date, datetime
 
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 
 from .models import Staff, Task, db
+from .pagination import page_response, paginate
 from .utils import get_current_tenant_id, is_manager_or_owner
+from .tenant_guard import identity_required
 
 bp = Blueprint("tasks", __name__)
 
+OPEN_STATUSES = ("OPEN", "IN_PROGRESS", "WAITING")
+
 
 @bp.get("/")
-@jwt_required()
+@identity_required()
 def list_tasks():
     tenant_id = get_current_tenant_id()
 
@@ -32,13 +36,12 @@ def list_tasks():
     if due_until:
         query = query.filter(Task.due_date <= date.fromisoformat(due_until))
     if only_open:
-        query = query.filter(Task.status.in_(["OPEN", "IN_PROGRESS", "WAITING"]))
+        query = query.filter(Task.status.in_(OPEN_STATUSES))
 
-    tasks = query.order_by(
-        Task.due_date.asc().nulls_last(), Task.created_at.desc()
-    ).all()
+    # prazo mais próximo primeiro, sem prazo no fim (desempate pelo id)
+    page = paginate(query, Task, Task.due_date)
 
-    return jsonify(
+    return page_response(
         [
             {
                 "id": t.id,
@@ -52,13 +55,37 @@ def list_tasks():
                 "due_date": t.due_date.isoformat() if t.due_date else None,
                 "created_at": t.created_at.isoformat(),
             }
-            for t in tasks
-        ]
+            for t in page.items
+        ],
+        page,
+    )
+
+
+@bp.get("/stats")
+@identity_required()
+def tasks_stats():
+    """Contagem de tarefas por status, agregada no banco."""
+    tenant_id = get_current_tenant_id()
+
+    rows = (
+        db.session.query(Task.status, func.count(Task.id))
+        .filter(Task.tenant_id == tenant_id)
+        .group_by(Task.status)
+        .all()
+    )
+    by_status = {status: count for status, count in rows}
+
+    return jsonify(
+        {
+            "total": sum(by_status.values()),
+            "open_count": sum(by_status.get(s, 0) for s in OPEN_STATUSES),
+            "by_status": by_status,
+        }
     )
 
 
 @bp.get("/<int:task_id>")
-@jwt_required()
+@identity_required()
 def get_task(task_id):
     tenant_id = get_current_tenant_id()
     t = db.session.get(Task, task_id)
@@ -84,7 +111,7 @@ def get_task(task_id):
 
 
 @bp.post("/")
-@jwt_required()
+@identity_required()
 def create_task():
     """
     Cria tarefa geral ou ligada a uma OS/cliente.
@@ -137,7 +164,7 @@ def create_task():
 
 
 @bp.patch("/<int:task_id>")
-@jwt_required()
+@identity_required()
 def update_task(task_id):
     tenant_id = get_current_tenant_id()
     data = request.get_json() or {}
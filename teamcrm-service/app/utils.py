@@ -1,8 +1,13 @@
 # teamcrm-service/app/utils.py
+from flask import g
 from flask_jwt_extended import get_jwt_identity, get_jwt
 
 
 def get_current_identity():
+    # identidade assinada pelo gateway (ver tenant_guard.load_internal_identity)
+    internal = g.get("internal_identity")
+    if internal is not None:
+        return internal
     identity = get_jwt_identity()
     if isinstance(identity, dict):
         return identity
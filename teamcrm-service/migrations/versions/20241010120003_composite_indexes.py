@@ -0,0 +1,63 @@
+"""Composite/partial indexes for tenant-scoped list queries (teamcrm).
+
+Revision ID: 20241010120003
+Revises: 20240909130003
+Create Date: 2024-10-10 12:00:03
+
+Cada índice casa com um filtro + ORDER BY das rotas de listagem (keyset em
+``app/pagination.py``: ``ORDER BY chave NULLS LAST, id``). Conferir com
+``scripts/explain_list_routes.py`` (ver ``docs/indexes-and-explain.md``).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20241010120003"
+down_revision: Union[str, None] = "20240909130003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas, WHERE do índice parcial)
+INDEXES = [
+    # GET /tasks  (+ ?status=) e GET /tasks/stats
+    ("ix_tasks_tenant_due", "tasks", ["tenant_id", "due_date", "id"], None),
+    (
+        "ix_tasks_tenant_status_due",
+        "tasks",
+        ["tenant_id", "status", "due_date", "id"],
+        None,
+    ),
+    # GET /tasks?only_open=1 e painel: só tarefas abertas
+    (
+        "ix_tasks_open",
+        "tasks",
+        ["tenant_id", "due_date", "id"],
+        "status IN ('OPEN', 'IN_PROGRESS', 'WAITING')",
+    ),
+    # GET /staff
+    ("ix_staff_tenant_name", "staff", ["tenant_id", "name", "id"], None),
+    # GET /interactions e painel (últimas interações)
+    (
+        "ix_interactions_tenant_occurred",
+        "interactions",
+        ["tenant_id", "occurred_at DESC"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            [sa.text(c) for c in columns],
+            unique=False,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns, _where in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,59 @@
+import pytest
+
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    monkeypatch.setenv("APP_ENV", "test")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    from app import create_app
+
+    application = create_app()
+    return application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(app, identity: dict):
+    with app.app_context():
+        token = create_access_token(identity=str(identity.get('sub', '1')), additional_claims={'tenant_id': identity.get('tenant_id'), 'role': identity.get('role')})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_tasks_stats_counts_open(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    other = auth_headers(client.application, {"tenant_id": 2, "role": "owner"})
+
+    ids = [
+        client.post("/tasks/", json={"title": f"T{i}"}, headers=headers).get_json()["id"]
+        for i in range(3)
+    ]
+    client.patch(f"/tasks/{ids[0]}", json={"status": "DONE"}, headers=headers)
+    client.patch(f"/tasks/{ids[1]}", json={"status": "WAITING"}, headers=headers)
+    client.post("/tasks/", json={"title": "outro tenant"}, headers=other)
+
+    resp = client.get("/tasks/stats", headers=headers)
+    assert resp.status_code == 200
+    assert resp.get_json() == {
+        "total": 3,
+        "open_count": 2,
+        "by_status": {"DONE": 1, "WAITING": 1, "OPEN": 1},
+    }
+
+
+def test_list_tasks_pages_past_null_due_dates(client):
+    headers = auth_headers(client.application, {"tenant_id": 1, "role": "owner"})
+    for title, due in (("sem prazo A", None), ("amanhã", "2030-01-02"), ("sem prazo B", None), ("hoje", "2030-01-01")):
+        client.post("/tasks/", json={"title": title, "due_date": due}, headers=headers)
+
+    first = client.get("/tasks/?limit=3", headers=headers)
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/tasks/?limit=3&cursor={cursor}", headers=headers)
+
+    titles = [t["title"] for t in first.get_json() + second.get_json()]
+    assert titles == ["hoje", "amanhã", "sem prazo A", "sem prazo B"]
+    assert "X-Next-Cursor" not in second.headers
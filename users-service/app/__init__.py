@@ -5,10 +5,17 @@ from flask_jwt_extended import JWTManager
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 
+from . import tokens
 from .config import load_config
 from .errors import register_error_handlers
-from .models import RevokedToken, db
+from .json_provider import init_json
+from .login_guard import init_login_guard
+from .models import db
 from .observability import register_observability
+from .passwords import init_password_policy
+from .profile_cache import init_profile_cache
+from .revocation import init_revocation_store
+from .revocation_gc import init_revocation_gc
 from .tenant_guard import inject_current_tenant_from_token
 
 
@@ -16,6 +23,7 @@ def create_app() -> Flask:
     cfg = load_config()
 
     app = Flask(__name__)
+    init_json(app)
     service_name = "users-service"
     register_observability(app, service_name)
 
@@ -29,10 +37,15 @@ def create_app() -> Flask:
     app.config.setdefault("JWT_BLOCKLIST_ENABLED", True)
     app.config.setdefault("JWT_BLOCKLIST_TOKEN_CHECKS", ["access", "refresh"])
 
+    store = init_revocation_store(app, cfg)
+    init_password_policy(app, cfg)
+    init_login_guard(app, cfg, store.redis)
+    init_profile_cache(app, cfg, store.redis)
+    init_revocation_gc(app, cfg)
+
     @jwt.token_in_blocklist_loader
     def is_token_revoked(jwt_header, jwt_payload):  # type: ignore[unused-argument]
-        jti = jwt_payload.get("jti")
-        return RevokedToken.query.filter_by(jti=jti).first() is not None
+        return tokens.is_token_revoked(jwt_payload)
 
     register_error_handlers(app)
 
@@ -31,6 +31,66 @@ class BaseConfig:
         default_factory=lambda: os.getenv("POSTGRES_DB", "motogestor_dev")
     )
     log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
+    # cache de revogação de JWT (vazio = só SQL + cache negativo local)
+    redis_url: str = field(default_factory=lambda: os.getenv("REDIS_URL", ""))
+    redis_socket_timeout: float = field(
+        default_factory=lambda: float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.2"))
+    )
+    revocation_negative_ttl: float = field(
+        default_factory=lambda: float(os.getenv("REVOCATION_NEGATIVE_TTL", "5"))
+    )
+    revocation_negative_cache_size: int = field(
+        default_factory=lambda: int(os.getenv("REVOCATION_NEGATIVE_CACHE_SIZE", "10000"))
+    )
+    # GC de revogações expiradas (segundos entre execuções; 0 desliga a thread)
+    revocation_gc_interval: float = field(
+        default_factory=lambda: float(os.getenv("REVOCATION_GC_INTERVAL", "3600"))
+    )
+    revocation_gc_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("REVOCATION_GC_BATCH_SIZE", "5000"))
+    )
+    # login: processos que verificam senha (0 = na própria thread) e fila máxima
+    password_pool_workers: int = field(
+        default_factory=lambda: int(os.getenv("PASSWORD_POOL_WORKERS", "2"))
+    )
+    password_pool_queue: int = field(
+        default_factory=lambda: int(os.getenv("PASSWORD_POOL_QUEUE", "8"))
+    )
+    password_verify_timeout: float = field(
+        default_factory=lambda: float(os.getenv("PASSWORD_VERIFY_TIMEOUT", "5"))
+    )
+    # hash de senha: algoritmo:custo (werkzeug); calibrar com
+    # bench/password_hash_bench.py. Hashes antigos são refeitos no login.
+    password_hash_method: str = field(
+        default_factory=lambda: os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    )
+    # cache de perfil (/auth/me, login, refresh): LRU local + Redis opcional
+    profile_cache_size: int = field(
+        default_factory=lambda: int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    )
+    profile_cache_local_ttl: float = field(
+        default_factory=lambda: float(os.getenv("PROFILE_CACHE_LOCAL_TTL", "5"))
+    )
+    profile_cache_ttl: int = field(
+        default_factory=lambda: int(os.getenv("PROFILE_CACHE_TTL", "300"))
+    )
+    # rate limit de login: tentativas por IP e falhas por email, por janela (s)
+    login_ip_limit: int = field(
+        default_factory=lambda: int(os.getenv("LOGIN_IP_LIMIT", "100"))
+    )
+    login_ip_window: int = field(
+        default_factory=lambda: int(os.getenv("LOGIN_IP_WINDOW", "60"))
+    )
+    login_email_limit: int = field(
+        default_factory=lambda: int(os.getenv("LOGIN_EMAIL_LIMIT", "10"))
+    )
+    login_email_window: int = field(
+        default_factory=lambda: int(os.getenv("LOGIN_EMAIL_WINDOW", "900"))
+    )
+    # proxies confiáveis na frente do serviço (api-gateway = 1) pro IP do cliente
+    trusted_proxy_hops: int = field(
+        default_factory=lambda: int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+    )
 
     @property
     def database_url(self) -> str:
@@ -62,6 +122,10 @@ class TestingConfig(BaseConfig):
     app_env: str = "test"
     database_url: str = "sqlite:///:memory:"
     log_level: str = "DEBUG"
+    redis_url: str = ""
+    revocation_gc_interval: float = 0
+    password_pool_workers: int = 0
+    password_hash_method: str = "pbkdf2:sha256:1000"
 
 
 CONFIG_MAP: dict[str, Type[BaseConfig]] = {
@@ -73,6 +73,22 @@ class ConflictError(ApiError):
         )
 
 
+class TooManyRequestsError(ApiError):
+    def __init__(
+        self,
+        message: str = "Muitas tentativas, tente novamente em instantes",
+        retry_after: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(
+            message=message,
+            status_code=429,
+            code="too_many_requests",
+            details=details,
+        )
+        self.retry_after = retry_after
+
+
 class ServiceUnavailableError(ApiError):
     def __init__(
         self,
@@ -90,8 +106,11 @@ class ServiceUnavailableError(ApiError):
 def register_error_handlers(app: Flask) -> None:
     @app.errorhandler(ApiError)
     def handle_api_error(exc: ApiError):  # type: ignore[override]
-        response = {"error": exc.to_dict()}
-        return jsonify(response), exc.status_code
+        response = jsonify({"error": exc.to_dict()})
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after:
+            response.headers["Retry-After"] = str(retry_after)
+        return response, exc.status_code
 
     @app.errorhandler(422)
     @app.errorhandler(400)
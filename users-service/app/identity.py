@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import time
 from datetime import timedelta
 from typing import Any, Dict
 
@@ -10,6 +11,9 @@ from flask_jwt_extended import create_access_token, create_refresh_token
 TENANT_ID_CLAIM = "tenant_id"
 PLAN_CLAIM = "plan"
 TENANT_NAME_CLAIM = "tenant_name"
+# instante de emissão em milissegundos; o ``iat`` padrão só tem segundos e
+# não separa um login feito logo depois do logout_all (ver revocation.py)
+ISSUED_AT_MS_CLAIM = "iat_ms"
 
 
 def build_token(
@@ -18,6 +22,7 @@ def build_token(
     claims = {
         TENANT_ID_CLAIM: tenant_id,
         PLAN_CLAIM: plan or "BASIC",
+        ISSUED_AT_MS_CLAIM: int(time.time() * 1000),
     }
     if tenant_name:
         claims[TENANT_NAME_CLAIM] = tenant_name
@@ -31,6 +36,7 @@ def build_refresh_token(
     claims = {
         TENANT_ID_CLAIM: tenant_id,
         PLAN_CLAIM: plan or "BASIC",
+        ISSUED_AT_MS_CLAIM: int(time.time() * 1000),
     }
     if tenant_name:
         claims[TENANT_NAME_CLAIM] = tenant_name
@@ -0,0 +1,264 @@
+"""Login protection: bounded password-verification pool and rate limits."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, current_app, request
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .errors import TooManyRequestsError
+from .observability import LOGIN_THROTTLED, PASSWORD_VERIFY_IN_FLIGHT, PASSWORD_VERIFY_LATENCY
+
+try:  # redis é opcional: sem ele o limite vale por worker
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - depende do ambiente
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "login_guard"
+
+
+class PasswordVerifier:
+    """
+    Verifica senhas num ``ProcessPoolExecutor`` para o hash (CPU) não prender
+    as threads do gunicorn: a thread só espera o resultado, sem segurar o GIL,
+    e ``/health`` e o resto continuam respondendo.
+
+    No máximo ``workers + max_queue`` verificações por worker (rodando +
+    esperando); acima disso falha na hora com 429 em vez de enfileirar.
+    ``workers=0`` verifica na própria thread (testes), mantendo o limite.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, workers + max_queue))
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # criado sob demanda em cada processo (depois do fork do gunicorn)
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self._in_flight += delta
+            PASSWORD_VERIFY_IN_FLIGHT.set(self._in_flight)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _acquire(self) -> bool:
+        if not self._slots.acquire(blocking=False):
+            return False
+        self._track(1)
+        return True
+
+    def _release(self, _future=None) -> None:
+        self._track(-1)
+        self._slots.release()
+
+    def _call(self, func, *args):
+        """
+        Roda ``func`` com uma vaga já reservada e a devolve quando a execução
+        termina de fato: no pool, pelo callback do future. Depois de um
+        timeout o hash continua rodando no processo, e a vaga segue ocupada
+        até ele acabar.
+        """
+        if self.workers > 0:
+            try:
+                future = self._executor().submit(func, *args)
+            except BrokenProcessPool:
+                self._reset_pool()
+            except Exception:
+                self._release()
+                raise
+            else:
+                future.add_done_callback(self._release)
+                try:
+                    return future.result(timeout=self.timeout)
+                except FutureTimeout:
+                    future.cancel()
+                    raise
+                except BrokenProcessPool:
+                    logger.error("login: pool de verificação quebrou, recriando", exc_info=True)
+                    self._reset_pool()
+                    # a vaga já voltou pelo callback; esta repetição fica fora do limite
+                    return func(*args)
+        try:
+            return func(*args)
+        finally:
+            self._release()
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        if not self._acquire():
+            LOGIN_THROTTLED.labels(reason="saturated").inc()
+            raise TooManyRequestsError(retry_after=1)
+        started = time.perf_counter()
+        try:
+            return self._call(check_password_hash, pwhash, password)
+        except FutureTimeout:
+            LOGIN_THROTTLED.labels(reason="timeout").inc()
+            raise TooManyRequestsError(retry_after=1)
+        finally:
+            PASSWORD_VERIFY_LATENCY.observe(time.perf_counter() - started)
+
+    def hash(self, password: str, method: str) -> Optional[str]:
+        """
+        Novo hash no mesmo pool (rehash no login). Sem vaga ou estourando o
+        timeout devolve None: o rehash fica pro próximo login.
+        """
+        if not self._acquire():
+            return None
+        try:
+            return self._call(generate_password_hash, password, method)
+        except FutureTimeout:
+            return None
+
+    def shutdown(self) -> None:
+        self._reset_pool()
+
+
+class RateLimiter:
+    """
+    Janela fixa: ``INCR <prefix><escopo>:<chave>:<janela>`` com EXPIRE no
+    Redis (vale pra todos os workers). Sem Redis, ou com erro nele, conta
+    em memória no worker.
+    """
+
+    def __init__(self, redis_client=None, prefix: str = "motogestor:ratelimit:") -> None:
+        self.redis = redis_client
+        self.prefix = prefix
+        self._local: Dict[Tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, window: int, now: float) -> Tuple[int, int]:
+        bucket = int(now // window)
+        retry_after = max(1, int((bucket + 1) * window - now))
+        return bucket, retry_after
+
+    def _local_count(self, key: Tuple[str, str, int], increment: int) -> int:
+        with self._lock:
+            if increment and len(self._local) > 10_000:
+                current = {k: v for k, v in self._local.items() if k[2] >= key[2]}
+                self._local = current
+            count = self._local.get(key, 0) + increment
+            if increment:
+                self._local[key] = count
+            return count
+
+    def _count(self, scope: str, key: str, window: int, increment: int) -> Tuple[int, int]:
+        bucket, retry_after = self._bucket(window, time.time())
+        if self.redis is not None:
+            redis_key = f"{self.prefix}{scope}:{key}:{bucket}"
+            try:
+                if not increment:
+                    return int(self.redis.get(redis_key) or 0), retry_after
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.incr(redis_key)
+                pipe.expire(redis_key, window)
+                count, _ = pipe.execute()
+                return int(count), retry_after
+            except RedisError:
+                logger.warning("login: Redis indisponível no rate limit", exc_info=True)
+        return self._local_count((scope, key, bucket), increment), retry_after
+
+    def hit(self, scope: str, key: str, limit: int, window: int) -> Optional[int]:
+        """Conta uma tentativa; devolve o Retry-After se passou do limite."""
+        count, retry_after = self._count(scope, key, window, 1)
+        return retry_after if count > limit else None
+
+    def blocked(self, scope: str, key: str, limit: int, window: int) -> Optional[int]:
+        """Só consulta (não conta); Retry-After se já estourou o limite."""
+        count, retry_after = self._count(scope, key, window, 0)
+        return retry_after if count >= limit else None
+
+
+class LoginGuard:
+    def __init__(self, verifier: PasswordVerifier, limiter: RateLimiter, cfg) -> None:
+        self.verifier = verifier
+        self.limiter = limiter
+        self.ip_limit = cfg.login_ip_limit
+        self.ip_window = cfg.login_ip_window
+        self.email_limit = cfg.login_email_limit
+        self.email_window = cfg.login_email_window
+        self.trusted_proxy_hops = cfg.trusted_proxy_hops
+
+    def client_ip(self) -> str:
+        """
+        IP do cliente: com ``trusted_proxy_hops`` proxies na frente (o gateway
+        acrescenta ao X-Forwarded-For), o n-ésimo de trás pra frente.
+        """
+        forwarded = [
+            part.strip()
+            for part in request.headers.get("X-Forwarded-For", "").split(",")
+            if part.strip()
+        ]
+        hops = self.trusted_proxy_hops
+        if hops > 0 and len(forwarded) >= hops:
+            return forwarded[-hops]
+        return request.remote_addr or "unknown"
+
+    def before_attempt(self, email: str) -> None:
+        """Rejeita com 429 antes de olhar o banco/calcular hash."""
+        retry_after = self.limiter.hit("ip", self.client_ip(), self.ip_limit, self.ip_window)
+        if retry_after:
+            LOGIN_THROTTLED.labels(reason="ip").inc()
+            raise TooManyRequestsError(retry_after=retry_after)
+        retry_after = self.limiter.blocked(
+            "email", email.lower(), self.email_limit, self.email_window
+        )
+        if retry_after:
+            LOGIN_THROTTLED.labels(reason="email").inc()
+            raise TooManyRequestsError(retry_after=retry_after)
+
+    def record_failure(self, email: str) -> None:
+        self.limiter.hit("email", email.lower(), self.email_limit, self.email_window)
+
+    def verify_password(self, pwhash: str, password: str) -> bool:
+        return self.verifier.verify(pwhash, password)
+
+    def rehash_password(self, password: str, method: str) -> Optional[str]:
+        return self.verifier.hash(password, method)
+
+
+def init_login_guard(app: Flask, cfg, redis_client=None) -> LoginGuard:
+    guard = LoginGuard(
+        PasswordVerifier(
+            cfg.password_pool_workers, cfg.password_pool_queue, cfg.password_verify_timeout
+        ),
+        RateLimiter(redis_client),
+        cfg,
+    )
+    app.extensions[EXTENSION_KEY] = guard
+    return guard
+
+
+def get_login_guard() -> LoginGuard:
+    return current_app.extensions[EXTENSION_KEY]
@@ -13,6 +13,18 @@ class RevokedToken(db.Model):
     token_type = db.Column(db.String(20), nullable=False)
     revoked_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     reason = db.Column(db.String(255))
+    # quando o token revogado expiraria; depois disso a linha pode ir pro GC
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
+
+
+class UserTokenEpoch(db.Model):
+    """Tokens do usuário emitidos até ``revoked_before`` (inclusive) são inválidos."""
+
+    __tablename__ = "user_token_epochs"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    revoked_before = db.Column(db.DateTime(timezone=True), nullable=False)
+    reason = db.Column(db.String(255))
 
 
 class Tenant(db.Model):
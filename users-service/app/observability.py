@@ -9,7 +9,7 @@ from logging.config import dictConfig
 from typing import Optional
 
 from flask import Flask, g, has_request_context, request
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from prometheus_flask_exporter import PrometheusMetrics
 
 try:  # opentelemetry is optional at runtime
@@ -46,6 +46,47 @@ OS_CREATED_COUNTER = Counter(
     "os_created_total", "Service Orders created per tenant", ["tenant_id"]
 )
 
+# GC de revoked_tokens (app/revocation_gc.py)
+REVOKED_TOKENS_ROWS = Gauge(
+    "revoked_tokens_rows", "Rows in revoked_tokens (all partitions)"
+)
+REVOKED_TOKENS_BYTES = Gauge(
+    "revoked_tokens_bytes", "Total size of revoked_tokens incl. indexes and partitions"
+)
+REVOCATION_GC_DELETED = Counter(
+    "revocation_gc_deleted_total",
+    "Expired revocation rows removed by the GC",
+    ["kind"],
+)
+REVOCATION_GC_DURATION = Histogram(
+    "revocation_gc_duration_seconds",
+    "Duration of a revocation GC run",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120),
+)
+
+# Login: pool de verificação de senha e rate limit (app/login_guard.py)
+PASSWORD_VERIFY_LATENCY = Histogram(
+    "password_verify_latency_seconds",
+    "Password hash verification time, including pool queueing",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+PASSWORD_VERIFY_IN_FLIGHT = Gauge(
+    "password_verify_in_flight",
+    "Password verifications running or queued in this worker",
+)
+LOGIN_THROTTLED = Counter(
+    "login_throttled_total",
+    "Login attempts rejected with 429",
+    ["reason"],
+)
+
+# Cache de perfil de usuário/tenant (app/profile_cache.py)
+PROFILE_CACHE_LOOKUPS = Counter(
+    "profile_cache_lookups_total",
+    "Profile lookups by layer that answered (local, redis or miss -> SQL)",
+    ["kind", "result"],
+)
+
 _APP_INFO_REGISTERED = False
 
 
@@ -0,0 +1,143 @@
+"""Keyset (cursor) pagination shared by the list endpoints."""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from flask import jsonify, request
+from sqlalchemy import and_, or_
+
+from .errors import ValidationError
+
+# Sem ``limit`` nem ``cursor`` a listagem volta inteira, como antes da
+# paginação; ``DEFAULT_LIMIT`` só vale quando vem um ``cursor`` sem ``limit``.
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Cabeçalho com o cursor da próxima página (ausente na última página).
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PaginationError(ValidationError):
+    """``limit`` ou ``cursor`` inválidos (vira 422 pelo handler de ApiError)."""
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, raw: Any) -> Any:
+    if raw is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(sort_name: str, value: Any, row_id: int) -> str:
+    payload = json.dumps([sort_name, _encode_value(value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_name, raw, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_name != sort_column.key:
+            raise ValueError(sort_name)
+        return _decode_value(sort_column, raw), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise PaginationError("cursor inválido") from exc
+
+
+def parse_limit(raw: Optional[str], default: Optional[int] = DEFAULT_LIMIT) -> Optional[int]:
+    if raw is None or raw == "":
+        return default
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise PaginationError("limit deve ser inteiro") from exc
+    if limit < 1:
+        raise PaginationError("limit deve ser maior que zero")
+    return min(limit, MAX_LIMIT)
+
+
+def _after(sort_column, id_column, value, row_id, descending: bool):
+    """
+    Filtro "depois de (value, row_id)" para ORDER BY sort NULLS LAST, id.
+    Linhas com chave nula ficam no fim, ordenadas só pelo id.
+    """
+    id_after = id_column < row_id if descending else id_column > row_id
+    if value is None:
+        return and_(sort_column.is_(None), id_after)
+    key_after = sort_column < value if descending else sort_column > value
+    return or_(
+        key_after,
+        and_(sort_column == value, id_after),
+        sort_column.is_(None),
+    )
+
+
+def paginate(query, model, sort_column=None, descending: bool = False) -> Page:
+    """
+    Aplica keyset pagination em ``query`` ordenando por ``(sort_column, id)``.
+
+    Lê ``limit`` e ``cursor`` da query string; o cursor é opaco pro cliente
+    e só vale para a mesma ordenação que o gerou. Sem nenhum dos dois, devolve
+    tudo (mesma ordem, sem cursor), pra não truncar clientes antigos.
+    """
+    id_column = model.id
+    sort_column = sort_column if sort_column is not None else id_column
+    cursor = request.args.get("cursor")
+    limit = parse_limit(request.args.get("limit"), DEFAULT_LIMIT if cursor else None)
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column)
+        if sort_column is id_column:
+            query = query.filter(id_column < row_id if descending else id_column > row_id)
+        else:
+            query = query.filter(_after(sort_column, id_column, value, row_id, descending))
+
+    if sort_column is id_column:
+        order = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order = [sort_column.desc().nulls_last(), id_column.desc()]
+    else:
+        order = [sort_column.asc().nulls_last(), id_column.asc()]
+
+    query = query.order_by(*order)
+    if limit is None:
+        return Page(items=query.all(), next_cursor=None)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort_column.key, getattr(last, sort_column.key), last.id
+        )
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+def page_response(payload: List[Any], page: Page):
+    """Lista JSON (formato de sempre) + cursor da próxima página no cabeçalho."""
+    resp = jsonify(payload)
+    if page.next_cursor:
+        resp.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return resp
@@ -0,0 +1,93 @@
+"""Password hashing policy: configured algorithm/cost and rehash detection."""
+
+from __future__ import annotations
+
+import time
+from typing import List, Optional
+
+from flask import Flask, current_app
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+EXTENSION_KEY = "password_policy"
+
+# parâmetros que o werkzeug usa quando o método vem sem custo
+SCRYPT_DEFAULTS = (2**15, 8, 1)
+
+
+def canonical_method(method: str) -> str:
+    """
+    Método no formato que o werkzeug grava no hash (antes do primeiro ``$``):
+    ``scrypt:n:r:p`` ou ``pbkdf2:<digest>:<iterações>``.
+    """
+    parts = [p for p in (method or "").strip().lower().split(":") if p]
+    if not parts:
+        raise ValueError("PASSWORD_HASH_METHOD vazio")
+    algorithm, args = parts[0], parts[1:]
+    if algorithm == "scrypt":
+        if len(args) > 3 or not all(a.isdigit() for a in args):
+            raise ValueError(f"scrypt inválido: {method!r} (use scrypt:n:r:p)")
+        n, r, p = [int(a) for a in args] + list(SCRYPT_DEFAULTS[len(args):])
+        if n < 2 or n & (n - 1):
+            raise ValueError(f"scrypt n deve ser potência de 2: {n}")
+        return f"scrypt:{n}:{r}:{p}"
+    if algorithm == "pbkdf2":
+        digest = args[0] if args else "sha256"
+        if digest not in ("sha256", "sha512"):
+            raise ValueError(f"pbkdf2 com digest não suportado: {digest}")
+        iterations = args[1] if len(args) > 1 else str(DEFAULT_PBKDF2_ITERATIONS)
+        if len(args) > 2 or not iterations.isdigit():
+            raise ValueError(f"pbkdf2 inválido: {method!r} (use pbkdf2:sha256:iterações)")
+        return f"pbkdf2:{digest}:{int(iterations)}"
+    raise ValueError(f"algoritmo de senha não suportado: {algorithm}")
+
+
+class PasswordPolicy:
+    """
+    Algoritmo e custo atuais (``PASSWORD_HASH_METHOD``). Hashes gravados com
+    outros parâmetros continuam válidos e são refeitos no próximo login bem
+    sucedido (``needs_rehash``). Custo escolhido com
+    ``bench/password_hash_bench.py`` no host de produção.
+    """
+
+    def __init__(self, method: str) -> None:
+        self.method = canonical_method(method)
+
+    def hash(self, password: str) -> str:
+        return generate_password_hash(password, method=self.method)
+
+    def needs_rehash(self, pwhash: Optional[str]) -> bool:
+        if not pwhash or "$" not in pwhash:
+            return True
+        try:
+            return canonical_method(pwhash.split("$", 1)[0]) != self.method
+        except ValueError:
+            return True
+
+
+def measure_verify_ms(method: str, samples: int = 20) -> List[float]:
+    """Tempo (ms) de ``check_password_hash`` com ``method``, ``samples`` vezes."""
+    pwhash = generate_password_hash("benchmark-password", method=canonical_method(method))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        check_password_hash(pwhash, "benchmark-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def init_password_policy(app: Flask, cfg) -> PasswordPolicy:
+    policy = PasswordPolicy(cfg.password_hash_method)
+    app.extensions[EXTENSION_KEY] = policy
+    return policy
+
+
+def get_password_policy() -> PasswordPolicy:
+    return current_app.extensions[EXTENSION_KEY]
+
+
+def hash_password(password: str) -> str:
+    return get_password_policy().hash(password)
@@ -0,0 +1,275 @@
+"""Cached user/tenant profiles for /auth/me, login and refresh."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from .models import Tenant, User, db
+from .observability import PROFILE_CACHE_LOOKUPS
+from .revocation import LocalCache
+
+try:  # redis é opcional: sem ele fica só o cache local
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - depende do ambiente
+    RedisError = OSError
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "profile_cache"
+# (tipo, id) alterados na transação corrente; invalidados no commit. id None:
+# UPDATE/DELETE em lote, invalida o tipo inteiro
+PENDING_KEY = "profile_cache_pending"
+
+USER_FIELDS = ("id", "name", "email", "tenant_id", "role", "plan")
+TENANT_FIELDS = ("id", "name", "plan")
+
+Profile = Dict[str, Any]
+
+
+class ProfileCache:
+    """
+    Perfis de usuário (``user:<id>``) e de tenant (``tenant:<id>``) em LRU
+    local com TTL curto e, com Redis, em ``<prefix><tipo>:<id>`` com TTL
+    maior. Consulta: local -> Redis -> SQL.
+
+    Qualquer commit que altere/apague um User ou Tenant apaga as duas
+    camadas (listeners do SQLAlchemy, ver ``install_invalidation``); UPDATE/
+    DELETE em lote pelo ORM invalida o tipo inteiro. SQL cru não passa pelos
+    listeners: chame ``invalidate``/``invalidate_all`` depois do commit.
+    Outros workers podem ver o perfil antigo por até ``local_ttl`` segundos.
+
+    Cada entrada no Redis guarda a geração em que foi lida
+    (``<prefix>gen:<tipo>`` e ``<prefix>gen:<tipo>:<id>``, que a invalidação
+    incrementa). Um leitor que leu a linha antiga e grava depois da
+    invalidação deixa uma entrada de geração velha, que vale como miss.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix: str = "motogestor:profile:",
+        maxsize: int = 10_000,
+        local_ttl: float = 5.0,
+        ttl: int = 300,
+    ) -> None:
+        self.redis = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local = LocalCache(maxsize, local_ttl)
+        # mesma ideia no cache local: invalidação no meio de uma leitura
+        # impede que ela grave o que leu
+        self._local_generation = 0
+        self._lock = threading.Lock()
+
+    def _key(self, kind: str, ident: int) -> str:
+        return f"{self.prefix}{kind}:{ident}"
+
+    def _gen_key(self, kind: str, ident: Optional[int] = None) -> str:
+        if ident is None:
+            return f"{self.prefix}gen:{kind}"
+        return f"{self.prefix}gen:{kind}:{ident}"
+
+    def _lookup(self, kind: str, ident: int, load) -> Optional[Profile]:
+        local_generation = self._local_generation
+        profile = self.local.get((kind, ident))
+        if profile is not None:
+            PROFILE_CACHE_LOOKUPS.labels(kind=kind, result="local").inc()
+            return profile
+
+        generation = None
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.get(self._key(kind, ident))
+                pipe.get(self._gen_key(kind))
+                pipe.get(self._gen_key(kind, ident))
+                raw, kind_gen, key_gen = pipe.execute()
+                generation = [int(kind_gen or 0), int(key_gen or 0)]
+                entry = json.loads(raw) if raw is not None else None
+                if isinstance(entry, dict) and entry.get("g") == generation:
+                    self._set_local(kind, ident, entry["p"], local_generation)
+                    PROFILE_CACHE_LOOKUPS.labels(kind=kind, result="redis").inc()
+                    return entry["p"]
+            except (RedisError, ValueError):
+                generation = None
+                logger.warning("profile cache: Redis indisponível, consultando SQL", exc_info=True)
+
+        PROFILE_CACHE_LOOKUPS.labels(kind=kind, result="miss").inc()
+        profile = load(ident)
+        if profile is not None:
+            self._store(kind, ident, profile, generation, local_generation)
+        return profile
+
+    def _set_local(self, kind: str, ident: int, profile: Profile, local_generation: int) -> None:
+        with self._lock:
+            if self._local_generation == local_generation:
+                self.local.set((kind, ident), profile)
+
+    def _store(
+        self,
+        kind: str,
+        ident: int,
+        profile: Profile,
+        generation: Optional[list],
+        local_generation: int,
+    ) -> None:
+        self._set_local(kind, ident, profile, local_generation)
+        # sem a geração lida antes do SQL não dá pra garantir que não é velho
+        if self.redis is None or self.ttl <= 0 or generation is None:
+            return
+        try:
+            self.redis.set(
+                self._key(kind, ident), json.dumps({"g": generation, "p": profile}), ex=self.ttl
+            )
+        except RedisError:
+            logger.warning("profile cache: falha ao gravar no Redis", exc_info=True)
+
+    @staticmethod
+    def _load_user(user_id: int) -> Optional[Profile]:
+        row = db.session.query(*(getattr(User, f) for f in USER_FIELDS)).filter(
+            User.id == user_id
+        ).first()
+        return dict(zip(USER_FIELDS, row)) if row else None
+
+    @staticmethod
+    def _load_tenant(tenant_id: int) -> Optional[Profile]:
+        row = db.session.query(*(getattr(Tenant, f) for f in TENANT_FIELDS)).filter(
+            Tenant.id == tenant_id
+        ).first()
+        return dict(zip(TENANT_FIELDS, row)) if row else None
+
+    def user(self, user_id: int) -> Optional[Profile]:
+        return self._lookup("user", user_id, self._load_user)
+
+    def tenant(self, tenant_id: Optional[int]) -> Optional[Profile]:
+        if tenant_id is None:
+            return None
+        return self._lookup("tenant", tenant_id, self._load_tenant)
+
+    def invalidate(self, kind: str, ident: int) -> None:
+        with self._lock:
+            self._local_generation += 1
+            self.local.discard((kind, ident))
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.delete(self._key(kind, ident))
+            self._bump(pipe, self._gen_key(kind, ident))
+            pipe.execute()
+        except RedisError:
+            logger.error("profile cache: falha ao invalidar no Redis", exc_info=True)
+
+    def invalidate_all(self, kind: str) -> None:
+        """Todos os perfis do tipo (UPDATE/DELETE em lote)."""
+        with self._lock:
+            self._local_generation += 1
+            self.local.clear()
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            self._bump(pipe, self._gen_key(kind))
+            pipe.execute()
+        except RedisError:
+            logger.error("profile cache: falha ao invalidar no Redis", exc_info=True)
+
+    def _bump(self, pipe, key: str) -> None:
+        # a geração vive mais que qualquer entrada gravada com o valor anterior
+        pipe.incr(key)
+        pipe.expire(key, max(self.ttl, 1) * 2)
+
+
+def effective_plan(user: Optional[Profile], tenant: Optional[Profile]) -> str:
+    """Plano do usuário, senão o do tenant, senão BASIC."""
+    if user and user.get("plan"):
+        return user["plan"]
+    return (tenant or {}).get("plan") or "BASIC"
+
+
+# ---------- invalidação ----------
+
+_CHANGE_FIELDS = {User: ("user", USER_FIELDS), Tenant: ("tenant", TENANT_FIELDS)}
+_installed = False
+
+
+def _mark(target, kind: str) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, set()).add((kind, target.id))
+
+
+def _track_update(mapper, connection, target) -> None:
+    kind, fields = _CHANGE_FIELDS[mapper.class_]
+    state = inspect(target)
+    # ex.: rehash de senha não muda o perfil
+    if any(state.attrs[f].history.has_changes() for f in fields):
+        _mark(target, kind)
+
+
+def _track_delete(mapper, connection, target) -> None:
+    _mark(target, _CHANGE_FIELDS[mapper.class_][0])
+
+
+def _track_bulk(orm_execute_state) -> None:
+    """``query.update()``/``delete()`` e ``update(User)``: sem after_update por linha."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    for mapper in orm_execute_state.all_mappers:
+        change = _CHANGE_FIELDS.get(mapper.class_)
+        if change is not None:
+            orm_execute_state.session.info.setdefault(PENDING_KEY, set()).add((change[0], None))
+
+
+def _after_commit(session) -> None:
+    pending: Set[Tuple[str, Optional[int]]] = session.info.pop(PENDING_KEY, set())
+    if not pending or not has_app_context():
+        return
+    cache = current_app.extensions.get(EXTENSION_KEY)
+    if cache is None:
+        return
+    for kind, ident in pending:
+        if ident is None:
+            cache.invalidate_all(kind)
+        else:
+            cache.invalidate(kind, ident)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def install_invalidation() -> None:
+    global _installed
+    if _installed:
+        return
+    for model in _CHANGE_FIELDS:
+        event.listen(model, "after_update", _track_update)
+        event.listen(model, "after_delete", _track_delete)
+    event.listen(Session, "do_orm_execute", _track_bulk)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _installed = True
+
+
+def init_profile_cache(app: Flask, cfg, redis_client=None) -> ProfileCache:
+    cache = ProfileCache(
+        redis_client,
+        maxsize=cfg.profile_cache_size,
+        local_ttl=cfg.profile_cache_local_ttl,
+        ttl=cfg.profile_cache_ttl,
+    )
+    app.extensions[EXTENSION_KEY] = cache
+    install_invalidation()
+    return cache
+
+
+def get_profile_cache() -> ProfileCache:
+    return current_app.extensions[EXTENSION_KEY]
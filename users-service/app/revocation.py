@@ -0,0 +1,440 @@
+"""JWT revocation store: durable SQL table with a Redis cache in front."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Hashable, Iterable, Optional, Tuple
+from uuid import uuid4
+
+from flask import Flask, current_app
+
+from .models import RevokedToken, UserTokenEpoch, db
+
+try:  # redis é opcional: sem REDIS_URL (ou sem o pacote) fica só SQL
+    import redis
+    from redis.exceptions import RedisError, WatchError
+except ImportError:  # pragma: no cover - depende do ambiente
+    redis = None
+    RedisError = OSError
+    WatchError = OSError
+
+logger = logging.getLogger(__name__)
+
+# vida máxima de um token emitido (refresh, ver identity.build_refresh_token);
+# usada como TTL quando não se sabe o ``exp`` do token revogado
+MAX_TOKEN_LIFETIME = timedelta(days=30)
+EXTENSION_KEY = "revocation_store"
+# cada revogação também é publicada aqui; o api-gateway mantém uma réplica
+# em memória (api-gateway/app/revocation.py)
+CHANNEL = "motogestor:revocations"
+
+
+_MISSING = object()
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class LocalCache:
+    """LRU com TTL curto por worker (jtis não revogados, épocas de usuário)."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def add(self, key: Hashable) -> None:
+        self.set(key, True)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _epoch(value: Optional[datetime]) -> int:
+    """Instante em milissegundos (0 se ``None``)."""
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    # aritmética inteira: timestamp() * 1000 em float pode perder 1 ms
+    return (value - _UNIX_EPOCH) // timedelta(milliseconds=1)
+
+
+def _epoch_ms(raw: Any) -> int:
+    """
+    Época lida do Redis. Chaves gravadas antes da troca pra milissegundos
+    estão em segundos; nenhum instante real em ms fica abaixo de 10**11 (1973).
+    """
+    epoch = int(raw or 0)
+    return epoch * 1000 if epoch < 10**11 else epoch
+
+
+def _ttl_seconds(expires_at: Optional[datetime]) -> int:
+    now = datetime.now(timezone.utc)
+    if expires_at is None:
+        expires_at = now + MAX_TOKEN_LIFETIME
+    elif expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return int((expires_at - now).total_seconds())
+
+
+class RevocationStore:
+    """
+    ``revoked_tokens`` (por jti) e ``user_token_epochs`` (logout_all: tudo que
+    o usuário recebeu até o instante T) são a fonte durável. O Redis guarda
+    ``<prefix><jti>`` com TTL = vida restante do token e ``<prefix>user:<id>``
+    = T em milissegundos; cada worker lembra por ``negative_ttl`` segundos os jtis
+    que não estão revogados e a época de cada usuário consultado.
+
+    Consulta: cache local -> Redis -> SQL. O Redis só responde "não revogado"
+    / "sem época" se estiver aquecido (chave ``<prefix>__primed__``); depois
+    de um restart/flush a consulta cai no SQL e o Redis é reaquecido a partir
+    das tabelas. Erro de Redis também cai no SQL. Se a réplica de uma
+    revogação falhar depois do commit, o ``__primed__`` é apagado (na hora ou
+    na próxima consulta deste worker) e todos voltam ao SQL até o ``warm()``.
+
+    Só um worker aquece por vez (``<prefix>__warming__``, SET NX com TTL); os
+    outros seguem no SQL enquanto isso. Cada desmarcação incrementa
+    ``<prefix>__generation__``, e o ``warm()`` só grava o ``__primed__`` se a
+    geração não mudou desde que ele começou a ler as tabelas: uma revogação
+    que falhou no meio do aquecimento pode não estar no que foi carregado.
+
+    Revogação feita em outro worker pode levar até ``negative_ttl`` para ser
+    vista por quem já tinha o jti/usuário no cache local.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix: str = "motogestor:revoked:",
+        negative_cache_size: int = 10_000,
+        negative_ttl: float = 5.0,
+        channel: str = CHANNEL,
+        warm_lock_ttl: int = 60,
+    ) -> None:
+        self.redis = redis_client
+        self.prefix = prefix
+        self.channel = channel
+        self.primed_key = f"{prefix}__primed__"
+        self.warm_lock_key = f"{prefix}__warming__"
+        self.generation_key = f"{prefix}__generation__"
+        self.warm_lock_ttl = warm_lock_ttl
+        self.negative = LocalCache(negative_cache_size, negative_ttl)
+        self.epochs = LocalCache(negative_cache_size, negative_ttl)
+        # réplica falhou e o ``__primed__`` ainda não foi apagado
+        self._unprime_pending = False
+
+    def _key(self, jti: str) -> str:
+        return f"{self.prefix}{jti}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.prefix}user:{user_id}"
+
+    # ---------- leitura ----------
+
+    def is_revoked(
+        self,
+        jti: Optional[str],
+        user_id: Optional[int] = None,
+        issued_at_ms: Optional[int] = None,
+    ) -> bool:
+        """
+        Revogado se o jti foi revogado ou se o token foi emitido
+        (``issued_at_ms``, claim ``iat_ms``) até a época do usuário. Em
+        milissegundos, um login logo depois do logout_all já vale.
+        """
+        if user_id is not None and issued_at_ms is not None:
+            if issued_at_ms <= self.user_epoch(user_id):
+                return True
+        if not jti:
+            return False
+        if jti in self.negative:
+            return False
+
+        if self.redis is not None:
+            try:
+                self._flush_unprime()
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.exists(self._key(jti))
+                pipe.exists(self.primed_key)
+                revoked, primed = pipe.execute()
+                if revoked:
+                    return True
+                if primed:
+                    self.negative.add(jti)
+                    return False
+                # Redis vazio (restart/flush): responde pelo SQL e reaquece
+                self.warm()
+            except RedisError:
+                logger.warning("revocation: Redis indisponível, consultando SQL", exc_info=True)
+
+        revoked = self._sql_is_revoked(jti)
+        if not revoked:
+            self.negative.add(jti)
+        return revoked
+
+    @staticmethod
+    def _sql_is_revoked(jti: str) -> bool:
+        return db.session.query(RevokedToken.id).filter_by(jti=jti).first() is not None
+
+    def user_epoch(self, user_id: int) -> int:
+        """Época (milissegundos) do usuário; 0 se ele nunca fez logout_all."""
+        epoch = self.epochs.get(user_id)
+        if epoch is not None:
+            return epoch
+
+        if self.redis is not None:
+            try:
+                self._flush_unprime()
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.get(self._user_key(user_id))
+                pipe.exists(self.primed_key)
+                raw, primed = pipe.execute()
+                if raw is not None or primed:
+                    epoch = _epoch_ms(raw)
+                    self.epochs.set(user_id, epoch)
+                    return epoch
+                self.warm()
+            except RedisError:
+                logger.warning("revocation: Redis indisponível, consultando SQL", exc_info=True)
+
+        epoch = _epoch(
+            db.session.query(UserTokenEpoch.revoked_before)
+            .filter_by(user_id=user_id)
+            .scalar()
+        )
+        self.epochs.set(user_id, epoch)
+        return epoch
+
+    # ---------- escrita (write-through) ----------
+
+    def revoke(
+        self,
+        jti: str,
+        user_id: int,
+        token_type: str,
+        reason: str = "",
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        if not jti:
+            return
+        if expires_at is None:
+            expires_at = datetime.now(timezone.utc) + MAX_TOKEN_LIFETIME
+        if not self._sql_is_revoked(jti):
+            db.session.add(
+                RevokedToken(
+                    jti=jti,
+                    user_id=user_id,
+                    token_type=token_type,
+                    reason=reason or None,
+                    expires_at=expires_at,
+                )
+            )
+            db.session.commit()
+        self.remember([(jti, expires_at)])
+
+    def revoke_user(self, user_id: int, reason: str = "") -> int:
+        """Invalida todos os tokens já emitidos pro usuário (uma linha por usuário)."""
+        now = datetime.now(timezone.utc)
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        row = db.session.get(UserTokenEpoch, user_id)
+        if row is None:
+            row = UserTokenEpoch(user_id=user_id)
+            db.session.add(row)
+        row.revoked_before = now
+        row.reason = reason or None
+        db.session.commit()
+        epoch = _epoch(now)
+        self.remember_epoch(user_id, epoch)
+        return epoch
+
+    def remember_epoch(self, user_id: int, epoch: int) -> None:
+        self.epochs.set(user_id, epoch)
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            # depois da vida máxima de token não sobra nada emitido antes de T
+            pipe.set(
+                self._user_key(user_id),
+                epoch,
+                ex=int(MAX_TOKEN_LIFETIME.total_seconds()),
+            )
+            pipe.publish(self.channel, json.dumps({"user_id": user_id, "epoch": epoch}))
+            pipe.execute()
+        except RedisError:
+            logger.error("revocation: falha ao replicar no Redis", exc_info=True)
+            self._unprime()
+
+    def remember(self, entries: Iterable[Tuple[str, Optional[datetime]]]) -> None:
+        """Replica no Redis revogações já gravadas no SQL."""
+        entries = list(entries)
+        for jti, _ in entries:
+            self.negative.discard(jti)
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for jti, expires_at in entries:
+                ttl = _ttl_seconds(expires_at)
+                if ttl > 0:  # token já expirado não precisa de cache
+                    pipe.set(self._key(jti), 1, ex=ttl)
+                    pipe.publish(
+                        self.channel, json.dumps({"jti": jti, "exp": int(time.time()) + ttl})
+                    )
+            pipe.execute()
+        except RedisError:
+            logger.error("revocation: falha ao replicar no Redis", exc_info=True)
+            self._unprime()
+
+    def _unprime(self) -> None:
+        """
+        A revogação está no SQL mas não no Redis: sem o ``__primed__`` o
+        "não revogado" do Redis deixa de valer e as consultas vão ao SQL até
+        o próximo ``warm()``. Se nem o DEL passar, tenta de novo antes da
+        próxima consulta ao Redis deste worker.
+        """
+        self._unprime_pending = True
+        try:
+            self._flush_unprime()
+        except RedisError:
+            logger.error("revocation: falha ao desmarcar o Redis como aquecido", exc_info=True)
+
+    def _flush_unprime(self) -> None:
+        if self._unprime_pending:
+            # INCR antes do DEL: um warm que já passou da checagem de geração
+            # grava o __primed__ antes deste DEL, e não depois
+            self.redis.incr(self.generation_key)
+            self.redis.delete(self.primed_key)
+            self._unprime_pending = False
+
+    def warm(self, batch_size: int = 1000) -> int:
+        """
+        Carrega no Redis as revogações/épocas ainda dentro da vida máxima de
+        token. Devolve 0 sem tocar no SQL se outro worker já está aquecendo.
+        """
+        if self.redis is None:
+            return 0
+        token = uuid4().hex
+        if not self.redis.set(self.warm_lock_key, token, nx=True, ex=self.warm_lock_ttl):
+            return 0
+        try:
+            return self._warm(batch_size)
+        finally:
+            self._release_warm_lock(token)
+
+    def _release_warm_lock(self, token: str) -> None:
+        # só apaga o próprio lock: se o TTL venceu, ele pode ser de outro worker
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(self.warm_lock_key)
+                raw = pipe.get(self.warm_lock_key)
+                if raw is not None and (raw.decode() if isinstance(raw, bytes) else raw) == token:
+                    pipe.multi()
+                    pipe.delete(self.warm_lock_key)
+                    pipe.execute()
+            except WatchError:
+                pass
+
+    def _warm(self, batch_size: int) -> int:
+        generation = self.redis.get(self.generation_key)
+        now = datetime.now(timezone.utc)
+        cutoff = now - MAX_TOKEN_LIFETIME
+        rows = (
+            db.session.query(RevokedToken.jti, RevokedToken.expires_at)
+            .filter(RevokedToken.expires_at > now)
+            .yield_per(batch_size)
+        )
+        count = 0
+        pipe = self.redis.pipeline(transaction=False)
+        for jti, expires_at in rows:
+            ttl = _ttl_seconds(expires_at)
+            if ttl > 0:
+                pipe.set(self._key(jti), 1, ex=ttl)
+                count += 1
+            if len(pipe) >= batch_size:
+                pipe.execute()
+        epochs = (
+            db.session.query(UserTokenEpoch.user_id, UserTokenEpoch.revoked_before)
+            .filter(UserTokenEpoch.revoked_before >= cutoff)
+            .yield_per(batch_size)
+        )
+        for user_id, revoked_before in epochs:
+            ttl = _ttl_seconds(revoked_before + MAX_TOKEN_LIFETIME)
+            if ttl > 0:
+                pipe.set(self._user_key(user_id), _epoch(revoked_before), ex=ttl)
+                count += 1
+            if len(pipe) >= batch_size:
+                pipe.execute()
+        pipe.execute()
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(self.generation_key)
+                if pipe.get(self.generation_key) != generation:
+                    # houve desmarcação durante a carga: continua frio
+                    return count
+                pipe.multi()
+                pipe.set(self.primed_key, 1)
+                pipe.execute()
+            except WatchError:
+                pass
+        return count
+
+
+def build_redis_client(url: str, socket_timeout: float):
+    if not url:
+        return None
+    if redis is None:
+        logger.warning("REDIS_URL definido mas o pacote redis não está instalado")
+        return None
+    return redis.Redis.from_url(
+        url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout
+    )
+
+
+def init_revocation_store(app: Flask, cfg) -> RevocationStore:
+    store = RevocationStore(
+        redis_client=build_redis_client(cfg.redis_url, cfg.redis_socket_timeout),
+        negative_cache_size=cfg.revocation_negative_cache_size,
+        negative_ttl=cfg.revocation_negative_ttl,
+    )
+    app.extensions[EXTENSION_KEY] = store
+    return store
+
+
+def get_revocation_store() -> RevocationStore:
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,303 @@
+"""Garbage collection for expired revocations (plain or partitioned table)."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import random
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import click
+from flask import Flask
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .models import RevokedToken, UserTokenEpoch, db
+from .observability import (
+    REVOCATION_GC_DELETED,
+    REVOCATION_GC_DURATION,
+    REVOKED_TOKENS_BYTES,
+    REVOKED_TOKENS_ROWS,
+)
+from .revocation import MAX_TOKEN_LIFETIME
+
+logger = logging.getLogger(__name__)
+
+# layout particionado (migração *_partition_revoked_tokens): uma partição por
+# mês de ``expires_at`` + a DEFAULT
+PARTITION_PREFIX = "revoked_tokens_p"
+PARTITIONS_AHEAD = 2
+# pg_try_advisory_lock: só um worker (de todos os processos) roda o GC por vez
+GC_LOCK_KEY = 0x5265_766F_6B47_43  # "RevokGC"
+
+
+def _is_postgres() -> bool:
+    return db.engine.dialect.name == "postgresql"
+
+
+def is_partitioned() -> bool:
+    if not _is_postgres():
+        return False
+    found = db.session.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = 'revoked_tokens' AND pg_table_is_visible(c.oid)"
+        )
+    ).first()
+    return found is not None
+
+
+def _month(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def _partition_month(name: str) -> Optional[date]:
+    suffix = name[len(PARTITION_PREFIX):]
+    if not name.startswith(PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def _partitions() -> List[str]:
+    rows = db.session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'revoked_tokens'::regclass"
+        )
+    )
+    return [name for (name,) in rows]
+
+
+def ensure_partitions(today: Optional[date] = None, ahead: int = PARTITIONS_AHEAD) -> int:
+    """
+    Cria as partições do mês corrente e dos ``ahead`` seguintes. DDL: precisa
+    do dono da tabela (role das migrações), não da ``motogestor_app``.
+    """
+    month = _month(today or datetime.now(timezone.utc).date())
+    existing = set(_partitions())
+    created = 0
+    for _ in range(ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            try:
+                db.session.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF revoked_tokens "
+                        f"FOR VALUES FROM ('{month.isoformat()}') "
+                        f"TO ('{_next_month(month).isoformat()}')"
+                    )
+                )
+                db.session.commit()
+                created += 1
+            except SQLAlchemyError:
+                # outro worker criou no meio, ou a DEFAULT já tem linhas do mês
+                db.session.rollback()
+                logger.warning("revocation gc: não criou a partição %s", name, exc_info=True)
+        month = _next_month(month)
+    return created
+
+
+def drop_expired_partitions(now: datetime) -> int:
+    """Partições cujo mês inteiro já expirou saem com DROP (sem DELETE). Também DDL."""
+    removed = 0
+    current = _month(now.date())
+    for name in _partitions():
+        month = _partition_month(name)
+        if month is None or _next_month(month) > current:
+            continue
+        rows = db.session.execute(text(f"SELECT count(*) FROM {name}")).scalar() or 0
+        db.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        db.session.commit()
+        removed += rows
+    return removed
+
+
+def _delete_expired_rows(now: datetime, batch_size: int) -> int:
+    """DELETE em lotes (tabela simples, ou a DEFAULT/mês corrente se particionada)."""
+    removed = 0
+    while True:
+        batch = (
+            select(RevokedToken.id)
+            .where(RevokedToken.expires_at < now)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        deleted = (
+            RevokedToken.query.filter(
+                RevokedToken.expires_at < now, RevokedToken.id.in_(batch)
+            ).delete(synchronize_session=False)
+        )
+        db.session.commit()
+        removed += deleted
+        if deleted < batch_size:
+            return removed
+
+
+def _delete_stale_epochs(now: datetime) -> int:
+    # passada a vida máxima de token, nenhum token anterior à época existe mais
+    deleted = UserTokenEpoch.query.filter(
+        UserTokenEpoch.revoked_before < now - MAX_TOKEN_LIFETIME
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def table_stats() -> Tuple[int, Optional[int]]:
+    """(linhas, bytes) de revoked_tokens; bytes só no Postgres."""
+    rows = db.session.query(func.count(RevokedToken.id)).scalar() or 0
+    size = None
+    if _is_postgres():
+        size = db.session.execute(
+            text(
+                "SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0) FROM pg_class c "
+                "WHERE c.oid = 'revoked_tokens'::regclass OR c.oid IN ("
+                "  SELECT inhrelid FROM pg_inherits "
+                "  WHERE inhparent = 'revoked_tokens'::regclass)"
+            )
+        ).scalar()
+    REVOKED_TOKENS_ROWS.set(rows)
+    if size is not None:
+        REVOKED_TOKENS_BYTES.set(size)
+    return rows, size
+
+
+def purge_expired(now: Optional[datetime] = None, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Remove revogações de tokens que já expiraram e épocas de logout_all sem
+    efeito. Só DELETE (basta a ``motogestor_app``); na tabela particionada o
+    DELETE passa pela tabela pai. Idempotente.
+    """
+    now = now or datetime.now(timezone.utc)
+    started = time.perf_counter()
+    result = {"tokens": _delete_expired_rows(now, batch_size)}
+    result["epochs"] = _delete_stale_epochs(now)
+
+    REVOCATION_GC_DELETED.labels(kind="token").inc(result["tokens"])
+    REVOCATION_GC_DELETED.labels(kind="epoch").inc(result["epochs"])
+    REVOCATION_GC_DURATION.observe(time.perf_counter() - started)
+    table_stats()
+    return result
+
+
+def maintain_partitions(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Manutenção do layout particionado: DROP dos meses expirados e CREATE dos
+    próximos. Roda fora do app (cron / deploy) com a role dona da tabela, via
+    ``flask --app wsgi maintain-revocation-partitions``.
+    """
+    now = now or datetime.now(timezone.utc)
+    if not is_partitioned():
+        return {"dropped_rows": 0, "created": 0}
+    dropped = drop_expired_partitions(now)
+    REVOCATION_GC_DELETED.labels(kind="token").inc(dropped)
+    return {"dropped_rows": dropped, "created": ensure_partitions(now.date())}
+
+
+@contextlib.contextmanager
+def _gc_lock():
+    """
+    True se este worker pegou o advisory lock do GC, False se outro já está
+    rodando. Fora do Postgres não há disputa entre processos.
+    """
+    if not _is_postgres():
+        yield True
+        return
+    with db.engine.connect() as conn:
+        got = bool(conn.execute(select(func.pg_try_advisory_lock(GC_LOCK_KEY))).scalar())
+        try:
+            yield got
+        finally:
+            if got:
+                conn.execute(select(func.pg_advisory_unlock(GC_LOCK_KEY)))
+
+
+class RevocationGC:
+    """
+    Thread daemon que roda ``purge_expired`` a cada ``interval`` segundos.
+    Todo worker tem a thread, mas a cada rodada só o que pega o advisory lock
+    apaga; os outros pulam a vez.
+    """
+
+    def __init__(self, app: Flask, interval: float, batch_size: int) -> None:
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[Dict[str, int]]:
+        with self.app.app_context():
+            try:
+                with _gc_lock() as elected:
+                    if not elected:
+                        logger.debug("revocation gc: outro worker já está rodando")
+                        return None
+                    result = purge_expired(batch_size=self.batch_size)
+                logger.info("revocation gc: %s", result)
+                return result
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.exception("revocation gc falhou")
+                return None
+            finally:
+                db.session.remove()
+
+    def _run(self) -> None:
+        # espalha os workers pra não rodarem todos no mesmo instante
+        delay = random.uniform(0, self.interval)
+        while not self._stop.wait(delay):
+            self.run_once()
+            delay = self.interval
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="revocation-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def init_revocation_gc(app: Flask, cfg) -> RevocationGC:
+    gc = RevocationGC(app, cfg.revocation_gc_interval, cfg.revocation_gc_batch_size)
+    app.extensions["revocation_gc"] = gc
+    gc.start()
+
+    @app.cli.command("purge-revoked-tokens")
+    @click.option("--batch-size", type=int, default=cfg.revocation_gc_batch_size)
+    def purge_revoked_tokens_command(batch_size):
+        """Remove revogações expiradas (uma execução do GC)."""
+        result = purge_expired(batch_size=batch_size)
+        rows, size = table_stats()
+        click.echo(
+            f"revoked_tokens: {result['tokens']} expiradas removidas, {result['epochs']} épocas; "
+            f"restam {rows} linhas" + (f", {size} bytes" if size is not None else "")
+        )
+
+    @app.cli.command("maintain-revocation-partitions")
+    def maintain_revocation_partitions_command():
+        """DROP/CREATE das partições mensais de revoked_tokens (role dona da tabela)."""
+        if not is_partitioned():
+            click.echo("revoked_tokens não está particionada; nada a fazer")
+            return
+        result = maintain_partitions()
+        click.echo(
+            f"revoked_tokens: {result['dropped_rows']} linhas removidas via DROP de partição, "
+            f"{result['created']} partições criadas"
+        )
+
+    return gc
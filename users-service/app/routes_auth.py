@@ -4,11 +4,13 @@ from flask_jwt_extended import (
     get_jwt_identity,
     jwt_required,
 )
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from .errors import ConflictError, NotFoundError, ValidationError
 from .identity import build_refresh_token, build_token
+from .login_guard import get_login_guard
 from .models import RevokedToken, Tenant, User, db
+from .passwords import get_password_policy, hash_password
+from .profile_cache import effective_plan, get_profile_cache
 from .schemas import AuthResponse, AuthUser, LoginRequest, RegisterRequest
 from .tokens import revoke_all_tokens_for_user, revoke_current_token
 
@@ -22,23 +24,37 @@ def login():
     except Exception as e:
         raise ValidationError("Email e senha são obrigatórios.", {"error": str(e)})
 
+    guard = get_login_guard()
+    guard.before_attempt(payload.email)
+
     user = User.query.filter_by(email=payload.email).first()
-    if not user or not check_password_hash(user.password_hash, payload.password):
+    if not user or not guard.verify_password(user.password_hash, payload.password):
+        guard.record_failure(payload.email)
         raise ValidationError("Credenciais inválidas.")
 
-    tenant = user.tenant
+    # hash com algoritmo/custo antigo: refaz agora que temos a senha em claro
+    policy = get_password_policy()
+    if policy.needs_rehash(user.password_hash):
+        new_hash = guard.rehash_password(payload.password, policy.method)
+        if new_hash:
+            user.password_hash = new_hash
+            db.session.commit()
+
+    tenant = get_profile_cache().tenant(user.tenant_id)
+    plan = effective_plan({"plan": user.plan}, tenant)
+    tenant_name = tenant["name"] if tenant else None
 
     access_token = build_token(
         identity=user.id,
         tenant_id=user.tenant_id,
-        plan=user.plan or tenant.plan if tenant else "BASIC",
-        tenant_name=tenant.name if tenant else None,
+        plan=plan,
+        tenant_name=tenant_name,
     )
     refresh_token = build_refresh_token(
         identity=user.id,
         tenant_id=user.tenant_id,
-        plan=user.plan or tenant.plan if tenant else "BASIC",
-        tenant_name=tenant.name if tenant else None,
+        plan=plan,
+        tenant_name=tenant_name,
     )
 
     response = AuthResponse(
@@ -49,8 +65,8 @@ def login():
             name=user.name,
             email=user.email,
             tenant_id=user.tenant_id,
-            tenant_name=tenant.name if tenant else None,
-            plan=user.plan or (tenant.plan if tenant else "BASIC"),
+            tenant_name=tenant_name,
+            plan=plan,
             role=user.role,
         ),
     )
@@ -75,7 +91,7 @@ def register():
     user = User(
         name=payload.name,
         email=payload.email,
-        password_hash=generate_password_hash(payload.password),
+        password_hash=hash_password(payload.password),
         tenant_id=tenant.id,
         role="OWNER",
         plan="BASIC",
@@ -105,6 +121,14 @@ def refresh():
     plan = claims.get("plan") if claims else "BASIC"
     tenant_name = claims.get("tenant_name") if claims else None
 
+    # nome/plano atuais (podem ter mudado desde o login)
+    cache = get_profile_cache()
+    user = cache.user(int(identity))
+    if user and user["tenant_id"] == tenant_id:
+        tenant = cache.tenant(tenant_id)
+        plan = effective_plan(user, tenant)
+        tenant_name = tenant["name"] if tenant else tenant_name
+
     new_access = build_token(
         identity=int(identity), tenant_id=int(tenant_id), plan=plan, tenant_name=tenant_name
     )
@@ -136,24 +160,25 @@ def logout_all():
 def me():
     user_id = get_jwt_identity()
     user_id = int(user_id) if user_id is not None else None
-    user = db.session.get(User, user_id)
+    cache = get_profile_cache()
+    user = cache.user(user_id) if user_id is not None else None
     token_claims = get_jwt()
     token_tenant_id = token_claims.get("tenant_id") if token_claims else None
 
-    if not user or (token_tenant_id and user.tenant_id != token_tenant_id):
+    if not user or (token_tenant_id and user["tenant_id"] != token_tenant_id):
         raise NotFoundError("Usuário não encontrado para o tenant atual.")
 
-    tenant = user.tenant
+    tenant = cache.tenant(user["tenant_id"])
 
     return (
         jsonify(
             {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "tenant_id": user.tenant_id,
-                "tenant_name": tenant.name if tenant else None,
-                "plan": user.plan or (tenant.plan if tenant else "BASIC"),
+                "id": user["id"],
+                "name": user["name"],
+                "email": user["email"],
+                "tenant_id": user["tenant_id"],
+                "tenant_name": tenant["name"] if tenant else None,
+                "plan": effective_plan(user, tenant),
             }
         ),
         200,
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify
-from werkzeug.security import generate_password_hash
 
 from .models import Tenant, User, db
+from .passwords import hash_password
 
 bp = Blueprint("seed_routes", __name__)
 
@@ -28,7 +28,7 @@ def seed_demo_user():
         user = User(
             name="Usuário Demo",
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
             tenant_id=tenant.id,
             role="OWNER",
             plan="BASIC",
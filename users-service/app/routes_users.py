@@ -1,8 +1,9 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from .errors import NotFoundError
 from .models import User, db
+from .pagination import page_response, paginate
 from .schemas import UserOut
 from .tenant import tenant_query
 
@@ -18,9 +19,9 @@ def list_users():
     if not current_user:
         raise NotFoundError("Usuário não encontrado.")
 
-    users = tenant_query(User).all()
+    page = paginate(tenant_query(User), User)
 
-    return jsonify(
+    return page_response(
         [
             UserOut(
                 **{
@@ -32,6 +33,7 @@ def list_users():
                     "plan": u.plan,
                 }
             ).model_dump()
-            for u in users
-        ]
+            for u in page.items
+        ],
+        page,
     )
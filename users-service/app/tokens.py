@@ -2,55 +2,58 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 
 from flask_jwt_extended import get_jwt
 
-from .models import RevokedToken, db
+from .identity import ISSUED_AT_MS_CLAIM
+from .revocation import get_revocation_store
 
 
-def is_token_revoked(jti: str) -> bool:
-    return db.session.query(RevokedToken.id).filter_by(jti=jti).first() is not None
+def _user_id(claims: Dict[str, Any]) -> Optional[int]:
+    sub = claims.get("sub")
+    try:
+        return int(sub) if sub is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _issued_at_ms(claims: Dict[str, Any]) -> Optional[int]:
+    """Emissão em ms; tokens antigos, sem ``iat_ms``, usam o ``iat`` (segundos)."""
+    if claims.get(ISSUED_AT_MS_CLAIM) is not None:
+        return int(claims[ISSUED_AT_MS_CLAIM])
+    iat = claims.get("iat")
+    return int(iat) * 1000 if iat is not None else None
 
 
-def revoke_token(jti: str, user_id: int, token_type: str, reason: str = "") -> None:
-    if not jti:
-        return
-    if is_token_revoked(jti):
-        return
-    db.session.add(
-        RevokedToken(
-            jti=jti, user_id=user_id, token_type=token_type, reason=reason or None
-        )
+def is_token_revoked(claims: Dict[str, Any]) -> bool:
+    return get_revocation_store().is_revoked(
+        claims.get("jti"), _user_id(claims), _issued_at_ms(claims)
     )
-    db.session.commit()
+
+
+def revoke_token(
+    jti: str,
+    user_id: int,
+    token_type: str,
+    reason: str = "",
+    expires_at: Optional[datetime] = None,
+) -> None:
+    get_revocation_store().revoke(jti, user_id, token_type, reason, expires_at)
 
 
 def revoke_all_tokens_for_user(user_id: int, reason: str = "") -> int:
-    now = datetime.utcnow()
-    rows = [
-        {
-            "jti": f"bulk-{user_id}-{now.timestamp()}-{idx}",
-            "user_id": user_id,
-            "token_type": "bulk",
-            "reason": reason or "logout_all",
-        }
-        for idx in range(3)
-    ]
-    db.session.execute(RevokedToken.__table__.insert(), rows)
-    db.session.commit()
-    return len(rows)
+    """Grava a época do usuário; devolve o instante (epoch em milissegundos)."""
+    return get_revocation_store().revoke_user(user_id, reason or "logout_all")
 
 
 def revoke_current_token(reason: str = "logout") -> Optional[str]:
     claims = get_jwt() or {}
     jti = claims.get("jti")
-    sub = claims.get("sub")
-    try:
-        user_id = int(sub) if sub is not None else None
-    except (TypeError, ValueError):
-        user_id = None
+    user_id = _user_id(claims)
+    exp = claims.get("exp")
+    expires_at = datetime.fromtimestamp(exp, tz=timezone.utc) if exp else None
     if jti and user_id:
-        revoke_token(jti, user_id, claims.get("type", "unknown"), reason)
+        revoke_token(jti, user_id, claims.get("type", "unknown"), reason, expires_at)
     return jti
@@ -0,0 +1,86 @@
+"""
+Benchmark: tempo de verificação de senha por algoritmo/custo neste host.
+
+Mede ``check_password_hash`` (o que o login paga por tentativa) para cada
+custo candidato, reporta mediana/P99 em ms e sugere o maior custo cuja P99
+cabe em ``--target-ms``. O resultado vai em ``PASSWORD_HASH_METHOD``; o
+login refaz os hashes antigos na próxima autenticação de cada usuário.
+
+Rodar de dentro de ``users-service/``, no mesmo tipo de máquina da produção:
+
+    python bench/password_hash_bench.py --target-ms 100
+
+Custos específicos:
+
+    python bench/password_hash_bench.py --methods scrypt:16384:8:1,pbkdf2:sha256:600000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.passwords import canonical_method, measure_verify_ms  # noqa: E402
+
+# do mais barato pro mais caro, por algoritmo
+DEFAULT_METHODS = (
+    "scrypt:8192:8:1",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "scrypt:65536:8:1",
+    "pbkdf2:sha256:300000",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:1000000",
+)
+
+
+def _p99(timings: List[float]) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def run(methods: List[str], samples: int, target_ms: float) -> Optional[str]:
+    print(f"{'método':<26} {'mediana ms':>11} {'p99 ms':>9}")
+    best = None
+    best_p99 = 0.0
+    for method in methods:
+        timings = measure_verify_ms(method, samples)
+        p99 = _p99(timings)
+        fits = p99 <= target_ms
+        print(
+            f"{canonical_method(method):<26} {statistics.median(timings):>11.1f} "
+            f"{p99:>9.1f}{'' if fits else '  (acima do alvo)'}"
+        )
+        # entre os que cabem, o mais lento é o mais caro pra quem ataca
+        if fits and p99 >= best_p99:
+            best, best_p99 = canonical_method(method), p99
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--methods", default=",".join(DEFAULT_METHODS))
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=100.0,
+        help="P99 máxima da verificação (o login inteiro tem que ficar < 300 ms)",
+    )
+    args = parser.parse_args(argv)
+
+    methods = [m.strip() for m in args.methods.split(",") if m.strip()]
+    best = run(methods, args.samples, args.target_ms)
+    if best:
+        print(f"\nPASSWORD_HASH_METHOD={best}")
+    else:
+        print(f"\nnenhum custo cabe em {args.target_ms:.0f} ms neste host")
+
+
+if __name__ == "__main__":
+    main()
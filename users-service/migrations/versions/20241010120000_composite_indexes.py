@@ -0,0 +1,25 @@
+"""Composite index for tenant-scoped user listing.
+
+Revision ID: 20241010120000
+Revises: 20240909130000
+Create Date: 2024-10-10 12:00:00
+
+``GET /users`` filtra por tenant e pagina por id (``app/pagination.py``).
+Conferir com ``scripts/explain_list_routes.py`` (ver ``docs/indexes-and-explain.md``).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "20241010120000"
+down_revision: Union[str, None] = "20240909130000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_tenant_id_id", "users", ["tenant_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_tenant_id_id", table_name="users")
@@ -0,0 +1,33 @@
+"""Per-user token revocation epoch (logout_all).
+
+Revision ID: 20241013120000
+Revises: 20241010120000
+Create Date: 2024-10-13 12:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20241013120000"
+down_revision: Union[str, None] = "20241010120000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_token_epochs",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("revoked_before", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("reason", sa.String(length=255), nullable=True),
+    )
+    op.execute("GRANT SELECT, INSERT, UPDATE, DELETE ON user_token_epochs TO motogestor_app")
+
+    # linhas sintéticas "bulk-*" do logout_all antigo nunca casavam com um jti real
+    op.execute("DELETE FROM revoked_tokens WHERE token_type = 'bulk'")
+
+
+def downgrade() -> None:
+    op.drop_table("user_token_epochs")
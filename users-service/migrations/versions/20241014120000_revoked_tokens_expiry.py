@@ -0,0 +1,37 @@
+"""Store expires_at on revoked tokens so expired rows can be purged.
+
+Revision ID: 20241014120000
+Revises: 20241013120000
+Create Date: 2024-10-14 12:00:00
+
+Linhas antigas não sabem o ``exp`` do token: usa ``revoked_at`` + 30 dias
+(vida do refresh token), o maior valor possível. GC em ``app/revocation_gc.py``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20241014120000"
+down_revision: Union[str, None] = "20241013120000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "revoked_tokens", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.execute(
+        "UPDATE revoked_tokens "
+        "SET expires_at = COALESCE(revoked_at, now()) + interval '30 days' "
+        "WHERE expires_at IS NULL"
+    )
+    op.alter_column("revoked_tokens", "expires_at", nullable=False)
+    op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revoked_tokens_expires_at", table_name="revoked_tokens")
+    op.drop_column("revoked_tokens", "expires_at")
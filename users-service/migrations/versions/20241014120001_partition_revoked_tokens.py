@@ -0,0 +1,150 @@
+"""Optional: monthly range partitions on revoked_tokens.expires_at.
+
+Revision ID: 20241014120001
+Revises: 20241014120000
+Create Date: 2024-10-14 12:00:01
+
+Opcional: só converte a tabela com ``REVOKED_TOKENS_PARTITIONED=true`` (ou
+``alembic -x partition_revoked_tokens=true upgrade head``); sem isso a
+revisão é registrada sem mudar nada. Para ativar depois::
+
+    alembic downgrade 20241014120000
+    REVOKED_TOKENS_PARTITIONED=true alembic upgrade head
+
+Com partições o DROP dos meses expirados e o CREATE dos seguintes ficam no
+``flask --app wsgi maintain-revocation-partitions``, rodado por cron (mensal)
+com a mesma role das migrações: a ``motogestor_app`` não é dona da tabela.
+O GC do app só faz DELETE, que passa pela tabela pai. Postgres exige a chave de partição nos índices
+únicos, então a unicidade passa a ser ``(jti, expires_at)``; o users-service
+já confere o jti antes de inserir.
+"""
+import os
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20241014120001"
+down_revision: Union[str, None] = "20241014120000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PG_ROLE = "motogestor_app"
+PARTITION_PREFIX = "revoked_tokens_p"
+MONTHS_AHEAD = 2
+COLUMNS = "id, jti, user_id, token_type, revoked_at, reason, expires_at"
+
+
+def _enabled() -> bool:
+    flag = context.get_x_argument(as_dictionary=True).get(
+        "partition_revoked_tokens", os.getenv("REVOKED_TOKENS_PARTITIONED", "")
+    )
+    return flag.lower() in ("1", "true", "yes")
+
+
+def _is_partitioned(bind) -> bool:
+    return (
+        bind.execute(
+            sa.text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = 'revoked_tokens'"
+            )
+        ).first()
+        is not None
+    )
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _enabled() or _is_partitioned(bind):
+        return
+
+    op.execute("ALTER TABLE revoked_tokens RENAME TO revoked_tokens_legacy")
+    # a sequence do id sobrevive ao DROP da tabela antiga
+    op.execute("ALTER SEQUENCE revoked_tokens_id_seq OWNED BY NONE")
+    op.execute(
+        """
+        CREATE TABLE revoked_tokens (
+            id integer NOT NULL DEFAULT nextval('revoked_tokens_id_seq'),
+            jti varchar(255) NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id),
+            token_type varchar(20) NOT NULL,
+            revoked_at timestamptz DEFAULT now(),
+            reason varchar(255),
+            expires_at timestamptz NOT NULL
+        ) PARTITION BY RANGE (expires_at)
+        """
+    )
+    op.execute(f"CREATE TABLE {PARTITION_PREFIX}default PARTITION OF revoked_tokens DEFAULT")
+
+    oldest = bind.execute(sa.text("SELECT min(expires_at) FROM revoked_tokens_legacy")).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {PARTITION_PREFIX}{month:%Y%m} PARTITION OF revoked_tokens "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+
+    op.execute(
+        f"INSERT INTO revoked_tokens ({COLUMNS}) SELECT {COLUMNS} FROM revoked_tokens_legacy"
+    )
+    op.execute("DROP TABLE revoked_tokens_legacy")
+    op.execute("ALTER SEQUENCE revoked_tokens_id_seq OWNED BY revoked_tokens.id")
+
+    op.execute("ALTER TABLE revoked_tokens ADD PRIMARY KEY (id, expires_at)")
+    op.execute("CREATE UNIQUE INDEX uq_revoked_tokens_jti ON revoked_tokens (jti, expires_at)")
+    op.execute("CREATE INDEX ix_revoked_tokens_jti ON revoked_tokens (jti)")
+    op.execute("CREATE INDEX ix_revoked_tokens_expires_at ON revoked_tokens (expires_at)")
+    op.execute(f"GRANT SELECT, INSERT, UPDATE, DELETE ON revoked_tokens TO {PG_ROLE}")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not _is_partitioned(bind):
+        return
+
+    op.execute("ALTER TABLE revoked_tokens RENAME TO revoked_tokens_partitioned")
+    op.execute("ALTER SEQUENCE revoked_tokens_id_seq OWNED BY NONE")
+    op.execute(
+        "ALTER TABLE revoked_tokens_partitioned "
+        "RENAME CONSTRAINT revoked_tokens_pkey TO revoked_tokens_partitioned_pkey"
+    )
+    op.execute("ALTER INDEX ix_revoked_tokens_jti RENAME TO ix_revoked_tokens_partitioned_jti")
+    op.execute(
+        "ALTER INDEX ix_revoked_tokens_expires_at RENAME TO ix_revoked_tokens_partitioned_expires_at"
+    )
+    op.execute(
+        """
+        CREATE TABLE revoked_tokens (
+            id integer PRIMARY KEY DEFAULT nextval('revoked_tokens_id_seq'),
+            jti varchar(255) NOT NULL UNIQUE,
+            user_id integer NOT NULL REFERENCES users (id),
+            token_type varchar(20) NOT NULL,
+            revoked_at timestamptz DEFAULT now(),
+            reason varchar(255),
+            expires_at timestamptz NOT NULL
+        )
+        """
+    )
+    op.execute(
+        f"INSERT INTO revoked_tokens ({COLUMNS}) "
+        f"SELECT DISTINCT ON (jti) {COLUMNS} FROM revoked_tokens_partitioned "
+        "ORDER BY jti, expires_at DESC"
+    )
+    op.execute("DROP TABLE revoked_tokens_partitioned")
+    op.execute("ALTER SEQUENCE revoked_tokens_id_seq OWNED BY revoked_tokens.id")
+    op.execute("CREATE INDEX ix_revoked_tokens_jti ON revoked_tokens (jti)")
+    op.execute("CREATE INDEX ix_revoked_tokens_expires_at ON revoked_tokens (expires_at)")
+    op.execute(f"GRANT SELECT, INSERT, UPDATE, DELETE ON revoked_tokens TO {PG_ROLE}")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from app.identity import TENANT_ID_CLAIM
-from app.models import RevokedToken, db
+from app.models import RevokedToken, UserTokenEpoch, db
 from flask_jwt_extended import decode_token
 
 from .factories import create_tenant, create_user
@@ -80,19 +80,43 @@ def test_refresh_and_blocklist_flow(client):
     assert me.status_code == 401
 
 
-def test_logout_all_inserts_blocklist_entries(client):
+def test_logout_all_revokes_every_session_without_per_token_rows(client):
     tenant = create_tenant(name="Bulk")
     user = create_user(tenant, password="secret123")
 
-    login = client.post(
-        "/auth/login",
-        json={"email": user.email, "password": "secret123"},
-    ).get_json()
-    access_token = login["access_token"]
+    sessions = [
+        client.post(
+            "/auth/login",
+            json={"email": user.email, "password": "secret123"},
+        ).get_json()
+        for _ in range(2)
+    ]
 
     resp = client.post(
-        "/auth/logout_all", headers={"Authorization": f"Bearer {access_token}"}
+        "/auth/logout_all",
+        headers={"Authorization": f"Bearer {sessions[0]['access_token']}"},
     )
     assert resp.status_code == 200
 
-    assert db.session.query(RevokedToken).count() >= 3
+    for session in sessions:
+        me = client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {session['access_token']}"}
+        )
+        assert me.status_code == 401
+        refresh = client.post(
+            "/auth/refresh",
+            headers={"Authorization": f"Bearer {session['refresh_token']}"},
+        )
+        assert refresh.status_code == 401
+
+    assert db.session.query(RevokedToken).count() == 0
+    assert db.session.get(UserTokenEpoch, user.id) is not None
+
+    # login logo depois do logout_all (mesmo segundo) já vale
+    fresh = client.post(
+        "/auth/login", json={"email": user.email, "password": "secret123"}
+    ).get_json()
+    me = client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {fresh['access_token']}"}
+    )
+    assert me.status_code == 200
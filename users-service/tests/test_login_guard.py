@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import fakeredis
+import pytest
+from app.errors import TooManyRequestsError
+from app.login_guard import EXTENSION_KEY, PasswordVerifier, RateLimiter
+from werkzeug.security import generate_password_hash
+
+from .factories import create_tenant, create_user
+
+
+def _login(client, email, password, ip="198.51.100.7"):
+    return client.post(
+        "/auth/login",
+        json={"email": email, "password": password},
+        headers={"X-Forwarded-For": ip},
+    )
+
+
+def test_verifier_rejects_fast_when_saturated(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_check(pwhash, password):
+        started.set()
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr("app.login_guard.check_password_hash", slow_check)
+    verifier = PasswordVerifier(workers=0, max_queue=1, timeout=5)
+    worker = threading.Thread(target=verifier.verify, args=("h", "p"))
+    worker.start()
+    started.wait(5)
+    try:
+        assert verifier.in_flight == 1
+        with pytest.raises(TooManyRequestsError) as exc:
+            verifier.verify("h", "p")
+        assert exc.value.status_code == 429
+    finally:
+        release.set()
+        worker.join()
+    assert verifier.in_flight == 0
+    assert verifier.verify("h", "p") is True
+
+
+def test_verifier_process_pool_checks_hashes():
+    verifier = PasswordVerifier(workers=1, max_queue=1, timeout=30)
+    pwhash = generate_password_hash("secret123")
+    try:
+        assert verifier.verify(pwhash, "secret123") is True
+        assert verifier.verify(pwhash, "wrong") is False
+    finally:
+        verifier.shutdown()
+
+
+def test_verifier_keeps_slot_until_timed_out_hash_finishes():
+    verifier = PasswordVerifier(workers=1, max_queue=0, timeout=30)
+    fast = generate_password_hash("secret123", "pbkdf2:sha256:1000")
+    slow = generate_password_hash("secret123", "pbkdf2:sha256:1500000")
+    try:
+        assert verifier.verify(fast, "secret123") is True  # sobe o processo do pool
+        verifier.timeout = 0.1
+        with pytest.raises(TooManyRequestsError):
+            verifier.verify(slow, "secret123")
+        # o hash continua no processo: a vaga não volta no timeout
+        assert verifier.in_flight == 1
+        with pytest.raises(TooManyRequestsError):
+            verifier.verify(fast, "secret123")
+
+        deadline = time.monotonic() + 10
+        while verifier.in_flight and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert verifier.in_flight == 0
+        assert verifier.verify(fast, "secret123") is True
+    finally:
+        verifier.shutdown()
+
+
+def test_login_email_failures_are_rate_limited(app, client):
+    app.extensions[EXTENSION_KEY].limiter = RateLimiter(fakeredis.FakeRedis())
+    app.extensions[EXTENSION_KEY].email_limit = 3
+    user = create_user(create_tenant(), password="secret123")
+
+    for _ in range(3):
+        assert _login(client, user.email, "wrong-password").status_code == 422
+
+    resp = _login(client, user.email, "secret123", ip="198.51.100.8")
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) > 0
+    assert resp.get_json()["error"]["code"] == "too_many_requests"
+
+
+def test_login_ip_limit_uses_gateway_forwarded_address(app, client):
+    guard = app.extensions[EXTENSION_KEY]
+    guard.limiter = RateLimiter(fakeredis.FakeRedis())
+    guard.ip_limit = 2
+    user = create_user(create_tenant(), password="secret123")
+
+    assert _login(client, user.email, "secret123").status_code == 200
+    assert _login(client, user.email, "secret123").status_code == 200
+    assert _login(client, user.email, "secret123").status_code == 429
+    # o cliente não escolhe o IP: só o último salto (o gateway) conta
+    spoofed = _login(client, user.email, "secret123", ip="10.0.0.1, 198.51.100.7")
+    assert spoofed.status_code == 429
+    assert _login(client, user.email, "secret123", ip="198.51.100.99").status_code == 200
+
+
+def test_rate_limiter_falls_back_to_local_counts():
+    limiter = RateLimiter()
+    assert limiter.hit("ip", "a", limit=1, window=60) is None
+    assert limiter.hit("ip", "a", limit=1, window=60) > 0
+    assert limiter.blocked("email", "x", limit=1, window=60) is None
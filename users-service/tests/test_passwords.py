@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+from app.models import User, db
+from app.passwords import PasswordPolicy, canonical_method, measure_verify_ms
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .factories import create_tenant, create_user
+
+
+def test_canonical_method_fills_werkzeug_defaults():
+    assert canonical_method("scrypt") == "scrypt:32768:8:1"
+    assert canonical_method("scrypt:16384") == "scrypt:16384:8:1"
+    assert canonical_method("PBKDF2:sha256:1000") == "pbkdf2:sha256:1000"
+    assert canonical_method("pbkdf2").startswith("pbkdf2:sha256:")
+    with pytest.raises(ValueError):
+        canonical_method("md5")
+    with pytest.raises(ValueError):
+        canonical_method("scrypt:1000:8:1")
+
+
+def test_needs_rehash_compares_stored_parameters():
+    policy = PasswordPolicy("pbkdf2:sha256:1000")
+    assert not policy.needs_rehash(generate_password_hash("x", method="pbkdf2:sha256:1000"))
+    assert policy.needs_rehash(generate_password_hash("x", method="pbkdf2:sha256:2000"))
+    assert policy.needs_rehash(generate_password_hash("x", method="scrypt:16384:8:1"))
+    assert policy.needs_rehash("texto-sem-formato")
+    assert policy.needs_rehash(None)
+
+
+def test_measure_verify_ms_returns_one_timing_per_sample():
+    timings = measure_verify_ms("pbkdf2:sha256:1000", samples=3)
+    assert len(timings) == 3
+    assert all(t >= 0 for t in timings)
+
+
+def test_login_upgrades_outdated_hash(client):
+    tenant = create_tenant()
+    user = create_user(tenant, email="old@example.com", password="secret123")
+    user.password_hash = generate_password_hash("secret123", method="pbkdf2:sha256:2000")
+    db.session.commit()
+
+    resp = client.post("/auth/login", json={"email": "old@example.com", "password": "secret123"})
+    assert resp.status_code == 200
+
+    stored = db.session.get(User, user.id).password_hash
+    assert stored.startswith("pbkdf2:sha256:1000$")
+    assert check_password_hash(stored, "secret123")
+
+
+def test_failed_login_keeps_outdated_hash(client):
+    tenant = create_tenant()
+    user = create_user(tenant, email="keep@example.com", password="secret123")
+    old_hash = generate_password_hash("secret123", method="pbkdf2:sha256:2000")
+    user.password_hash = old_hash
+    db.session.commit()
+
+    resp = client.post(
+        "/auth/login", json={"email": "keep@example.com", "password": "wrong-password"}
+    )
+    assert resp.status_code == 422
+    assert db.session.get(User, user.id).password_hash == old_hash
+
+
+def test_register_uses_configured_method(client):
+    resp = client.post(
+        "/auth/register",
+        json={
+            "name": "Nova",
+            "email": "nova@example.com",
+            "password": "secret123",
+            "tenant_name": "Oficina Nova",
+        },
+    )
+    assert resp.status_code == 201
+    user = User.query.filter_by(email="nova@example.com").first()
+    assert user.password_hash.startswith("pbkdf2:sha256:1000$")
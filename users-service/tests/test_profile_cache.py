@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import fakeredis
+import pytest
+from app.models import Tenant, User, db
+from app.profile_cache import EXTENSION_KEY, ProfileCache
+from flask_jwt_extended import decode_token
+from sqlalchemy import update
+
+from .factories import create_tenant, create_user
+
+
+@pytest.fixture()
+def fake_redis():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture()
+def cache(app, fake_redis):
+    profile_cache = ProfileCache(fake_redis, local_ttl=60, ttl=60)
+    app.extensions[EXTENSION_KEY] = profile_cache
+    return profile_cache
+
+
+def _login(client, user):
+    return client.post(
+        "/auth/login", json={"email": user.email, "password": "secret123"}
+    ).get_json()
+
+
+def _me(client, token):
+    return client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_me_is_served_from_cache_without_sql(client, cache, fake_redis):
+    tenant = create_tenant(name="Oficina Cache", plan="PRO")
+    user = create_user(tenant, password="secret123")
+    token = _login(client, user)["access_token"]
+
+    assert _me(client, token).status_code == 200
+    assert fake_redis.exists(f"motogestor:profile:user:{user.id}")
+
+    cache._load_user = cache._load_tenant = None  # SQL não pode mais ser usado
+    data = _me(client, token).get_json()
+    assert data["tenant_name"] == "Oficina Cache"
+    assert data["plan"] == "PRO"
+
+
+def test_redis_layer_answers_after_local_cache_is_cleared(client, cache, fake_redis):
+    tenant = create_tenant(name="Compartilhado")
+    user = create_user(tenant, password="secret123")
+    token = _login(client, user)["access_token"]
+    _me(client, token)
+
+    cache.local.clear()
+    cache._load_user = cache._load_tenant = None
+    assert _me(client, token).get_json()["tenant_name"] == "Compartilhado"
+
+
+def test_tenant_change_invalidates_profile(client, cache, fake_redis):
+    tenant = create_tenant(name="Antigo", plan="BASIC")
+    user = create_user(tenant, password="secret123")
+    tokens = _login(client, user)
+    assert _me(client, tokens["access_token"]).get_json()["tenant_name"] == "Antigo"
+
+    row = db.session.get(Tenant, tenant.id)
+    row.name = "Novo"
+    db.session.commit()
+
+    assert not fake_redis.exists(f"motogestor:profile:tenant:{tenant.id}")
+    assert _me(client, tokens["access_token"]).get_json()["tenant_name"] == "Novo"
+
+    refreshed = client.post(
+        "/auth/refresh", headers={"Authorization": f"Bearer {tokens['refresh_token']}"}
+    ).get_json()
+    assert decode_token(refreshed["access_token"])["tenant_name"] == "Novo"
+
+
+def test_user_change_invalidates_only_profile_fields(client, cache, fake_redis):
+    tenant = create_tenant()
+    user = create_user(tenant, password="secret123")
+    token = _login(client, user)["access_token"]
+    _me(client, token)
+
+    user.password_hash = "outro-hash"
+    db.session.commit()
+    assert fake_redis.exists(f"motogestor:profile:user:{user.id}")
+
+    user.name = "Nome Novo"
+    db.session.commit()
+    assert not fake_redis.exists(f"motogestor:profile:user:{user.id}")
+    assert _me(client, token).get_json()["name"] == "Nome Novo"
+
+
+def test_bulk_update_invalidates_profiles(client, cache, fake_redis):
+    tenant = create_tenant()
+    user = create_user(tenant, password="secret123")
+    token = _login(client, user)["access_token"]
+    _me(client, token)
+
+    User.query.filter_by(id=user.id).update({"name": "Em Lote"})
+    db.session.commit()
+    assert _me(client, token).get_json()["name"] == "Em Lote"
+
+    cache.local.clear()
+    db.session.execute(update(User).where(User.id == user.id).values(name="De Novo"))
+    db.session.commit()
+    assert _me(client, token).get_json()["name"] == "De Novo"
+
+
+def test_reader_racing_an_invalidation_does_not_cache_the_old_row(app, cache, fake_redis):
+    user = create_user(create_tenant())
+    load = cache._load_user
+
+    def racing_load(user_id):
+        profile = load(user_id)  # leu a linha antiga...
+        user.name = "Nome Novo"  # ...e o commit + invalidação acontecem antes de gravar
+        db.session.commit()
+        return profile
+
+    cache._load_user = racing_load
+    assert cache.user(user.id)["name"] != "Nome Novo"
+
+    cache._load_user = load
+    assert cache.user(user.id)["name"] == "Nome Novo"
+    cache.local.clear()
+    assert cache.user(user.id)["name"] == "Nome Novo"
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import pytest
+from app.models import RevokedToken, UserTokenEpoch, db
+from app.revocation import EXTENSION_KEY, RevocationStore
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from .factories import create_tenant, create_user
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    pipelines = 0
+
+    def pipeline(self, *args, **kwargs):
+        type(self).pipelines += 1
+        return super().pipeline(*args, **kwargs)
+
+
+@pytest.fixture()
+def fake_redis():
+    CountingRedis.pipelines = 0
+    return CountingRedis()
+
+
+@pytest.fixture()
+def store(app, fake_redis):
+    store = RevocationStore(redis_client=fake_redis, negative_ttl=60)
+    app.extensions[EXTENSION_KEY] = store
+    return store
+
+
+def _login(client):
+    tenant = create_tenant()
+    user = create_user(tenant, password="secret123")
+    data = client.post(
+        "/auth/login", json={"email": user.email, "password": "secret123"}
+    ).get_json()
+    return {"Authorization": f"Bearer {data['access_token']}"}
+
+
+def _jti(store, fake_redis):
+    keys = [k.decode() for k in fake_redis.keys(f"{store.prefix}*")]
+    jtis = [k[len(store.prefix):] for k in keys]
+    return [k for k in jtis if not k.startswith("__")]
+
+
+def test_logout_writes_through_with_token_ttl(client, store, fake_redis):
+    headers = _login(client)
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+
+    (jti,) = _jti(store, fake_redis)
+    assert 0 < fake_redis.ttl(store._key(jti)) <= 15 * 60
+    assert db.session.query(RevokedToken).filter_by(jti=jti).count() == 1
+
+    # o Redis responde sozinho: sem a linha no SQL continua revogado
+    RevokedToken.query.delete()
+    db.session.commit()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_negative_cache_skips_redis_and_is_dropped_on_revoke(client, store, fake_redis):
+    headers = _login(client)
+    store.warm()
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    before = CountingRedis.pipelines
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert CountingRedis.pipelines == before
+
+    client.post("/auth/logout", headers=headers)
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_flushed_redis_falls_back_to_sql_and_rewarms(client, store, fake_redis):
+    headers = _login(client)
+    client.post("/auth/logout", headers=headers)
+    (jti,) = _jti(store, fake_redis)
+
+    fake_redis.flushall()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert fake_redis.exists(store.primed_key)
+    assert fake_redis.exists(store._key(jti))
+
+
+def test_redis_errors_fall_back_to_sql(app, client):
+    class DownRedis(fakeredis.FakeRedis):
+        def pipeline(self, *args, **kwargs):
+            raise RedisConnectionError("down")
+
+    app.extensions[EXTENSION_KEY] = RevocationStore(redis_client=DownRedis())
+    headers = _login(client)
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_failed_replication_unprimes_redis(app, client):
+    class FlakyRedis(fakeredis.FakeRedis):
+        fail_pipeline = fail_delete = False
+
+        def pipeline(self, *args, **kwargs):
+            pipe = super().pipeline(*args, **kwargs)
+            if self.fail_pipeline:
+                def execute(*a, **k):
+                    raise RedisConnectionError("write lost")
+
+                pipe.execute = execute
+            return pipe
+
+        def delete(self, *names):
+            if self.fail_delete:
+                raise RedisConnectionError("down")
+            return super().delete(*names)
+
+    flaky = FlakyRedis()
+    store = RevocationStore(redis_client=flaky, negative_ttl=60)
+    other = RevocationStore(redis_client=flaky, negative_ttl=60)  # outro worker
+    headers = _login(client)
+    store.warm()
+
+    # commit no SQL ok, SET/PUBLISH no Redis falham: o __primed__ sai
+    app.extensions[EXTENSION_KEY] = store
+    flaky.fail_pipeline = True
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    flaky.fail_pipeline = False
+    assert not flaky.exists(store.primed_key)
+
+    # o outro worker cai no SQL (e reaquece o Redis a partir dele)
+    app.extensions[EXTENSION_KEY] = other
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert flaky.exists(store.primed_key)
+
+    # se nem o DEL passar, ele sai antes da próxima consulta deste worker
+    flaky.fail_pipeline = flaky.fail_delete = True
+    store.revoke_user(1)
+    flaky.fail_pipeline = flaky.fail_delete = False
+    assert flaky.exists(store.primed_key)
+    store.is_revoked("outro-jti")
+    assert not store._unprime_pending
+
+
+def test_only_one_worker_warms_and_the_others_use_sql(client, store, fake_redis):
+    headers = _login(client)
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    (jti,) = _jti(store, fake_redis)
+    fake_redis.flushall()
+
+    # outro worker está aquecendo: este responde pelo SQL e não marca nada
+    fake_redis.set(store.warm_lock_key, "outro", ex=60)
+    assert store.warm() == 0
+    assert store.is_revoked(jti)
+    assert not fake_redis.exists(store.primed_key)
+    assert not fake_redis.exists(store._key(jti))
+
+    fake_redis.delete(store.warm_lock_key)
+    assert store.warm() == 1
+    assert fake_redis.exists(store.primed_key)
+    assert not fake_redis.exists(store.warm_lock_key)
+
+
+def test_unprime_during_warm_keeps_redis_cold(app, store, fake_redis):
+    other = RevocationStore(redis_client=fake_redis, negative_ttl=60)  # outro worker
+
+    class UnprimeMidWarm(CountingRedis):
+        armed = True
+
+        def pipeline(self, *args, **kwargs):
+            # a réplica do outro worker falha depois que o warm leu a geração
+            if self.armed:
+                self.armed = False
+                other._unprime()
+            return super().pipeline(*args, **kwargs)
+
+    redis = UnprimeMidWarm()
+    other.redis = redis
+    store.redis = redis
+    store.warm()
+    assert not redis.exists(store.primed_key)
+    assert not redis.exists(store.warm_lock_key)
+
+    store.warm()
+    assert redis.exists(store.primed_key)
+
+
+def test_logout_all_epoch_is_cached_in_redis_and_rewarmed(client, store, fake_redis):
+    headers = _login(client)
+    assert client.post("/auth/logout_all", headers=headers).status_code == 200
+
+    user_keys = fake_redis.keys(f"{store.prefix}user:*")
+    assert len(user_keys) == 1
+    assert 0 < fake_redis.ttl(user_keys[0]) <= 30 * 24 * 3600
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+    store.epochs.clear()
+    fake_redis.flushall()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert fake_redis.exists(user_keys[0])
+
+
+def test_epochs_are_in_milliseconds_and_read_legacy_seconds(store, fake_redis):
+    epoch = store.revoke_user(1)
+    assert int(fake_redis.get(store._user_key(1))) == epoch
+    assert not store.is_revoked(None, 1, epoch + 1)
+    assert store.is_revoked(None, 1, epoch)
+
+    # chave gravada antes da troca pra ms (segundos)
+    store.epochs.clear()
+    fake_redis.set(store._user_key(1), epoch // 1000)
+    assert store.user_epoch(1) == epoch // 1000 * 1000
+
+
+def test_revocations_are_published_for_the_gateway(client, store, fake_redis):
+    pubsub = fake_redis.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(store.channel)
+    headers = _login(client)
+
+    client.post("/auth/logout", headers=headers)
+    client.post("/auth/logout_all", headers=_login(client))
+
+    messages = []
+    for _ in range(5):  # a primeira é a confirmação do subscribe (ignorada)
+        message = pubsub.get_message(timeout=0.1)
+        if message:
+            messages.append(json.loads(message["data"]))
+    assert [sorted(m) for m in messages] == [["exp", "jti"], ["epoch", "user_id"]]
+
+
+def test_gc_purges_expired_revocations_and_stale_epochs(app):
+    from app.revocation_gc import purge_expired
+
+    user = create_user(create_tenant())
+    now = datetime.now(timezone.utc)
+    db.session.add_all(
+        [
+            RevokedToken(jti="old-1", user_id=user.id, token_type="access", expires_at=now - timedelta(days=1)),
+            RevokedToken(jti="old-2", user_id=user.id, token_type="refresh", expires_at=now - timedelta(seconds=1)),
+            RevokedToken(jti="live", user_id=user.id, token_type="access", expires_at=now + timedelta(minutes=5)),
+            UserTokenEpoch(user_id=user.id, revoked_before=now - timedelta(days=31)),
+        ]
+    )
+    db.session.commit()
+
+    assert purge_expired(now=now, batch_size=1) == {"tokens": 2, "epochs": 1}
+    assert [t.jti for t in RevokedToken.query.all()] == ["live"]
+    assert UserTokenEpoch.query.count() == 0
+
+    result = app.test_cli_runner().invoke(args=["purge-revoked-tokens"])
+    assert "0 expiradas removidas" in result.output
+    assert "restam 1 linhas" in result.output
+
+    # DDL de partição não é do GC: fica no comando rodado com a role das migrações
+    result = app.test_cli_runner().invoke(args=["maintain-revocation-partitions"])
+    assert "não está particionada" in result.output
+
+
+def test_revoke_stores_token_expiry(client, store):
+    headers = _login(client)
+    client.post("/auth/logout", headers=headers)
+
+    (row,) = RevokedToken.query.all()
+    expires_at = row.expires_at.replace(tzinfo=row.expires_at.tzinfo or timezone.utc)
+    assert timedelta(0) < expires_at - datetime.now(timezone.utc) <= timedelta(minutes=15)
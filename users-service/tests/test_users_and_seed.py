@@ -30,3 +30,28 @@ def test_seed_demo_idempotent(client):
     assert second.status_code == 201
     body = second.get_json()
     assert body["user"]["email"] == "demo@motogestor.com"
+
+
+def test_list_users_paginates_with_cursor(client):
+    tenant = create_tenant(name="Gamma")
+    user = create_user(tenant, password="secret123")
+    for _ in range(2):
+        create_user(tenant, password="secret123")
+
+    token = client.post(
+        "/auth/login", json={"email": user.email, "password": "secret123"}
+    ).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get("/users/?limit=2", headers=headers)
+    assert len(first.get_json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(f"/users/?limit=2&cursor={cursor}", headers=headers)
+    assert [u["id"] for u in second.get_json()] == [
+        max(u["id"] for u in first.get_json()) + 1
+    ]
+    assert "X-Next-Cursor" not in second.headers
+
+    bad = client.get("/users/?cursor=%%%", headers=headers)
+    assert bad.status_code == 422